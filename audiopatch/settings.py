@@ -129,17 +129,23 @@ TEMPLATES = [
 
 
 WSGI_APPLICATION = 'audiopatch.wsgi.application'
+ASGI_APPLICATION = 'audiopatch.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+#
+# Production is served under ASGI (Procfile), where Django runs each request's
+# sync code in a fresh thread: persistent connections would pile up, one per
+# thread, so they stay off there.
+# https://docs.djangoproject.com/en/5.2/ref/databases/#persistent-connections
 
 import dj_database_url
 
 DATABASES = {
     'default': dj_database_url.config(
         default=f'sqlite:///{BASE_DIR}/db.sqlite3',
-        conn_max_age=600,
+        conn_max_age=0,
         conn_health_checks=True,
     )
 }
@@ -255,6 +261,18 @@ else:
     SERVER_EMAIL = DEFAULT_FROM_EMAIL
 
 
+# Network Health Monitor housekeeping (planner/monitor_retention.py): seconds
+# between in-process archive / prune passes in each web worker. Unset = off;
+# run `manage.py prune_monitor_history` from cron instead. Both may run at
+# once: each pass claims the slices and sessions it works on.
+MONITOR_RETENTION_INTERVAL = int(os.environ.get('MONITOR_RETENTION_INTERVAL', 0)) or None
+
+# Background PDF rendering (planner/render_jobs.py): 'thread' renders on a
+# pool of RENDER_JOB_WORKERS threads in each web worker, 'inline' renders in
+# the requesting thread.
+RENDER_JOB_QUEUE = os.environ.get('RENDER_JOB_QUEUE', 'thread')
+RENDER_JOB_WORKERS = int(os.environ.get('RENDER_JOB_WORKERS', 2))
+
 # Add this near the bottom of settings.py
 LOGGING = {
     'version': 1,
@@ -43,6 +43,8 @@ urlpatterns = [
 
      # API endpoints at root level (no prefix)
     path('api/mic-tracker-checksum/', planner_views.mic_tracker_checksum, name='mic_tracker_checksum'),
+    path('api/mic-tracker-changes/', planner_views.mic_tracker_changes, name='mic_tracker_changes'),
+    path('api/mic-tracker-days/', planner_views.mic_tracker_days, name='mic_tracker_days'),
 
 
     
@@ -20,7 +20,7 @@ from .models import SoundvisionPrediction, SpeakerArray, SpeakerCabinet
 from django.contrib.admin import AdminSite
 from . import admin_ordering
 from .models import ConsoleStereoOutput
-from .models import MonitorSession, DiscoveredDevice, PollResult, DeviceEvent, ProjectSNMPConfig, SwitchPortSnapshot
+from .models import MonitorSession, DiscoveredDevice, PollResult, PollRollup, DeviceEvent, ProjectSNMPConfig, SwitchPortSnapshot
 from django.urls import path
 
 # Python standard library imports
@@ -37,6 +37,7 @@ from .models import Device, DeviceInput, DeviceOutput
 from .models import Console, ConsoleInput, ConsoleAuxOutput, ConsoleMatrixOutput, SourceHardwareOption
 from .models import ConsoleImport
 from .models import MultitrackSession, MultitrackTrack
+from .project_revisions import object_project, revision_conditional, touch_queryset
 from .models import MultitrackTemplate, MultitrackTemplateSlot
 from .models import SignalFlowDiagram
 from .models import Location, AmpLocation, Amp, AmpChannel, AmpDivider, AMP_PRESET_SUGGESTIONS
@@ -1096,7 +1097,9 @@ class ConsoleAdmin(BaseEquipmentAdmin):
         urls = super().get_urls()
         custom_urls = [
             path('<int:pk>/export-yamaha/',
-                 self.admin_site.admin_view(self.export_yamaha_view),
+                 self.admin_site.admin_view(revision_conditional(
+                     'consoles', project=object_project(Console, 'pk'),
+                 )(self.export_yamaha_view)),
                  name='console-export-yamaha'),
         ]
         return custom_urls + urls
@@ -2147,6 +2150,7 @@ class AmpAdmin(BaseEquipmentAdmin):
                 # Reconstruct the queryset from the IDs
                 amps = Amp.objects.filter(id__in=amp_ids)
                 count = amps.update(color=color)
+                touch_queryset(amps)
                 self.message_user(request, f'Color {color} assigned to {count} amp(s).', messages.SUCCESS)
                 return HttpResponseRedirect(request.get_full_path())
         
@@ -2198,8 +2202,9 @@ class LocationAdmin(BaseEquipmentAdmin):
         """PDF export button for each location"""
         url = reverse('planner:location_pdf_export', args=[obj.id])
         return format_html(
-            '<a class="button" href="{}" target="_blank">📄 Export PDF</a>',
-            url
+            '<a class="button" href="{}" data-render-url="{}" data-render-params="location_id={}" '
+            'target="_blank">📄 Export PDF</a>',
+            url, reverse('planner:render_report', args=['location']), obj.id,
         )
     export_pdf_button.short_description = 'Export Inventory'
     export_pdf_button.allow_tags = True
@@ -3247,6 +3252,7 @@ class PACableAdmin(BaseEquipmentAdmin):
             color = request.POST.get('color')
             if color:
                 count = queryset.update(color=color)
+                touch_queryset(queryset)
                 self.message_user(request, f'Color assigned to {count} cable(s).')
                 return None
         
@@ -4837,6 +4843,7 @@ class CommBeltPackAdmin(BaseEquipmentAdmin):
         """Mark selected belt packs as checked out (wireless only)"""
         wireless_packs = queryset.filter(system_type='WIRELESS')
         updated = wireless_packs.update(checked_out=True)
+        touch_queryset(wireless_packs)
         
         hardwired_count = queryset.filter(system_type='HARDWIRED').count()
         
@@ -4858,6 +4865,7 @@ class CommBeltPackAdmin(BaseEquipmentAdmin):
         """Mark selected belt packs as checked in (wireless only)"""
         wireless_packs = queryset.filter(system_type='WIRELESS')
         updated = wireless_packs.update(checked_out=False)
+        touch_queryset(wireless_packs)
         
         if updated:
             self.message_user(
@@ -6573,7 +6581,7 @@ showstack_admin_site.register(CommConfig, CommConfigAdmin)
 class MonitorSessionAdmin(admin.ModelAdmin):
     list_display = ('__str__', 'project', 'started_at', 'ended_at')
     list_filter = ('project',)
-    readonly_fields = ('started_at',)
+    readonly_fields = ('started_at', 'rollup_watermark')
 
 class DiscoveredDeviceAdmin(admin.ModelAdmin):
     list_display = ('label', 'ip_address', 'domain', 'last_known_state', 'consecutive_failures', 'is_active', 'project')
@@ -6591,6 +6599,18 @@ class PollResultAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return False
 
+class PollRollupAdmin(admin.ModelAdmin):
+    list_display = ('device', 'resolution', 'segment_start', 'bucket_count', 'updated_at')
+    list_filter = ('resolution',)
+    exclude = ('offsets', 'samples', 'lost', 'min_latency', 'max_latency', 'sum_latency', 'timed')
+    readonly_fields = ('device', 'resolution', 'segment_start', 'bucket_count', 'updated_at')
+
+    def has_add_permission(self, request):
+        return False  # Written by rollup_monitor_history
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 class DeviceEventAdmin(admin.ModelAdmin):
     list_display = ('event_type', 'device', 'occurred_at', 'session')
     list_filter = ('event_type', 'session')
@@ -6605,6 +6625,7 @@ class DeviceEventAdmin(admin.ModelAdmin):
 showstack_admin_site.register(MonitorSession, MonitorSessionAdmin)
 showstack_admin_site.register(DiscoveredDevice, DiscoveredDeviceAdmin)
 showstack_admin_site.register(PollResult, PollResultAdmin)
+showstack_admin_site.register(PollRollup, PollRollupAdmin)
 showstack_admin_site.register(DeviceEvent, DeviceEventAdmin)
 
 
@@ -1,7 +1,7 @@
 # planner/admin_ordering.py
 # Updated to hide child models for viewers
 from django.contrib import admin
-from planner.models import ProjectMember, Project
+from planner.project_access import get_project_access
 from planner.admin_site import showstack_admin_site
 
 # TEST - print on import
@@ -22,24 +22,8 @@ def ordered_get_app_list(request, app_label=None):
     app_list = [app for app in app_list if app['app_label'] != 'admin_interface']
     
    # Check if user is a viewer (no editor/owner roles)
-    is_viewer = False
-    if request.user.is_authenticated and not request.user.is_superuser:
-        viewer_memberships = ProjectMember.objects.filter(
-            user=request.user,
-            role='viewer'
-        )
-        
-        if viewer_memberships.exists():
-            editor_owner_memberships = ProjectMember.objects.filter(
-                user=request.user,
-                role='editor'
-            ).exists()
-            
-            owns_projects = Project.objects.filter(owner=request.user).exists()
-            
-            # If ONLY viewer (no editor roles or owned projects), set read-only
-            if not editor_owner_memberships and not owns_projects:
-                is_viewer = True
+    access = get_project_access(request)
+    is_viewer = access is not None and access.is_viewer_only
     
     # DEBUG
     print(f"User: {request.user.username}, is_viewer: {is_viewer}")
@@ -198,11 +198,9 @@ class ShowStackAdminSite(admin.AdminSite):
                 return True
             
             # Free users need to be members of at least one project
-            from planner.models import Project, ProjectMember
-            owns_projects = Project.objects.filter(owner=request.user).exists()
-            member_of_projects = ProjectMember.objects.filter(user=request.user).exists()
-            
-            return owns_projects or member_of_projects
+            from planner.project_access import get_project_access
+            access = get_project_access(request)
+            return access.is_owner or access.is_invited
         
         return False
 
@@ -0,0 +1,549 @@
+"""Synthetic-load benchmarks for ShowStack hot paths.
+
+Each benchmark builds a throwaway project at a few sizes, runs the code path
+under test, and reports wall time plus the number of SQL queries it issued.
+Run them with `python manage.py benchmark` (see the command for flags).
+
+Every run happens inside a transaction that is rolled back afterwards, so a
+benchmark never leaves rows behind — but point it at a dev database, not
+production.
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .models import Project
+
+
+# name -> (callable(size) -> list[dict], default sizes)
+BENCHMARKS = {}
+
+
+def benchmark(name, sizes):
+    """Register a benchmark. The callable gets one size and returns result rows."""
+    def decorator(fn):
+        BENCHMARKS[name] = (fn, tuple(sizes))
+        return fn
+    return decorator
+
+
+class _Rollback(Exception):
+    pass
+
+
+def run_benchmark(name, sizes=None):
+    """Run one registered benchmark for each size, rolling back every run.
+    Returns a flat list of result rows ({'size', 'step', 'ms', 'queries'})."""
+    fn, default_sizes = BENCHMARKS[name]
+    rows = []
+    for size in sizes or default_sizes:
+        try:
+            with transaction.atomic():
+                rows.extend(fn(size))
+                raise _Rollback
+        except _Rollback:
+            pass
+    return rows
+
+
+def measure(size, step, fn, *args, **kwargs):
+    """Call fn once and return (result, row) with elapsed ms and query count."""
+    # CaptureQueriesContext counts from the query log, which stops growing
+    # once a big setup has filled it
+    connection.queries_log.clear()
+    with CaptureQueriesContext(connection) as ctx:
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = (time.perf_counter() - started) * 1000
+    return result, {
+        'size': size,
+        'step': step,
+        'ms': round(elapsed, 1),
+        'queries': len(ctx.captured_queries),
+    }
+
+
+def make_project(label):
+    """Create a throwaway owner + project for one benchmark run."""
+    User = get_user_model()
+    owner = User.objects.create_user(
+        username=f'bench-{label}-{uuid.uuid4().hex[:8]}',
+        password=None,
+    )
+    return Project.objects.create(name=f'Benchmark — {label}', owner=owner)
+
+
+# ──────────────────────────────────────────────
+# Network Health Monitor
+# ──────────────────────────────────────────────
+
+def _make_monitor_devices(project, size):
+    from .models import DiscoveredDevice, MonitorSession
+
+    session = MonitorSession.objects.create(project=project)
+    DiscoveredDevice.objects.bulk_create([
+        DiscoveredDevice(
+            project=project,
+            ip_address=f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}',
+            label=f'Device {i + 1}',
+            domain='dante' if i % 2 else 'la_network',
+        )
+        for i in range(size)
+    ])
+    ips = list(
+        DiscoveredDevice.objects.filter(project=project)
+        .order_by('pk').values_list('ip_address', flat=True)
+    )
+    return session, ips
+
+
+@benchmark('monitor_ingest', sizes=(50, 500, 2000))
+def bench_monitor_ingest(size):
+    """agent_poll_results ingestion: a first all-up cycle (every device goes
+    ONLINE) followed by three cycles where every tenth device stops answering."""
+    from .monitor_ingest import ingest_poll_results
+
+    project = make_project('monitor-ingest')
+    session, ips = _make_monitor_devices(project, size)
+
+    rows = []
+    all_up = [{'ip': ip, 'is_alive': True, 'latency_ms': 0.4} for ip in ips]
+    _, row = measure(size, 'cycle 1 (all online)', ingest_poll_results, project, session, all_up)
+    rows.append(row)
+
+    some_down = [
+        {'ip': ip, 'is_alive': bool(i % 10), 'latency_ms': 0.4 if i % 10 else None}
+        for i, ip in enumerate(ips)
+    ]
+    for cycle in range(2, 5):
+        _, row = measure(size, f'cycle {cycle} (10% down)', ingest_poll_results, project, session, some_down)
+        rows.append(row)
+    return rows
+
+
+def _snmp_cycle(switch_ids, ports_per_switch, flap_every=0, cycle=0):
+    """One SNMP payload; every `flap_every`-th port toggles up/down per cycle."""
+    results = []
+    for device_id in switch_ids:
+        ports = []
+        for port in range(1, ports_per_switch + 1):
+            flapped = flap_every and port % flap_every == 0 and cycle % 2
+            ports.append({
+                'port_index': port,
+                'port_description': f'Gi1/0/{port}',
+                'oper_status': 'down' if flapped else 'up',
+                'speed_mbps': 1000,
+                'bandwidth_pct': 12.5,
+                'error_count': 0,
+            })
+        results.append({'device_id': device_id, 'error': None, 'ports': ports})
+    return results
+
+
+@benchmark('monitor_snmp', sizes=(1, 10, 40))
+def bench_monitor_snmp(size):
+    """agent_snmp_results ingestion for `size` 48-port switches: a first cycle
+    (every snapshot new), an unchanged cycle, and two cycles where every
+    eighth port flaps."""
+    from .models import DiscoveredDevice, MonitorSession
+    from .monitor_ingest import ingest_snmp_results
+
+    project = make_project('monitor-snmp')
+    session = MonitorSession.objects.create(project=project)
+    DiscoveredDevice.objects.bulk_create([
+        DiscoveredDevice(project=project, ip_address=f'10.1.{i // 256}.{i % 256}',
+                         label=f'Switch {i + 1}', domain='switch')
+        for i in range(size)
+    ])
+    switch_ids = list(DiscoveredDevice.objects.filter(project=project).values_list('pk', flat=True))
+
+    rows = []
+    for cycle, step in enumerate(('cycle 1 (new ports)', 'cycle 2 (unchanged)',
+                                  'cycle 3 (1/8 ports down)', 'cycle 4 (back up)')):
+        payload = _snmp_cycle(switch_ids, 48, flap_every=8 if cycle >= 2 else 0, cycle=cycle + 1)
+        _, row = measure(size, step, ingest_snmp_results, project, session, payload)
+        rows.append(row)
+    return rows
+
+
+def _dante_cycle(size, clock_role='locked', skip=0):
+    """One Dante mDNS payload for `size` endpoints, leaving out the first `skip`."""
+    return [
+        {'name': f'DIO-{i}', 'ip': f'10.2.{i // 256}.{i % 256}', 'clock_role': clock_role,
+         'tx_count': 2, 'rx_count': 2, 'model_id': 'DIOAES3',
+         'mac_address': f'00:1d:c1:00:{i // 256:02x}:{i % 256:02x}'}
+        for i in range(skip, size)
+    ]
+
+
+@benchmark('monitor_dante', sizes=(50, 500, 1000))
+def bench_monitor_dante(size):
+    """agent_dante_results reconciliation for `size` Dante endpoints: discovery,
+    a steady-state cycle, a clock change on every device, and a cycle where
+    a tenth of the network drops out."""
+    from .models import MonitorSession
+    from .monitor_ingest import ingest_dante_results
+
+    project = make_project('monitor-dante')
+    session = MonitorSession.objects.create(project=project)
+
+    rows = []
+    for step, payload in (
+        ('cycle 1 (discovery)', _dante_cycle(size)),
+        ('cycle 2 (unchanged)', _dante_cycle(size)),
+        ('cycle 3 (clock change)', _dante_cycle(size, clock_role='unlocked')),
+        ('cycle 4 (10% gone)', _dante_cycle(size, clock_role='unlocked', skip=size // 10)),
+    ):
+        _, row = measure(size, step, ingest_dante_results, project, session, payload)
+        rows.append(row)
+    return rows
+
+
+# ──────────────────────────────────────────────
+# Mic tracker
+# ──────────────────────────────────────────────
+
+MIC_SESSIONS_PER_DAY = 8
+
+
+def _create_mic_day(project, date, mics):
+    """A show day of MIC_SESSIONS_PER_DAY sessions of `mics` mics each."""
+    from .models import MicSession, ShowDay
+
+    day = ShowDay.objects.create(project=project, date=date)
+    for order in range(MIC_SESSIONS_PER_DAY):
+        MicSession.objects.create(day=day, name=f'Session {order + 1}', order=order, num_mics=mics)
+    return day
+
+
+def _duplicate_mic_day(day, date):
+    """Copy every session of `day` into a new day, as duplicate_session does."""
+    from .models import MicSession, ShowDay
+
+    new_day = ShowDay.objects.create(project_id=day.project_id, date=date)
+    for session in day.sessions.all():
+        copy = MicSession(day=new_day, name=session.name, order=session.order, num_mics=session.num_mics)
+        copy.save(create_assignments=False)
+        session.duplicate_to_session(copy)
+    return new_day
+
+
+@benchmark('mic_duplicate_day', sizes=(16, 40, 100))
+def bench_mic_duplicate_day(size):
+    """A show day of eight `size`-mic sessions: creating it, deleting RF 1 in
+    every session (each delete renumbers its session), and duplicating the
+    day with two presenter slots and a shared presenter on every mic."""
+    import datetime
+
+    from .models import MicAssignment, Presenter, PresenterSlot, SharedPresenterAssignment
+
+    project = make_project('mic-duplicate-day')
+    first = datetime.date(2026, 6, 1)
+
+    rows = []
+    day, row = measure(size, 'create day', _create_mic_day, project, first, size + 1)
+    rows.append(row)
+
+    def delete_first_mics():
+        for session in day.sessions.all():
+            session.mic_assignments.filter(rf_number=1).delete()
+    _, row = measure(size, 'delete RF 1 + renumber', delete_first_mics)
+    rows.append(row)
+
+    presenter = Presenter.objects.create(name=f'Bench presenter {project.pk}', project=project)
+    assignments = list(MicAssignment.objects.filter(session__day=day))
+    PresenterSlot.objects.bulk_create([
+        PresenterSlot(assignment=a, presenter=presenter, order=order, is_active=not order)
+        for a in assignments for order in range(2)
+    ])
+    SharedPresenterAssignment.objects.bulk_create([
+        SharedPresenterAssignment(mic_assignment=a, presenter=presenter) for a in assignments
+    ])
+    _, row = measure(size, 'duplicate day', _duplicate_mic_day, day, first + datetime.timedelta(days=1))
+    rows.append(row)
+    return rows
+
+
+# ──────────────────────────────────────────────
+# Project duplication
+# ──────────────────────────────────────────────
+
+def _make_festival(project, channels):
+    """A show with `channels` channels: half console inputs, a quarter I/O
+    device inputs and a quarter amp channels (4 per amp), plus a show day of
+    16-mic sessions, PA cables and a checklist. Built with bulk_create so the
+    save() hooks don't add rows of their own."""
+    import datetime
+
+    from .models import (
+        Amp, AmpChannel, AmpLocation, AmpModel, AudioChecklist, AudioChecklistTask,
+        Console, ConsoleAuxOutput, ConsoleInput, Device, DeviceInput, Location,
+        PACableSchedule, PAZone,
+    )
+
+    location = Location.objects.create(project=project, name='FOH')
+    amp_location = AmpLocation.objects.create(project=project, name='Amp Rack SL')
+
+    consoles = Console.objects.bulk_create([
+        Console(project=project, location=location, name=f'Console {n + 1}') for n in range(4)
+    ])
+    ConsoleInput.objects.bulk_create([
+        ConsoleInput(console=consoles[n % 4], input_ch=n // 4 + 1, dante_number=n + 1, source=f'Input {n + 1}')
+        for n in range(channels // 2)
+    ])
+    ConsoleAuxOutput.objects.bulk_create([
+        ConsoleAuxOutput(console=console, aux_number=n + 1, name=f'Aux {n + 1}')
+        for console in consoles for n in range(24)
+    ])
+
+    device_count = max(channels // 4 // 64, 1)
+    devices = Device.objects.bulk_create([
+        Device(project=project, location=location, name=f'Stagebox {n + 1}', input_count=64)
+        for n in range(device_count)
+    ])
+    DeviceInput.objects.bulk_create([
+        DeviceInput(device=devices[n % device_count], input_number=n // device_count + 1, signal_name=f'Line {n + 1}')
+        for n in range(channels // 4)
+    ])
+
+    amp_model, _ = AmpModel.objects.get_or_create(
+        manufacturer='Benchmark', model_name='4-channel', defaults={'channel_count': 4},
+    )
+    amps = Amp.objects.bulk_create([
+        Amp(project=project, location=amp_location, amp_model=amp_model, name=f'Amp {n + 1}', sort_order=n)
+        for n in range(channels // 16)
+    ])
+    AmpChannel.objects.bulk_create([
+        AmpChannel(amp=amp, channel_number=n + 1) for amp in amps for n in range(4)
+    ])
+
+    _create_mic_day(project, datetime.date(2026, 7, 1), 16)
+
+    zones = PAZone.objects.bulk_create([
+        PAZone(project=project, name=name) for name in ('HL', 'HR', 'SUB', 'FF')
+    ])
+    PACableSchedule.objects.bulk_create([
+        PACableSchedule(project=project, label=zones[n % 4], destination=f'Array {n}', count=1)
+        for n in range(40)
+    ])
+    checklist = AudioChecklist.objects.create(project=project, name='Load-in')
+    AudioChecklistTask.objects.bulk_create([
+        AudioChecklistTask(checklist=checklist, task=f'Task {n + 1}', sort_order=n) for n in range(50)
+    ])
+
+
+@benchmark('project_duplicate', sizes=(500, 2000, 5000))
+def bench_project_duplicate(size):
+    """Project.duplicate() on a synthetic festival template of `size` channels."""
+    project = make_project('project-duplicate')
+    _make_festival(project, size)
+    _, row = measure(size, 'duplicate project', project.duplicate)
+    return [row]
+
+
+# ──────────────────────────────────────────────
+# Multitrack export
+# ──────────────────────────────────────────────
+
+def _make_multitrack_session(size):
+    """A `size`-track session, mostly console inputs plus one aux, matrix and
+    stereo source; every other track has a palette colour override."""
+    from .models import (
+        Console, ConsoleAuxOutput, ConsoleInput, ConsoleMatrixOutput,
+        ConsoleStereoOutput, MultitrackSession, MultitrackTrack,
+    )
+
+    project = make_project('multitrack-export')
+    console = Console.objects.create(project=project, name='Bench CL5')
+    inputs = ConsoleInput.objects.bulk_create([
+        ConsoleInput(console=console, input_ch=str(n), dante_number=str(n), source=f'Input {n}')
+        for n in range(1, size - 2)
+    ])
+    sources = [('input', i.pk) for i in inputs] + [
+        ('aux', ConsoleAuxOutput.objects.create(console=console, aux_number=1).pk),
+        ('matrix', ConsoleMatrixOutput.objects.create(console=console, matrix_number=1).pk),
+        ('stereo', ConsoleStereoOutput.objects.create(console=console, stereo_type='L').pk),
+    ]
+    session = MultitrackSession.objects.create(
+        project=project, console=console, name='Bench', track_order_mode='dante',
+    )
+    MultitrackTrack.objects.bulk_create([
+        MultitrackTrack(session=session, track_number=n, source_type=t, source_id=pk,
+                        color_override='#FF0000' if n % 2 else '')
+        for n, (t, pk) in enumerate(sources, start=1)
+    ])
+    return session
+
+
+@benchmark('multitrack_export', sizes=(32, 128, 512))
+def bench_multitrack_export(size):
+    """Reaper and Nuendo Live exports of a `size`-track session."""
+    from .utils.nuendo_live_export import build_nlpr
+    from .utils.reaper_export import build_rpp
+
+    session = _make_multitrack_session(size)
+    rows = []
+    for step, build in (('build_rpp', build_rpp), ('build_nlpr', build_nlpr)):
+        _, row = measure(size, step, build, session)
+        rows.append(row)
+    return rows
+
+
+@benchmark('nlpr_export', sizes=(64, 256, 1024))
+def bench_nlpr_export(size):
+    """Nuendo Live export of a `size`-track session: time to the first
+    streamed chunk and to the whole file (template already compiled)."""
+    from .utils.nuendo_live_export import build_nlpr, iter_nlpr
+
+    session = _make_multitrack_session(size)
+    build_nlpr(session)  # warm the template cache
+
+    _, first = measure(size, 'first chunk', lambda: next(iter_nlpr(session)))
+    _, whole = measure(size, 'whole file', build_nlpr, session)
+    return [first, whole]
+
+
+# ──────────────────────────────────────────────
+# Signal-flow label autocomplete
+# ──────────────────────────────────────────────
+
+def _make_signal_labels(project, size):
+    """About `size` distinct signal labels: half console inputs, a quarter
+    device inputs patched to them and a quarter named amp channels, plus 96
+    console aux outputs."""
+    from .models import (
+        Amp, AmpChannel, AmpLocation, AmpModel, Console, ConsoleAuxOutput,
+        ConsoleInput, Device, DeviceInput,
+    )
+
+    consoles = Console.objects.bulk_create([
+        Console(project=project, name=f'Console {n + 1}') for n in range(4)
+    ])
+    inputs = ConsoleInput.objects.bulk_create([
+        ConsoleInput(console=consoles[n % 4], input_ch=n // 4 + 1, source=f'Input {n + 1}')
+        for n in range(size // 2)
+    ])
+    ConsoleAuxOutput.objects.bulk_create([
+        ConsoleAuxOutput(console=console, aux_number=n + 1, name=f'Aux {n + 1}')
+        for console in consoles for n in range(24)
+    ])
+    device = Device.objects.create(project=project, name='Stagebox', input_count=size // 4)
+    DeviceInput.objects.bulk_create([
+        DeviceInput(device=device, input_number=n + 1, console_input=inputs[n],
+                    signal_name=f'Line {n + 1}')
+        for n in range(size // 4)
+    ])
+    amp_model, _ = AmpModel.objects.get_or_create(
+        manufacturer='Benchmark', model_name='4-channel', defaults={'channel_count': 4},
+    )
+    amp_location = AmpLocation.objects.create(project=project, name='Amp Rack SL')
+    amps = Amp.objects.bulk_create([
+        Amp(project=project, location=amp_location, amp_model=amp_model, name=f'Amp {n + 1}', sort_order=n)
+        for n in range(size // 16)
+    ])
+    AmpChannel.objects.bulk_create([
+        AmpChannel(amp=amp, channel_number=n + 1, channel_name=f'{amp.name} Out {n + 1}')
+        for amp in amps for n in range(4)
+    ])
+
+
+@benchmark('signal_label_search', sizes=(300, 1000, 3000))
+def bench_signal_label_search(size):
+    """signal_flow_label_autocomplete on a project of about `size` labels:
+    an engineer typing 'Input 12' one keystroke at a time, plus the index
+    build the first keystroke pays for."""
+    from django.test import RequestFactory
+
+    from .signal_labels import label_index
+    from .views import signal_flow_label_autocomplete
+
+    project = make_project('signal-label-search')
+    project.owner.is_staff = True
+    _make_signal_labels(project, size)
+
+    def type_query(text):
+        for n in range(1, len(text) + 1):
+            request = RequestFactory().get('/', {'q': text[:n]})
+            request.user = project.owner
+            request.current_project = project
+            signal_flow_label_autocomplete(request)
+
+    label_index.invalidate(project.pk)
+    _, build = measure(size, 'build index', label_index.get, project.pk)
+    label_index.invalidate(project.pk)
+    _, first = measure(size, 'first keystroke', type_query, 'I')
+    _, typing = measure(size, '8 keystrokes', type_query, 'Input 12')
+    return [build, first, typing]
+
+
+# ──────────────────────────────────────────────
+# PDF exports
+# ──────────────────────────────────────────────
+
+@benchmark('system_report', sizes=(32, 128, 512))
+def bench_system_report(size):
+    """Complete System Report PDF of a synthetic festival of `size` channels."""
+    from django.test import RequestFactory
+
+    from .utils.pdf_exports.system_report import export_system_report
+
+    project = make_project('system-report')
+    _make_festival(project, size)
+    request = RequestFactory().get('/')
+    request.user = project.owner
+    request.current_project = project
+    _, row = measure(size, 'system report', export_system_report, request)
+    return [row]
+
+
+@benchmark('system_report_revalidate', sizes=(32, 128, 512))
+def bench_system_report_revalidate(size):
+    """Cache key of the Complete System Report, and a conditional GET of it
+    that the browser already holds (project_revisions.py)."""
+    from django.test import RequestFactory
+
+    from .render_jobs import REPORTS, report_revision
+    from .utils.pdf_exports.system_report import export_system_report
+
+    project = make_project('system-report-revalidate')
+    _make_festival(project, size)
+    rows = []
+    _, row = measure(size, 'cache key', report_revision, project, REPORTS['system_report'])
+    rows.append(row)
+
+    request = RequestFactory().get('/')
+    request.user = project.owner
+    request.current_project = project
+    etag = export_system_report(request)['ETag']
+    request = RequestFactory().get('/', HTTP_IF_NONE_MATCH=etag)
+    request.user = project.owner
+    request.current_project = project
+    response, row = measure(size, 'revalidate (304)', export_system_report, request)
+    assert response.status_code == 304
+    rows.append(row)
+    return rows
+
+
+# ──────────────────────────────────────────────
+# Dashboard
+# ──────────────────────────────────────────────
+
+@benchmark('dashboard_stats', sizes=(10, 50, 200))
+def bench_dashboard_stats(size):
+    """Dashboard figures of one 256-channel project in a database holding
+    `size` other projects of the same shape (project_stats.py)."""
+    from .project_stats import ProjectStatsCache, load_project_stats
+
+    for n in range(size):
+        _make_festival(make_project(f'dashboard-tenant-{n}'), 256)
+    project = make_project('dashboard')
+    _make_festival(project, 256)
+
+    cache = ProjectStatsCache()
+    _, load = measure(size, 'load figures', load_project_stats, project.pk)
+    _, first = measure(size, 'first view', cache.get, project.pk)
+    _, cached = measure(size, 'unchanged view', cache.get, project.pk)
+    return [load, first, cached]
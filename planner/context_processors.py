@@ -1,7 +1,7 @@
 """
 Context processors for ShowStack admin interface
 """
-from planner.models import Project, ProjectMember 
+from planner.project_access import get_project_access
 
 
 def user_projects(request):
@@ -24,42 +24,31 @@ def user_projects(request):
     if not request.user.is_authenticated:
         return context
     
-    # Determine user role and project access
-    if request.user.is_superuser:
+    # Determine user role and project access (shared with the middleware)
+    access = get_project_access(request)
+    if access.is_superuser:
         # Superusers see only their own projects with dropdown
-        context['user_projects'] = Project.objects.filter(owner=request.user).order_by('-created_at')
+        context['user_projects'] = access.owned_projects()
         context['show_project_dropdown'] = True
         context['user_role'] = 'superuser'
     
-    elif hasattr(request.user, 'userprofile'):
-        # Check if user owns projects
-        owned_projects = Project.objects.filter(owner=request.user).order_by('-created_at')
-        
-        # Check if user is invited to projects
-        invited_projects = Project.objects.filter(
-            projectmember__user=request.user
-        ).distinct().order_by('-created_at')
-        
-        if owned_projects.exists():
+    elif access.has_profile:
+        if access.is_owner:
             # User owns projects - show dropdown with owned projects
-            context['user_projects'] = owned_projects
+            context['user_projects'] = access.owned_projects()
             context['show_project_dropdown'] = True
             context['user_role'] = 'owner'
         
-        elif invited_projects.exists():
+        elif access.is_invited:
             # User is invited but doesn't own - no dropdown, auto-scoped
-            context['user_projects'] = invited_projects
+            context['user_projects'] = access.invited_projects()
             context['show_project_dropdown'] = False
             
             # Determine if editor or viewer
-            membership = ProjectMember.objects.filter(user=request.user).first()
-            if membership:
-                context['user_role'] = membership.role  # 'editor' or 'viewer'
-            else:
-                context['user_role'] = 'viewer'
+            context['user_role'] = access.first_membership[1]  # 'editor' or 'viewer'
     
     # Set current project from request
     if hasattr(request, 'current_project'):
         context['current_project'] = request.current_project
     
-    return context
\ No newline at end of file
+    return context
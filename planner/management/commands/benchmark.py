@@ -0,0 +1,50 @@
+"""Run synthetic-load benchmarks against the configured database.
+
+Every run is rolled back, so nothing is left behind, but use a dev database.
+
+Usage:
+    # List available benchmarks:
+    python manage.py benchmark --list
+
+    # Run one benchmark at its default sizes:
+    python manage.py benchmark monitor_ingest
+
+    # Override the sizes:
+    python manage.py benchmark monitor_ingest --sizes 50 500 2000
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from planner.benchmarks import BENCHMARKS, run_benchmark
+
+
+class Command(BaseCommand):
+    help = "Time ShowStack hot paths on synthetic projects and count their queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Benchmarks to run (default: all).')
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=None,
+            help='Override the benchmark sizes.',
+        )
+        parser.add_argument('--list', action='store_true', help='List benchmarks and exit.')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name, (fn, sizes) in sorted(BENCHMARKS.items()):
+                summary = (fn.__doc__ or '').strip().splitlines()[0] if fn.__doc__ else ''
+                self.stdout.write(f'{name:<24} sizes={list(sizes)}  {summary}')
+            return
+
+        names = options['names'] or sorted(BENCHMARKS)
+        unknown = [n for n in names if n not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(unknown)}. Use --list.")
+
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(f'  {"size":>6}  {"queries":>7}  {"ms":>9}  step')
+            for row in run_benchmark(name, options['sizes']):
+                self.stdout.write(
+                    f'  {row["size"]:>6}  {row["queries"]:>7}  {row["ms"]:>9.1f}  {row["step"]}'
+                )
@@ -0,0 +1,57 @@
+"""Archive closed Network Health Monitor sessions and prune old history.
+
+One housekeeping pass (planner/monitor_retention.py run_housekeeping):
+compacts raw polls into the rollup tiers, exports every closed session to a
+gzip JSON Lines archive (MonitorSession.archive_file), applies rollup / raw
+retention, then deletes events and whole sessions that are past their
+window. Only archived sessions are ever pruned. Windows come from
+DEFAULT_RETENTION in planner/monitor_rollup.py, overridable with
+settings.MONITOR_HISTORY_RETENTION.
+
+Deletes run in bounded batches, so this is safe to run while shows are live.
+Web workers can run the same pass in-process instead; see
+settings.MONITOR_RETENTION_INTERVAL.
+
+Usage:
+    # Full pass (e.g. from cron every hour):
+    railway run python manage.py prune_monitor_history
+
+    # Export closed sessions only, delete nothing:
+    railway run python manage.py prune_monitor_history --archive-only
+"""
+
+from django.core.management.base import BaseCommand
+
+from planner.monitor_retention import archive_closed_sessions, run_housekeeping
+from planner.monitor_rollup import compact_all
+
+
+class Command(BaseCommand):
+    help = "Archive closed monitor sessions and prune monitor history past its retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--archive-only', action='store_true',
+            help='Compact and archive closed sessions; do not delete anything.',
+        )
+
+    def handle(self, *args, **options):
+        if options['archive_only']:
+            compacted = compact_all()
+            archived = archive_closed_sessions()
+            self.stdout.write(f'Compacted {compacted} raw poll result(s); archived {archived} session(s).')
+            self.stdout.write(self.style.SUCCESS('Done.'))
+            return
+
+        summary = run_housekeeping()
+        retention = summary['retention']
+        self.stdout.write(f"Compacted {summary['compacted']} raw poll result(s); archived {summary['archived']} session(s).")
+        self.stdout.write(
+            f"Deleted {retention['raw']} raw row(s); rollup segments: "
+            f"1s={retention[1]}, 1min={retention[60]}, 1h={retention[3600]}."
+        )
+        self.stdout.write(
+            f"Deleted {summary['events']} expired event(s) and {summary['sessions']} "
+            f"session(s) ({summary['session_rows']} row(s))."
+        )
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,46 @@
+"""Compact Network Health Monitor poll history into the rollup tiers.
+
+Folds raw PollResult rows into per-device 1s / 1min / 1h PollRollup buckets,
+then applies the retention policy (planner/monitor_rollup.py DEFAULT_RETENTION,
+overridable with settings.MONITOR_HISTORY_RETENTION): expired rollup segments
+are dropped, and raw rows older than the raw window are deleted once compacted.
+
+Safe to run repeatedly — each session remembers how far it has been compacted —
+and alongside the in-process housekeeping pass (MONITOR_RETENTION_INTERVAL):
+each slice is claimed before it is folded in, so no poll is counted twice.
+
+Usage:
+    # Compact and apply retention (e.g. from cron every minute):
+    railway run python manage.py rollup_monitor_history
+
+    # Compact only, keep every raw row:
+    railway run python manage.py rollup_monitor_history --no-prune
+"""
+
+from django.core.management.base import BaseCommand
+
+from planner.monitor_rollup import apply_retention, compact_all
+
+
+class Command(BaseCommand):
+    help = "Compact raw monitor poll results into 1s/1min/1h rollups and apply retention."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-prune', action='store_true',
+            help='Only compact; do not delete expired rollups or raw rows.',
+        )
+
+    def handle(self, *args, **options):
+        compacted = compact_all()
+        self.stdout.write(f'Compacted {compacted} raw poll result(s).')
+
+        if options['no_prune']:
+            return
+
+        deleted = apply_retention()
+        self.stdout.write(
+            f"Deleted {deleted['raw']} raw row(s); rollup segments: "
+            f"1s={deleted[1]}, 1min={deleted[60]}, 1h={deleted[3600]}."
+        )
+        self.stdout.write(self.style.SUCCESS('Done.'))
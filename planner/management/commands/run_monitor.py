@@ -12,7 +12,9 @@ Usage:
 
 The agent authenticates with the project's agent_api_key (shown on the
 Network Health Monitor dashboard). All network scanning and ICMP polling
-happens locally on this machine. Results are POSTed to the ShowStack API.
+happens locally on this machine. Results go to the ShowStack API through one
+pooled, compressed uplink that batches each tick into a single request and
+spools ping results to disk while the venue uplink is down (monitor_uplink.py).
 """
 import time
 import ipaddress
@@ -20,69 +22,207 @@ import subprocess
 import json
 import threading
 import asyncio
+import os
 
 import requests as http_requests  # renamed to avoid shadowing Django requests
 
 from django.core.management.base import BaseCommand
 
+from planner.monitor_uplink import MonitorUplink
 
-# ── SNMP polling functions (module-level, called via asyncio.run) ─────────────
+
+# ── SNMP polling functions (module-level, driven by SnmpPoller) ───────────────
 
 try:
     from pysnmp.hlapi.asyncio import (
         SnmpEngine, CommunityData, UdpTransportTarget,
-        ContextData, ObjectType, ObjectIdentity, walk_cmd,
+        ContextData, ObjectType, ObjectIdentity, bulk_cmd,
     )
+    from pysnmp.proto.rfc1905 import EndOfMibView, NoSuchInstance, NoSuchObject
     PYSNMP_AVAILABLE = True
 except ImportError:
     PYSNMP_AVAILABLE = False
 
-# ── Dante mDNS discovery (module-level, called via asyncio.run) ──────────────
+# ── Dante mDNS discovery (module-level, driven by DanteWatcher) ───────────────
 
 try:
     from netaudio.dante.browser import DanteBrowser
+    from netaudio.dante.const import SERVICE_CHAN, SERVICE_CMC, SERVICES as DANTE_SERVICES
+    from netaudio.dante.device import DanteDevice
+    from zeroconf import ServiceStateChange
+    from zeroconf.asyncio import AsyncServiceBrowser, AsyncZeroconf
     NETAUDIO_AVAILABLE = True
 except ImportError:
     NETAUDIO_AVAILABLE = False
 
 
-async def _async_discover_dante(timeout=3.0, interface_ip=None, log_fn=None):
-    """Discover Dante devices via mDNS using netaudio DanteBrowser.
-    After mDNS discovery, queries each device for clock status and channel counts.
+# Per-device Dante queries in flight at once, and the initial mDNS settle time
+DANTE_MAX_CONCURRENCY = 16
+DANTE_SETTLE_SECONDS = 3.0
+
+
+def _announcement_fingerprint(services):
+    """What a device announces over mDNS: changes when it is re-addressed,
+    renamed, re-clocked at a new rate, or its channel config changes."""
+    return tuple(sorted(
+        (name, service.get('ipv4'), service.get('port'), tuple(sorted(service.get('properties', {}).items())))
+        for name, service in services.items()
+    ))
+
 
-    Args:
-        interface_ip: IP of the network interface to bind mDNS discovery to.
-                      Prevents discovering devices on other interfaces (e.g. WiFi).
-        log_fn: Optional callable for logging (receives string messages).
+class DanteWatcher:
+    """Long-lived Dante discovery for the agent.
+
+    One mDNS browser stays open for the life of the agent and follows
+    add/update/remove announcements, instead of re-browsing the network from
+    scratch every cycle. refresh() then queries every known device
+    concurrently (at most DANTE_MAX_CONCURRENCY at a time): clock status every
+    time, since lock state is never announced, but TX/RX channel counts only
+    for devices that are new or whose announcement changed.
+    Must be used from a single thread, on the loop that ran start().
     """
-    # Restrict mDNS discovery to a specific interface if provided
-    if interface_ip:
-        from netaudio.common.app_config import settings as netaudio_settings
-        netaudio_settings.interface_ip = interface_ip
 
-    browser = DanteBrowser(mdns_timeout=timeout)
-    devices = await browser.get_devices()
+    def __init__(self, interface_ip=None, max_concurrency=DANTE_MAX_CONCURRENCY, log_fn=None):
+        if interface_ip:
+            # Restrict mDNS discovery to a specific interface
+            from netaudio.common.app_config import settings as netaudio_settings
+            netaudio_settings.interface_ip = interface_ip
+        self.max_concurrency = max_concurrency
+        self._log = log_fn or (lambda msg: None)
+        self._services = {}       # mDNS service name -> netaudio service dict
+        self._devices = {}        # server_name -> DanteDevice
+        self._fingerprints = {}   # server_name -> announcement its channels were read at
+        self._resolving = set()
+        self._zc = None
+        self._mdns = None
+
+    async def start(self):
+        # DanteBrowser only lends its zeroconf settings and service parser
+        self._parser = DanteBrowser(mdns_timeout=0)
+        self._zc = AsyncZeroconf(**self._parser.get_zeroconf_kwargs())
+        self._mdns = AsyncServiceBrowser(
+            self._zc.zeroconf, DANTE_SERVICES, handlers=[self._on_state_change],
+        )
 
-    # Query each device for clock status and channel counts (UDP per-device queries)
-    for server_name, device in devices.items():
-        try:
-            result = await device.get_clocking_status()
-            if log_fn:
-                log_fn(f'  [Dante] {server_name} clock: {getattr(device, "clock_role", None)} (raw: {result})')
-        except Exception as e:
-            if log_fn:
-                log_fn(f'  [Dante] {server_name} clock query failed: {e}')
-        try:
-            await device.get_tx_channels()
-        except Exception as e:
-            if log_fn:
-                log_fn(f'  [Dante] {server_name} tx_channels query failed: {e}')
+    async def close(self):
+        if self._mdns is not None:
+            await self._mdns.async_cancel()
+        if self._zc is not None:
+            await self._zc.async_close()
+
+    def _on_state_change(self, zeroconf, service_type, name, state_change):
+        if service_type == SERVICE_CHAN:
+            return
+        if state_change is ServiceStateChange.Removed:
+            self._services.pop(name, None)
+            return
+        task = asyncio.get_running_loop().create_task(self._resolve(zeroconf, service_type, name))
+        self._resolving.add(task)
+        task.add_done_callback(self._resolving.discard)
+
+    async def _resolve(self, zeroconf, service_type, name):
+        service = await self._parser.async_parse_netaudio_service(zeroconf, service_type, name)
+        if service:
+            self._services[name] = service
+
+    def _build_device(self, server_name, services):
+        """A fresh DanteDevice from its mDNS services (as DanteBrowser.get_devices does)."""
+        device = DanteDevice(server_name=server_name)
+        device.services = dict(sorted(services.items()))
+        for service in services.values():
+            properties = service.get('properties', {})
+            if not device.ipv4:
+                device.ipv4 = service['ipv4']
+            if 'id' in properties and service.get('type') == SERVICE_CMC:
+                device.mac_address = properties['id']
+            if 'model' in properties:
+                device.model_id = properties['model']
+            if 'rate' in properties:
+                device.sample_rate = int(properties['rate'])
+        return device
+
+    async def refresh(self):
+        """Reconcile devices with the current announcements, query them, and
+        return the agent payload entries (see _dante_entries)."""
+        by_host = {}
+        for name, service in self._services.items():
+            by_host.setdefault(service.get('server_name'), {})[name] = service
+
+        for server_name in list(self._devices):
+            if server_name not in by_host:
+                # Every service withdrawn (or expired): the device is gone
+                del self._devices[server_name]
+                self._fingerprints.pop(server_name, None)
+
+        stale = {}
+        for server_name, services in by_host.items():
+            fingerprint = _announcement_fingerprint(services)
+            if self._fingerprints.get(server_name) != fingerprint:
+                self._devices[server_name] = self._build_device(server_name, services)
+                stale[server_name] = fingerprint
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        devices = list(self._devices.items())
+        results = await asyncio.gather(*[
+            self._query(server_name, device, server_name in stale, semaphore)
+            for server_name, device in devices
+        ])
+        for (server_name, _), channels_ok in zip(devices, results):
+            if server_name in stale and channels_ok:
+                self._fingerprints[server_name] = stale[server_name]
+        return _dante_entries(self._devices)
+
+    async def _query(self, server_name, device, with_channels, semaphore):
+        """Clock status, plus channel counts when `with_channels`. Returns
+        False if a channel query failed, so it is retried next refresh."""
+        async with semaphore:
+            try:
+                await device.get_clocking_status()
+            except Exception as e:
+                self._log(f'  [Dante] {server_name} clock query failed: {e}')
+            if not with_channels:
+                return True
+            channels_ok = True
+            for query in ('get_tx_channels', 'get_rx_channels'):
+                try:
+                    await getattr(device, query)()
+                except Exception as e:
+                    channels_ok = False
+                    self._log(f'  [Dante] {server_name} {query[4:]} query failed: {e}')
+            return channels_ok
+
+    async def run(self, stop_event, interval, on_results):
+        """Thread body: refresh every `interval` seconds until stop_event is
+        set, handing each non-empty result list to on_results. The loop keeps
+        running between refreshes so mDNS announcements are processed."""
+        await self.start()
         try:
-            await device.get_rx_channels()
-        except Exception as e:
-            if log_fn:
-                log_fn(f'  [Dante] {server_name} rx_channels query failed: {e}')
+            await _sleep_unless_stopped(stop_event, DANTE_SETTLE_SECONDS)
+            while not stop_event.is_set():
+                started = time.monotonic()
+                try:
+                    devices = await self.refresh()
+                except Exception as e:
+                    self._log(f'[Dante] Discovery error: {e}')
+                    devices = []
+                if devices:
+                    on_results(devices)
+                await _sleep_unless_stopped(stop_event, interval - (time.monotonic() - started))
+        finally:
+            await self.close()
+
+
+async def _sleep_unless_stopped(stop_event, seconds):
+    deadline = time.monotonic() + max(0.0, seconds)
+    while not stop_event.is_set():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(remaining, 0.5))
+
 
+def _dante_entries(devices):
+    """Agent payload entries for {server_name: DanteDevice}."""
     # Build results, deduplicating by device name.
     # Same physical device may appear with multiple IPs (link-local + routed).
     # Prefer 169.254.x.x (primary Dante network) over routed IPs.
@@ -124,6 +264,214 @@ async def _async_discover_dante(timeout=3.0, interface_ip=None, log_fn=None):
 
     return list(seen_names.values())
 
+
+# ── Adaptive ICMP polling (driven by IcmpScheduler) ───────────────────────────
+
+# Scheduler resolution, and the fast tier: critical gear, flapping devices and
+# devices that just stopped answering (so OFFLINE is confirmed in ~1.5 s)
+ICMP_TICK = 0.25
+ICMP_FAST_INTERVAL = 0.5
+ICMP_FAST_TIMEOUT = 0.4
+# Everything else; a wired show LAN answers well inside this
+ICMP_TIMEOUT = 1.0
+# Consecutive replies before a device counts as stable, and how much less
+# often stable devices are pinged (interval × factor)
+ICMP_STABLE_AFTER = 6
+ICMP_STABLE_FACTOR = 3
+# State changes within the window that make a device flapping
+ICMP_FLAP_WINDOW = 60.0
+ICMP_FLAP_THRESHOLD = 3
+# How long a device that stopped answering stays on the fast tier
+ICMP_DOWN_FAST_SECONDS = 30.0
+# Pings in flight: the device count, within these bounds
+ICMP_MIN_CONCURRENCY = 16
+ICMP_MAX_CONCURRENCY = 256
+# Refetch /devices/ at least this often even if the server never signals a change,
+# and retry this soon after a failed fetch
+DEVICE_LIST_MAX_AGE = 300.0
+DEVICE_LIST_RETRY = 5.0
+
+
+class _PollTarget:
+    __slots__ = ('critical', 'due', 'in_flight', 'alive', 'streak', 'changes', 'down_since')
+
+    def __init__(self, due):
+        self.critical = False
+        self.due = due
+        self.in_flight = False
+        self.alive = None
+        self.streak = 0
+        self.changes = []
+        self.down_since = None
+
+
+class IcmpScheduler:
+    """Per-device ICMP cadence for the agent.
+
+    The device list is fetched from /devices/ once and kept; the server puts
+    a devices_version in every poll response and the list is refetched only
+    when that changes (or after DEVICE_LIST_MAX_AGE). Each device is then
+    pinged on its own schedule:
+
+      fast    (ICMP_FAST_INTERVAL) — critical gear (the server's `critical`
+              list), flapping devices, and devices that just stopped answering
+      normal  (interval)           — everything else
+      stable  (interval × ICMP_STABLE_FACTOR) — ICMP_STABLE_AFTER replies in a row
+
+    Stable devices are the vast majority on a show network, so the packet
+    rate stays near the fixed-interval poller's while critical gear gets
+    sub-second detection. Results are handed over every tick when something
+    failed or changed state, otherwise once per interval.
+    """
+
+    def __init__(self, interval, ping=None, clock=time.monotonic):
+        self.interval = interval
+        self._ping = ping
+        self._clock = clock
+        self.targets = {}
+        self.version = None
+        self._refresh_at = 0.0
+        self._signalled = None
+        self._results = []
+        self._urgent = False
+
+    # ── Device list ──
+
+    def update_devices(self, ips, critical=(), version=None):
+        now = self._clock()
+        critical = set(critical)
+        targets = {}
+        for ip in ips:
+            target = self.targets.get(ip) or _PollTarget(now)
+            target.critical = ip in critical
+            targets[ip] = target
+        self.targets = targets
+        self.version = version
+        self._refresh_at = now + DEVICE_LIST_MAX_AGE
+
+    def request_refresh(self, version):
+        """Called with the devices_version of each poll response (any thread)."""
+        if version is not None and version != self.version:
+            self._signalled = version
+
+    def refresh_due(self):
+        return self._signalled is not None or self._clock() >= self._refresh_at
+
+    def refresh_failed(self):
+        self._refresh_at = self._clock() + DEVICE_LIST_RETRY
+
+    @property
+    def concurrency(self):
+        return min(ICMP_MAX_CONCURRENCY, max(ICMP_MIN_CONCURRENCY, len(self.targets)))
+
+    # ── Scheduling ──
+
+    def tier(self, target, now):
+        if (target.critical or len(target.changes) >= ICMP_FLAP_THRESHOLD
+                or (target.down_since is not None and now - target.down_since < ICMP_DOWN_FAST_SECONDS)):
+            return 'fast'
+        if target.alive and target.streak >= ICMP_STABLE_AFTER:
+            return 'stable'
+        return 'normal'
+
+    def due(self):
+        """[(ip, timeout)] for every device due a ping now; marks them in flight."""
+        now = self._clock()
+        batch = []
+        for ip, target in self.targets.items():
+            if target.in_flight or target.due > now:
+                continue
+            target.in_flight = True
+            timeout = ICMP_FAST_TIMEOUT if self.tier(target, now) == 'fast' else ICMP_TIMEOUT
+            batch.append((ip, timeout))
+        return batch
+
+    def record(self, ip, alive, latency_ms=None):
+        """Apply one ping result and schedule the device's next ping."""
+        target = self.targets.get(ip)
+        if target is None:
+            return  # dropped from the list while the ping was in flight
+        now = self._clock()
+        changed = target.alive is not None and alive != target.alive
+        if changed:
+            target.changes.append(now)
+        target.changes = [t for t in target.changes if now - t < ICMP_FLAP_WINDOW]
+        if alive:
+            target.streak = target.streak + 1 if target.alive else 1
+            target.down_since = None
+        else:
+            target.streak = 0
+            if target.down_since is None:
+                target.down_since = now
+        target.alive = alive
+        target.in_flight = False
+        target.due = now + {
+            'fast': ICMP_FAST_INTERVAL,
+            'normal': self.interval,
+            'stable': self.interval * ICMP_STABLE_FACTOR,
+        }[self.tier(target, now)]
+
+        self._results.append({'ip': ip, 'is_alive': alive, 'latency_ms': latency_ms})
+        self._urgent = self._urgent or changed or not alive
+
+    def take_results(self, force=False):
+        """Results to submit now: at once after a failure or state change,
+        otherwise only when `force` (the interval elapsed)."""
+        if not self._results or not (force or self._urgent):
+            return []
+        results, self._results, self._urgent = self._results, [], False
+        return results
+
+    # ── Loop ──
+
+    async def _ping_one(self, ip, timeout, semaphore):
+        async with semaphore:
+            try:
+                host = await self._ping(ip, count=1, timeout=timeout, privileged=False)
+                alive = host.is_alive
+                latency = round(host.avg_rtt, 2) if alive else None
+            except Exception:
+                alive, latency = False, None
+        self.record(ip, alive, latency)
+
+    async def run(self, stop_event, refresh, on_results):
+        """Ping due devices every ICMP_TICK until stop_event is set.
+        `refresh` is an async callable returning (ips, critical, version) or
+        None on failure; `on_results` gets each batch of results."""
+        if self._ping is None:
+            from icmplib import async_ping
+            self._ping = async_ping
+        tasks = set()
+        semaphore, size = None, None
+        last_submit = self._clock()
+        try:
+            while not stop_event.is_set():
+                if self.refresh_due():
+                    self._signalled = None
+                    device_list = await refresh()
+                    if device_list is None:
+                        self.refresh_failed()
+                    else:
+                        self.update_devices(*device_list)
+
+                if size != self.concurrency:
+                    semaphore, size = asyncio.Semaphore(self.concurrency), self.concurrency
+                for ip, timeout in self.due():
+                    task = asyncio.ensure_future(self._ping_one(ip, timeout, semaphore))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+                await _sleep_unless_stopped(stop_event, ICMP_TICK)
+                force = self._clock() - last_submit >= self.interval
+                results = self.take_results(force)
+                if results:
+                    on_results(results)
+                    last_submit = self._clock()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
 IF_MIB_ROOTS = {
     'oper_status':   '1.3.6.1.2.1.2.2.1.8',
     'high_speed':    '1.3.6.1.2.1.31.1.1.1.15',
@@ -134,84 +482,151 @@ IF_MIB_ROOTS = {
 }
 
 
-async def _async_walk_subtree(snmp_engine, community, transport, oid_root):
-    """Walk one IF-MIB subtree via GETNEXT/walk_cmd.
-    Returns {port_index: value_string} or None on error."""
-    rows = {}
-    try:
-        async for (err_indication, err_status, err_index, var_binds) in walk_cmd(
+# GETBULK tuning: rows fetched per column per request, switches polled at
+# once, per-request timeout (retried once), and the wall-clock budget for one
+# switch's whole table fetch.
+SNMP_MAX_REPETITIONS = 25
+SNMP_MAX_CONCURRENCY = 16
+SNMP_REQUEST_TIMEOUT = 1.0
+SNMP_SWITCH_TIMEOUT = 5.0
+
+
+async def _async_bulk_walk(snmp_engine, community, transport, roots):
+    """Fetch several IF-MIB columns together with GETBULK.
+
+    Each request carries the last OID of every unfinished column, so one round
+    trip returns up to SNMP_MAX_REPETITIONS rows of all of them; a column is
+    finished once the switch answers past the end of its subtree.
+    Returns {field: {port_index: value_string}}, or None if the switch does
+    not answer the first request.
+    """
+    tables = {field: {} for field in roots}
+    cursor = dict(roots)  # field -> OID to continue from
+    first = True
+    while cursor:
+        fields = list(cursor)
+        err_indication, err_status, _, var_binds = await bulk_cmd(
             snmp_engine,
             CommunityData(community),
             transport,
             ContextData(),
-            ObjectType(ObjectIdentity(oid_root)),
-            lexicographicMode=False,
-        ):
-            if err_indication or err_status:
-                return None
-            for name, val in var_binds:
-                oid_str = str(name)
-                port_idx = int(oid_str.split('.')[-1])
-                rows[port_idx] = val.prettyPrint()
-    except Exception:
-        return None
-    return rows
+            0, SNMP_MAX_REPETITIONS,
+            *[ObjectType(ObjectIdentity(cursor[f])) for f in fields],
+            lookupMib=False,
+        )
+        if err_indication or err_status:
+            return None if first else tables
+        first = False
+
+        # Var-binds come back row by row: one per requested column per repetition
+        advanced = False
+        for i, (name, val) in enumerate(var_binds):
+            field = fields[i % len(fields)]
+            if field not in cursor:
+                continue
+            oid = str(name)
+            if (isinstance(val, (EndOfMibView, NoSuchObject, NoSuchInstance))
+                    or not oid.startswith(roots[field] + '.')):
+                del cursor[field]
+                continue
+            tables[field][int(oid.rsplit('.', 1)[1])] = val.prettyPrint()
+            if oid != cursor[field]:
+                cursor[field] = oid
+                advanced = True
+        if not advanced:
+            break  # nothing new (or a misbehaving agent repeating OIDs)
+    return tables
+
+
+def _merge_port_tables(tables):
+    """Merge per-column tables into {port_idx: {field: val}} keyed off ifOperStatus."""
+    ports = {}
+    oper_table = tables.get('oper_status', {})
+    for port_idx in oper_table:
+        oper_val = oper_table[port_idx]
+        # ifOperStatus: '1'=up, '2'=down
+        oper_status = 'up' if str(oper_val) == '1' else 'down'
+        speed_raw = tables.get('high_speed', {}).get(port_idx, '0')
+        speed_mbps = int(speed_raw) if str(speed_raw).isdigit() else 0
+        in_octets = int(tables.get('hc_in_octets', {}).get(port_idx, '0') or '0')
+        out_octets = int(tables.get('hc_out_octets', {}).get(port_idx, '0') or '0')
+        in_errors = int(tables.get('in_errors', {}).get(port_idx, '0') or '0')
+        port_descr = str(tables.get('if_descr', {}).get(port_idx, ''))
+
+        ports[port_idx] = {
+            'oper_status': oper_status,
+            'speed_mbps': speed_mbps,
+            'hc_in_octets': in_octets,
+            'hc_out_octets': out_octets,
+            'in_errors': in_errors,
+            'port_description': port_descr,
+        }
+    return ports
 
 
-async def _async_poll_switch(ip, community):
-    """Poll all IF-MIB subtrees for a single switch.
-    Returns {port_idx: {field: val}} or None if SNMP unreachable."""
-    snmp_engine = SnmpEngine()
-    try:
-        transport = await UdpTransportTarget.create((ip, 161), timeout=5, retries=1)
+class SnmpPoller:
+    """One SNMP engine and one event loop for the life of the agent.
 
-        tables = {}
-        for field_name, oid_root in IF_MIB_ROOTS.items():
-            result = await _async_walk_subtree(snmp_engine, community, transport, oid_root)
-            if result is None and field_name == 'oper_status':
-                # Cannot even get port status — switch is SNMP-unreachable
-                return None
-            if result is not None:
-                tables[field_name] = result
-
-        # Merge tables into per-port dicts
-        ports = {}
-        oper_table = tables.get('oper_status', {})
-        for port_idx in oper_table:
-            oper_val = oper_table[port_idx]
-            # ifOperStatus: '1'=up, '2'=down
-            oper_status = 'up' if str(oper_val) == '1' else 'down'
-            speed_raw = tables.get('high_speed', {}).get(port_idx, '0')
-            speed_mbps = int(speed_raw) if str(speed_raw).isdigit() else 0
-            in_octets = int(tables.get('hc_in_octets', {}).get(port_idx, '0') or '0')
-            out_octets = int(tables.get('hc_out_octets', {}).get(port_idx, '0') or '0')
-            in_errors = int(tables.get('in_errors', {}).get(port_idx, '0') or '0')
-            port_descr = str(tables.get('if_descr', {}).get(port_idx, ''))
-
-            ports[port_idx] = {
-                'oper_status': oper_status,
-                'speed_mbps': speed_mbps,
-                'hc_in_octets': in_octets,
-                'hc_out_octets': out_octets,
-                'in_errors': in_errors,
-                'port_description': port_descr,
-            }
-        return ports
-    finally:
-        snmp_engine.closeDispatcher()
-
-
-async def _async_poll_all_switches(switches, community):
-    """Poll all switches. Returns list of per-switch result dicts."""
-    results = []
-    for sw in switches:
-        port_data = await _async_poll_switch(sw['ip'], community)
-        results.append({
+    poll() fetches every switch concurrently (at most SNMP_MAX_CONCURRENCY at
+    a time), each bounded by SNMP_SWITCH_TIMEOUT, so a dead switch costs one
+    timeout rather than delaying the rest. Building a fresh SnmpEngine and
+    event loop per cycle (asyncio.run) was most of the cost of a fast cycle.
+    Must be used from a single thread.
+    """
+
+    def __init__(self, max_concurrency=SNMP_MAX_CONCURRENCY, switch_timeout=SNMP_SWITCH_TIMEOUT):
+        self.loop = asyncio.new_event_loop()
+        self.engine = SnmpEngine()
+        self.max_concurrency = max_concurrency
+        self.switch_timeout = switch_timeout
+        self._transports = {}  # ip -> UdpTransportTarget
+
+    def poll(self, switches, community):
+        """Poll all switches. Returns a list of per-switch result dicts:
+        {'device_id', 'ip', 'ports' (None if SNMP unreachable), 'poll_ms'}."""
+        return self.loop.run_until_complete(self._poll_all(switches, community))
+
+    def close(self):
+        try:
+            self.engine.close_dispatcher()
+        finally:
+            self.loop.close()
+
+    async def _transport(self, ip):
+        transport = self._transports.get(ip)
+        if transport is None:
+            transport = await UdpTransportTarget.create(
+                (ip, 161), timeout=SNMP_REQUEST_TIMEOUT, retries=1,
+            )
+            self._transports[ip] = transport
+        return transport
+
+    async def _poll_switch(self, sw, community, semaphore):
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                transport = await self._transport(sw['ip'])
+                tables = await asyncio.wait_for(
+                    _async_bulk_walk(self.engine, community, transport, IF_MIB_ROOTS),
+                    timeout=self.switch_timeout,
+                )
+            except Exception:
+                tables = None
+            poll_ms = round((time.monotonic() - started) * 1000, 1)
+        # None: cannot even get port status — switch is SNMP-unreachable
+        ports = _merge_port_tables(tables) if tables is not None else None
+        return {
             'device_id': sw['id'],
             'ip': sw['ip'],
-            'ports': port_data,  # None if SNMP unreachable
-        })
-    return results
+            'ports': ports,
+            'poll_ms': poll_ms,
+        }
+
+    async def _poll_all(self, switches, community):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        return await asyncio.gather(*[
+            self._poll_switch(sw, community, semaphore) for sw in switches
+        ])
 
 
 def _compute_bandwidth_pct(curr_in, prev_in, curr_out, prev_out, prev_ts, curr_ts, speed_mbps):
@@ -236,11 +651,17 @@ class Command(BaseCommand):
         parser.add_argument('--server', type=str, default='http://localhost:8000',
                             help='ShowStack server URL (default: http://localhost:8000)')
         parser.add_argument('--interval', type=int, default=10,
-                            help='Poll interval in seconds (default: 10)')
+                            help='Base ICMP poll interval in seconds (default: 10). Stable devices are '
+                                 'pinged less often, critical and flapping ones every 0.5s')
         parser.add_argument('--scan', action='store_true',
                             help='Run a network scan before starting polling')
         parser.add_argument('--scan-only', action='store_true',
                             help='Run a network scan and exit (no polling)')
+        parser.add_argument('--snmp-interval', type=float, default=30,
+                            help='SNMP poll interval in seconds (default: 30; 1 is fine for 20+ switches)')
+        parser.add_argument('--spool-file', type=str,
+                            default=os.path.join(os.path.expanduser('~'), '.showstack', 'monitor-spool.jsonl'),
+                            help='Where ping results are kept while the uplink is down (default: ~/.showstack/monitor-spool.jsonl)')
         parser.add_argument('--dante-interface', type=str, default=None,
                             help='IP of the Dante network interface (restricts mDNS discovery to this interface)')
 
@@ -252,17 +673,20 @@ class Command(BaseCommand):
         scan = options['scan'] or options['scan_only']
         scan_only = options['scan_only']
         self._dante_interface = options.get('dante_interface')
+        self._snmp_interval = options.get('snmp_interval') or 30
+        self._verbosity = options.get('verbosity', 1)
 
-        headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json',
-        }
+        self.uplink = MonitorUplink(
+            base_url, api_key, spool_path=options.get('spool_file'),
+            log=lambda msg: self.stderr.write(self.style.WARNING(msg)),
+        )
+        self._scan_requested = threading.Event()
+        self._icmp_scheduler = IcmpScheduler(interval)
 
         # ── Step 1: Authenticate with heartbeat ──
         self.stdout.write('Connecting to ShowStack...')
         try:
-            resp = http_requests.post(f'{base_url}/heartbeat/', headers=headers,
-                                      json={'agent_version': '1.0'}, timeout=10)
+            resp = self.uplink.request('POST', 'heartbeat', {'agent_version': '1.0'}, timeout=10)
         except http_requests.ConnectionError:
             self.stderr.write(self.style.ERROR(
                 f'Cannot connect to {server}. Is the server running?'
@@ -296,12 +720,7 @@ class Command(BaseCommand):
                     self.stdout.write(f'  {dev["ip"]} ({dev["domain"]}) — {dev.get("latency_ms", "?")} ms')
 
                 # Push to API
-                resp = http_requests.post(
-                    f'{base_url}/scan-results/',
-                    headers=headers,
-                    json={'devices': discovered},
-                    timeout=30,
-                )
+                resp = self.uplink.request('POST', 'scan-results', {'devices': discovered}, timeout=30)
                 if resp.status_code == 200:
                     result = resp.json()
                     self.stdout.write(self.style.SUCCESS(
@@ -318,29 +737,38 @@ class Command(BaseCommand):
                 return
 
         # ── Step 3: Start polling threads ──
-        self.stdout.write(f'\nStarting polling. ICMP every {interval}s, SNMP every 30s, Dante every 30s. Press Ctrl+C to stop.')
+        self.stdout.write(
+            f'\nStarting polling. ICMP every {interval}s (adaptive), SNMP every {self._snmp_interval:g}s, '
+            f'Dante every 30s. Press Ctrl+C to stop.'
+        )
 
         stop_event = threading.Event()
 
         icmp_thread = threading.Thread(
             target=self._icmp_loop,
-            args=(stop_event, base_url, headers, interval),
+            args=(stop_event, interval),
             daemon=True, name='ICMPPoller',
         )
         snmp_thread = threading.Thread(
             target=self._snmp_loop,
-            args=(stop_event, base_url, headers),
+            args=(stop_event,),
             daemon=True, name='SNMPPoller',
         )
         dante_thread = threading.Thread(
             target=self._dante_loop,
-            args=(stop_event, base_url, headers),
+            args=(stop_event,),
             daemon=True, name='DantePoller',
         )
+        uplink_thread = threading.Thread(
+            target=self.uplink.run,
+            args=(stop_event,),
+            daemon=True, name='Uplink',
+        )
 
         icmp_thread.start()
         snmp_thread.start()
         dante_thread.start()
+        uplink_thread.start()
 
         try:
             while not stop_event.is_set():
@@ -352,71 +780,95 @@ class Command(BaseCommand):
         icmp_thread.join(timeout=5)
         snmp_thread.join(timeout=5)
         dante_thread.join(timeout=5)
+        uplink_thread.join(timeout=20)  # last flush; anything undelivered stays spooled
 
         # Shutdown
         try:
-            http_requests.post(f'{base_url}/stop/', headers=headers,
-                               json={}, timeout=5)
+            self.uplink.request('POST', 'stop', {}, timeout=5)
         except Exception:
             pass
+        self.uplink.close()
         self.stdout.write(self.style.SUCCESS('Monitor agent stopped.'))
 
-    def _icmp_loop(self, stop_event, base_url, headers, interval):
-        """ICMP polling — existing logic moved from flat while-loop."""
-        while not stop_event.is_set():
-            poll_results = self._poll_devices(base_url, headers)
-            if poll_results:
-                try:
-                    resp = http_requests.post(
-                        f'{base_url}/poll-results/',
-                        headers=headers,
-                        json={'results': poll_results},
-                        timeout=15,
-                    )
-                    if resp.status_code == 200:
-                        result = resp.json()
-                        events = result.get('events', [])
-                        for ev in events:
-                            etype = ev.get('type', '')
-                            name = ev.get('device_name', ev.get('device_id', ''))
-                            if etype == 'OFFLINE':
-                                self.stderr.write(self.style.ERROR(f'  OFFLINE: {name}'))
-                            elif etype == 'ONLINE':
-                                self.stdout.write(self.style.SUCCESS(f'  ONLINE: {name}'))
-                        if result.get('scan_requested'):
-                            self.stdout.write(self.style.WARNING('\nRe-scan requested from dashboard...'))
-                            discovered = self._scan_all_nics()
-                            if discovered:
-                                self.stdout.write(f'Found {len(discovered)} devices')
-                                http_requests.post(
-                                    f'{base_url}/scan-results/',
-                                    headers=headers,
-                                    json={'devices': discovered},
-                                    timeout=30,
-                                )
-                    else:
-                        self.stderr.write(self.style.WARNING(f'Poll push failed ({resp.status_code})'))
-                except http_requests.ConnectionError:
-                    self.stderr.write(self.style.WARNING('Lost connection to ShowStack. Retrying next cycle...'))
-                except Exception as e:
-                    self.stderr.write(self.style.WARNING(f'Error: {e}'))
-
-            # Wait with stop_event check
-            stop_event.wait(timeout=interval)
+    def _icmp_loop(self, stop_event, interval):
+        """ICMP polling — adaptive per-device cadence (IcmpScheduler); results
+        are queued on the uplink for the next batch."""
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._icmp_scheduler.run(
+                stop_event, self._fetch_device_list, self._submit_poll_results,
+            ))
+        finally:
+            loop.close()
 
-    def _snmp_loop(self, stop_event, base_url, headers):
-        """SNMP polling thread — polls switch-domain devices every 30 seconds."""
+    async def _fetch_device_list(self):
+        """(ips, critical, version) from /devices/, or None if unavailable."""
+        loop = asyncio.get_running_loop()
+        try:
+            resp = await loop.run_in_executor(
+                None, lambda: self.uplink.request('GET', 'devices', timeout=10))
+            if resp.status_code != 200:
+                return None
+            body = resp.json()
+        except Exception:
+            return None
+        return body.get('devices', []), body.get('critical', []), body.get('version')
+
+    def _submit_poll_results(self, results):
+        self.uplink.submit('poll-results', {'results': results}, self._on_poll_response)
+        if self._scan_requested.is_set():
+            self._scan_requested.clear()
+            # Scans take seconds; keep them off the ping loop
+            threading.Thread(target=self._rescan, daemon=True, name='Rescan').start()
+
+    def _rescan(self):
+        self.stdout.write(self.style.WARNING('\nRe-scan requested from dashboard...'))
+        discovered = self._scan_all_nics()
+        if discovered:
+            self.stdout.write(f'Found {len(discovered)} devices')
+            try:
+                self.uplink.request('POST', 'scan-results', {'devices': discovered}, timeout=30)
+            except http_requests.RequestException as e:
+                self.stderr.write(self.style.WARNING(f'Scan push failed: {e}'))
+
+    def _on_poll_response(self, result):
+        """Batch response for one poll cycle (runs on the uplink thread)."""
+        if not result.get('ok'):
+            self.stderr.write(self.style.WARNING(f'Poll push failed: {result.get("error", "unknown error")}'))
+            return
+        for ev in result.get('events', []):
+            etype = ev.get('type', '')
+            name = ev.get('device_name', ev.get('device_id', ''))
+            if etype == 'OFFLINE':
+                self.stderr.write(self.style.ERROR(f'  OFFLINE: {name}'))
+            elif etype == 'ONLINE':
+                self.stdout.write(self.style.SUCCESS(f'  ONLINE: {name}'))
+        self._icmp_scheduler.request_refresh(result.get('devices_version'))
+        if result.get('scan_requested'):
+            # Scans take seconds; run it off the uplink thread
+            self._scan_requested.set()
+
+    def _snmp_loop(self, stop_event):
+        """SNMP polling thread — polls switch-domain devices every --snmp-interval seconds."""
         if not PYSNMP_AVAILABLE:
             self.stderr.write(self.style.WARNING(
                 'pysnmp not installed — SNMP polling disabled. Install: pip install "pysnmp>=7.1,<8.0"'
             ))
             return
 
-        SNMP_INTERVAL = 30
+        poller = SnmpPoller()
+        try:
+            self._snmp_cycles(stop_event, poller)
+        finally:
+            poller.close()
+
+    def _snmp_cycles(self, stop_event, poller):
+        SNMP_INTERVAL = self._snmp_interval
         prev_counters = {}  # {(device_id, port_idx): {'in': N, 'out': N, 'ts': float}}
 
         while not stop_event.is_set():
-            snmp_settings = self._fetch_snmp_settings(base_url, headers)
+            cycle_started = time.monotonic()
+            snmp_settings = self._fetch_snmp_settings()
             if not snmp_settings or not snmp_settings.get('configured'):
                 stop_event.wait(timeout=SNMP_INTERVAL)
                 continue
@@ -427,13 +879,14 @@ class Command(BaseCommand):
                 stop_event.wait(timeout=SNMP_INTERVAL)
                 continue
 
-            # Poll all switches via asyncio.run (safe — this thread has no event loop)
+            # Poll all switches concurrently on the poller's long-lived loop and engine
             try:
-                raw_results = asyncio.run(_async_poll_all_switches(switches, community))
+                raw_results = poller.poll(switches, community)
             except Exception as e:
                 self.stderr.write(self.style.WARNING(f'[SNMP] Poll error: {e}'))
                 stop_event.wait(timeout=SNMP_INTERVAL)
                 continue
+            self._report_snmp_cycle(raw_results, time.monotonic() - cycle_started, SNMP_INTERVAL)
 
             # Process results: compute bandwidth from deltas, build push payload
             now = time.time()
@@ -489,54 +942,52 @@ class Command(BaseCommand):
                     'ports': ports_payload,
                 })
 
-            # Push to Django API
+            # Queue for the next uplink batch
             if push_results:
-                self._push_snmp_results(base_url, headers, push_results)
+                self.uplink.submit('snmp-results', {'results': push_results}, self._on_snmp_response)
 
-            stop_event.wait(timeout=SNMP_INTERVAL)
+            # Keep a steady cadence: the poll itself counts against the interval
+            stop_event.wait(timeout=max(0.0, SNMP_INTERVAL - (time.monotonic() - cycle_started)))
 
-    def _fetch_snmp_settings(self, base_url, headers):
+    def _report_snmp_cycle(self, raw_results, elapsed, interval):
+        """Per-switch poll times at -v 2; a warning whenever a cycle overruns."""
+        if self._verbosity >= 2:
+            for sw_result in raw_results:
+                self.stdout.write(f'  [SNMP] {sw_result["ip"]}: {sw_result["poll_ms"]:.0f} ms')
+        if elapsed > interval and raw_results:
+            slowest = max(raw_results, key=lambda r: r['poll_ms'])
+            self.stderr.write(self.style.WARNING(
+                f'  [SNMP] cycle took {elapsed * 1000:.0f} ms for {len(raw_results)} switches '
+                f'(interval {interval:g}s); slowest {slowest["ip"]} at {slowest["poll_ms"]:.0f} ms'
+            ))
+
+    def _fetch_snmp_settings(self):
         """GET /api/snmp-settings/ — returns community string + switch IP list."""
         try:
-            resp = http_requests.get(
-                f'{base_url}/snmp-settings/',
-                headers=headers, timeout=10,
-            )
+            resp = self.uplink.request('GET', 'snmp-settings', timeout=10)
             if resp.status_code != 200:
                 return None
             return resp.json()
         except Exception:
             return None
 
-    def _push_snmp_results(self, base_url, headers, results):
-        """POST /api/snmp-results/ — push port data for all switches."""
-        try:
-            resp = http_requests.post(
-                f'{base_url}/snmp-results/',
-                headers=headers,
-                json={'results': results},
-                timeout=15,
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                events = data.get('events', [])
-                for ev in events:
-                    etype = ev.get('type', '')
-                    name = ev.get('device_name', ev.get('device_id', ''))
-                    port = ev.get('details', {}).get('port_index', '')
-                    if etype == 'PORT_DOWN':
-                        self.stderr.write(self.style.WARNING(f'  [SNMP] {name} port {port} DOWN'))
-                    elif etype == 'PORT_UP':
-                        self.stdout.write(self.style.SUCCESS(f'  [SNMP] {name} port {port} UP'))
-            else:
-                self.stderr.write(self.style.WARNING(f'[SNMP] Push failed ({resp.status_code})'))
-        except http_requests.ConnectionError:
-            self.stderr.write(self.style.WARNING('[SNMP] Lost connection. Retrying next cycle...'))
-        except Exception as e:
-            self.stderr.write(self.style.WARNING(f'[SNMP] Push error: {e}'))
-
-    def _dante_loop(self, stop_event, base_url, headers):
-        """Dante mDNS discovery thread — discovers devices every 30 seconds."""
+    def _on_snmp_response(self, result):
+        """Batch response for one SNMP cycle (runs on the uplink thread)."""
+        if not result.get('ok'):
+            self.stderr.write(self.style.WARNING(f'[SNMP] Push failed: {result.get("error", "unknown error")}'))
+            return
+        for ev in result.get('events', []):
+            etype = ev.get('type', '')
+            name = ev.get('device_name', ev.get('device_id', ''))
+            port = ev.get('details', {}).get('port_index', '')
+            if etype == 'PORT_DOWN':
+                self.stderr.write(self.style.WARNING(f'  [SNMP] {name} port {port} DOWN'))
+            elif etype == 'PORT_UP':
+                self.stdout.write(self.style.SUCCESS(f'  [SNMP] {name} port {port} UP'))
+
+    def _dante_loop(self, stop_event):
+        """Dante mDNS discovery thread — follows announcements continuously and
+        reports devices every 30 seconds (see DanteWatcher)."""
         if not NETAUDIO_AVAILABLE:
             self.stderr.write(self.style.WARNING(
                 'netaudio not installed -- Dante discovery disabled. Install: pip install "netaudio==0.2.4"'
@@ -553,46 +1004,31 @@ class Command(BaseCommand):
         def _log(msg):
             self.stderr.write(msg)
 
-        while not stop_event.is_set():
-            try:
-                devices = asyncio.run(_async_discover_dante(
-                    timeout=3.0, interface_ip=iface, log_fn=_log,
-                ))
-            except Exception as e:
-                self.stderr.write(self.style.WARNING(f'[Dante] Discovery error: {e}'))
-                stop_event.wait(timeout=DANTE_INTERVAL)
-                continue
-
-            if devices:
-                self._push_dante_results(base_url, headers, devices)
+        def _submit(devices):
+            self.uplink.submit('dante-results', {'results': devices}, self._on_dante_response)
 
-            stop_event.wait(timeout=DANTE_INTERVAL)
-
-    def _push_dante_results(self, base_url, headers, results):
-        """POST /api/dante-results/ — push Dante mDNS discovery data."""
+        # One event loop and one mDNS browser for the life of the agent
+        watcher = DanteWatcher(interface_ip=iface, log_fn=_log)
+        loop = asyncio.new_event_loop()
         try:
-            resp = http_requests.post(
-                f'{base_url}/dante-results/',
-                headers=headers,
-                json={'results': results},
-                timeout=15,
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                events = data.get('events', [])
-                for ev in events:
-                    etype = ev.get('type', '')
-                    name = ev.get('device_name', '')
-                    if etype == 'DANTE_DISCOVERED':
-                        self.stdout.write(self.style.SUCCESS(f'  [Dante] Discovered: {name}'))
-                    elif etype == 'DANTE_LOST':
-                        self.stderr.write(self.style.WARNING(f'  [Dante] Lost: {name}'))
-            else:
-                self.stderr.write(self.style.WARNING(f'[Dante] Push failed ({resp.status_code})'))
-        except http_requests.ConnectionError:
-            self.stderr.write(self.style.WARNING('[Dante] Lost connection. Retrying next cycle...'))
+            loop.run_until_complete(watcher.run(stop_event, DANTE_INTERVAL, _submit))
         except Exception as e:
-            self.stderr.write(self.style.WARNING(f'[Dante] Push error: {e}'))
+            self.stderr.write(self.style.WARNING(f'[Dante] Discovery stopped: {e}'))
+        finally:
+            loop.close()
+
+    def _on_dante_response(self, result):
+        """Batch response for one Dante cycle (runs on the uplink thread)."""
+        if not result.get('ok'):
+            self.stderr.write(self.style.WARNING(f'[Dante] Push failed: {result.get("error", "unknown error")}'))
+            return
+        for ev in result.get('events', []):
+            etype = ev.get('type', '')
+            name = ev.get('device_name', '')
+            if etype == 'DANTE_DISCOVERED':
+                self.stdout.write(self.style.SUCCESS(f'  [Dante] Discovered: {name}'))
+            elif etype == 'DANTE_LOST':
+                self.stderr.write(self.style.WARNING(f'  [Dante] Lost: {name}'))
 
     def _scan_all_nics(self):
         """Scan all active NICs for responding devices."""
@@ -706,38 +1142,3 @@ class Command(BaseCommand):
              'latency_ms': round(r.avg_rtt, 2)}
             for r in results if r.is_alive
         ]
-
-    def _poll_devices(self, base_url, headers):
-        """Fetch registered device IPs from the server, ping them locally,
-        return results for the cloud to process."""
-        import icmplib
-
-        # Fetch the device list from the API
-        try:
-            resp = http_requests.get(
-                f'{base_url}/devices/',
-                headers=headers, timeout=10,
-            )
-            if resp.status_code != 200:
-                return []
-            device_ips = resp.json().get('devices', [])
-        except Exception:
-            return []
-
-        if not device_ips:
-            return []
-
-        # Ping all registered devices locally
-        try:
-            results = icmplib.multiping(
-                device_ips, count=1, timeout=2,
-                privileged=False, concurrent_tasks=50,
-            )
-        except Exception:
-            return []
-
-        return [
-            {'ip': r.address, 'is_alive': r.is_alive,
-             'latency_ms': round(r.avg_rtt, 2) if r.is_alive else None}
-            for r in results
-        ]
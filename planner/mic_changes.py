@@ -0,0 +1,163 @@
+# planner/mic_changes.py
+#
+# Mic tracker change feed.
+#
+# Every open mic tracker tab polls for "did anything change?". Rather than
+# hashing the whole project on each poll, each project keeps:
+#
+#   - a MicTrackerRevision counter, bumped whenever a ShowDay, MicSession,
+#     MicAssignment or PresenterSlot in the project is saved or deleted;
+#   - a MicTrackerChange log saying which object changed at which revision.
+#
+# A poll is then one primary-key read when nothing changed, and otherwise
+# one indexed range read of the log (mic_changes_since()).
+#
+#   - Model saves and deletes are recorded by the receivers in signals.py.
+#     Queryset .update() calls skip signals, so those call sites record
+#     their rows themselves (record_queryset_changes()).
+#   - The bump and its log rows are written in one transaction (the
+#     caller's, when there is one). The counter row is read under
+#     SELECT ... FOR UPDATE and stays locked until commit, so two writers
+#     never get the same revision, and revisions become visible in order
+#     and never without their log rows.
+#   - Only the last CHANGE_LOG_KEEP revisions are kept. A client further
+#     behind than that gets reset=True and reloads the page; otherwise it
+#     re-renders just the days the changes touch (changed_day_ids(),
+#     views.mic_tracker_days).
+
+from django.db import IntegrityError, transaction
+
+from .models import (
+    MicAssignment, MicSession, MicTrackerChange, MicTrackerRevision, PresenterSlot, ShowDay,
+)
+from .project_revisions import touch
+
+
+# Revisions kept in the change log
+CHANGE_LOG_KEEP = 1000
+
+# Trim the change log once every this many revisions
+CHANGE_LOG_TRIM_EVERY = 100
+
+# Changes returned by one poll; further behind than this, the client reloads
+MAX_CHANGES_PER_POLL = 500
+
+
+def current_revision(project_id):
+    """The project's mic tracker revision (0 before the first change)."""
+    return (
+        MicTrackerRevision.objects.filter(project_id=project_id)
+        .values_list('revision', flat=True).first()
+    ) or 0
+
+
+def _bump(project_id):
+    """Add one to the project's counter and return the new revision. Call
+    inside a transaction: the counter row stays locked until it commits."""
+    counter = MicTrackerRevision.objects.select_for_update().filter(project_id=project_id)
+    revision = counter.values_list('revision', flat=True).first()
+    if revision is None:
+        try:
+            with transaction.atomic():
+                MicTrackerRevision.objects.create(project_id=project_id, revision=1)
+            return 1
+        except IntegrityError:
+            # Another writer created the counter first
+            revision = counter.values_list('revision', flat=True).get()
+    counter.update(revision=revision + 1)
+    return revision + 1
+
+
+def record_mic_changes(project_id, changes):
+    """Record `changes`, an iterable of (kind, object_id, op) tuples, as one
+    new revision. Returns the new revision, or None if there was nothing to
+    record."""
+    changes = list(changes)
+    if project_id is None or not changes:
+        return None
+    with transaction.atomic():
+        revision = _bump(project_id)
+        MicTrackerChange.objects.bulk_create([
+            MicTrackerChange(project_id=project_id, revision=revision,
+                             kind=kind, object_id=object_id, op=op)
+            for kind, object_id, op in changes
+        ])
+        if revision % CHANGE_LOG_TRIM_EVERY == 0:
+            MicTrackerChange.objects.filter(
+                project_id=project_id, revision__lte=revision - CHANGE_LOG_KEEP,
+            ).delete()
+    return revision
+
+
+def record_queryset_changes(project_id, kind, queryset, op='save'):
+    """Record every row of `queryset` as changed. For .update() and other
+    bulk writes that bypass the model signals; also bumps the project's mic
+    revision (project_revisions.py)."""
+    ids = list(queryset.values_list('pk', flat=True))
+    if not ids:
+        return None
+    with transaction.atomic():
+        touch(project_id, 'mic')
+        return record_mic_changes(project_id, [(kind, pk, op) for pk in ids])
+
+
+def mic_changes_since(project_id, since):
+    """What changed in the project after revision `since`.
+
+    Returns {'revision': current, 'changes': [{'kind', 'id', 'op'}], 'reset'}.
+    Each object appears once, with its latest op. reset is True when the log
+    no longer reaches back to `since` (or `since` is from another timeline);
+    the client should then reload instead of applying the changes.
+    """
+    revision = current_revision(project_id)
+    result = {'revision': revision, 'changes': [], 'reset': False}
+    if since is None or since == revision:
+        return result
+    if since > revision:
+        result['reset'] = True
+        return result
+
+    rows = list(
+        MicTrackerChange.objects.filter(project_id=project_id, revision__gt=since)
+        .order_by('revision', 'id')
+        .values_list('revision', 'kind', 'object_id', 'op')[:MAX_CHANGES_PER_POLL + 1]
+    )
+    if not rows or rows[0][0] != since + 1 or len(rows) > MAX_CHANGES_PER_POLL:
+        result['reset'] = True
+        return result
+
+    latest = {}
+    for _, kind, object_id, op in rows:
+        latest.pop((kind, object_id), None)
+        latest[(kind, object_id)] = op
+    result['changes'] = [
+        {'kind': kind, 'id': object_id, 'op': op}
+        for (kind, object_id), op in latest.items()
+    ]
+    return result
+
+
+# change kind -> (model, lookup from the model to its show day id, lookup to
+# its project)
+_KIND_DAYS = {
+    'day': (ShowDay, 'pk', 'project_id'),
+    'session': (MicSession, 'day_id', 'day__project_id'),
+    'assignment': (MicAssignment, 'session__day_id', 'session__day__project_id'),
+    'slot': (PresenterSlot, 'assignment__session__day_id', 'assignment__session__day__project_id'),
+}
+
+
+def changed_day_ids(project_id, ids_by_kind):
+    """The project's show days holding the objects in `ids_by_kind`
+    ({kind: [id, ...]}, kinds as in the change log). Objects that no longer
+    exist are skipped: the client knows their day from the page."""
+    day_ids = set()
+    for kind, ids in ids_by_kind.items():
+        if kind not in _KIND_DAYS or not ids:
+            continue
+        model, day_lookup, project_lookup = _KIND_DAYS[kind]
+        day_ids.update(
+            model.objects.filter(pk__in=ids, **{project_lookup: project_id})
+            .values_list(day_lookup, flat=True)
+        )
+    return day_ids
@@ -0,0 +1,78 @@
+# planner/mic_grid.py
+#
+# Mic tracker read model.
+#
+# The mic tracker pages walk day -> session -> assignment -> slot and call
+# model helpers (active_slot, get_mic_usage_stats, get_all_mics_status) on
+# the way down. Unloaded, that is several queries per assignment.
+# build_mic_grid() loads a set of days in a fixed number of queries, whatever
+# the size of the show:
+#
+#   days, sessions, assignments                           3 queries
+#   + assignment groups, shared presenters, slots
+#     (with presenter), slot groups, slot A2 groups       5 more with detail
+#
+# The rows are plain model instances with their prefetch caches filled, so
+# templates keep using the usual relations (session.mic_assignments.all,
+# assignment.presenter_slots.all ...) and the helpers above answer from
+# memory. Groups come in primary-key order, so `groups.all.0` is the group
+# `groups.first` would have returned.
+#
+# Used by mic_tracker_view, mic_tracker_overview_view, export_mic_tracker_pdf
+# and the mobile mic tracker views.
+
+from django.db.models import Prefetch, prefetch_related_objects
+
+from .models import MicAssignment, MicGroup, MicSession, PresenterSlot
+
+
+def _groups(name):
+    return Prefetch(name, queryset=MicGroup.objects.order_by('pk'))
+
+
+def load_assignments(assignments, detail=True):
+    """Prefetch what the mic tracker shows for a list of MicAssignments:
+    groups, shared presenters and presenter slots with their presenter and
+    groups. Returns the list."""
+    if not detail or not assignments:
+        return assignments
+    prefetch_related_objects(
+        assignments,
+        _groups('groups'),
+        'shared_presenters',
+        Prefetch('presenter_slots',
+                 queryset=PresenterSlot.objects.select_related('presenter').order_by('order', 'id')),
+    )
+    slots = [slot for a in assignments for slot in a.presenter_slots.all()]
+    if slots:
+        prefetch_related_objects(slots, _groups('groups'), _groups('a2_groups'))
+    return assignments
+
+
+def build_mic_grid(days, detail=True):
+    """Load `days` (a ShowDay queryset) into the mic tracker grid.
+
+    Returns [{'day', 'sessions', 'stats'}] in day order, sessions in display
+    order and assignments by RF number. stats is day.get_all_mics_status();
+    session.get_mic_usage_stats() is likewise answered from memory. With
+    detail=False only days, sessions and assignments are loaded (enough for
+    counts).
+    """
+    days = list(days)
+    prefetch_related_objects(
+        days,
+        Prefetch('sessions', queryset=MicSession.objects.order_by('order', 'start_time', 'id')),
+    )
+    sessions = [session for day in days for session in day.sessions.all()]
+    prefetch_related_objects(
+        sessions,
+        Prefetch('mic_assignments',
+                 queryset=MicAssignment.objects.select_related('group').order_by('rf_number', 'id')),
+    )
+    load_assignments(
+        [a for session in sessions for a in session.mic_assignments.all()], detail=detail,
+    )
+    return [
+        {'day': day, 'sessions': day.sessions.all(), 'stats': day.get_all_mics_status()}
+        for day in days
+    ]
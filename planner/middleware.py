@@ -1,7 +1,8 @@
 """
 CurrentProjectMiddleware - Handles project scoping for multi-tenancy
 """
-from planner.models import Project, ProjectMember  # CORRECT - models are in planner
+from planner.models import Project  # CORRECT - models are in planner
+from planner.project_access import get_project_access
 
 
 class CurrentProjectMiddleware:
@@ -21,36 +22,21 @@ class CurrentProjectMiddleware:
         request.current_project = None
         
         if request.user.is_authenticated:
-            # Get user role information
-            is_superuser = request.user.is_superuser
-            
-            # Check if user owns any projects (doesn't require userprofile)
-            is_owner = Project.objects.filter(owner=request.user).exists()
-            
-            # Check if user is invited to any projects (doesn't require userprofile)
-            is_invited = ProjectMember.objects.filter(user=request.user).exists()
+            # Role information, cached in the session (see project_access.py)
+            access = get_project_access(request)
+            is_superuser = access.is_superuser
+            is_owner = access.is_owner
+            is_invited = access.is_invited
             
             # SUPERUSERS and PROJECT OWNERS: Can switch projects via dropdown
             if is_superuser or is_owner:
                 # Try to get project from session (dropdown selection)
                 project_id = request.session.get('current_project_id')
                 
-                if project_id:
-                    try:
-                        project = Project.objects.get(id=project_id)
-                        
-                        # Verify access
-                        if is_superuser:
-                            # Superusers can access any project
-                            request.current_project = project
-                        elif project.owner == request.user:
-                            # User owns this project
-                            request.current_project = project
-                        elif ProjectMember.objects.filter(user=request.user, project=project).exists():
-                            # User is invited to this project
-                            request.current_project = project
-                    except Project.DoesNotExist:
-                        pass
+                # Superusers can access any project; owners their own and
+                # the ones they're invited to
+                if project_id and access.can_access(project_id):
+                    request.current_project = Project.objects.filter(id=project_id).first()
                 
                 # If no valid project selected, auto-select first owned project
                 if not request.current_project:
@@ -70,26 +56,17 @@ class CurrentProjectMiddleware:
                 # First, check if there's a project_id in session that they have access to
                 project_id = request.session.get('current_project_id')
                 
-                if project_id:
-                    # Verify they're actually a member of this project
-                    membership = ProjectMember.objects.filter(
-                        user=request.user,
-                        project_id=project_id
-                    ).select_related('project').first()
-                    
-                    if membership:
-                        request.current_project = membership.project
+                if project_id and access.can_access(project_id):
+                    request.current_project = Project.objects.filter(id=project_id).first()
                 
                 # If no valid project in session, fall back to first invited project
                 if not request.current_project:
-                    membership = ProjectMember.objects.filter(
-                        user=request.user
-                    ).select_related('project').first()
+                    first_project_id, _ = access.first_membership
+                    request.current_project = Project.objects.filter(id=first_project_id).first()
                     
-                    if membership:
-                        request.current_project = membership.project
-                        request.session['current_project_id'] = membership.project.id
+                    if request.current_project:
+                        request.session['current_project_id'] = first_project_id
                         request.session.modified = True
         
         response = self.get_response(request)
-        return response
\ No newline at end of file
+        return response
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0181_presenterslot_headset_color'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitorsession',
+            name='rollup_watermark',
+            field=models.DateTimeField(blank=True, help_text='Raw PollResults before this time are compacted into PollRollup', null=True),
+        ),
+        migrations.CreateModel(
+            name='PollRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField(choices=[(1, '1 second'), (60, '1 minute'), (3600, '1 hour')])),
+                ('segment_start', models.DateTimeField()),
+                ('bucket_count', models.PositiveIntegerField(default=0)),
+                ('offsets', models.BinaryField(default=bytes)),
+                ('samples', models.BinaryField(default=bytes)),
+                ('lost', models.BinaryField(default=bytes)),
+                ('min_latency', models.BinaryField(default=bytes)),
+                ('max_latency', models.BinaryField(default=bytes)),
+                ('sum_latency', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('device', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='poll_rollups', to='planner.discovereddevice')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resolution', 'segment_start'], name='planner_pol_resolut_e6601f_idx')],
+                'unique_together': {('device', 'resolution', 'segment_start')},
+            },
+        ),
+    ]
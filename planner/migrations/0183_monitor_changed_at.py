@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0182_monitor_poll_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='discovereddevice',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='switchportsnapshot',
+            name='changed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='discovereddevice',
+            index=models.Index(fields=['project', 'changed_at'], name='planner_dis_project_08bb86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='switchportsnapshot',
+            index=models.Index(fields=['session', 'changed_at'], name='planner_swi_session_b84eb4_idx'),
+        ),
+    ]
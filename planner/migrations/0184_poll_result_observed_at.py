@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:27
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0183_monitor_changed_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='pollresult',
+            name='polled_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
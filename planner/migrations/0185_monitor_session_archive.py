@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0184_poll_result_observed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitorsession',
+            name='archive_file',
+            field=models.FileField(blank=True, upload_to='monitor_archives/'),
+        ),
+        migrations.AddField(
+            model_name='monitorsession',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, help_text='When this closed session was exported to archive_file (planner/monitor_retention.py)', null=True),
+        ),
+    ]
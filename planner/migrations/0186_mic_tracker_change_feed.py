@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0185_monitor_session_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MicTrackerRevision',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='mic_tracker_revision', serialize=False, to='planner.project')),
+                ('revision', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Mic Tracker Revision',
+            },
+        ),
+        migrations.CreateModel(
+            name='MicTrackerChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('day', 'Show Day'), ('session', 'Mic Session'), ('assignment', 'Mic Assignment'), ('slot', 'Presenter Slot')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('op', models.CharField(choices=[('save', 'Saved'), ('delete', 'Deleted')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mic_tracker_changes', to='planner.project')),
+            ],
+            options={
+                'verbose_name': 'Mic Tracker Change',
+                'ordering': ['revision', 'id'],
+                'indexes': [models.Index(fields=['project', 'revision'], name='planner_mic_project_818438_idx')],
+            },
+        ),
+    ]
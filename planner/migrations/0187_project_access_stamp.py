@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('planner', '0186_mic_tracker_change_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectAccessStamp',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='project_access_stamp', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Project Access Stamp',
+            },
+        ),
+    ]
@@ -0,0 +1,185 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:16
+
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import mimetypes
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+# Frozen copies of photo_store's naming and thumbnail settings as they were
+# when this migration was written, so later changes there don't alter it.
+THUMBNAIL_SIZES = {'sm': 160, 'lg': 400}
+THUMBNAIL_QUALITY = 85
+
+
+def decode_data_url(value):
+    """(bytes, content type) of a base64 data: URL, or (None, None) if it is
+    not one."""
+    header, sep, payload = value.partition(',')
+    if not sep or not header.startswith('data:') or not header.endswith(';base64'):
+        return None, None
+    try:
+        return base64.b64decode(payload), header[5:-7]
+    except (binascii.Error, ValueError):
+        return None, None
+
+
+def photo_name(digest, suffix):
+    return f'photo_store/{digest[:2]}/{digest}{suffix}'
+
+
+def write_file(name, data):
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+
+
+def thumbnail(image, pixels):
+    """JPEG bytes of `image` scaled to fit a `pixels` square, transparency
+    flattened onto white."""
+    from PIL import Image
+
+    thumb = image.copy()
+    thumb.thumbnail((pixels, pixels), Image.LANCZOS)
+    if thumb.mode not in ('RGB', 'L'):
+        rgba = thumb.convert('RGBA')
+        thumb = Image.new('RGB', rgba.size, 'white')
+        thumb.paste(rgba, mask=rgba.getchannel('A'))
+    buffer = io.BytesIO()
+    thumb.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def store_legacy_photo(data, content_type, model):
+    """The StoredPhoto holding `data`, with none of the upload limits: the
+    old upload paths took any size and type, and 0189 drops the only other
+    copy. The original is always kept; thumbnails (and a size) are only
+    made when Pillow can decode it, otherwise width and height are 0."""
+    from PIL import Image, ImageOps
+
+    digest = hashlib.sha256(data).hexdigest()
+    photo = model.objects.filter(pk=digest).first()
+    if photo is not None:
+        return photo
+
+    max_pixels, Image.MAX_IMAGE_PIXELS = Image.MAX_IMAGE_PIXELS, None  # rows, not uploads
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, ValueError, SyntaxError):
+        image = None
+    finally:
+        Image.MAX_IMAGE_PIXELS = max_pixels
+
+    if image is not None:
+        content_type = Image.MIME.get(image.format, content_type)
+        extension = f'.{image.format.lower()}'
+    else:
+        extension = mimetypes.guess_extension(content_type or '') or '.bin'
+    original = photo_name(digest, extension)
+    write_file(original, data)
+
+    width = height = 0
+    if image is not None:
+        image = ImageOps.exif_transpose(image)
+        width, height = image.width, image.height
+        for size, pixels in THUMBNAIL_SIZES.items():
+            write_file(photo_name(digest, f'_{size}.jpg'), thumbnail(image, pixels))
+
+    photo, _ = model.objects.get_or_create(pk=digest, defaults={
+        'original': original,
+        'content_type': (content_type or 'application/octet-stream')[:50],
+        'byte_size': len(data),
+        'width': width,
+        'height': height,
+    })
+    return photo
+
+
+def move_photo_data(apps, schema_editor):
+    """Move every slot's inline photo_data into the photo store, one
+    StoredPhoto per distinct picture. A value that is not a base64 data:
+    URL is kept as its raw text, so nothing is lost when 0189 drops the
+    column; those and pictures Pillow can't decode are logged."""
+    PresenterSlot = apps.get_model('planner', 'PresenterSlot')
+    StoredPhoto = apps.get_model('planner', 'StoredPhoto')
+
+    slots_by_digest = {}
+    digest_by_value = {}
+    rows = (
+        PresenterSlot.objects.exclude(photo_data__isnull=True).exclude(photo_data='')
+        .values_list('pk', 'photo_data').iterator(chunk_size=100)
+    )
+    for pk, value in rows:
+        if value not in digest_by_value:
+            data, content_type = decode_data_url(value)
+            if data is None:
+                logger.warning(
+                    'PresenterSlot %s: photo_data is not a base64 data: URL; '
+                    'kept as text', pk,
+                )
+                data, content_type = value.encode('utf-8'), 'text/plain'
+            photo = store_legacy_photo(data, content_type, StoredPhoto)
+            if not photo.width:
+                logger.warning(
+                    'PresenterSlot %s: photo %s (%s) could not be decoded; '
+                    'original kept without thumbnails', pk, photo.pk, photo.content_type,
+                )
+            digest_by_value[value] = photo.pk
+        slots_by_digest.setdefault(digest_by_value[value], []).append(pk)
+
+    for digest, pks in slots_by_digest.items():
+        PresenterSlot.objects.filter(pk__in=pks).update(stored_photo_id=digest)
+
+
+def restore_photo_data(apps, schema_editor):
+    """Write the stored originals back as data: URLs."""
+    from django.core.files.storage import default_storage
+
+    PresenterSlot = apps.get_model('planner', 'PresenterSlot')
+    StoredPhoto = apps.get_model('planner', 'StoredPhoto')
+    for photo in StoredPhoto.objects.all():
+        with default_storage.open(photo.original.name, 'rb') as f:
+            b64 = base64.b64encode(f.read()).decode('utf-8')
+        PresenterSlot.objects.filter(stored_photo_id=photo.pk).update(
+            photo_data=f'data:{photo.content_type};base64,{b64}',
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0187_project_access_stamp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredPhoto',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('original', models.FileField(max_length=200, upload_to='photo_store/')),
+                ('content_type', models.CharField(max_length=50)),
+                ('byte_size', models.PositiveIntegerField()),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Stored Photo',
+            },
+        ),
+        migrations.AddField(
+            model_name='presenterslot',
+            name='stored_photo',
+            field=models.ForeignKey(blank=True, help_text='Headshot shown in the A2 photo zone', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slots', to='planner.storedphoto'),
+        ),
+        migrations.RunPython(move_photo_data, restore_photo_data),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:16
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Separate from 0188: on PostgreSQL the FK updates of the data move leave
+    # deferred constraint checks pending, and ALTER TABLE on the same table
+    # in that transaction fails.
+
+    dependencies = [
+        ('planner', '0188_photo_store'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='presenterslot',
+            name='photo_data',
+        ),
+    ]
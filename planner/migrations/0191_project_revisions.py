@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0190_render_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('module', models.CharField(max_length=30)),
+                ('revision', models.BigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='planner.project')),
+            ],
+            options={
+                'verbose_name': 'Project Revision',
+                'constraints': [models.UniqueConstraint(fields=('project', 'module'), name='unique_project_revision'), models.UniqueConstraint(condition=models.Q(('project__isnull', True)), fields=('module',), name='unique_catalogue_revision')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-17 17:02
+
+from django.db import migrations, models
+
+
+def fail_duplicate_active_jobs(apps, schema_editor):
+    """Keep the oldest queued or running job of each report revision; the
+    constraint below would reject the others."""
+    RenderJob = apps.get_model('planner', 'RenderJob')
+    seen = set()
+    duplicates = []
+    active = RenderJob.objects.filter(status__in=('queued', 'running')).order_by('created_at')
+    for pk, *key in active.values_list('pk', 'project_id', 'report_type', 'params', 'revision'):
+        if tuple(key) in seen:
+            duplicates.append(pk)
+        seen.add(tuple(key))
+    RenderJob.objects.filter(pk__in=duplicates).update(status='failed', error='Duplicate job')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0191_project_revisions'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='renderjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ('queued', 'running'))), fields=('project', 'report_type', 'params', 'revision'), name='unique_active_render_job'),
+        ),
+    ]
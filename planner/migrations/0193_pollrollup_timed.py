@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0192_render_job_unique_active'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pollrollup',
+            name='timed',
+            field=models.BinaryField(default=bytes),
+        ),
+    ]
@@ -9,6 +9,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.views.decorators.http import require_http_methods
 from .models import Project, ProjectMember, SoundvisionPrediction, ShowDay, MicSession, MicAssignment, CommBeltPack
+from .mic_grid import build_mic_grid, load_assignments
 
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
@@ -313,17 +314,15 @@ def mic_tracker_days(request, project_id):
     if not user_can_access_project(request.user, project):
         return redirect('mobile:dashboard')
     
-    days = ShowDay.objects.filter(project=project).order_by('date')
+    grid = build_mic_grid(ShowDay.objects.filter(project=project).order_by('date'), detail=False)
     
     # Add session count to each day
     day_data = []
-    for day in days:
-        session_count = day.sessions.count()
-        mic_count = MicAssignment.objects.filter(session__day=day).count()
+    for entry in grid:
         day_data.append({
-            'day': day,
-            'session_count': session_count,
-            'mic_count': mic_count,
+            'day': entry['day'],
+            'session_count': len(entry['sessions']),
+            'mic_count': entry['stats']['total'],
         })
     
     context = {
@@ -344,18 +343,16 @@ def mic_tracker_sessions(request, project_id, day_id):
         return redirect('mobile:dashboard')
     
     day = get_object_or_404(ShowDay, id=day_id, project=project)
-    sessions = day.sessions.all().order_by('order', 'start_time')
+    grid = build_mic_grid(ShowDay.objects.filter(pk=day.pk), detail=False)
     
     # Add assignment counts
     session_data = []
-    for session in sessions:
+    for session in grid[0]['sessions']:
         assignments = session.mic_assignments.all()
-        total = assignments.count()
-        assigned = assignments.filter(is_micd=True).count()
         session_data.append({
             'session': session,
-            'total_mics': total,
-            'assigned_mics': assigned,
+            'total_mics': len(assignments),
+            'assigned_mics': sum(1 for a in assignments if a.is_micd),
         })
     
     context = {
@@ -378,7 +375,7 @@ def mic_tracker_assignments(request, project_id, session_id):
         return redirect('mobile:dashboard')
     
     session = get_object_or_404(MicSession, id=session_id, day__project=project)
-    assignments = session.mic_assignments.all().order_by('rf_number')
+    assignments = load_assignments(list(session.mic_assignments.all().order_by('rf_number')))
     
     context = {
         'project': project,
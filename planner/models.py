@@ -53,620 +53,19 @@ class Project(models.Model):
     def duplicate(self, new_name=None, duplicate_for_user=None):
         """
         Create a complete copy of this project and all related data.
+
+        Copied table by table with bulk inserts (see project_clone.py).
+        Team members and invitations are not copied.
         """
-        
-        
-        from django.db import transaction
-        
+        from .project_clone import clone_project
+
         # Set defaults
         if new_name is None:
             new_name = f"Copy of {self.name}"
         if duplicate_for_user is None:
             duplicate_for_user = self.owner
-        
-     
-    
-        
-        with transaction.atomic():
-            # Create new project
-            new_project = Project.objects.create(
-                name=new_name,
-                owner=duplicate_for_user,
-                start_date=self.start_date,
-                end_date=self.end_date,
-                venue=self.venue,
-                client=self.client,
-                notes=self.notes,
-                is_archived=False  # Always create as active
-            )
-            
-            # Track old_id -> new_object mappings for relationships
-            location_map = {}
-            amp_location_map = {}
-            console_map = {}
-            amp_map = {}
-
-            # 1. Duplicate Locations (needed for other models)
-            for location in self.location_set.all():
-                new_location = Location.objects.create(
-                    project=new_project,
-                    name=location.name,
-                    description=location.description
-                )
-                location_map[location.id] = new_location
-
-            # 1b. Duplicate AmpLocations (issue #29)
-            for amp_location in self.amplocation_set.all():
-                new_amp_location = AmpLocation.objects.create(
-                    project=new_project,
-                    name=amp_location.name,
-                    sort_order=amp_location.sort_order,
-                    description=amp_location.description,
-                )
-                amp_location_map[amp_location.id] = new_amp_location
-            
-            # 2. Duplicate Consoles and their related objects
-            for console in self.console_set.all():
-                # Get the location if it exists
-                new_location = location_map.get(console.location_id) if console.location_id else None
-                
-                new_console = Console.objects.create(
-                    project=new_project,
-                    location=new_location,
-                    name=console.name,
-                    is_template=console.is_template,
-                    primary_ip_address=console.primary_ip_address,
-                    secondary_ip_address=console.secondary_ip_address
-                )
-                console_map[console.id] = new_console
-                
-                # Duplicate Console Inputs
-                for input_obj in console.consoleinput_set.all():
-                    ConsoleInput.objects.create(
-                        console=new_console,
-                        dante_number=input_obj.dante_number,
-                        input_ch=input_obj.input_ch,
-                        source=input_obj.source,
-                        group=input_obj.group,
-                        dca=input_obj.dca,
-                        mute=input_obj.mute,
-                        direct_out=input_obj.direct_out,
-                        omni_in=input_obj.omni_in
-                    )
-                
-                # Duplicate Console Aux Outputs
-                for aux in console.consoleauxoutput_set.all():
-                    ConsoleAuxOutput.objects.create(
-                        console=new_console,
-                        dante_number=aux.dante_number,
-                        aux_number=aux.aux_number,
-                        name=aux.name,
-                        mono_stereo=aux.mono_stereo,
-                        bus_type=aux.bus_type,
-                        omni_in=aux.omni_in,
-                        omni_out=aux.omni_out
-                    )
-                
-                # Duplicate Console Matrix Outputs
-                for matrix in console.consolematrixoutput_set.all():
-                    ConsoleMatrixOutput.objects.create(
-                        console=new_console,
-                        dante_number=matrix.dante_number,
-                        matrix_number=matrix.matrix_number,
-                        name=matrix.name,
-                        mono_stereo=matrix.mono_stereo,
-                        destination=matrix.destination,
-                        omni_out=matrix.omni_out
-                    )
-                
-                # Duplicate Console Stereo Outputs
-                for stereo in console.consolestereooutput_set.all():
-                    ConsoleStereoOutput.objects.create(
-                        console=new_console,
-                        stereo_type=stereo.stereo_type,
-                        name=stereo.name,
-                        dante_number=stereo.dante_number,
-                        omni_out=stereo.omni_out
-                    )
-            
-            # 3. Duplicate Devices (I/O Devices)
-            for device in self.device_set.all():
-                new_location = location_map.get(device.location_id) if device.location_id else None
-                
-                new_device = Device.objects.create(
-                project=new_project,
-                location=new_location,
-                name=device.name,
-                input_count=device.input_count,
-                output_count=device.output_count,
-                primary_ip_address=device.primary_ip_address,
-                secondary_ip_address=device.secondary_ip_address
-            )
-                # Duplicate Device Inputs
-                for device_input in device.inputs.all():
-                   DeviceInput.objects.create(
-                        device=new_device,
-                        input_number=device_input.input_number,
-                        signal_name=device_input.signal_name
-                    )
-                
-                # Duplicate Device Outputs
-                for device_output in device.outputs.all():
-                    DeviceOutput.objects.create(
-                    device=new_device,
-                    output_number=device_output.output_number,
-                    signal_name=device_output.signal_name
-                )
-            
-            # 4. Duplicate Amplifiers
-            for amp in self.amp_set.all():
-                new_location = amp_location_map.get(amp.location_id) if amp.location_id else None
 
-                # Amp requires a location - skip if we can't map it
-                if not new_location:
-                    continue
-                
-                new_amp = Amp.objects.create(
-                    project=new_project,
-                    location=new_location,
-                    amp_model=amp.amp_model,
-                    name=amp.name,
-                    ip_address=amp.ip_address,
-                    color=amp.color,
-                    nl4_a_pair_1=amp.nl4_a_pair_1,
-                    nl4_a_pair_2=amp.nl4_a_pair_2,
-                    nl4_b_pair_1=amp.nl4_b_pair_1,
-                    nl4_b_pair_2=amp.nl4_b_pair_2,
-                    nl8_a_pair_1=amp.nl8_a_pair_1,
-                    nl8_a_pair_2=amp.nl8_a_pair_2,
-                    nl8_a_pair_3=amp.nl8_a_pair_3,
-                    nl8_a_pair_4=amp.nl8_a_pair_4,
-                    nl8_b_pair_1=amp.nl8_b_pair_1,
-                    nl8_b_pair_2=amp.nl8_b_pair_2,
-                    nl8_b_pair_3=amp.nl8_b_pair_3,
-                    nl8_b_pair_4=amp.nl8_b_pair_4,
-                    cacom_1_ch1=amp.cacom_1_ch1,
-                    cacom_1_ch2=amp.cacom_1_ch2,
-                    cacom_1_ch3=amp.cacom_1_ch3,
-                    cacom_1_ch4=amp.cacom_1_ch4,
-                    cacom_2_ch1=amp.cacom_2_ch1,
-                    cacom_2_ch2=amp.cacom_2_ch2,
-                    cacom_2_ch3=amp.cacom_2_ch3,
-                    cacom_2_ch4=amp.cacom_2_ch4,
-                    cacom_3_ch1=amp.cacom_3_ch1,
-                    cacom_3_ch2=amp.cacom_3_ch2,
-                    cacom_3_ch3=amp.cacom_3_ch3,
-                    cacom_3_ch4=amp.cacom_3_ch4,
-                    cacom_4_ch1=amp.cacom_4_ch1,
-                    cacom_4_ch2=amp.cacom_4_ch2,
-                    cacom_4_ch3=amp.cacom_4_ch3,
-                    cacom_4_ch4=amp.cacom_4_ch4
-                )
-                amp_map[amp.id] = new_amp
-                
-                # Duplicate Amp Channels
-                for channel in amp.channels.all():
-                                        AmpChannel.objects.create(
-                        amp=new_amp,
-                        channel_number=channel.channel_number,
-                        channel_name=channel.channel_name,
-                        avb_stream=channel.avb_stream,
-                        aes_input=channel.aes_input,
-                        analog_input=channel.analog_input
-                    )
-                
-               
-                
-               
-               
-            
-            # 5. Duplicate COMM System
-            # Duplicate CommChannels
-            for channel in self.comm_channels.all():
-                CommChannel.objects.create(
-                    project=new_project,
-                    channel_number=channel.channel_number,
-                    name=channel.name
-                )
-            
-            # Duplicate CommPositions
-            for position in self.commposition_set.all():
-                CommPosition.objects.create(
-                    project=new_project,
-                    name=position.name,
-                    order=position.order
-                )
-                            
-            # Duplicate CommCrewNames
-            for crew in self.commcrewname_set.all():
-                CommCrewName.objects.create(
-                    project=new_project,
-                    name=crew.name
-                )
-            
-            # Duplicate CommBeltPacks and their channels
-            # First create a map of old CommChannel IDs to new ones
-            comm_channel_map = {}
-            for old_channel in self.comm_channels.all():
-                new_channel = CommChannel.objects.filter(
-                    project=new_project,
-                    channel_number=old_channel.channel_number
-                ).first()
-                if new_channel:
-                    comm_channel_map[old_channel.id] = new_channel
-            
-            for beltpack in self.commbeltpack_set.all():
-                # Map unit_location to new location if it exists
-                new_unit_location = location_map.get(beltpack.unit_location_id) if beltpack.unit_location_id else None
-                
-                new_beltpack = CommBeltPack.objects.create(
-                    project=new_project,
-                    bp_number=beltpack.bp_number,
-                    system_type=beltpack.system_type,
-                    unit_location=new_unit_location,
-                    manufacturer=beltpack.manufacturer,
-                    ip_address=beltpack.ip_address,
-                    headset=beltpack.headset,
-                    audio_pgm=beltpack.audio_pgm,
-                    group=beltpack.group
-                )
-                
-                # Duplicate CommBeltPackChannels
-                for bp_channel in beltpack.channels.all():
-                    CommBeltPackChannel.objects.create(
-                        beltpack=new_beltpack,
-                        channel_number=bp_channel.channel_number,
-                        channel=comm_channel_map.get(bp_channel.channel_id) if bp_channel.channel_id else None
-                    )
-            
-            # 6. Duplicate Mic Tracker System
-            # Duplicate Presenters first (needed for sessions)
-            presenter_map = {}
-            for presenter in self.presenters.all():
-                new_presenter = Presenter.objects.create(
-                project=new_project,
-                name=presenter.name,
-                notes=presenter.notes
-            )
-                presenter_map[presenter.id] = new_presenter
-            # 6. Duplicate Mic Tracker System
-            # Duplicate Presenters first (needed for sessions)
-            presenter_map = {}
-            for presenter in self.presenters.all():
-                new_presenter = Presenter.objects.create(
-                    project=new_project,
-                    name=presenter.name,
-                    notes=presenter.notes
-                )
-                presenter_map[presenter.id] = new_presenter
-
-            # Duplicate ShowDays
-            showday_map = {}
-            for showday in self.showday_set.all():
-                new_showday = ShowDay.objects.create(
-                    project=new_project,
-                    date=showday.date,
-                    name=showday.name,
-                    is_collapsed=showday.is_collapsed,
-                    order=showday.order
-                )
-                showday_map[showday.id] = new_showday
-
-            # Duplicate MicSessions (through ShowDays)
-            session_map = {}
-            for old_showday_id, new_showday in showday_map.items():
-                old_showday = ShowDay.objects.get(id=old_showday_id)
-                for session in old_showday.sessions.all():
-                    new_session = MicSession.objects.create(
-                        day=new_showday,
-                        name=session.name,
-                        session_type=session.session_type,
-                        start_time=session.start_time,
-                        end_time=session.end_time,
-                        location=session.location,
-                        notes=session.notes,
-                        num_mics=session.num_mics,
-                        column_position=session.column_position,
-                        order=session.order
-                    )
-                    session_map[session.id] = new_session
-
-                    # Duplicate MicGroups for this session and build group_map
-                    group_map = {}
-                    for group in session.mic_groups.all():
-                        new_group = MicGroup.objects.create(
-                            session=new_session,
-                            name=group.name,
-                            color=group.color
-                        )
-                        group_map[group.id] = new_group
-
-                    # Duplicate MicAssignments
-                    for assignment in session.mic_assignments.all():
-                        new_assignment = MicAssignment.objects.create(
-                            session=new_session,
-                            rf_number=assignment.rf_number,
-                            mic_type=assignment.mic_type,
-                            is_micd=assignment.is_micd,
-                            is_d_mic=assignment.is_d_mic,
-                            active_presenter_index=assignment.active_presenter_index,
-                            notes=assignment.notes,
-                            group=group_map.get(assignment.group_id) if assignment.group_id else None
-                        )
-
-                        # Duplicate PresenterSlots for this assignment
-                        for slot in assignment.presenter_slots.all():
-                            PresenterSlot.objects.create(
-                                assignment=new_assignment,
-                                presenter=presenter_map.get(slot.presenter_id) if slot.presenter_id else None,
-                                order=slot.order,
-                                is_active=slot.is_active,
-                                mic_type=slot.mic_type,
-                                placement=slot.placement,
-                                sensitivity=slot.sensitivity,
-                                output_level=slot.output_level,
-                                notes=slot.notes,
-                                photo=None,  # don't copy uploaded files
-                                group=group_map.get(slot.group_id) if slot.group_id else None,
-                                a2_group=group_map.get(slot.a2_group_id) if slot.a2_group_id else None
-                            )
-
-            # Duplicate MicShowInfo (OneToOne)
-            if hasattr(self, 'mic_show_info'):
-                MicShowInfo.objects.update_or_create(
-                    project=new_project,
-                    defaults={
-                        'show_name': self.mic_show_info.show_name,
-                        'venue_name': self.mic_show_info.venue_name,
-                        'ballroom_name': self.mic_show_info.ballroom_name,
-                        'start_date': self.mic_show_info.start_date,
-                        'end_date': self.mic_show_info.end_date,
-                        'default_mics_per_session': self.mic_show_info.default_mics_per_session,
-                        'default_session_duration': self.mic_show_info.default_session_duration
-                    }
-                )
-            
-                # 7. Duplicate Soundvision/PA System
-            # First duplicate SoundvisionPredictions
-            prediction_map = {}
-            for prediction in SoundvisionPrediction.objects.filter(project=self):
-                new_showday = showday_map.get(prediction.show_day_id) if prediction.show_day_id else None
-                
-                new_prediction = SoundvisionPrediction.objects.create(
-                    project=new_project,
-                    show_day=new_showday,
-                    file_name=prediction.file_name,
-                    version=prediction.version,
-                    date_generated=prediction.date_generated,
-                    raw_data=prediction.raw_data,
-                    notes=prediction.notes
-                )
-                prediction_map[prediction.id] = new_prediction
-                
-                # Duplicate Speaker Arrays for this prediction
-                for array in prediction.speaker_arrays.all():
-                    new_array = SpeakerArray.objects.create(
-                        prediction=new_prediction,
-                        source_name=array.source_name,
-                        array_base_name=array.array_base_name,
-                        symmetry_type=array.symmetry_type,
-                        group_context=array.group_context,
-                        configuration=array.configuration,
-                        bumper_type=array.bumper_type,
-                        position_x=array.position_x,
-                        position_y=array.position_y,
-                        position_z=array.position_z,
-                        site_angle=array.site_angle,
-                        azimuth=array.azimuth,
-                        top_site=array.top_site,
-                        bottom_site=array.bottom_site,
-                        num_motors=array.num_motors,
-                        front_pickup_position=array.front_pickup_position,
-                        rear_pickup_position=array.rear_pickup_position,
-                        front_motor_load_lb=array.front_motor_load_lb,
-                        rear_motor_load_lb=array.rear_motor_load_lb,
-                        total_weight_lb=array.total_weight_lb,
-                        enclosure_weight_lb=array.enclosure_weight_lb,
-                        bottom_elevation=array.bottom_elevation,
-                        spatial_dimensions=array.spatial_dimensions,
-                        mbar_hole=array.mbar_hole,
-                        is_single_point=array.is_single_point,
-                        bumper_angle=array.bumper_angle
-                    )
-                
-                    # Duplicate Speaker Cabinets
-                    for cabinet in array.cabinets.all():
-                        SpeakerCabinet.objects.create(
-                            array=new_array,
-                            position_number=cabinet.position_number,
-                            speaker_model=cabinet.speaker_model,
-                            angle_to_next=cabinet.angle_to_next,
-                            site_angle=cabinet.site_angle,
-                            top_z=cabinet.top_z,
-                            bottom_z=cabinet.bottom_z,
-                            panflex_setting=cabinet.panflex_setting
-                        )
-            
-           
-            
-            # 8. Duplicate Power Distribution Plans and their AmplifierAssignments
-            for power_plan in self.powerdistributionplan_set.all():
-                new_power_plan = PowerDistributionPlan.objects.create(
-                    project=new_project,
-                    show_day=showday_map.get(power_plan.show_day_id) if power_plan.show_day_id else None,
-                    venue_name=power_plan.venue_name,
-                    service_type=power_plan.service_type,
-                    available_amperage_per_leg=power_plan.available_amperage_per_leg,
-                    transient_headroom=power_plan.transient_headroom,
-                    safety_margin=power_plan.safety_margin,
-                    notes=power_plan.notes
-                )
-                
-                # Duplicate AmplifierAssignments for this plan
-                for assignment in power_plan.amplifier_assignments.all():
-                    AmplifierAssignment.objects.create(
-                        distribution_plan=new_power_plan,
-                        amplifier=assignment.amplifier,  # FK to global AmplifierProfile
-                        quantity=assignment.quantity,
-                        zone=assignment.zone,
-                        position=assignment.position,
-                        phase_assignment=assignment.phase_assignment,
-                        duty_cycle=assignment.duty_cycle,
-                        calculated_current_per_unit=assignment.calculated_current_per_unit,
-                        calculated_total_current=assignment.calculated_total_current,
-                        notes=assignment.notes
-                    )
-            
-            # 9. Duplicate System Processors (P1 and Galaxy)
-            processor_map = {}
-            for sys_proc in self.systemprocessor_set.all():
-                new_location = location_map.get(sys_proc.location_id) if sys_proc.location_id else None
-                
-                # SystemProcessor requires a location - skip if we can't map it
-                if not new_location:
-                    continue
-                
-                new_sys_proc = SystemProcessor.objects.create(
-                    project=new_project,
-                    name=sys_proc.name,
-                    device_type=sys_proc.device_type,
-                    location=new_location,
-                    ip_address=sys_proc.ip_address,
-                    notes=sys_proc.notes
-                )
-                processor_map[sys_proc.id] = new_sys_proc
-                
-                # Duplicate P1Processor if exists
-                if hasattr(sys_proc, 'p1_config'):
-                    p1_config = sys_proc.p1_config
-                    # Create P1Processor (this will auto-create default channels)
-                    new_p1 = P1Processor(
-                        system_processor=new_sys_proc,
-                        notes=p1_config.notes
-                    )
-                    new_p1.save()
-                    
-                    # Delete auto-created default channels
-                    new_p1.inputs.all().delete()
-                    new_p1.outputs.all().delete()
-                    
-                    # Now duplicate P1Inputs from original
-                    for p1_input in p1_config.inputs.all():
-                        P1Input.objects.create(
-                            p1_processor=new_p1,
-                            input_type=p1_input.input_type,
-                            channel_number=p1_input.channel_number,
-                            label=p1_input.label,
-                        )
-                    
-                    # Duplicate P1Outputs
-                    for p1_output in p1_config.outputs.all():
-                        P1Output.objects.create(
-                            p1_processor=new_p1,
-                            output_type=p1_output.output_type,
-                            channel_number=p1_output.channel_number,
-                            label=p1_output.label,
-                            assigned_bus=p1_output.assigned_bus
-                        )
-                
-                # Duplicate GalaxyProcessor if exists
-                if hasattr(sys_proc, 'galaxy_config'):
-                    galaxy_config = sys_proc.galaxy_config
-                    new_galaxy = GalaxyProcessor.objects.create(
-                        system_processor=new_sys_proc,
-                        notes=galaxy_config.notes
-                    )
-                    
-                    # Duplicate GalaxyInputs
-                    for galaxy_input in galaxy_config.inputs.all():
-                        GalaxyInput.objects.create(
-                            galaxy_processor=new_galaxy,
-                            input_type=galaxy_input.input_type,
-                            channel_number=galaxy_input.channel_number,
-                            label=galaxy_input.label,
-                        )
-                    
-                    # Duplicate GalaxyOutputs
-                    for galaxy_output in galaxy_config.outputs.all():
-                        GalaxyOutput.objects.create(
-                            galaxy_processor=new_galaxy,
-                            output_type=galaxy_output.output_type,
-                            channel_number=galaxy_output.channel_number,
-                            label=galaxy_output.label,
-                            assigned_bus=galaxy_output.assigned_bus,
-                            destination=galaxy_output.destination
-                        )
-            
-            # 10. Duplicate PA Zones
-            # Note: PAZone has unique=True on name, so we need to generate unique names
-            pa_zone_map = {}
-            for pa_zone in PAZone.objects.filter(project=self):
-                
-                
-                # Generate unique name for the new zone
-                base_name = pa_zone.name
-                new_name = base_name
-                counter = 1
-                while PAZone.objects.filter(name=new_name).exists():
-                    new_name = f"{base_name}_{counter}"
-                    counter += 1
-                
-                new_pa_zone = PAZone.objects.create(
-                    project=new_project,
-                    name=new_name,
-                    sort_order=pa_zone.sort_order,
-                    zone_type=pa_zone.zone_type
-                )
-                pa_zone_map[pa_zone.id] = new_pa_zone
-            
-            # 11. Duplicate PA Cable Schedules and Fan Outs
-            for cable in PACableSchedule.objects.filter(project=self):
-                new_cable = PACableSchedule.objects.create(
-                    project=new_project,
-                    label=pa_zone_map.get(cable.label_id) if cable.label_id else None,
-                    destination=cable.destination,
-                    count=cable.count,
-                    cable=cable.cable,
-                    notes=cable.notes,
-                    drawing_ref=cable.drawing_ref,
-                    length=cable.length
-                )
-                
-                # Duplicate PAFanOuts
-                for fan_out in cable.fan_outs.all():
-                    PAFanOut.objects.create(
-                        cable_schedule=new_cable,
-                        fan_out_type=fan_out.fan_out_type,
-                        quantity=fan_out.quantity
-                    )
-            
-            # 12. Duplicate Audio Checklists and Tasks
-            for checklist in self.audio_checklists.all():
-                new_checklist = AudioChecklist.objects.create(
-                    project=new_project,
-                    name=checklist.name
-                )
-                
-                # Duplicate AudioChecklistTasks
-                for task in checklist.tasks.all():
-                    AudioChecklistTask.objects.create(
-                        checklist=new_checklist,
-                        task=task.task,
-                        task_type=task.task_type,
-                        stage=task.stage,
-                        sort_order=task.sort_order,
-                        day1_status=task.day1_status,
-                        day2_status=task.day2_status,
-                        day3_status=task.day3_status,
-                        day4_status=task.day4_status
-                    )
-            
-            # NOTE: We intentionally do NOT duplicate:
-            # - ProjectMember (team members)
-            # - Invitations
-            # - created_at/updated_at timestamps (automatically set to now)
-            
-            return new_project
+        return clone_project(self, new_name, duplicate_for_user)
 
 
 
@@ -725,7 +124,28 @@ class ProjectMember(models.Model):
     
     def __str__(self):
         return f"{self.user.username} → {self.project.name} ({self.role})"
-    
+
+
+class ProjectAccessStamp(models.Model):
+    """Version of a user's project access (owned projects and memberships).
+
+    Bumped whenever a Project or ProjectMember change affects the user, so
+    the per-session copy kept by project_access.py knows when to reload.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='project_access_stamp',
+        primary_key=True,
+    )
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Project Access Stamp"
+
+    def __str__(self):
+        return f"{self.user_id} @ v{self.version}"
+
 
 
 class ProjectAccessRequest(models.Model):
@@ -1202,11 +622,42 @@ class MultitrackTrack(models.Model):
 
     @property
     def resolved_source(self):
-        """D-14: return the live channel-model instance, or None for manual / orphan."""
+        """D-14: return the live channel-model instance, or None for manual / orphan.
+
+        Cached on the instance for its current (source_type, source_id);
+        resolve_sources() fills the cache for a whole track list at once.
+        """
+        key = (self.source_type, self.source_id)
+        cached = self.__dict__.get('_resolved_source')
+        if cached is not None and cached[0] == key:
+            return cached[1]
         model = _source_model_for(self.source_type)
         if model is None or self.source_id is None:
-            return None
-        return model.objects.filter(pk=self.source_id).first()
+            source = None
+        else:
+            source = model.objects.filter(pk=self.source_id).first()
+        self._resolved_source = (key, source)
+        return source
+
+    @classmethod
+    def resolve_sources(cls, tracks):
+        """Load the source channel of every track in `tracks` with one query
+        per source type and cache it on each track, so resolved_source /
+        resolved_label / resolved_dante_number don't query per track.
+        Returns the tracks as a list."""
+        tracks = list(tracks)
+        wanted = {}
+        for track in tracks:
+            if track.source_id is not None and _source_model_for(track.source_type) is not None:
+                wanted.setdefault(track.source_type, set()).add(track.source_id)
+        loaded = {
+            source_type: _source_model_for(source_type).objects.in_bulk(ids)
+            for source_type, ids in wanted.items()
+        }
+        for track in tracks:
+            source = loaded.get(track.source_type, {}).get(track.source_id)
+            track._resolved_source = ((track.source_type, track.source_id), source)
+        return tracks
 
     @property
     def resolved_label(self):
@@ -1394,7 +845,9 @@ class MultitrackTemplate(models.Model):
             mapped += 1
 
         if new_tracks:
+            from .project_revisions import touch
             MultitrackTrack.objects.bulk_create(new_tracks)
+            touch(session.project_id, 'multitrack')
         return mapped, len(skipped), _summarise_skipped_slots(skipped)
 
 
@@ -3003,6 +2456,11 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import json
 
+def _is_prefetched(instance, related_name):
+    """True if `related_name` on instance was loaded with prefetch_related."""
+    return related_name in getattr(instance, '_prefetched_objects_cache', {})
+
+
 class ShowDay(models.Model):
     """Represents a day in the show schedule"""
     project = models.ForeignKey('Project', on_delete=models.CASCADE) 
@@ -3030,6 +2488,12 @@ class ShowDay(models.Model):
         used_mics = 0
         
         for session in sessions:
+            if _is_prefetched(session, 'mic_assignments'):
+                # Loaded by mic_grid.build_mic_grid(): count in memory
+                assignments = session.mic_assignments.all()
+                total_mics += len(assignments)
+                used_mics += sum(1 for a in assignments if a.is_micd)
+                continue
             assignments = session.mic_assignments.all()
             total_mics += assignments.count()
             used_mics += assignments.filter(is_micd=True).count()
@@ -3138,25 +2602,37 @@ class MicSession(models.Model):
         luminance = 0.299 * r + 0.587 * g + 0.114 * b
         return '#111' if luminance > 150 else '#fff'
     
-    def save(self, *args, **kwargs):
+    def save(self, *args, create_assignments=True, **kwargs):
         is_new = self.pk is None
         super().save(*args, **kwargs)
         
-        # Auto-create mic assignments if this is a new session
-        if is_new:
+        # Auto-create mic assignments if this is a new session (skipped when
+        # the caller fills the session itself, e.g. duplicate_to_session)
+        if is_new and create_assignments:
             self.create_mic_assignments()
+
+    def record_bulk_changes(self, **rows):
+        """bulk_create/bulk_update skip the change-feed signals; record the
+        rows as one mic tracker revision (mic_changes.py) and bump the
+        project's mic revision (project_revisions.py). Keyword = kind."""
+        from .mic_changes import record_mic_changes
+        from .project_revisions import touch
+        touch(self.day.project_id, 'mic')
+        record_mic_changes(self.day.project_id, [
+            (kind, obj.pk, 'save') for kind, objs in rows.items() for obj in objs
+        ])
     
     def create_mic_assignments(self):
         """Create the specified number of mic assignments for this session"""
         existing_count = self.mic_assignments.count()
         
         if existing_count < self.num_mics:
-            # Add more assignments
-            for i in range(existing_count + 1, self.num_mics + 1):
-                MicAssignment.objects.create(
-                    session=self,
-                    rf_number=i
-                )
+            # Add more assignments, one INSERT for the lot
+            created = MicAssignment.objects.bulk_create([
+                MicAssignment(session=self, rf_number=i)
+                for i in range(existing_count + 1, self.num_mics + 1)
+            ])
+            self.record_bulk_changes(assignment=created)
         elif existing_count > self.num_mics:
             # Remove excess assignments (from the end)
             excess = self.mic_assignments.filter(rf_number__gt=self.num_mics)
@@ -3182,19 +2658,34 @@ class MicSession(models.Model):
             return False
 
         with transaction.atomic():
+            # Two statements whatever the session size: park every row on
+            # its negated target, then flip all the signs back at once
             for i, a in enumerate(assignments, start=1):
                 a.rf_number = -i
-                a.save(update_fields=['rf_number'])
-            for i, a in enumerate(assignments, start=1):
-                a.rf_number = i
-                a.save(update_fields=['rf_number'])
+            MicAssignment.objects.bulk_update(assignments, ['rf_number'])
+            self.mic_assignments.update(rf_number=-models.F('rf_number'))
+            for a in assignments:
+                a.rf_number = -a.rf_number
             self.num_mics = len(assignments)
             self.save(update_fields=['num_mics'])
+            self.record_bulk_changes(assignment=assignments)
         return True
 
     def get_mic_usage_stats(self):
         """Get statistics about mic usage in this session"""
         assignments = self.mic_assignments.all()
+        if _is_prefetched(self, 'mic_assignments') and all(
+            _is_prefetched(a, 'shared_presenters') for a in assignments
+        ):
+            # Loaded by mic_grid.build_mic_grid(): count in memory
+            micd = sum(1 for a in assignments if a.is_micd)
+            return {
+                'total': len(assignments),
+                'micd': micd,
+                'd_mic': sum(1 for a in assignments if a.is_d_mic),
+                'available': len(assignments) - micd,
+                'shared': sum(len(a.shared_presenters.all()) for a in assignments),
+            }
         return {
             'total': assignments.count(),
             'micd': assignments.filter(is_micd=True).count(),
@@ -3213,8 +2704,11 @@ class MicSession(models.Model):
         from django.db import transaction
 
         with transaction.atomic():
-            for assignment in self.mic_assignments.all():
-                new_assignment = MicAssignment.objects.create(
+            assignments = list(self.mic_assignments.prefetch_related(
+                'shared_presenter_assignments', 'presenter_slots',
+            ))
+            new_assignments = MicAssignment.objects.bulk_create([
+                MicAssignment(
                     session=target_session,
                     rf_number=assignment.rf_number,
                     mic_type=assignment.mic_type,
@@ -3226,32 +2720,42 @@ class MicSession(models.Model):
                     output_level=assignment.output_level,
                     notes=assignment.notes,
                 )
-
-                # Shared presenters live on a through model that also carries
-                # per-assignment placement/order.
-                for spa in assignment.shared_presenter_assignments.all():
-                    SharedPresenterAssignment.objects.create(
-                        mic_assignment=new_assignment,
-                        presenter=spa.presenter,
-                        placement=spa.placement,
-                        order=spa.order,
-                    )
-
-                # Presenter slots are the source of truth for the A2 / slot UI.
-                for slot in assignment.presenter_slots.all():
-                    PresenterSlot.objects.create(
-                        assignment=new_assignment,
-                        presenter=slot.presenter,
-                        order=slot.order,
-                        is_active=slot.is_active,
-                        mic_type=slot.mic_type,
-                        placement=slot.placement,
-                        sensitivity=slot.sensitivity,
-                        output_level=slot.output_level,
-                        notes=slot.notes,
-                        photo_data=slot.photo_data,
-                        is_micd=slot.is_micd,
-                    )
+                for assignment in assignments
+            ])
+            pairs = list(zip(assignments, new_assignments))
+
+            # Shared presenters live on a through model that also carries
+            # per-assignment placement/order.
+            SharedPresenterAssignment.objects.bulk_create([
+                SharedPresenterAssignment(
+                    mic_assignment=new_assignment,
+                    presenter_id=spa.presenter_id,
+                    placement=spa.placement,
+                    order=spa.order,
+                )
+                for assignment, new_assignment in pairs
+                for spa in assignment.shared_presenter_assignments.all()
+            ])
+
+            # Presenter slots are the source of truth for the A2 / slot UI.
+            new_slots = PresenterSlot.objects.bulk_create([
+                PresenterSlot(
+                    assignment=new_assignment,
+                    presenter_id=slot.presenter_id,
+                    order=slot.order,
+                    is_active=slot.is_active,
+                    mic_type=slot.mic_type,
+                    placement=slot.placement,
+                    sensitivity=slot.sensitivity,
+                    output_level=slot.output_level,
+                    notes=slot.notes,
+                    stored_photo_id=slot.stored_photo_id,
+                    is_micd=slot.is_micd,
+                )
+                for assignment, new_assignment in pairs
+                for slot in assignment.presenter_slots.all()
+            ])
+            target_session.record_bulk_changes(assignment=new_assignments, slot=new_slots)
 
 class MicGroup(models.Model):
     GROUP_COLORS = [
@@ -3541,6 +3045,12 @@ class MicAssignment(models.Model):
         # which then 500s the change form. Short-circuit safely instead.
         if self.pk is None:
             return None
+        if _is_prefetched(self, 'presenter_slots'):
+            slots = self.presenter_slots.all()
+            active = [slot for slot in slots if slot.is_active]
+            if active:
+                return active[0]
+            return min(slots, key=lambda slot: slot.order, default=None)
         slot = self.presenter_slots.filter(is_active=True).first()
         if not slot:
             slot = self.presenter_slots.order_by('order').first()
@@ -3552,6 +3062,35 @@ class MicAssignment(models.Model):
         return slot.presenter if slot else None    
         
 
+class StoredPhoto(models.Model):
+    """A headshot in the content-addressed photo store (photo_store.py).
+
+    Keyed by the SHA-256 of the uploaded bytes, so slots showing the same
+    picture share one row and one set of files. The thumbnails' URLs only
+    need the digest: PresenterSlot.stored_photo_id is enough to render them.
+    """
+    THUMBNAIL_SIZES = {'sm': 160, 'lg': 400}
+
+    digest = models.CharField(max_length=64, primary_key=True)
+    original = models.FileField(upload_to='photo_store/', max_length=200)
+    content_type = models.CharField(max_length=50)
+    byte_size = models.PositiveIntegerField()
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Stored Photo"
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.width}x{self.height})"
+
+    @staticmethod
+    def thumbnail_url(digest, size='sm'):
+        from django.urls import reverse
+        return reverse('planner:stored_photo', args=[digest, size])
+
+
 class PresenterSlot(models.Model):
     assignment = models.ForeignKey(MicAssignment, on_delete=models.CASCADE, related_name='presenter_slots')
     presenter = models.ForeignKey(Presenter, on_delete=models.SET_NULL, null=True, blank=True, related_name='slots')
@@ -3569,10 +3108,12 @@ class PresenterSlot(models.Model):
         blank=True,
         help_text="Photo for this presenter slot"
     )
-    photo_data = models.TextField(
-        null=True,
-        blank=True,
-        help_text="Base64 encoded photo data"
+    stored_photo = models.ForeignKey(
+        StoredPhoto,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='slots',
+        help_text="Headshot shown in the A2 photo zone"
     )
     group = models.ForeignKey(
         'MicGroup',
@@ -3601,6 +3142,20 @@ class PresenterSlot(models.Model):
 
     def __str__(self):
         return f"Slot {self.order} - {self.presenter} on RF {self.assignment.rf_number}"       
+
+    @property
+    def photo_url(self):
+        """Photo-zone thumbnail URL, or '' without a headshot."""
+        if not self.stored_photo_id:
+            return ''
+        return StoredPhoto.thumbnail_url(self.stored_photo_id, 'sm')
+
+    @property
+    def photo_large_url(self):
+        """Hover / expanded view thumbnail URL, or ''."""
+        if not self.stored_photo_id:
+            return ''
+        return StoredPhoto.thumbnail_url(self.stored_photo_id, 'lg')
         
 
 class SharedPresenterAssignment(models.Model):
@@ -3670,6 +3225,138 @@ class MicShowInfo(models.Model):
         return ""
 
 
+class MicTrackerRevision(models.Model):
+    """Per-project mic tracker revision counter.
+
+    Bumped (never decremented) whenever a ShowDay, MicSession, MicAssignment
+    or PresenterSlot in the project is saved or deleted; see mic_changes.py.
+    """
+    project = models.OneToOneField(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='mic_tracker_revision',
+        primary_key=True,
+    )
+    revision = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Mic Tracker Revision"
+
+    def __str__(self):
+        return f"{self.project_id} @ r{self.revision}"
+
+
+class MicTrackerChange(models.Model):
+    """One entry in a project's mic tracker change log: which object changed
+    at which revision. Only the most recent entries are kept."""
+    KIND_CHOICES = [
+        ('day', 'Show Day'),
+        ('session', 'Mic Session'),
+        ('assignment', 'Mic Assignment'),
+        ('slot', 'Presenter Slot'),
+    ]
+    OP_CHOICES = [
+        ('save', 'Saved'),
+        ('delete', 'Deleted'),
+    ]
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='mic_tracker_changes')
+    revision = models.BigIntegerField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    op = models.CharField(max_length=10, choices=OP_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['revision', 'id']
+        indexes = [models.Index(fields=['project', 'revision'])]
+        verbose_name = "Mic Tracker Change"
+
+    def __str__(self):
+        return f"r{self.revision} {self.op} {self.kind} {self.object_id}"
+
+
+class RenderJob(models.Model):
+    """One background PDF render (render_jobs.py), and the cached artifact
+    once it is done.
+
+    A finished job is reused for as long as the report's modules of the
+    project are still at `revision`, so it doubles as the report's cache
+    entry.
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='render_jobs')
+    report_type = models.CharField(max_length=50)
+    # Canonical 'name=value&...' of the report's parameters ('' when none)
+    params = models.CharField(max_length=200, blank=True)
+    revision = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    progress = models.PositiveSmallIntegerField(default=0)
+    stage = models.CharField(max_length=100, blank=True)
+    artifact = models.FileField(upload_to='render_cache/', max_length=200, blank=True)
+    filename = models.CharField(max_length=200, blank=True)
+    byte_size = models.PositiveIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='render_jobs',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['project', 'report_type', 'params', 'revision'])]
+        constraints = [
+            # One queued or running job per report revision
+            UniqueConstraint(
+                fields=['project', 'report_type', 'params', 'revision'],
+                condition=Q(status__in=('queued', 'running')),
+                name='unique_active_render_job',
+            ),
+        ]
+        verbose_name = "Render Job"
+
+    def __str__(self):
+        return f"{self.report_type} for {self.project_id} ({self.status})"
+
+
+class ProjectRevision(models.Model):
+    """Revision counter of one module of a project's data (consoles, mic
+    tracker ...); see project_revisions.py.
+
+    Bumped (never decremented) whenever a row of the module is written.
+    Shared catalogue tables (amp models, amplifier profiles) count with no
+    project.
+    """
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, null=True, blank=True, related_name='revisions',
+    )
+    module = models.CharField(max_length=30)
+    revision = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=['project', 'module'], name='unique_project_revision'),
+            UniqueConstraint(
+                fields=['module'], condition=Q(project__isnull=True), name='unique_catalogue_revision',
+            ),
+        ]
+        verbose_name = "Project Revision"
+
+    def __str__(self):
+        return f"{self.project_id or 'catalogue'}/{self.module} @ r{self.revision}"
+
+
 
 
 #-------Power Esimator--------
@@ -5391,6 +5078,15 @@ class MonitorSession(models.Model):
         choices=[('setup', 'Setup'), ('show', 'Show'), ('wrap', 'Wrap')],
         default='show',
     )
+    rollup_watermark = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Raw PollResults before this time are compacted into PollRollup",
+    )
+    archived_at = models.DateTimeField(
+        null=True, blank=True,
+        help_text="When this closed session was exported to archive_file (planner/monitor_retention.py)",
+    )
+    archive_file = models.FileField(upload_to='monitor_archives/', blank=True)
 
     class Meta:
         ordering = ['-started_at']
@@ -5442,13 +5138,36 @@ class DiscoveredDevice(models.Model):
     dante_mac_address = models.CharField(max_length=20, blank=True,
         help_text="Dante interface MAC address from mDNS")
 
+    # Bumped whenever a field the dashboard shows changes (last_seen only when
+    # it moves to a new minute, see monitor_ingest.last_seen_moved) —
+    # monitor_status_view sends only rows changed since the client's cursor.
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    # Fields that feed as_status_dict(); saving any of them bumps changed_at
+    STATUS_FIELDS = frozenset({
+        'label', 'ip_address', 'domain', 'is_active', 'consecutive_failures',
+        'last_known_state', 'dante_device_name', 'clock_role',
+        'tx_channel_count', 'rx_channel_count',
+    })
+
     class Meta:
         unique_together = [('project', 'ip_address')]
         ordering = ['domain', 'label', 'ip_address']
+        indexes = [
+            models.Index(fields=['project', 'changed_at']),
+        ]
 
     def __str__(self):
         return f"{self.label or self.ip_address} ({self.domain})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.STATUS_FIELDS.intersection(update_fields):
+            self.changed_at = timezone.now()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'changed_at'}
+        super().save(*args, **kwargs)
+
     def status(self):
         # Never-seen devices show as unreachable (grey), not offline (red)
         if self.last_seen is None and self.last_known_state != 'online':
@@ -5486,7 +5205,9 @@ class PollResult(models.Model):
                                related_name='poll_results')
     session = models.ForeignKey(MonitorSession, on_delete=models.CASCADE,
                                 related_name='poll_results')
-    polled_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: cycles the agent replays after an uplink outage keep
+    # the time they were observed (monitor_ingest.record_poll_history)
+    polled_at = models.DateTimeField(default=timezone.now, editable=False)
     is_reachable = models.BooleanField()
     latency_ms = models.FloatField(null=True, blank=True)
 
@@ -5501,6 +5222,43 @@ class PollResult(models.Model):
         return f"{self.device} {state} @ {self.polled_at:%H:%M:%S}"
 
 
+class PollRollup(models.Model):
+    """Downsampled latency history for one device at one resolution.
+
+    One row covers a fixed segment of time (an hour of 1s buckets, a day of
+    1min buckets, a month of 1h buckets). Only buckets that saw polls are
+    stored: each column is a packed little-endian array, aligned by position
+    with `offsets` (bucket index from segment_start). See planner/monitor_rollup.py.
+    """
+    RESOLUTION_CHOICES = [
+        (1, '1 second'),
+        (60, '1 minute'),
+        (3600, '1 hour'),
+    ]
+    device = models.ForeignKey(DiscoveredDevice, on_delete=models.CASCADE,
+                               related_name='poll_rollups')
+    resolution = models.PositiveIntegerField(choices=RESOLUTION_CHOICES)
+    segment_start = models.DateTimeField()
+    bucket_count = models.PositiveIntegerField(default=0)
+    offsets = models.BinaryField(default=bytes)       # uint32
+    samples = models.BinaryField(default=bytes)       # uint32 polls per bucket
+    lost = models.BinaryField(default=bytes)          # uint32 failed polls per bucket
+    min_latency = models.BinaryField(default=bytes)   # float32 ms, NaN if no replies
+    max_latency = models.BinaryField(default=bytes)   # float32 ms, NaN if no replies
+    sum_latency = models.BinaryField(default=bytes)   # float64 ms over replies
+    timed = models.BinaryField(default=bytes)         # uint32 replies with a latency per bucket
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = [('device', 'resolution', 'segment_start')]
+        indexes = [
+            models.Index(fields=['resolution', 'segment_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.device} {self.get_resolution_display()} @ {self.segment_start:%Y-%m-%d %H:%M}"
+
+
 class DeviceEvent(models.Model):
     EVENT_CHOICES = [
         ('ONLINE', 'Came online'),
@@ -5577,12 +5335,27 @@ class SwitchPortSnapshot(models.Model):
     bandwidth_pct = models.FloatField(null=True, blank=True)
     error_count = models.PositiveBigIntegerField(default=0)
     polled_at = models.DateTimeField(auto_now=True)
+    # Bumped only when a displayed port field changes (polled_at moves every cycle)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    DISPLAY_FIELDS = ('port_description', 'oper_status', 'speed_mbps', 'bandwidth_pct', 'error_count')
 
     class Meta:
         unique_together = [('device', 'session', 'port_index')]
         indexes = [
             models.Index(fields=['device', 'session']),
+            models.Index(fields=['session', 'changed_at']),
         ]
 
+    def as_status_dict(self):
+        return {
+            'port_index': self.port_index,
+            'port_description': self.port_description,
+            'oper_status': self.oper_status,
+            'speed_mbps': self.speed_mbps,
+            'bandwidth_pct': self.bandwidth_pct,
+            'error_count': self.error_count,
+        }
+
     def __str__(self):
         return f"{self.device} port {self.port_index} ({self.oper_status})"
\ No newline at end of file
@@ -0,0 +1,147 @@
+# planner/monitor_agent_cache.py
+#
+# Network Health Monitor — cached agent authentication.
+#
+# Every agent push starts by resolving its Bearer token to a Project and then
+# looking up the project's open MonitorSession: two queries per request, at a
+# few requests a second per venue, before any real work. AgentCache keeps the
+# (project, active session) pair for each agent key for a few seconds.
+#
+#   - Views get a copy of the cached instances, so saving one (e.g. clearing
+#     the scan flag in session.notes) never leaks into other requests.
+#   - Anything that changes the session the agent should see calls
+#     invalidate(): agent_heartbeat (may open a session), agent_stop (ends
+#     it), dashboard_set_show_mode, dashboard_request_scan and the poll cycle
+#     that consumes the scan flag.
+#   - A cached token is checked (constant time) against the agent_api_key of
+#     the cached project on every hit, and forgotten when they differ. That
+#     copy is only as fresh as the entry, so a key rotated through another
+#     path keeps working here until the entry expires (up to AGENT_CACHE_TTL),
+#     or at once if something reloads or invalidates the project's entry.
+#   - Like monitor_hub, the cache is per process. Another worker drops its
+#     copy within AGENT_CACHE_TTL of a change.
+#   - stats() reports the hit rate; it is also logged (INFO, this module's
+#     logger) every STATS_LOG_EVERY lookups.
+
+import copy
+import hmac
+import logging
+import threading
+import time
+
+from .models import MonitorSession, Project
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a resolved agent key / session stays cached
+AGENT_CACHE_TTL = 10
+
+# Log the hit rate once per this many lookups
+STATS_LOG_EVERY = 1000
+
+
+class _Entry:
+    __slots__ = ('project', 'session', 'expires')
+
+    def __init__(self, project, session, expires):
+        self.project = project
+        self.session = session
+        self.expires = expires
+
+
+def _same_key(project, token):
+    return hmac.compare_digest(str(project.agent_api_key).encode(), str(token).encode())
+
+
+class AgentCache:
+    """TTL cache of agent key -> (project, active session). Thread-safe."""
+
+    def __init__(self, ttl=AGENT_CACHE_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}   # project_id -> _Entry
+        self._tokens = {}    # agent key -> project_id
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def project(self, token):
+        """The project owning agent key `token`, or None for an unknown key."""
+        with self._lock:
+            entry = self._fresh(self._tokens.get(token))
+            if entry is not None and not _same_key(entry.project, token):
+                # The project's key changed since this token was cached
+                del self._tokens[token]
+                entry = None
+        if entry is None:
+            project = Project.objects.filter(agent_api_key=token).first()
+            if project is None:
+                self._count(hit=False)
+                return None
+            entry = self._load(project, token)
+        else:
+            self._count(hit=True)
+        return copy.copy(entry.project)
+
+    def session(self, project):
+        """The project's open MonitorSession, or None."""
+        with self._lock:
+            entry = self._fresh(project.pk)
+        if entry is None:
+            entry = self._load(project)
+        else:
+            self._count(hit=True)
+        return copy.copy(entry.session) if entry.session is not None else None
+
+    def invalidate(self, project_id):
+        with self._lock:
+            if self._entries.pop(project_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens.clear()
+            self.hits = self.misses = self.invalidations = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'lookups': lookups,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+            }
+
+    def _fresh(self, project_id):
+        entry = self._entries.get(project_id)
+        if entry is not None and entry.expires > self._clock():
+            return entry
+        return None
+
+    def _load(self, project, token=None):
+        session = MonitorSession.objects.filter(project=project, ended_at__isnull=True).first()
+        entry = _Entry(project, session, self._clock() + self.ttl)
+        with self._lock:
+            self._entries[project.pk] = entry
+            self._tokens[token if token is not None else str(project.agent_api_key)] = project.pk
+        self._count(hit=False)
+        return entry
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            lookups = self.hits + self.misses
+        if lookups % STATS_LOG_EVERY == 0:
+            logger.info('Agent auth cache: %s', self.stats())
+
+
+agent_cache = AgentCache()
@@ -0,0 +1,145 @@
+# planner/monitor_hub.py
+#
+# Network Health Monitor — in-process fan-out of live updates.
+#
+# Agent endpoints publish one message per cycle (the cycle's DeviceEvents plus
+# a "something visible changed" flag). Every dashboard tab holding an event
+# stream open on this process gets a copy straight from memory, so an OFFLINE
+# alert reaches the browser as soon as the agent's POST commits, with no
+# per-client database polling.
+#
+# The hub only knows about subscribers in its own process. A dashboard whose
+# stream is served by another worker won't hear the push; the dashboard keeps
+# a slow status poll (monitor_status_view) as a safety net for that case.
+#
+# Streams are served by views_monitor.monitor_stream_view. Production runs
+# the app under ASGI (gunicorn with uvicorn workers, see Procfile), where an
+# open stream is a parked coroutine rather than a busy worker.
+
+import asyncio
+import json
+import threading
+from collections import defaultdict, deque
+
+from django.db import transaction
+
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_SECONDS = 15
+
+# Browser reconnect delay sent with every stream (milliseconds)
+RECONNECT_MS = 3000
+
+# A subscriber that stops reading keeps at most this many queued messages
+SUBSCRIBER_BACKLOG = 500
+
+
+class Subscription:
+    """One connected dashboard. `notify` is called (from any thread) after a
+    message is queued; the reader collects queued messages with drain()."""
+
+    def __init__(self, project_id, notify):
+        self.project_id = project_id
+        self._notify = notify
+        self._messages = deque(maxlen=SUBSCRIBER_BACKLOG)
+        self._lock = threading.Lock()
+
+    def push(self, message):
+        with self._lock:
+            self._messages.append(message)
+        self._notify()
+
+    def drain(self):
+        with self._lock:
+            messages = list(self._messages)
+            self._messages.clear()
+        return messages
+
+
+class MonitorHub:
+    """Per-project publish/subscribe registry. Thread-safe: agent views
+    publish from worker threads while streams read on the event loop."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, project_id, notify):
+        subscription = Subscription(project_id, notify)
+        with self._lock:
+            self._subscribers[project_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.project_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.project_id]
+
+    def subscriber_count(self, project_id):
+        with self._lock:
+            return len(self._subscribers.get(project_id, ()))
+
+    def publish(self, project_id, message):
+        """Hand `message` to every subscriber of the project. Returns the
+        number of subscribers reached."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(project_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.push(message)
+            except RuntimeError:
+                # The subscriber's event loop is gone; its stream is dead
+                self.unsubscribe(subscription)
+        return len(subscribers)
+
+
+hub = MonitorHub()
+
+
+def publish_monitor_update(project_id, events=(), changed=True):
+    """Queue one push to the project's dashboards for after the current
+    transaction commits, so a dashboard never hears about rows it can't read
+    yet. `events` are DeviceEvent.as_sse_dict() payloads."""
+    events = list(events)
+    if not events and not changed:
+        return
+    message = {'events': events, 'changed': changed}
+    transaction.on_commit(lambda: hub.publish(project_id, message))
+
+
+def sse_frame(message):
+    """One server-sent event. The id is the newest DeviceEvent id, so a
+    reconnecting browser's Last-Event-ID matches the status poll's cursor."""
+    lines = []
+    if message['events']:
+        lines.append('id: %d' % message['events'][-1]['id'])
+    lines.append('event: monitor')
+    lines.append('data: ' + json.dumps(message))
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(project_id, heartbeat=HEARTBEAT_SECONDS):
+    """Async iterator of SSE frames for one dashboard. Subscribes on first
+    iteration and unsubscribes when the client goes away (Django cancels the
+    iterator on disconnect)."""
+    loop = asyncio.get_running_loop()
+    wakeup = asyncio.Event()
+    subscription = hub.subscribe(
+        project_id, lambda: loop.call_soon_threadsafe(wakeup.set),
+    )
+    try:
+        yield 'retry: %d\n\n' % RECONNECT_MS
+        while True:
+            try:
+                await asyncio.wait_for(wakeup.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            wakeup.clear()
+            for message in subscription.drain():
+                yield sse_frame(message)
+    finally:
+        hub.unsubscribe(subscription)
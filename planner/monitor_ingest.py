@@ -0,0 +1,532 @@
+# planner/monitor_ingest.py
+#
+# Network Health Monitor — batched ingestion of agent results.
+#
+# The agent pushes one payload per cycle covering every monitored device
+# (ping results) or every switch port (SNMP). Rather than writing a row (and
+# a device save, and maybe an event) per IP or port, each cycle is applied in
+# memory and flushed with bulk writes, so the number of queries per request
+# stays flat whatever the device or port count.
+#
+# Called from the agent API views in views_monitor.py. Each cycle is also
+# published to open dashboards through monitor_hub.py once it commits.
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import DiscoveredDevice, PollResult, DeviceEvent, SwitchPortSnapshot
+from .monitor_hub import publish_monitor_update
+from .monitor_rollup import fold_late_results
+
+
+# N=3 state machine: consecutive failed polls before a device is OFFLINE
+OFFLINE_THRESHOLD = 3
+
+POLL_STATE_FIELDS = ['consecutive_failures', 'last_known_state', 'last_seen']
+
+# Dashboards show last_seen, but a refresh on every poll would make every
+# healthy device a change each cycle. It counts as one (bumps changed_at)
+# only when it moves into a new bucket of this many seconds.
+LAST_SEEN_STEP_SECONDS = 60
+
+
+def last_seen_moved(previous, now):
+    """Whether refreshing last_seen from `previous` to `now` is a change the
+    dashboard should be sent."""
+    if previous is None:
+        return True
+    step = LAST_SEEN_STEP_SECONDS
+    return int(previous.timestamp()) // step != int(now.timestamp()) // step
+
+
+def apply_poll_result(device, is_up, latency, session, now):
+    """Advance one device through the N=3 state machine in memory.
+
+    Mutates `device` and returns an unsaved DeviceEvent for the state change,
+    or None. Never touches the database.
+    """
+    event = None
+    if is_up:
+        if device.last_known_state != 'online':
+            event = DeviceEvent(
+                device=device, session=session,
+                event_type='ONLINE',
+                details={'latency_ms': latency},
+            )
+        device.consecutive_failures = 0
+        device.last_known_state = 'online'
+        device.last_seen = now
+    else:
+        device.consecutive_failures = (device.consecutive_failures or 0) + 1
+        if device.consecutive_failures == OFFLINE_THRESHOLD:
+            device.last_known_state = 'offline'
+            # Only fire OFFLINE alert if device was previously online
+            # Never-seen devices (last_seen=None) stay "unreachable" — no alert
+            if device.last_seen is not None:
+                event = DeviceEvent(
+                    device=device, session=session,
+                    event_type='OFFLINE',
+                    details={'consecutive_failures': device.consecutive_failures},
+                )
+    return event
+
+
+def _grouped_state_updates(touched, start_state, now):
+    """Collapse per-device state changes into a few set-based UPDATEs.
+
+    Devices that answered at least once this cycle get absolute values
+    (failures reset, last_seen=now); the rest only get their failure count
+    bumped with F(), optionally flipping to offline. Groups whose dashboard
+    status changed, or whose last_seen moved to a new bucket
+    (last_seen_moved), also bump changed_at. Either way there are only
+    a handful of distinct groups per cycle, so this is a constant number of
+    `UPDATE ... WHERE id IN (...)` statements — unlike bulk_update, whose
+    CASE WHEN per row gets slow to build beyond a few hundred devices.
+    """
+    groups = defaultdict(list)
+    for device in touched:
+        failures, state, last_seen = start_state[device.pk]
+        if device.last_seen != last_seen:
+            visible = (
+                (device.consecutive_failures, device.last_known_state) != (failures, state)
+                or last_seen_moved(last_seen, now)
+            )
+            key = ('set', device.consecutive_failures, device.last_known_state, visible)
+        else:
+            key = (
+                'inc',
+                device.consecutive_failures - (failures or 0),
+                device.last_known_state if device.last_known_state != state else None,
+                True,
+            )
+        groups[key].append(device.pk)
+
+    for (kind, failures, state, visible), pks in groups.items():
+        if kind == 'set':
+            values = {'consecutive_failures': failures, 'last_known_state': state, 'last_seen': now}
+        else:
+            values = {'consecutive_failures': F('consecutive_failures') + failures}
+            if state is not None:
+                values['last_known_state'] = state
+        if visible:
+            values['changed_at'] = now
+        yield pks, values
+
+
+def ingest_poll_results(project, session, results, devices=None):
+    """Apply one agent poll cycle for `project` and persist it in bulk.
+
+    `results` is the agent payload: [{"ip": ..., "is_alive": bool, "latency_ms": N}].
+    IPs that are not active devices of the project are ignored. If the same IP
+    appears twice, each entry is applied in order, exactly as the per-row loop did.
+
+    Issues one read, one PollResult insert, one DeviceEvent insert and a few
+    grouped device UPDATEs regardless of how many devices report. `devices`
+    is the project's active DiscoveredDevices when the caller already loaded
+    them; the read is skipped.
+    Returns the created events as SSE dicts, in payload order, and publishes
+    them (with a change notice when a visible status moved) to the hub.
+    """
+    if devices is None:
+        devices = DiscoveredDevice.objects.filter(project=project, is_active=True)
+    active_devices = {d.ip_address: d for d in devices}
+    now = timezone.now()
+
+    poll_rows = []
+    events = []
+    start_state = {}
+
+    for r in results:
+        ip = (r.get('ip') or '').strip()
+        device = active_devices.get(ip)
+        if not device:
+            continue
+
+        is_up = r.get('is_alive', False)
+        latency = r.get('latency_ms')
+
+        poll_rows.append(PollResult(
+            device=device, session=session,
+            is_reachable=is_up, latency_ms=latency,
+        ))
+
+        start_state.setdefault(
+            device.pk, tuple(getattr(device, f) for f in POLL_STATE_FIELDS),
+        )
+        event = apply_poll_result(device, is_up, latency, session, now)
+        if event is not None:
+            events.append(event)
+
+    touched = [
+        d for d in active_devices.values()
+        if d.pk in start_state
+        and tuple(getattr(d, f) for f in POLL_STATE_FIELDS) != start_state[d.pk]
+    ]
+
+    changed = False
+    with transaction.atomic():
+        if poll_rows:
+            PollResult.objects.bulk_create(poll_rows)
+        for pks, values in _grouped_state_updates(touched, start_state, now):
+            DiscoveredDevice.objects.filter(pk__in=pks).update(**values)
+            changed = changed or 'changed_at' in values
+        if events:
+            DeviceEvent.objects.bulk_create(events)
+        sse_events = [ev.as_sse_dict() for ev in events]
+        publish_monitor_update(project.pk, sse_events, changed=changed)
+
+    return sse_events
+
+
+def record_poll_history(project, session, results, observed_at):
+    """Store a ping cycle observed at `observed_at` as latency history only.
+
+    For cycles the agent spooled during an uplink outage and replays later:
+    device state, events and change stamps have moved on since, so only the
+    PollResult rows are written, at their original time (never later than
+    now), and folded into the rollups if compaction already passed that time.
+    Returns the number of rows stored.
+    """
+    observed_at = min(observed_at, timezone.now())
+    device_ids = dict(
+        DiscoveredDevice.objects.filter(project=project, is_active=True)
+        .values_list('ip_address', 'pk')
+    )
+    rows = []
+    for r in results:
+        device_id = device_ids.get((r.get('ip') or '').strip())
+        if device_id is None:
+            continue
+        rows.append(PollResult(
+            device_id=device_id, session=session, polled_at=observed_at,
+            is_reachable=bool(r.get('is_alive', False)), latency_ms=r.get('latency_ms'),
+        ))
+
+    with transaction.atomic():
+        PollResult.objects.bulk_create(rows)
+        # Reads the watermark fresh (the session may come from the agent
+        # auth cache) and holds the session row until the rows commit
+        fold_late_results(session, [
+            (row.device_id, row.polled_at, row.is_reachable, row.latency_ms) for row in rows
+        ])
+    return len(rows)
+
+
+def _port_events(device, session, port_index, port_desc, prev_status, oper_status, bw_pct):
+    """Unsaved PORT_UP/PORT_DOWN and bandwidth events for one port reading."""
+    events = []
+    if prev_status and prev_status != oper_status:
+        events.append(DeviceEvent(
+            device=device, session=session,
+            event_type='PORT_UP' if oper_status == 'up' else 'PORT_DOWN',
+            details={'port_index': port_index, 'port_description': port_desc},
+        ))
+    if bw_pct is not None and bw_pct > 90:
+        events.append(DeviceEvent(
+            device=device, session=session,
+            event_type='BW_CRITICAL',
+            details={'port_index': port_index, 'bandwidth_pct': bw_pct},
+        ))
+    elif bw_pct is not None and bw_pct > 70:
+        events.append(DeviceEvent(
+            device=device, session=session,
+            event_type='BW_WARNING',
+            details={'port_index': port_index, 'bandwidth_pct': bw_pct},
+        ))
+    return events
+
+
+def ingest_snmp_results(project, session, results):
+    """Apply one agent SNMP cycle for `project` and persist it in bulk.
+
+    `results` is the agent payload: [{"device_id": N, "error": null|"...",
+    "ports": [{"port_index": N, "oper_status": ..., ...}]}]. Switches that are
+    not active devices of the project, and switches reporting an SNMP error,
+    are skipped. Non-critical port events are suppressed in setup/wrap mode
+    (D-08).
+
+    Issues one read of the switches, one read of their previous snapshots,
+    one snapshot upsert and one DeviceEvent insert regardless of port count.
+    Returns the created events as SSE dicts, in payload order.
+    """
+    device_ids = set()
+    for switch_data in results:
+        try:
+            device_ids.add(int(switch_data.get('device_id')))
+        except (TypeError, ValueError):
+            continue
+    switches = {
+        d.pk: d
+        for d in DiscoveredDevice.objects.filter(pk__in=device_ids, project=project, is_active=True)
+    } if device_ids else {}
+    current = {
+        (snap.device_id, snap.port_index): snap
+        for snap in SwitchPortSnapshot.objects.filter(session=session, device__in=list(switches))
+    }
+    suppress_non_critical = session.show_mode in ('setup', 'wrap')
+    now = timezone.now()
+
+    upserts = {}
+    events = []
+    for switch_data in results:
+        try:
+            device = switches.get(int(switch_data.get('device_id')))
+        except (TypeError, ValueError):
+            device = None
+        if not device or switch_data.get('error'):
+            # Unknown switch, or SNMP unreachable — skip port snapshots
+            continue
+
+        for port_data in switch_data.get('ports', []):
+            port_idx = port_data.get('port_index')
+            if port_idx is None:
+                continue
+
+            port_desc = port_data.get('port_description', '')
+            oper_status = port_data.get('oper_status', 'unknown')
+            bw_pct = port_data.get('bandwidth_pct')
+            snap = SwitchPortSnapshot(
+                device=device, session=session, port_index=port_idx,
+                port_description=port_desc,
+                oper_status=oper_status,
+                speed_mbps=port_data.get('speed_mbps'),
+                bandwidth_pct=bw_pct,
+                error_count=port_data.get('error_count', 0),
+                changed_at=now,
+            )
+            prev = current.get((device.pk, port_idx))
+            if prev is not None and all(
+                getattr(prev, f) == getattr(snap, f) for f in SwitchPortSnapshot.DISPLAY_FIELDS
+            ):
+                snap.changed_at = prev.changed_at
+            # A port listed twice is applied in order; the last reading wins
+            current[(device.pk, port_idx)] = upserts[(device.pk, port_idx)] = snap
+
+            if not suppress_non_critical:
+                events.extend(_port_events(
+                    device, session, port_idx, port_desc,
+                    prev.oper_status if prev else None, oper_status, bw_pct,
+                ))
+
+    with transaction.atomic():
+        if upserts:
+            SwitchPortSnapshot.objects.bulk_create(
+                list(upserts.values()),
+                update_conflicts=True,
+                unique_fields=['device', 'session', 'port_index'],
+                update_fields=[*SwitchPortSnapshot.DISPLAY_FIELDS, 'polled_at', 'changed_at'],
+            )
+        if events:
+            DeviceEvent.objects.bulk_create(events)
+        sse_events = [ev.as_sse_dict() for ev in events]
+        changed = any(snap.changed_at == now for snap in upserts.values())
+        publish_monitor_update(project.pk, sse_events, changed=changed)
+
+    return sse_events
+
+
+DANTE_CLOCK_ROLES = ('master', 'locked', 'unlocked', 'unknown')
+
+
+
+def _apply_values(device, values):
+    """Set `values` on `device`; returns {field: value} for what changed."""
+    changed = {}
+    for field, value in values.items():
+        if getattr(device, field) != value:
+            setattr(device, field, value)
+            changed[field] = value
+    return changed
+
+
+def _update_grouped(changes, now):
+    """Write per-device field changes ({pk: {field: value}}) as one UPDATE per
+    distinct change, so a clock change across the whole network is a single
+    statement. Bumps changed_at when a status field moves."""
+    groups = defaultdict(list)
+    for pk, fields in changes.items():
+        groups[tuple(sorted(fields.items()))].append(pk)
+    for key, pks in groups.items():
+        values = dict(key)
+        if DiscoveredDevice.STATUS_FIELDS.intersection(values):
+            values['changed_at'] = now
+        DiscoveredDevice.objects.filter(pk__in=pks).update(**values)
+
+
+def ingest_dante_results(project, session, results):
+    """Reconcile the project's Dante devices with one agent mDNS cycle.
+
+    `results` is the agent payload: [{"name", "ip", "clock_role", "tx_count",
+    "rx_count", "model_id", "mac_address"}]. Reported devices are created or
+    updated as Dante devices (online, last_seen=now); an older record of the
+    same device name at another IP is deleted; Dante devices missing from
+    the cycle are deactivated.
+
+    One read of the project's devices, then the diff is written in bulk: an
+    insert, one UPDATE per distinct field change, two last_seen refreshes
+    (with and without a changed_at bump, see last_seen_moved), one delete
+    and one deactivation, however many devices report.
+    Returns the DANTE_DISCOVERED events as SSE dicts, in payload order.
+    """
+    now = timezone.now()
+    devices = {d.ip_address: d for d in DiscoveredDevice.objects.filter(project=project)}
+    existing_pks = {d.pk for d in devices.values()}
+
+    created = {}      # ip -> unsaved device
+    changes = {}      # pk -> {field: new value}
+    seen_ips = set()
+    current_ip_by_name = {}
+
+    for entry in results:
+        ip = entry.get('ip')
+        name = entry.get('name', '')
+        if not ip:
+            continue
+        seen_ips.add(ip)
+        if name:
+            current_ip_by_name[name] = ip
+
+        # Validate clock_role value
+        clock_role = entry.get('clock_role', 'unknown')
+        if clock_role not in DANTE_CLOCK_ROLES:
+            clock_role = 'unknown'
+
+        values = {
+            'domain': 'dante',
+            'label': name,
+            'dante_device_name': name,
+            'clock_role': clock_role,
+            'tx_channel_count': entry.get('tx_count'),
+            'rx_channel_count': entry.get('rx_count'),
+            'dante_model_id': entry.get('model_id', ''),
+            'dante_mac_address': entry.get('mac_address', ''),
+            'is_active': True,
+            'last_known_state': 'online',
+            'consecutive_failures': 0,
+        }
+        device = devices.get(ip)
+        if device is None:
+            device = devices[ip] = created[ip] = DiscoveredDevice(
+                project=project, ip_address=ip, last_seen=now, changed_at=now, **values)
+        else:
+            fields = _apply_values(device, values)
+            if device.pk is not None and fields:
+                changes.setdefault(device.pk, {}).update(fields)
+
+    # Same device name at a different IP: keep the record at the current
+    # discovery IP, drop stale duplicates
+    doomed = {
+        ip for ip, device in devices.items()
+        if device.domain == 'dante'
+        and device.dante_device_name in current_ip_by_name
+        and current_ip_by_name[device.dante_device_name] != ip
+    }
+    delete_pks = {devices[ip].pk for ip in doomed if devices[ip].pk is not None}
+
+    # Deactivate Dante devices NOT in this discovery cycle
+    deactivate_pks = [
+        d.pk for ip, d in devices.items()
+        if d.pk is not None and ip not in doomed and ip not in seen_ips
+        and d.domain == 'dante' and d.is_active
+    ]
+
+    new_devices = [d for ip, d in created.items() if ip not in doomed]
+    refreshed = defaultdict(list)
+    for ip in seen_ips:
+        device = devices[ip]
+        if ip not in doomed and device.pk in existing_pks:
+            refreshed[last_seen_moved(device.last_seen, now)].append(device.pk)
+    changes = {pk: fields for pk, fields in changes.items() if pk not in delete_pks}
+
+    with transaction.atomic():
+        if new_devices:
+            DiscoveredDevice.objects.bulk_create(new_devices)
+        _update_grouped(changes, now)
+        if refreshed[True]:
+            DiscoveredDevice.objects.filter(pk__in=refreshed[True]).update(last_seen=now, changed_at=now)
+        if refreshed[False]:
+            DiscoveredDevice.objects.filter(pk__in=refreshed[False]).update(last_seen=now)
+        if delete_pks:
+            DiscoveredDevice.objects.filter(pk__in=delete_pks).delete()
+        if deactivate_pks:
+            DiscoveredDevice.objects.filter(pk__in=deactivate_pks).update(is_active=False, changed_at=now)
+
+        events = [
+            DeviceEvent(
+                device=device, session=session,
+                event_type='DANTE_DISCOVERED',
+                details={'name': device.dante_device_name, 'ip': device.ip_address,
+                         'clock_role': device.clock_role},
+            )
+            for device in new_devices
+        ]
+        if events:
+            DeviceEvent.objects.bulk_create(events)
+        sse_events = [ev.as_sse_dict() for ev in events]
+        publish_monitor_update(
+            project.pk, sse_events,
+            changed=bool(new_devices or changes or refreshed[True] or delete_pks or deactivate_pks),
+        )
+
+    return sse_events
+
+
+def ingest_scan_results(project, session, devices_data):
+    """Merge one agent network scan into the project's devices.
+
+    `devices_data` is the agent payload: [{"ip", "label", "domain", "latency_ms"}].
+    New IPs are added as active devices; known ones take a new label or
+    domain if the scan provides one, and inactive ones are reactivated with
+    a clean slate. Logs a SCAN_STARTED event when a session is running.
+
+    One read, then one insert and one UPDATE per distinct change.
+    Returns (added, updated).
+    """
+    now = timezone.now()
+    devices = {d.ip_address: d for d in DiscoveredDevice.objects.filter(project=project)}
+    created = []
+    changes = {}  # pk -> {field: new value}
+
+    for dev in devices_data:
+        ip = dev.get('ip', '').strip()
+        if not ip:
+            continue
+        device = devices.get(ip)
+        if device is None:
+            device = devices[ip] = DiscoveredDevice(
+                project=project, ip_address=ip,
+                label=dev.get('label', ''),
+                domain=dev.get('domain', 'unknown'),
+                is_active=True,
+            )
+            created.append(device)
+            continue
+
+        # Update label/domain if provided and device exists
+        values = {}
+        if dev.get('label'):
+            values['label'] = dev['label']
+        if dev.get('domain'):
+            values['domain'] = dev['domain']
+        if not device.is_active:
+            values.update(is_active=True, consecutive_failures=0, last_known_state='unknown')
+        fields = _apply_values(device, values)
+        if fields and device.pk is not None:
+            changes.setdefault(device.pk, {}).update(fields)
+
+    with transaction.atomic():
+        if created:
+            DiscoveredDevice.objects.bulk_create(created)
+        _update_grouped(changes, now)
+        # Log scan event
+        if session:
+            DeviceEvent.objects.create(
+                session=session, event_type='SCAN_STARTED',
+                details={'device_count': len(devices_data), 'added': len(created)},
+            )
+        publish_monitor_update(project.pk, changed=bool(created or changes))
+
+    return len(created), len(changes)
@@ -0,0 +1,279 @@
+# planner/monitor_retention.py
+#
+# Network Health Monitor — archiving and pruning of old shows.
+#
+# Every show leaves PollResult, DeviceEvent and SwitchPortSnapshot rows
+# behind, and nothing used to delete them. Housekeeping runs in this order:
+#
+#   1. compact_all()               — fold raw polls into the rollup tiers
+#   2. archive_closed_sessions()   — export each closed, fully compacted
+#                                    session to a gzip JSON Lines file
+#                                    (MonitorSession.archive_file)
+#   3. apply_retention()           — expire rollup segments and compacted
+#                                    raw polls (monitor_rollup.py)
+#   4. prune_archived_sessions()   — drop events older than the 'events'
+#                                    window, then whole sessions older than
+#                                    the 'sessions' window
+#
+# Only archived sessions lose events or rows, so an incident review can
+# always fall back to the archive (iter_archive()). Deletes go in
+# DELETE_BATCH_SIZE batches, each its own short statement, so no pass holds
+# a long lock on the history tables.
+#
+# Windows come from monitor_rollup.retention_policy(). run_housekeeping() is
+# run by `manage.py prune_monitor_history` or by RetentionScheduler. That
+# scheduler is an in-process thread, enabled by
+# settings.MONITOR_RETENTION_INTERVAL and started by agent_heartbeat.
+#
+# Passes may overlap — one scheduler per web worker, the cron commands, the
+# agent's rollups — and each step claims its work in the database first:
+# compaction claims each slice by moving the session's watermark
+# (monitor_rollup.compact_session), archiving claims the session by setting
+# archived_at (archive_session), and the deletes only remove rows that are
+# already past their window. A pass that loses a claim skips that work.
+# A session only counts as archived once archive_file is saved too: a claim
+# whose process died before writing the file is taken over after
+# ARCHIVE_CLAIM_TIMEOUT, and pruning never touches such a session.
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import DeviceEvent, DiscoveredDevice, MonitorSession, PollResult, SwitchPortSnapshot
+from .monitor_rollup import (
+    COMPACTION_LAG, apply_retention, compact_all, delete_in_batches, latency_series, retention_policy,
+)
+
+logger = logging.getLogger(__name__)
+
+
+ARCHIVE_FORMAT = 'showstack-monitor-archive'
+ARCHIVE_VERSION = 1
+
+# Latency in the archive comes from this rollup tier
+ARCHIVE_RESOLUTION = 60
+
+# Events streamed from the database per round-trip while archiving
+ARCHIVE_CHUNK_SIZE = 2000
+
+# An archive claim with no archive_file after this long is taken to be lost
+ARCHIVE_CLAIM_TIMEOUT = timedelta(hours=1)
+
+# Seconds after the first heartbeat before the scheduler's first pass
+SCHEDULER_FIRST_DELAY = 60
+
+
+# ──────────────────────────────────────────────
+# Archive
+# ──────────────────────────────────────────────
+
+def _unclaimed(now):
+    """Sessions no live archive claim holds: never claimed, or claimed by a
+    pass that died before saving the file."""
+    return Q(archived_at__isnull=True) | Q(archive_file='', archived_at__lt=now - ARCHIVE_CLAIM_TIMEOUT)
+
+
+def sessions_pending_archive(now=None):
+    """Closed sessions not yet archived whose raw polls are all compacted."""
+    return MonitorSession.objects.filter(
+        _unclaimed(now or timezone.now()),
+        ended_at__isnull=False,
+        rollup_watermark__gte=F('ended_at'),
+    ).select_related('project')
+
+
+def _archive_records(session):
+    """Yield the archive of one session as JSON-ready dicts."""
+    yield {
+        'kind': 'session',
+        'format': ARCHIVE_FORMAT,
+        'version': ARCHIVE_VERSION,
+        'session': {
+            'id': session.pk,
+            'started_at': session.started_at.isoformat(),
+            'ended_at': session.ended_at.isoformat(),
+            'show_mode': session.show_mode,
+        },
+        'project': {'id': session.project_id, 'name': session.project.name},
+    }
+
+    device_ids = []
+    for device in DiscoveredDevice.objects.filter(project=session.project_id).order_by('pk'):
+        device_ids.append(device.pk)
+        yield {
+            'kind': 'device',
+            'id': device.pk,
+            'label': device.label,
+            'ip': device.ip_address,
+            'domain': device.domain,
+            'dante_device_name': device.dante_device_name,
+        }
+
+    events = DeviceEvent.objects.filter(session=session).order_by('occurred_at', 'pk')
+    for ev in events.iterator(chunk_size=ARCHIVE_CHUNK_SIZE):
+        yield {
+            'kind': 'event',
+            'id': ev.pk,
+            't': ev.occurred_at.isoformat(),
+            'type': ev.event_type,
+            'device_id': ev.device_id,
+            'details': ev.details,
+        }
+
+    if device_ids:
+        latency = latency_series(
+            device_ids, session.started_at, session.ended_at, resolution=ARCHIVE_RESOLUTION,
+        )
+        for device_id, columns in latency['series'].items():
+            if columns['t']:
+                yield {'kind': 'latency', 'device_id': device_id,
+                       'resolution': ARCHIVE_RESOLUTION, **columns}
+
+
+def archive_session(session, now=None):
+    """Export one closed session to its archive file. Returns False if another
+    process claimed it first."""
+    now = now or timezone.now()
+    # Claim the session so concurrent housekeeping passes never export it twice
+    if not MonitorSession.objects.filter(_unclaimed(now), pk=session.pk).update(archived_at=now):
+        return False
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            with gzip.GzipFile(fileobj=tmp, mode='wb') as gz:
+                for record in _archive_records(session):
+                    gz.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+            tmp.seek(0)
+            name = f'project-{session.project_id}/session-{session.pk}-{session.ended_at:%Y%m%d}.jsonl.gz'
+            session.archive_file.save(name, File(tmp), save=False)
+    except Exception:
+        MonitorSession.objects.filter(pk=session.pk).update(archived_at=None)
+        raise
+    session.archived_at = now
+    MonitorSession.objects.filter(pk=session.pk).update(
+        archived_at=now, archive_file=session.archive_file.name,
+    )
+    return True
+
+
+def archive_closed_sessions(now=None):
+    """Archive every session pending archive. Returns the number archived."""
+    archived = 0
+    for session in sessions_pending_archive(now):
+        try:
+            archived += archive_session(session, now)
+        except Exception:
+            # Left unarchived (and so unpruned); retried on the next pass
+            logger.exception('Archiving monitor session %s failed', session.pk)
+    return archived
+
+
+def iter_archive(session):
+    """Read back a session's archive, one record dict at a time."""
+    with session.archive_file.open('rb') as f, gzip.GzipFile(fileobj=f) as gz:
+        for line in gz:
+            yield json.loads(line)
+
+
+# ──────────────────────────────────────────────
+# Pruning
+# ──────────────────────────────────────────────
+
+def prune_archived_sessions(now=None):
+    """Delete events past the 'events' window and sessions past the
+    'sessions' window, archived sessions only. Returns
+    {'events': rows, 'sessions': sessions, 'session_rows': rows} deleted."""
+    now = now or timezone.now()
+    policy = retention_policy()
+
+    # archived_at alone is only a claim; the saved archive_file is the archive
+    events = delete_in_batches(DeviceEvent.objects.filter(
+        session__archived_at__isnull=False,
+        occurred_at__lt=now - policy['events'],
+    ).exclude(session__archive_file=''))
+
+    expired = list(MonitorSession.objects.filter(
+        archived_at__isnull=False, ended_at__lt=now - policy['sessions'],
+    ).exclude(archive_file='').values_list('pk', flat=True))
+    session_rows = 0
+    for session_id in expired:
+        # Children first, in batches, so the final cascade has nothing left to do
+        for model in (PollResult, DeviceEvent, SwitchPortSnapshot):
+            session_rows += delete_in_batches(model.objects.filter(session_id=session_id))
+        MonitorSession.objects.filter(pk=session_id).delete()
+    return {'events': events, 'sessions': len(expired), 'session_rows': session_rows}
+
+
+def run_housekeeping(now=None):
+    """One full pass: compact, archive, expire rollups and raw polls, prune.
+    Returns a summary dict."""
+    now = now or timezone.now()
+    summary = {'compacted': compact_all(until=now - COMPACTION_LAG)}
+    summary['archived'] = archive_closed_sessions(now)
+    summary['retention'] = apply_retention(now)
+    summary.update(prune_archived_sessions(now))
+    return summary
+
+
+# ──────────────────────────────────────────────
+# In-process scheduler
+# ──────────────────────────────────────────────
+
+class RetentionScheduler:
+    """Daemon thread running run_housekeeping() every `interval` seconds.
+    Several workers may each run one, next to the cron commands: every step
+    claims its work first (see the module comment), so overlapping passes
+    never compact or archive the same data twice."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def ensure_started(self):
+        """Start the thread once per process, if MONITOR_RETENTION_INTERVAL is set."""
+        interval = getattr(settings, 'MONITOR_RETENTION_INTERVAL', None)
+        if not interval or self.running:
+            return False
+        with self._lock:
+            if self.running:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=(interval,), name='monitor-retention', daemon=True,
+            )
+            self._thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self, interval):
+        delay = min(SCHEDULER_FIRST_DELAY, interval)
+        while not self._stop.wait(delay):
+            delay = interval
+            try:
+                summary = run_housekeeping()
+                logger.info('Monitor housekeeping (pid %s): %s', os.getpid(), summary)
+            except Exception:
+                logger.exception('Monitor housekeeping failed')
+            finally:
+                connections.close_all()
+
+
+retention_scheduler = RetentionScheduler()
@@ -0,0 +1,409 @@
+# planner/monitor_rollup.py
+#
+# Network Health Monitor — downsampled latency history.
+#
+# Every ICMP poll lands in PollResult as one row. That is the right shape for
+# ingesting a cycle, but a three-day festival leaves tens of millions of rows
+# that the dashboard would have to scan to draw a sparkline. This module
+# compacts raw results into per-device 1s / 1min / 1h buckets (samples, loss,
+# min/max/sum latency and how many replies carried one) stored as packed
+# arrays in PollRollup, applies a retention policy to each tier, and serves
+# sparkline series from the tiers.
+#
+# Compaction is incremental: MonitorSession.rollup_watermark records how far
+# each session's raw rows have been folded in, so a row is counted exactly once.
+# Each slice is claimed by moving the watermark with a conditional UPDATE in
+# the slice's transaction; a second compactor (the cron command, the agent's
+# retention pass) blocks on the session row and then finds the watermark gone
+# and stops, so no slice is folded twice. Late rows folded at ingest take the
+# same row lock (fold_late_results).
+#
+# Entry points:
+#   compact_all()            — fold new raw rows of every session into rollups
+#   apply_retention()        — drop expired rollup segments and compacted raw rows
+#   latency_series(...)      — columnar sparkline data for the dashboard
+
+import math
+import sys
+from array import array
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from .models import MonitorSession, PollResult, PollRollup
+
+
+RESOLUTIONS = (1, 60, 3600)
+
+# Seconds of history covered by one PollRollup row, per resolution
+SEGMENT_SECONDS = {
+    1: 3600,            # 3,600 x 1s buckets
+    60: 86400,          # 1,440 x 1min buckets
+    3600: 30 * 86400,   # 720 x 1h buckets
+}
+
+# How long each tier is kept. Override any key with settings.MONITOR_HISTORY_RETENTION.
+# 'raw' applies to PollResult rows, and only once they have been compacted.
+# 'events' and 'sessions' apply to archived sessions (see monitor_retention.py).
+DEFAULT_RETENTION = {
+    'raw': timedelta(hours=24),
+    1: timedelta(hours=6),
+    60: timedelta(days=14),
+    3600: timedelta(days=400),
+    'events': timedelta(days=30),
+    'sessions': timedelta(days=90),
+}
+
+# Raw rows younger than this are left for the next pass — a poll cycle may
+# still be committing rows stamped a moment ago.
+COMPACTION_LAG = timedelta(seconds=5)
+
+# Raw rows are folded in per slice of this length, one transaction each,
+# so a long backlog never holds a big transaction or a big dict in memory.
+COMPACTION_SLICE = timedelta(hours=1)
+
+DELETE_BATCH_SIZE = 5000
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Bucket stats, in this order: samples, lost, min, max, sum, timed (replies
+# with a latency, the divisor of the average)
+_SAMPLES, _LOST, _MIN, _MAX, _SUM, _TIMED = range(6)
+
+
+def retention_policy():
+    """DEFAULT_RETENTION with any settings.MONITOR_HISTORY_RETENTION overrides."""
+    policy = dict(DEFAULT_RETENTION)
+    policy.update(getattr(settings, 'MONITOR_HISTORY_RETENTION', {}))
+    return policy
+
+
+# ──────────────────────────────────────────────
+# Packed column encoding
+# ──────────────────────────────────────────────
+
+def _pack(typecode, values):
+    arr = array(typecode, values)
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpack(typecode, blob):
+    arr = array(typecode)
+    arr.frombytes(bytes(blob or b''))
+    if sys.byteorder == 'big':
+        arr.byteswap()
+    return arr
+
+
+def decode_buckets(rollup):
+    """{offset: [samples, lost, min, max, sum, timed]} for one PollRollup row.
+    Rows written before `timed` existed count every reply as timed."""
+    offsets = _unpack('I', rollup.offsets)
+    samples = _unpack('I', rollup.samples)
+    lost = _unpack('I', rollup.lost)
+    timed = _unpack('I', rollup.timed)
+    if len(timed) != len(offsets):
+        timed = [n - k for n, k in zip(samples, lost)]
+    columns = zip(
+        offsets, samples, lost,
+        _unpack('f', rollup.min_latency),
+        _unpack('f', rollup.max_latency),
+        _unpack('d', rollup.sum_latency),
+        timed,
+    )
+    return {offset: list(stats) for offset, *stats in columns}
+
+
+def encode_buckets(rollup, buckets):
+    """Write {offset: stats} into the packed columns of `rollup` (unsaved)."""
+    offsets = sorted(buckets)
+    rollup.bucket_count = len(offsets)
+    rollup.offsets = _pack('I', offsets)
+    rollup.samples = _pack('I', (buckets[o][_SAMPLES] for o in offsets))
+    rollup.lost = _pack('I', (buckets[o][_LOST] for o in offsets))
+    rollup.min_latency = _pack('f', (buckets[o][_MIN] for o in offsets))
+    rollup.max_latency = _pack('f', (buckets[o][_MAX] for o in offsets))
+    rollup.sum_latency = _pack('d', (buckets[o][_SUM] for o in offsets))
+    rollup.timed = _pack('I', (buckets[o][_TIMED] for o in offsets))
+    return rollup
+
+
+def _merge_bucket(into, stats):
+    into[_SAMPLES] += stats[_SAMPLES]
+    into[_LOST] += stats[_LOST]
+    into[_SUM] += stats[_SUM]
+    into[_TIMED] += stats[_TIMED]
+    for idx, pick in ((_MIN, min), (_MAX, max)):
+        if math.isnan(into[idx]):
+            into[idx] = stats[idx]
+        elif not math.isnan(stats[idx]):
+            into[idx] = pick(into[idx], stats[idx])
+
+
+def _epoch_seconds(dt):
+    return int((dt - _EPOCH).total_seconds())
+
+
+def _segment_key(epoch, resolution):
+    """(segment_start epoch, bucket offset) for a poll at `epoch` seconds."""
+    span = SEGMENT_SECONDS[resolution]
+    segment = epoch - epoch % span
+    return segment, (epoch - segment) // resolution
+
+
+# ──────────────────────────────────────────────
+# Compaction
+# ──────────────────────────────────────────────
+
+def _accumulate(rows):
+    """Fold raw (device_id, polled_at, is_reachable, latency_ms) rows into
+    {(device_id, resolution, segment_epoch): {offset: stats}} for every tier."""
+    acc = defaultdict(dict)
+    for device_id, polled_at, is_reachable, latency in rows:
+        epoch = _epoch_seconds(polled_at)
+        has_latency = is_reachable and latency is not None
+        stats = [
+            1,
+            0 if is_reachable else 1,
+            latency if has_latency else math.nan,
+            latency if has_latency else math.nan,
+            latency if has_latency else 0.0,
+            1 if has_latency else 0,
+        ]
+        for resolution in RESOLUTIONS:
+            segment, offset = _segment_key(epoch, resolution)
+            buckets = acc[(device_id, resolution, segment)]
+            if offset in buckets:
+                _merge_bucket(buckets[offset], stats)
+            else:
+                buckets[offset] = list(stats)
+    return acc
+
+
+def _write_segments(acc):
+    """Merge accumulated buckets into PollRollup: one read, one delete of the
+    segments being replaced, one bulk insert."""
+    if not acc:
+        return
+    segment_starts = {
+        segment: datetime.fromtimestamp(segment, tz=dt_timezone.utc)
+        for (_, _, segment) in acc
+    }
+    existing = PollRollup.objects.filter(
+        device_id__in={device_id for (device_id, _, _) in acc},
+        segment_start__in=set(segment_starts.values()),
+    )
+    replaced = []
+    for rollup in existing:
+        key = (rollup.device_id, rollup.resolution, _epoch_seconds(rollup.segment_start))
+        if key not in acc:
+            continue
+        merged = decode_buckets(rollup)
+        for offset, stats in acc[key].items():
+            if offset in merged:
+                _merge_bucket(merged[offset], stats)
+            else:
+                merged[offset] = stats
+        acc[key] = merged
+        replaced.append(rollup.pk)
+
+    if replaced:
+        PollRollup.objects.filter(pk__in=replaced).delete()
+    PollRollup.objects.bulk_create([
+        encode_buckets(
+            PollRollup(device_id=device_id, resolution=resolution,
+                       segment_start=segment_starts[segment]),
+            buckets,
+        )
+        for (device_id, resolution, segment), buckets in acc.items()
+    ])
+
+
+def _claim(session, watermark, new_watermark):
+    """Move the session's watermark from `watermark` to `new_watermark`.
+    False when another compactor moved it first. The session row stays
+    locked until the caller's transaction commits."""
+    claimed = MonitorSession.objects.filter(
+        pk=session.pk, rollup_watermark=watermark,
+    ).update(rollup_watermark=new_watermark)
+    if claimed:
+        session.rollup_watermark = new_watermark
+    return bool(claimed)
+
+
+def compact_session(session, until=None):
+    """Fold raw PollResults of `session` between its watermark and `until`
+    into the rollup tiers, one COMPACTION_SLICE per transaction.
+    Returns the number of raw rows compacted.
+
+    Safe to run from several processes at once: a slice whose watermark
+    another compactor already moved is left to it, and this call stops.
+    """
+    until = until or timezone.now() - COMPACTION_LAG
+    watermark = session.rollup_watermark
+    cursor = watermark
+    if cursor is None:
+        cursor = PollResult.objects.filter(session=session).aggregate(
+            first=Min('polled_at'))['first']
+        if cursor is None:
+            # Nothing polled yet: anything later lands after the watermark
+            _claim(session, None, until)
+            return 0
+
+    compacted = 0
+    while cursor < until:
+        slice_end = min(cursor + COMPACTION_SLICE, until)
+        with transaction.atomic():
+            if not _claim(session, watermark, slice_end):
+                break
+            # Read under the claim: rows committed before it are all seen
+            rows = list(
+                PollResult.objects.filter(
+                    session=session, polled_at__gte=cursor, polled_at__lt=slice_end,
+                ).values_list('device_id', 'polled_at', 'is_reachable', 'latency_ms')
+            )
+            _write_segments(_accumulate(rows))
+        compacted += len(rows)
+        watermark = cursor = slice_end
+    return compacted
+
+
+def fold_late_results(session, rows):
+    """Fold raw (device_id, polled_at, is_reachable, latency_ms) rows that
+    landed behind the session's watermark straight into the rollup tiers.
+
+    Compaction never revisits slices behind the watermark, so rows stamped
+    in the past (ping cycles the agent replays after an uplink outage) would
+    otherwise never be rolled up. Buckets merge additively, so this is safe
+    on top of what compaction already wrote. The watermark is read fresh
+    with the session row locked, so a compaction pass can't move it (or
+    rewrite the same segments) until this commits. Returns the rows folded.
+    """
+    with transaction.atomic():
+        # NO KEY: the caller's PollResult inserts already hold a key-share
+        # lock on the row, which a plain FOR UPDATE would wait on
+        watermark = MonitorSession.objects.select_for_update(no_key=True).filter(
+            pk=session.pk,
+        ).values_list('rollup_watermark', flat=True).first()
+        session.rollup_watermark = watermark
+        if watermark is None:
+            return 0
+        late = [row for row in rows if row[1] < watermark]
+        if late:
+            _write_segments(_accumulate(late))
+    return len(late)
+
+
+def sessions_pending_compaction():
+    """Sessions that may have raw rows beyond their watermark."""
+    return MonitorSession.objects.filter(
+        Q(rollup_watermark__isnull=True)
+        | Q(ended_at__isnull=True)
+        | Q(ended_at__gt=F('rollup_watermark'))
+    )
+
+
+def compact_all(until=None):
+    """Compact every session with pending raw rows. Returns rows compacted."""
+    return sum(compact_session(s, until) for s in sessions_pending_compaction())
+
+
+# ──────────────────────────────────────────────
+# Retention
+# ──────────────────────────────────────────────
+
+def delete_in_batches(queryset):
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:DELETE_BATCH_SIZE])
+        if not pks:
+            return deleted
+        deleted += queryset.model.objects.filter(pk__in=pks).delete()[0]
+
+
+def apply_retention(now=None):
+    """Drop rollup segments that fell wholly out of their tier's window, and
+    raw PollResults older than the raw window that are already compacted.
+    Deletes in bounded batches. Returns {tier: rows deleted}."""
+    now = now or timezone.now()
+    policy = retention_policy()
+    deleted = {}
+
+    for resolution in RESOLUTIONS:
+        # A segment is expired once its *end* is older than the window
+        cutoff = now - policy[resolution] - timedelta(seconds=SEGMENT_SECONDS[resolution])
+        deleted[resolution] = delete_in_batches(
+            PollRollup.objects.filter(resolution=resolution, segment_start__lt=cutoff)
+        )
+
+    raw_cutoff = now - policy['raw']
+    deleted['raw'] = delete_in_batches(
+        PollResult.objects.filter(
+            polled_at__lt=raw_cutoff,
+            session__rollup_watermark__isnull=False,
+        ).filter(polled_at__lt=F('session__rollup_watermark'))
+    )
+    return deleted
+
+
+# ──────────────────────────────────────────────
+# Query API
+# ──────────────────────────────────────────────
+
+def pick_resolution(start, end, max_points, now=None):
+    """Finest tier that still covers `start` and fits the range in max_points."""
+    now = now or timezone.now()
+    policy = retention_policy()
+    span = (end - start).total_seconds()
+    for resolution in RESOLUTIONS:
+        if start < now - policy[resolution]:
+            continue
+        if span / resolution <= max_points:
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+def latency_series(device_ids, start, end=None, max_points=120, resolution=None):
+    """Latency sparkline data for `device_ids` over [start, end), read from the
+    rollup tiers only — raw rows are never scanned.
+
+    Returns {'resolution': seconds, 'series': {device_id: columns}} where columns
+    is {'t': [epoch s], 'avg': [...], 'min': [...], 'max': [...], 'loss_pct': [...]},
+    one entry per bucket that saw polls. Latency is None for all-lost buckets.
+    """
+    end = end or timezone.now()
+    resolution = resolution or pick_resolution(start, end, max_points)
+    start_epoch, end_epoch = _epoch_seconds(start), _epoch_seconds(end)
+    first_segment, _ = _segment_key(start_epoch, resolution)
+
+    rollups = PollRollup.objects.filter(
+        device_id__in=device_ids,
+        resolution=resolution,
+        segment_start__gte=datetime.fromtimestamp(first_segment, tz=dt_timezone.utc),
+        segment_start__lt=end,
+    ).order_by('device_id', 'segment_start')
+
+    series = {
+        device_id: {'t': [], 'avg': [], 'min': [], 'max': [], 'loss_pct': []}
+        for device_id in device_ids
+    }
+    for rollup in rollups:
+        columns = series[rollup.device_id]
+        base = _epoch_seconds(rollup.segment_start)
+        for offset, (samples, lost, lo, hi, total, timed) in sorted(decode_buckets(rollup).items()):
+            t = base + offset * resolution
+            if not start_epoch - resolution < t < end_epoch:
+                continue
+            columns['t'].append(t)
+            columns['avg'].append(round(total / timed, 3) if timed else None)
+            columns['min'].append(None if math.isnan(lo) else round(lo, 3))
+            columns['max'].append(None if math.isnan(hi) else round(hi, 3))
+            columns['loss_pct'].append(round(lost * 100.0 / samples, 1) if samples else None)
+
+    return {'resolution': resolution, 'series': series}
@@ -0,0 +1,158 @@
+# planner/monitor_status.py
+#
+# Network Health Monitor — versioned status snapshots for the dashboard.
+#
+# Every open dashboard tab asks for status every 2 seconds. Re-serialising
+# every device and switch port each time is wasteful when almost nothing
+# changes between polls, so the status endpoint speaks a small delta protocol:
+#
+#   - DiscoveredDevice.changed_at / SwitchPortSnapshot.changed_at move only
+#     when something the dashboard shows changes.
+#   - The client keeps an opaque cursor (the newest changed_at it has seen)
+#     and gets back only rows changed since then. Rows changed in the last few
+#     seconds are always re-sent, so a write that commits late is never skipped.
+#   - status_signature() folds everything the response depends on into one
+#     ETag; an unchanged signature means the client can be told 304.
+#   - Hard deletes can't be seen as "changed rows", so the signature carries
+#     the active device count and id sum. A client whose merged state
+#     disagrees with them drops its cursor and asks for a full snapshot.
+
+import hashlib
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Max, Q, Sum
+
+from .models import DeviceEvent, DiscoveredDevice, SwitchPortSnapshot
+
+
+# Rows changed this recently are re-sent on every delta (commit-order slack)
+CHANGE_OVERLAP = timedelta(seconds=10)
+
+MAX_EVENTS = 50
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _micros(dt):
+    return (dt - _EPOCH) // timedelta(microseconds=1) if dt else 0
+
+
+def parse_cursor(cursor):
+    """Cursor string -> aware datetime, or None for 'send everything'."""
+    try:
+        micros = int(cursor)
+    except (TypeError, ValueError):
+        return None
+    if micros <= 0:
+        return None
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def status_signature(project, session, now):
+    """Aggregate the change stamps of everything the dashboard shows.
+    Two queries, independent of device and port counts."""
+    recent = Q(changed_at__gt=now - CHANGE_OVERLAP)
+    devices = DiscoveredDevice.objects.filter(project=project).aggregate(
+        stamp=Max('changed_at'),
+        recent=Count('pk', filter=recent),
+        active=Count('pk', filter=Q(is_active=True)),
+        id_sum=Sum('pk', filter=Q(is_active=True)),
+    )
+    ports = {'stamp': None, 'recent': 0}
+    if session:
+        ports = SwitchPortSnapshot.objects.filter(session=session).aggregate(
+            stamp=Max('changed_at'),
+            recent=Count('pk', filter=recent),
+        )
+    return {
+        'now': now,
+        'device_stamp': devices['stamp'],
+        'device_recent': devices['recent'],
+        'port_stamp': ports['stamp'],
+        'port_recent': ports['recent'],
+        'members': {'count': devices['active'], 'sum': devices['id_sum'] or 0},
+    }
+
+
+def status_etag(signature, session, snmp_configured, last_event_id):
+    parts = (
+        session.pk if session else None,
+        session.show_mode if session else None,
+        snmp_configured,
+        _micros(signature['device_stamp']), signature['device_recent'],
+        _micros(signature['port_stamp']), signature['port_recent'],
+        signature['members']['count'], signature['members']['sum'],
+        last_event_id,
+    )
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def new_events(session, last_event_id):
+    """Events after last_event_id (oldest first, capped) as SSE dicts."""
+    if not session:
+        return []
+    events = DeviceEvent.objects.filter(
+        session=session, id__gt=last_event_id,
+    ).order_by('id').select_related('device')[:MAX_EVENTS]
+    return [ev.as_sse_dict() for ev in events]
+
+
+def status_payload(project, session, signature, since=None):
+    """Devices, switch ports and Dante entries changed since `since`
+    (everything active when since is None). Two queries: devices, then the
+    ports of every switch in one pass."""
+    if since is not None:
+        since = min(since, signature['now'] - CHANGE_OVERLAP)
+
+    devices_qs = DiscoveredDevice.objects.filter(project=project)
+    if since is None:
+        devices_qs = devices_qs.filter(is_active=True)
+    else:
+        devices_qs = devices_qs.filter(changed_at__gt=since)
+
+    devices, removed = [], []
+    for device in devices_qs:
+        (devices if device.is_active else removed).append(device)
+
+    switch_ports = {}
+    if session:
+        ports_qs = SwitchPortSnapshot.objects.filter(
+            session=session, device__project=project,
+            device__is_active=True, device__domain='switch',
+        )
+        if since is not None:
+            # Changed ports, plus every port of a switch whose card changed
+            # (e.g. just reassigned to the switch domain)
+            ports_qs = ports_qs.filter(
+                Q(changed_at__gt=since)
+                | Q(device__in=[d.pk for d in devices if d.domain == 'switch'])
+            )
+        by_device = defaultdict(list)
+        for snap in ports_qs.order_by('device_id', 'port_index'):
+            by_device[str(snap.device_id)].append(snap.as_status_dict())
+        switch_ports = dict(by_device)
+        if since is None:
+            # Full snapshot: every switch gets an entry, even with no ports yet
+            for device in devices:
+                if device.domain == 'switch':
+                    switch_ports.setdefault(str(device.pk), [])
+
+    return {
+        'full': since is None,
+        'cursor': str(max(_micros(signature['device_stamp']), _micros(signature['port_stamp']))),
+        'members': signature['members'],
+        'devices': [d.as_status_dict() for d in devices],
+        'removed': [d.pk for d in removed],
+        'switch_ports': switch_ports,
+        'dante_data': {
+            str(device.pk): {
+                'dante_device_name': device.dante_device_name,
+                'clock_role': device.clock_role,
+                'tx_channels': device.tx_channel_count,
+                'rx_channels': device.rx_channel_count,
+            }
+            for device in devices
+            if device.domain == 'dante'
+        },
+    }
@@ -0,0 +1,244 @@
+# planner/monitor_uplink.py
+#
+# Network Health Monitor — the agent's uplink to the ShowStack cloud.
+#
+# Venue uplinks are slow and drop out. Rather than opening a fresh HTTPS
+# connection for every push, the agent (run_monitor) sends everything through
+# one MonitorUplink:
+#
+#   - one pooled keep-alive requests.Session for every call;
+#   - request bodies gzip-compressed once they're worth compressing;
+#   - ICMP / SNMP / Dante results queued by the polling threads and sent
+#     together, one request per tick, to /api/batch/ (views_monitor.agent_batch);
+#   - ping cycles that can't be delivered are spooled to a bounded JSONL file
+#     and replayed, oldest first, when the uplink comes back. The server files
+#     them as latency history at the time they were observed. SNMP and Dante
+#     payloads are snapshots that the next cycle supersedes, so they are
+#     coalesced in memory and never spooled.
+#   - a batch the server rejects outright (4xx: bad key, no session) is not
+#     an outage: its replayed cycles are moved aside to <spool>.rejected so
+#     they can't block the spool, and sending backs off as it would offline.
+#
+# Runs inside the agent process only; nothing here touches the database.
+
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Bodies smaller than this go uncompressed (gzip overhead isn't worth it)
+GZIP_MIN_BYTES = 1024
+
+# Spooled ping cycles kept on disk (~14 hours at the default 10 s interval)
+SPOOL_LIMIT = 5000
+
+# Spooled cycles replayed per tick while catching up after an outage
+REPLAY_BATCH = 50
+
+# Backoff between send attempts while the uplink is down (seconds)
+RETRY_MIN_SECONDS = 2
+RETRY_MAX_SECONDS = 30
+
+# Kinds worth keeping through an outage; everything else is a snapshot
+SPOOLED_KINDS = frozenset({'poll-results'})
+
+
+def _now_iso():
+    return datetime.now(dt_timezone.utc).isoformat()
+
+
+class _Spool:
+    """Bounded FIFO of undelivered items, mirrored to a JSONL file so it
+    survives an agent restart. Past `limit`, the oldest items are dropped."""
+
+    def __init__(self, path, limit=SPOOL_LIMIT):
+        self.path = path
+        self.items = deque(maxlen=limit)
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.items.append(json.loads(line))
+                    except ValueError:
+                        continue  # torn write from a crash
+        except FileNotFoundError:
+            pass
+
+    def __len__(self):
+        return len(self.items)
+
+    def peek(self, count):
+        return list(islice(self.items, count))
+
+    def extend(self, items):
+        if not items:
+            return
+        overflow = len(self.items) + len(items) > self.items.maxlen
+        self.items.extend(items)
+        if overflow:
+            self._rewrite()
+        else:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(item) + '\n' for item in items)
+
+    def drop(self, count):
+        for _ in range(min(count, len(self.items))):
+            self.items.popleft()
+        self._rewrite()
+
+    def quarantine(self, count):
+        """Move the oldest `count` items to the .rejected file beside the
+        spool, kept for inspection but never replayed."""
+        with open(self.path + '.rejected', 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(item) + '\n' for item in self.peek(count))
+        self.drop(count)
+
+    def _rewrite(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(item) + '\n' for item in self.items)
+        os.replace(tmp_path, self.path)
+
+
+class MonitorUplink:
+    """Pooled, compressed, batching connection from the agent to the cloud API.
+
+    Polling threads call submit(); the uplink thread (run()) sends whatever
+    is pending once per tick. request() is for one-off calls (heartbeat,
+    settings, scans) and goes straight out on the same pooled session.
+    """
+
+    def __init__(self, base_url, api_key, spool_path=None, spool_limit=SPOOL_LIMIT,
+                 timeout=15, log=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+        })
+        self.spool = None
+        if spool_path:
+            os.makedirs(os.path.dirname(os.path.abspath(spool_path)), exist_ok=True)
+            self.spool = _Spool(spool_path, spool_limit)
+        self._log = log or (lambda msg: None)
+        self._lock = threading.Lock()
+        self._pending = []  # [(item, callback)]
+        self._retry_at = None
+        self._backoff = RETRY_MIN_SECONDS
+
+    @property
+    def online(self):
+        return self._retry_at is None
+
+    def request(self, method, path, payload=None, timeout=None):
+        """Send one request to /api/<path>/ and return the response.
+        Raises requests exceptions like requests.post would."""
+        kwargs = {'timeout': timeout or self.timeout}
+        if payload is not None:
+            body = json.dumps(payload).encode('utf-8')
+            headers = {}
+            if len(body) >= GZIP_MIN_BYTES:
+                body = gzip.compress(body, compresslevel=6)
+                headers['Content-Encoding'] = 'gzip'
+            kwargs.update(data=body, headers=headers)
+        return self.session.request(method, f'{self.base_url}/{path}/', **kwargs)
+
+    def submit(self, kind, body, callback=None):
+        """Queue one result payload for the next batch. `callback` gets the
+        server's response for this item once it has been delivered."""
+        item = {'kind': kind, 'body': body, 'observed_at': _now_iso()}
+        with self._lock:
+            if kind not in SPOOLED_KINDS:
+                # A newer snapshot supersedes one still waiting to go out
+                self._pending = [(i, cb) for (i, cb) in self._pending if i['kind'] != kind]
+            self._pending.append((item, callback))
+
+    def flush(self):
+        """Send everything pending, led by a slice of the spool, as one batch.
+        Returns True when the batch was delivered or there was nothing to send."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        if self._retry_at is not None and time.monotonic() < self._retry_at:
+            self._spool_pending(pending)
+            return False
+
+        replay = self.spool.peek(REPLAY_BATCH) if self.spool else []
+        if not pending and not replay:
+            return True
+
+        items = [dict(item, replay=True) for item in replay] + [item for item, _ in pending]
+        try:
+            resp = self.request('POST', 'batch', {'items': items})
+        except requests.RequestException as e:
+            self._went_offline(f'{e.__class__.__name__}', pending)
+            return False
+        if resp.status_code >= 500:
+            self._went_offline(f'HTTP {resp.status_code}', pending)
+            return False
+        if resp.status_code != 200:
+            # Not an outage (bad key, no session): retrying the same batch
+            # won't help, so it goes, but keep the rejected replay for a look
+            self._log(f'[Uplink] Batch rejected ({resp.status_code}); dropped {len(pending)} result(s)'
+                      + (f', set aside {len(replay)} spooled cycle(s)' if replay else ''))
+            if replay:
+                self.spool.quarantine(len(replay))
+            self._back_off()
+            return False
+        try:
+            results = resp.json()['results']
+        except (ValueError, KeyError):
+            # The server stored the batch; sending it again would duplicate it
+            self._log('[Uplink] Batch delivered but the response was unreadable')
+            results = []
+
+        if replay:
+            self.spool.drop(len(replay))
+        if not self.online:
+            backlog = len(self.spool) if self.spool else 0
+            self._log(f'[Uplink] Reconnected; {backlog} spooled cycle(s) left to replay')
+        self._retry_at = None
+        self._backoff = RETRY_MIN_SECONDS
+
+        for (item, callback), result in zip(pending, results[len(replay):]):
+            if callback is not None:
+                callback(result)
+        return True
+
+    def run(self, stop_event, tick=1.0):
+        """Uplink thread body: flush once per tick until stop_event is set,
+        then make one last attempt (anything undelivered stays spooled)."""
+        while not stop_event.is_set():
+            started = time.monotonic()
+            self.flush()
+            stop_event.wait(timeout=max(0.0, tick - (time.monotonic() - started)))
+        self.flush()
+
+    def close(self):
+        self.session.close()
+
+    def _went_offline(self, reason, pending):
+        if self.online:
+            self._log(f'[Uplink] Lost connection to ShowStack ({reason}); spooling ping results')
+        self._back_off()
+        self._spool_pending(pending)
+
+    def _back_off(self):
+        self._retry_at = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, RETRY_MAX_SECONDS)
+
+    def _spool_pending(self, pending):
+        if self.spool is not None:
+            self.spool.extend([item for item, _ in pending if item['kind'] in SPOOLED_KINDS])
@@ -0,0 +1,100 @@
+# planner/photo_store.py
+#
+# Mic tracker — content-addressed store for presenter slot headshots.
+#
+# Headshots used to live inline in PresenterSlot.photo_data as base64 data:
+# URLs (up to ~7 MB of text per slot), which every presenter-slot query
+# loaded and every slot JSON response sent back. They now live on the
+# default storage (MEDIA_ROOT), named by the SHA-256 of the uploaded bytes:
+#
+#   photo_store/ab/<digest>.<ext>     the upload as received
+#   photo_store/ab/<digest>_sm.jpg    StoredPhoto.THUMBNAIL_SIZES thumbnails
+#   photo_store/ab/<digest>_lg.jpg
+#
+#   - The same picture on several slots is stored once: one StoredPhoto
+#     row and one set of files, referenced by PresenterSlot.stored_photo.
+#   - Files never change once written, so views.stored_photo serves the
+#     thumbnails with a one-year immutable Cache-Control.
+#   - Only raster images Pillow can decode are accepted, up to
+#     MAX_PHOTO_BYTES.
+#   - Photos no slot uses any more are kept (a later slot may reuse them).
+
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .models import StoredPhoto
+
+
+MAX_PHOTO_BYTES = 5 * 1024 * 1024
+
+THUMBNAIL_QUALITY = 85
+
+
+class PhotoError(ValueError):
+    """The upload cannot be stored (too large, or not an image)."""
+
+
+def photo_name(digest, suffix):
+    return f'photo_store/{digest[:2]}/{digest}{suffix}'
+
+
+def thumbnail_name(digest, size):
+    return photo_name(digest, f'_{size}.jpg')
+
+
+def store_photo(data, model=StoredPhoto):
+    """The StoredPhoto holding `data`, writing its files on first sight.
+    Raises PhotoError. `model` lets migrations pass their historical model."""
+    if len(data) > MAX_PHOTO_BYTES:
+        raise PhotoError('Image exceeds 5 MB limit')
+    digest = hashlib.sha256(data).hexdigest()
+    photo = model.objects.filter(pk=digest).first()
+    if photo is not None:
+        return photo
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise PhotoError('Not a supported image')
+    original = photo_name(digest, f'.{image.format.lower()}')
+    content_type = Image.MIME.get(image.format, 'application/octet-stream')
+
+    _write(original, data)
+    image = ImageOps.exif_transpose(image)
+    for size, pixels in StoredPhoto.THUMBNAIL_SIZES.items():
+        _write(thumbnail_name(digest, size), _thumbnail(image, pixels))
+
+    photo, _ = model.objects.get_or_create(pk=digest, defaults={
+        'original': original,
+        'content_type': content_type,
+        'byte_size': len(data),
+        'width': image.width,
+        'height': image.height,
+    })
+    return photo
+
+
+def _write(name, data):
+    # Same name, same bytes: a file already there (an earlier upload, or a
+    # concurrent one) is left as it is.
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+
+
+def _thumbnail(image, pixels):
+    """JPEG bytes of `image` scaled to fit a `pixels` square, transparency
+    flattened onto white."""
+    thumb = image.copy()
+    thumb.thumbnail((pixels, pixels), Image.LANCZOS)
+    if thumb.mode not in ('RGB', 'L'):
+        rgba = thumb.convert('RGBA')
+        thumb = Image.new('RGB', rgba.size, 'white')
+        thumb.paste(rgba, mask=rgba.getchannel('A'))
+    buffer = io.BytesIO()
+    thumb.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+    return buffer.getvalue()
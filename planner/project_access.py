@@ -0,0 +1,150 @@
+# planner/project_access.py
+#
+# Per-user project access, resolved once and cached in the session.
+#
+# CurrentProjectMiddleware, the user_projects context processor, the mic
+# tracker views and the admin all need to know which projects a user owns and
+# what role they have in the ones they were invited to. They used to ask the
+# database separately, several exists() queries each, on every request.
+#
+#   - get_project_access(request) returns a ProjectAccess for request.user.
+#     It is memoised on the request, so everything handling one request
+#     shares it.
+#   - The owned project ids and memberships are kept in the session together
+#     with the user's ProjectAccessStamp version. A request reads only that
+#     version (one primary-key query) while it matches.
+#   - The receivers in signals.py bump the stamp of every user affected by a
+#     Project or ProjectMember save or delete. The next request from any
+#     worker then recomputes the snapshot.
+#   - is_superuser is always read from request.user, never from the snapshot.
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Project, ProjectAccessStamp, ProjectMember, UserProfile
+
+
+SESSION_KEY = '_project_access'
+
+
+class ProjectAccess:
+    """Which projects a user owns or was invited to, and with which role."""
+
+    def __init__(self, user, owned_ids=(), memberships=(), has_profile=False, version=0):
+        self.user = user
+        self.is_superuser = user.is_superuser
+        self.owned_ids = list(owned_ids)
+        # [(project_id, role)] in ProjectMember order, so memberships[0] is
+        # the user's first membership
+        self.memberships = [tuple(m) for m in memberships]
+        self.has_profile = has_profile
+        self.version = version
+        self._roles = dict(self.memberships)
+
+    @classmethod
+    def load(cls, user, version):
+        return cls(
+            user,
+            owned_ids=Project.objects.filter(owner=user).order_by('-created_at').values_list('pk', flat=True),
+            memberships=ProjectMember.objects.filter(user=user).values_list('project_id', 'role'),
+            has_profile=UserProfile.objects.filter(user=user).exists(),
+            version=version,
+        )
+
+    @classmethod
+    def from_session(cls, user, data):
+        return cls(user, data['owned'], data['members'], data['profile'], data['version'])
+
+    def to_session(self):
+        return {
+            'user': self.user.pk,
+            'version': self.version,
+            'owned': self.owned_ids,
+            'members': [list(m) for m in self.memberships],
+            'profile': self.has_profile,
+        }
+
+    @property
+    def is_owner(self):
+        return bool(self.owned_ids)
+
+    @property
+    def is_invited(self):
+        return bool(self.memberships)
+
+    @property
+    def first_membership(self):
+        """(project_id, role) of the user's first membership, or None."""
+        return self.memberships[0] if self.memberships else None
+
+    @property
+    def is_viewer_only(self):
+        """Read-only everywhere: viewer memberships but no editor membership
+        and no owned projects. Never true for superusers."""
+        roles = self._roles.values()
+        return (not self.is_superuser and not self.owned_ids
+                and 'viewer' in roles and 'editor' not in roles)
+
+    def can_access(self, project_id):
+        return self.role_for(project_id) is not None
+
+    def role_for(self, project_id):
+        """'superuser', 'owner', 'editor', 'viewer' or None."""
+        if self.is_superuser:
+            return 'superuser'
+        if project_id in self.owned_ids:
+            return 'owner'
+        return self._roles.get(project_id)
+
+    def owned_projects(self):
+        return Project.objects.filter(pk__in=self.owned_ids).order_by('-created_at')
+
+    def invited_projects(self):
+        return Project.objects.filter(pk__in=list(self._roles)).order_by('-created_at')
+
+
+def access_version(user_id):
+    return (
+        ProjectAccessStamp.objects.filter(user_id=user_id)
+        .values_list('version', flat=True).first()
+    ) or 0
+
+
+def bump_access_version(*user_ids):
+    """Invalidate the cached access of these users, in every session."""
+    user_ids = {pk for pk in user_ids if pk is not None}
+    if not user_ids:
+        return
+    stamps = ProjectAccessStamp.objects.filter(user_id__in=user_ids)
+    existing = set(stamps.values_list('user_id', flat=True))
+    stamps.update(version=F('version') + 1)
+    for user_id in user_ids - existing:
+        try:
+            with transaction.atomic():
+                ProjectAccessStamp.objects.create(user_id=user_id, version=1)
+        except IntegrityError:
+            # Another writer created it first
+            ProjectAccessStamp.objects.filter(user_id=user_id).update(version=F('version') + 1)
+
+
+def get_project_access(request):
+    """ProjectAccess for request.user (None when anonymous), computed at most
+    once per request and reused across requests while the stamp matches."""
+    access = getattr(request, '_project_access', None)
+    if access is not None:
+        return access
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+
+    version = access_version(user.pk)
+    session = getattr(request, 'session', None)
+    cached = session.get(SESSION_KEY) if session is not None else None
+    if cached and cached.get('user') == user.pk and cached.get('version') == version:
+        access = ProjectAccess.from_session(user, cached)
+    else:
+        access = ProjectAccess.load(user, version)
+        if session is not None:
+            session[SESSION_KEY] = access.to_session()
+    request._project_access = access
+    return access
@@ -0,0 +1,197 @@
+# planner/project_clone.py
+#
+# Bulk project copy behind Project.duplicate().
+#
+# A project is copied table by table, parents before children, in two queries
+# per table whatever its size: one SELECT of the source rows (as values, no
+# model instances) and one bulk_create of the copies (Django splits it into
+# backend-sized batches). Every copied table records old pk -> new pk, and a
+# later table's foreign keys are remapped through those maps:
+#
+#   - FK to a model copied earlier in CLONE_PLAN (the project itself included)
+#     -> the copy's pk. A required FK whose parent was not copied drops the
+#     row, and its children drop with it (e.g. an Amp without an AmpLocation).
+#   - FK to anything else (AmpModel, AmplifierProfile, ContentType ...) is a
+#     shared catalogue row and is kept as is.
+#   - GenericForeignKeys (DeviceOutput.console_output) are remapped the same
+#     way through their content type.
+#   - File fields are left empty; uploaded files are not copied.
+#
+# bulk_create skips save() and the post_save signals, so the copied modules'
+# revisions (project_revisions.py) are bumped once at the end, and the hooks
+# that populate new rows never fire: Amp.setup_channels,
+# MicSession.create_mic_assignments and P1Processor's default channels would
+# otherwise add blank rows next to the copied ones. Fields those save()
+# methods derive (PACableSchedule.zone, AmplifierAssignment currents ...) are
+# copied from the source row, where save() already computed them.
+#
+# Not copied: team members, invitations, and the per-project monitor, crew and
+# multitrack data (see CLONE_PLAN for what is).
+
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+
+from .models import (
+    Amp, AmpChannel, AmpLocation, AmplifierAssignment, AudioChecklist,
+    AudioChecklistTask, CommBeltPack, CommBeltPackChannel, CommChannel,
+    CommCrewName, CommPosition, Console, ConsoleAuxOutput, ConsoleInput,
+    ConsoleMatrixOutput, ConsoleStereoOutput, Device, DeviceInput,
+    DeviceOutput, GalaxyInput, GalaxyOutput, GalaxyProcessor, Location,
+    MicAssignment, MicGroup, MicSession, MicShowInfo, P1Input, P1Output,
+    P1Processor, PACableSchedule, PAFanOut, PAZone, PowerDistributionPlan,
+    Presenter, PresenterSlot, Project, SharedPresenterAssignment, ShowDay,
+    SoundvisionPrediction, SpeakerArray, SpeakerCabinet, SystemProcessor,
+)
+from .project_revisions import TRACKED, touch
+
+
+# (model, lookup from the model to its project, fields left at their default)
+CLONE_PLAN = (
+    (Location, 'project', ()),
+    (AmpLocation, 'project', ()),
+
+    (Console, 'project', ()),
+    (ConsoleInput, 'console__project', ()),
+    (ConsoleAuxOutput, 'console__project', ()),
+    (ConsoleMatrixOutput, 'console__project', ()),
+    (ConsoleStereoOutput, 'console__project', ()),
+
+    (Device, 'project', ()),
+    (DeviceInput, 'device__project', ()),
+    (DeviceOutput, 'device__project', ()),
+
+    (Amp, 'project', ()),
+    (AmpChannel, 'amp__project', ()),
+
+    (CommChannel, 'project', ()),
+    (CommPosition, 'project', ()),
+    (CommCrewName, 'project', ()),
+    (CommBeltPack, 'project', ('checked_out',)),
+    (CommBeltPackChannel, 'beltpack__project', ()),
+
+    (Presenter, 'project', ()),
+    (ShowDay, 'project', ()),
+    (MicSession, 'day__project', ()),
+    (MicGroup, 'session__day__project', ()),
+    (MicAssignment, 'session__day__project', ('modified_by',)),
+    (MicAssignment.groups.through, 'micassignment__session__day__project', ()),
+    (SharedPresenterAssignment, 'mic_assignment__session__day__project', ()),
+    (PresenterSlot, 'assignment__session__day__project', ()),
+    (PresenterSlot.groups.through, 'presenterslot__assignment__session__day__project', ()),
+    (PresenterSlot.a2_groups.through, 'presenterslot__assignment__session__day__project', ()),
+    (MicShowInfo, 'project', ()),
+
+    (SoundvisionPrediction, 'project', ()),
+    (SpeakerArray, 'prediction__project', ()),
+    (SpeakerCabinet, 'array__prediction__project', ()),
+
+    (PowerDistributionPlan, 'project', ('created_by',)),
+    (AmplifierAssignment, 'distribution_plan__project', ()),
+
+    (SystemProcessor, 'project', ()),
+    (P1Processor, 'system_processor__project', ()),
+    (P1Input, 'p1_processor__system_processor__project', ()),
+    (P1Output, 'p1_processor__system_processor__project', ()),
+    (GalaxyProcessor, 'system_processor__project', ()),
+    (GalaxyInput, 'galaxy_processor__system_processor__project', ()),
+    (GalaxyOutput, 'galaxy_processor__system_processor__project', ()),
+
+    (PAZone, 'project', ()),
+    (PACableSchedule, 'project', ()),
+    (PAFanOut, 'cable_schedule__project', ()),
+
+    (AudioChecklist, 'project', ()),
+    (AudioChecklistTask, 'checklist__project', ()),
+)
+
+
+class ProjectCloner:
+    """Copies the CLONE_PLAN tables of one project into another.
+
+    `maps` holds {model: {old pk: new pk}} for every table copied so far,
+    starting with the project itself.
+    """
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+        self.maps = {Project: {source.pk: target.pk}}
+
+    def run(self, plan=CLONE_PLAN):
+        for model, project_lookup, exclude in plan:
+            self.copy(model, project_lookup, exclude)
+        touch(self.target.pk, *{TRACKED[model][0] for model, _, _ in plan if model in TRACKED})
+        return self.maps
+
+    def copy(self, model, project_lookup, exclude=()):
+        """Copy every `model` row of the source project; returns the number
+        of rows created."""
+        fields = [
+            f for f in model._meta.concrete_fields
+            if not f.primary_key and f.name not in exclude and not isinstance(f, models.FileField)
+        ]
+        generic = [
+            (gfk.ct_field + '_id', gfk.fk_field)
+            for gfk in model._meta.private_fields if isinstance(gfk, GenericForeignKey)
+        ]
+        rows = (
+            model.objects.filter(**{project_lookup: self.source})
+            .order_by('pk')
+            .values_list('pk', *[f.attname for f in fields])
+        )
+
+        old_pks, copies = [], []
+        for pk, *values in rows:
+            data = self._remap(fields, values)
+            if data is None:
+                continue
+            for ct_attname, id_attname in generic:
+                data[id_attname] = self._remap_generic(data[ct_attname], data[id_attname])
+            old_pks.append(pk)
+            copies.append(model(**data))
+
+        created = model.objects.bulk_create(copies)
+        self.maps[model] = {old: new.pk for old, new in zip(old_pks, created)}
+        return len(created)
+
+    def _remap(self, fields, values):
+        """Field values for one copy, or None when a required parent was not
+        copied."""
+        data = {}
+        for field, value in zip(fields, values):
+            if field.is_relation and value is not None:
+                id_map = self.maps.get(field.related_model)
+                if id_map is not None:
+                    value = id_map.get(value)
+                    if value is None and not field.null:
+                        return None
+            data[field.attname] = value
+        return data
+
+    def _remap_generic(self, content_type_id, object_id):
+        if content_type_id is None or object_id is None:
+            return object_id
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        id_map = self.maps.get(model)
+        if id_map is None:
+            return object_id
+        return id_map.get(object_id)
+
+
+def clone_project(source, new_name, owner):
+    """Create a new active project owned by `owner` holding a copy of
+    `source`'s show data. Runs in one transaction."""
+    with transaction.atomic():
+        target = Project.objects.create(
+            name=new_name,
+            owner=owner,
+            start_date=source.start_date,
+            end_date=source.end_date,
+            venue=source.venue,
+            client=source.client,
+            notes=source.notes,
+            is_archived=False,  # Always create as active
+        )
+        ProjectCloner(source, target).run()
+    return target
@@ -0,0 +1,422 @@
+# planner/project_revisions.py
+#
+# Project revision stamps: has anything in this part of the project changed
+# since I last looked?
+#
+# Each project keeps one ProjectRevision counter per module of its data
+# (MODULES: consoles, devices, mic tracker ...). Any write to a module's rows
+# bumps the counter and its changed_at, so the answer is one indexed read,
+# however big the project is. Readers name the modules they depend on:
+#
+#   - revision_stamp() folds those counters into an ETag and a Last-Modified
+#     time. render_jobs.py keys its cached PDFs on it.
+#   - @revision_conditional(...) puts the stamp on a GET view's response and
+#     answers 304 Not Modified when the browser already has it.
+#
+# Keeping the counters current:
+#
+#   - Model saves and deletes bump them through the receivers in signals.py.
+#     A row removed by a cascade bumps its own module once per delete.
+#   - Queryset .update() / bulk_create() / bulk_update() skip signals, so
+#     those call sites bump the counters themselves (touch(),
+#     touch_queryset()).
+#   - Each touch() is one transaction that locks the counters it bumps
+#     (SELECT ... FOR UPDATE), like the mic tracker revision (mic_changes.py).
+#     Inside a caller's transaction it joins it and the counters stay locked
+#     until that commits, so a reader never sees new rows under an old stamp.
+#     One touch() locks its counters in module order, but separate saves in
+#     one caller's transaction lock them in the order they happen, so two
+#     such transactions writing the same modules in opposite orders can
+#     deadlock (the database aborts one of them). Code that writes several
+#     modules in one transaction should bump them together, up front, with
+#     a single touch().
+#   - Shared catalogue tables (amp models, amplifier profiles) aren't owned
+#     by a project; their counters have no project and count for everyone.
+
+import hashlib
+import threading
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import (
+    Amp, AmpChannel, AmpDivider, AmpLocation, AmpModel, AmplifierAssignment,
+    AmplifierProfile, AudioChecklist, AudioChecklistTask, AudioChecklistTemplate,
+    AudioChecklistTemplateTask, CommBeltPack, CommBeltPackChannel, CommChannel,
+    CommConfig, CommConfigDanteChannel, CommConfigKeyset, CommConfigNetworkPort,
+    CommConfigPartyline, CommConfigPortAssignment, CommConfigRole, CommConfigRoleset,
+    CommConfigSession, CommCrewName, CommPosition, Console, ConsoleAuxOutput,
+    ConsoleInput, ConsoleMatrixOutput, ConsoleStereoOutput, DanteConsoleConfig,
+    DanteDeviceConfig, DanteSubscription, Device, DeviceInput, DeviceOutput,
+    GalaxyInput, GalaxyOutput, GalaxyProcessor, Location, MicAssignment, MicGroup,
+    MicSession, MicShowInfo, MultitrackSession, MultitrackTrack, P1Input, P1Output,
+    P1Processor, PACableSchedule, PACoupler, PAFanOut, PAFanOutExtension, PAZone,
+    PowerDistributionPlan, Presenter, PresenterSlot, Project, ProjectRevision,
+    SharedPresenterAssignment, ShowDay, SignalFlowDiagram, SoundvisionPrediction,
+    SpeakerArray, SpeakerCabinet, SystemProcessor,
+)
+
+
+# module -> ((model, lookup from the model to its project), ...). A None
+# lookup marks a shared catalogue table.
+MODULES = {
+    'project': (
+        (Project, 'pk'),
+    ),
+    'locations': (
+        (Location, 'project'),
+    ),
+    'consoles': (
+        (Console, 'project'),
+        (ConsoleInput, 'console__project'),
+        (ConsoleAuxOutput, 'console__project'),
+        (ConsoleMatrixOutput, 'console__project'),
+        (ConsoleStereoOutput, 'console__project'),
+    ),
+    'devices': (
+        (Device, 'project'),
+        (DeviceInput, 'device__project'),
+        (DeviceOutput, 'device__project'),
+    ),
+    'dante': (
+        (DanteConsoleConfig, 'console__project'),
+        (DanteDeviceConfig, 'device__project'),
+        (DanteSubscription, 'project'),
+    ),
+    'amps': (
+        (AmpLocation, 'project'),
+        (Amp, 'project'),
+        (AmpChannel, 'amp__project'),
+        (AmpDivider, 'project'),
+    ),
+    'processors': (
+        (SystemProcessor, 'project'),
+        (P1Processor, 'system_processor__project'),
+        (P1Input, 'p1_processor__system_processor__project'),
+        (P1Output, 'p1_processor__system_processor__project'),
+        (GalaxyProcessor, 'system_processor__project'),
+        (GalaxyInput, 'galaxy_processor__system_processor__project'),
+        (GalaxyOutput, 'galaxy_processor__system_processor__project'),
+    ),
+    'pa_cables': (
+        (PAZone, 'project'),
+        (PACableSchedule, 'project'),
+        (PAFanOut, 'cable_schedule__project'),
+        (PAFanOutExtension, 'cable_schedule__project'),
+        (PACoupler, 'cable_schedule__project'),
+    ),
+    'comm': (
+        (CommChannel, 'project'),
+        (CommPosition, 'project'),
+        (CommCrewName, 'project'),
+        (CommBeltPack, 'project'),
+        (CommBeltPackChannel, 'beltpack__project'),
+        (CommConfig, 'project'),
+        (CommConfigPartyline, 'config__project'),
+        (CommConfigRole, 'config__project'),
+        (CommConfigKeyset, 'role__config__project'),
+        (CommConfigRoleset, 'config__project'),
+        (CommConfigSession, 'config__project'),
+        (CommConfigPortAssignment, 'config__project'),
+        (CommConfigDanteChannel, 'config__project'),
+        (CommConfigNetworkPort, 'config__project'),
+    ),
+    'mic': (
+        (ShowDay, 'project'),
+        (Presenter, 'project'),
+        (MicShowInfo, 'project'),
+        (MicSession, 'day__project'),
+        (MicGroup, 'session__day__project'),
+        (MicAssignment, 'session__day__project'),
+        (SharedPresenterAssignment, 'mic_assignment__session__day__project'),
+        (PresenterSlot, 'assignment__session__day__project'),
+    ),
+    'power': (
+        (PowerDistributionPlan, 'project'),
+        (AmplifierAssignment, 'distribution_plan__project'),
+    ),
+    'predictions': (
+        (SoundvisionPrediction, 'project'),
+        (SpeakerArray, 'prediction__project'),
+        (SpeakerCabinet, 'array__prediction__project'),
+    ),
+    'multitrack': (
+        (MultitrackSession, 'project'),
+        (MultitrackTrack, 'session__project'),
+    ),
+    'signal_flow': (
+        (SignalFlowDiagram, 'project'),
+    ),
+    'checklists': (
+        (AudioChecklist, 'project'),
+        (AudioChecklistTask, 'checklist__project'),
+        (AudioChecklistTemplate, 'project'),
+        (AudioChecklistTemplateTask, 'template__project'),
+    ),
+    'amp_models': (
+        (AmpModel, None),
+    ),
+    'amplifier_profiles': (
+        (AmplifierProfile, None),
+    ),
+}
+
+# model -> (module, lookup)
+TRACKED = {
+    model: (module, lookup)
+    for module, models in MODULES.items()
+    for model, lookup in models
+}
+
+CATALOGUE_MODULES = frozenset(
+    module for module, models in MODULES.items() if models[0][1] is None
+)
+
+
+class RevisionStamp:
+    """What a reader saw of some modules of a project: an ETag (quoted, as
+    sent in the header) and the last time any of them changed (None if they
+    never did)."""
+
+    __slots__ = ('etag', 'last_modified')
+
+    def __init__(self, etag, last_modified):
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __repr__(self):
+        return f'RevisionStamp({self.etag}, {self.last_modified})'
+
+
+# ──────────────────────────────────────────────
+# Reading
+# ──────────────────────────────────────────────
+
+def _check_modules(modules):
+    unknown = set(modules) - MODULES.keys()
+    if unknown:
+        raise ValueError(f"Unknown revision modules: {', '.join(sorted(unknown))}")
+
+
+def current_revisions(project_id, modules=None):
+    """{module: (revision, changed_at)} for `modules` of the project (all
+    of them by default). Modules never written are (0, None)."""
+    modules = sorted(MODULES if modules is None else set(modules))
+    _check_modules(modules)
+    project_modules = [m for m in modules if m not in CATALOGUE_MODULES]
+    catalogue_modules = [m for m in modules if m in CATALOGUE_MODULES]
+    result = dict.fromkeys(modules, (0, None))
+    rows = ProjectRevision.objects.filter(
+        Q(project_id=project_id, module__in=project_modules)
+        | Q(project__isnull=True, module__in=catalogue_modules)
+    ).values_list('module', 'revision', 'changed_at')
+    for module, revision, changed_at in rows:
+        result[module] = (revision, changed_at)
+    return result
+
+
+def revision_stamp(project_id, modules=None):
+    """The RevisionStamp of `modules` of the project (all by default).
+
+    The project module always counts: it is bumped when the project is
+    created, so a new project never shares a stamp with a deleted one whose
+    id it reuses.
+    """
+    modules = set(MODULES if modules is None else modules) | {'project'}
+    revisions = current_revisions(project_id, modules)
+    digest = hashlib.sha256(str(project_id).encode())
+    for module, (revision, changed_at) in sorted(revisions.items()):
+        digest.update(f'|{module}:{revision}:{changed_at and changed_at.timestamp()}'.encode())
+    changed = [changed_at for _, changed_at in revisions.values() if changed_at is not None]
+    return RevisionStamp(f'"{digest.hexdigest()[:32]}"', max(changed, default=None))
+
+
+# ──────────────────────────────────────────────
+# Writing
+# ──────────────────────────────────────────────
+
+def _bump(project_id, module, now):
+    """Add one to the counter, creating it on the first write. Call inside a
+    transaction: the counter row stays locked until it commits."""
+    counter = ProjectRevision.objects.select_for_update().filter(project_id=project_id, module=module)
+    if counter.values_list('pk', flat=True).first() is None:
+        try:
+            with transaction.atomic():
+                ProjectRevision.objects.create(project_id=project_id, module=module, revision=1, changed_at=now)
+            return
+        except IntegrityError:
+            # Another writer created the counter first: wait for its lock
+            counter.values_list('pk', flat=True).get()
+    counter.update(revision=F('revision') + 1, changed_at=now)
+
+
+def touch(project_id, *modules):
+    """Bump `modules` of the project in one transaction, locking their
+    counters in module order. Catalogue modules are bumped for everyone
+    whatever the project. A None project (a row not attached to one) only
+    bumps catalogue modules."""
+    _check_modules(modules)
+    now = timezone.now()
+    with transaction.atomic():
+        for module in sorted(set(modules)):
+            if module in CATALOGUE_MODULES:
+                _bump(None, module, now)
+            elif project_id is not None:
+                _bump(project_id, module, now)
+
+
+def touch_queryset(queryset):
+    """Bump the module of `queryset`'s model in every project it has rows
+    in, in one transaction. For .update() and other bulk writes that bypass
+    the model signals; call it before a write that could move rows out of
+    the queryset."""
+    module, lookup = TRACKED[queryset.model]
+    if lookup is None:
+        touch(None, module)
+        return
+    project_ids = queryset.order_by().values_list(lookup, flat=True).distinct()
+    with transaction.atomic():
+        for project_id in sorted(project_id for project_id in project_ids if project_id is not None):
+            touch(project_id, module)
+
+
+def project_id_of(instance, parents=None):
+    """Project id of a tracked row, walking already-loaded parents before
+    falling back to one query. `parents` memoizes those queries by
+    (parent model, pk)."""
+    lookup = TRACKED[type(instance)][1]
+    if lookup == 'pk':
+        return instance.pk
+    while '__' in lookup:
+        field_name, lookup = lookup.split('__', 1)
+        field = type(instance)._meta.get_field(field_name)
+        parent_id = getattr(instance, field.attname)
+        if parent_id is None:
+            return None
+        if not field.is_cached(instance):
+            key = (field.related_model, parent_id)
+            if parents is None or key not in parents:
+                project_id = field.related_model.objects.filter(pk=parent_id).values_list(
+                    lookup, flat=True,
+                ).first()
+                if parents is None:
+                    return project_id
+                parents[key] = project_id
+            return parents[key]
+        instance = getattr(instance, field_name)
+    return getattr(instance, f'{lookup}_id')
+
+
+def record_save(instance):
+    """post_save: bump the module of a saved row."""
+    module, lookup = TRACKED[type(instance)]
+    touch(None if lookup is None else project_id_of(instance), module)
+
+
+# The delete() call in progress in this thread. Django sends pre_delete for
+# every row of a delete (cascade included) before the first post_delete, so
+# a pre_delete after a post_delete starts the next call.
+_deleting = threading.local()
+
+
+def begin_delete(instance, origin):
+    """pre_delete: start tracking a delete() call."""
+    state = getattr(_deleting, 'state', None)
+    if state is None or state['origin'] is not origin or state['deleted']:
+        state = _deleting.state = {
+            'origin': origin, 'deleted': False, 'parents': {}, 'bumped': set(), 'projects': set(),
+        }
+    if type(instance) is Project:
+        # Its counters go with it
+        state['projects'].add(instance.pk)
+
+
+def record_delete(instance, origin):
+    """post_delete: bump the module of a deleted row. One delete() call,
+    cascade included, bumps each (project, module) it touches once."""
+    module, lookup = TRACKED[type(instance)]
+    if lookup is None:
+        touch(None, module)
+        return
+    state = getattr(_deleting, 'state', None)
+    if state is None or state['origin'] is not origin:
+        begin_delete(instance, origin)
+        state = _deleting.state
+    state['deleted'] = True
+    key = (project_id_of(instance, state['parents']), module)
+    if key[0] is not None and key[0] not in state['projects'] and key not in state['bumped']:
+        state['bumped'].add(key)
+        touch(*key)
+
+
+# ──────────────────────────────────────────────
+# HTTP
+# ──────────────────────────────────────────────
+
+def request_stamp(request, modules, project_id=None):
+    """revision_stamp() of `modules` of project `project_id` (by default the
+    request's current project), or None without a project. Memoized on the
+    request."""
+    if project_id is None:
+        project = getattr(request, 'current_project', None)
+        if project is None:
+            return None
+        project_id = project.pk
+    stamps = request.__dict__.setdefault('_revision_stamps', {})
+    key = (project_id, frozenset(modules))
+    if key not in stamps:
+        stamps[key] = revision_stamp(project_id, modules)
+    return stamps[key]
+
+
+def object_project(model, url_kwarg):
+    """For revision_conditional(project=...): the project owning the `model`
+    row named by URL argument `url_kwarg`."""
+    lookup = TRACKED[model][1]
+
+    def project_id(request, *args, **kwargs):
+        return model.objects.filter(pk=kwargs[url_kwarg]).values_list(lookup, flat=True).first()
+    return project_id
+
+
+def revision_conditional(*modules, project=None):
+    """Decorate a GET view whose response only depends on `modules` of a
+    project (and its URL). The response carries the stamp as ETag /
+    Last-Modified and must be revalidated; a browser that already holds it
+    gets 304 Not Modified without the view running.
+
+    The project is the request's current one, unless `project(request,
+    *args, **kwargs)` names another (see object_project()). Put this under
+    the auth decorators, which must still run first.
+    """
+    _check_modules(modules)
+
+    def stamp(request, *args, **kwargs):
+        if project is None:
+            return request_stamp(request, modules)
+        project_id = project(request, *args, **kwargs)
+        return None if project_id is None else request_stamp(request, modules, project_id)
+
+    def etag(request, *args, **kwargs):
+        current = stamp(request, *args, **kwargs)
+        return current and current.etag
+
+    def last_modified(request, *args, **kwargs):
+        current = stamp(request, *args, **kwargs)
+        return current and current.last_modified
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header('ETag'):
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
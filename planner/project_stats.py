@@ -0,0 +1,197 @@
+# planner/project_stats.py
+#
+# Dashboard figures for one project: the System Dashboard page
+# (views.dashboard) and the stats JSON behind the admin index
+# (views.dashboard_stats).
+#
+# Both used to count each figure with its own unscoped query — about thirty
+# COUNT / DISTINCT queries over every project in the database per page view,
+# plus a Python sum over every PA cable run. Here each table is read once,
+# filtered by project, with all of its figures as conditional aggregates in
+# the same query (load_project_stats()). The cost follows the size of the
+# project, not of the database.
+#
+#   - ProjectStatsCache keeps each project's figures per process, keyed on
+#     the revision stamp of STATS_MODULES (project_revisions.py). A view
+#     with unchanged data costs the one stamp query; any write to those
+#     modules, from any process, changes the stamp and the next view
+#     reloads.
+#   - The figures are plain dicts and lists, ready for a template or
+#     JsonResponse. They are shared between requests: treat them as
+#     read-only.
+
+import threading
+from collections import OrderedDict
+
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+
+from .models import (
+    Amp, AmpLocation, CommBeltPack, Console, ConsoleAuxOutput, ConsoleInput,
+    ConsoleMatrixOutput, Device, DeviceInput, DeviceOutput, MicAssignment,
+    MultitrackSession, PACableSchedule, PAZone, PowerDistributionPlan,
+    SharedPresenterAssignment, ShowDay, SoundvisionPrediction, SystemProcessor,
+)
+from .project_revisions import revision_stamp
+
+
+# The project_revisions.MODULES the figures are counted from
+STATS_MODULES = (
+    'consoles', 'devices', 'processors', 'amps', 'power', 'pa_cables', 'mic',
+    'comm', 'predictions', 'multitrack',
+)
+
+# Projects whose figures a process keeps (least recently used go first)
+STATS_CACHE_SIZE = 500
+
+# Show days listed with their mic counts, and recent rows on the dashboard
+SHOW_DAYS_LISTED = 5
+RECENT_SHOW_DAYS = 3
+RECENT_CABLES = 5
+
+
+def _count_if(condition):
+    return Count('pk', filter=condition)
+
+
+def load_project_stats(project_id):
+    """Every dashboard figure of the project: one aggregate query per table,
+    each filtered by project."""
+    stats = {}
+
+    stats['console'] = Console.objects.filter(project_id=project_id).aggregate(
+        total=Count('pk'),
+        with_inputs=_count_if(Exists(ConsoleInput.objects.filter(console=OuterRef('pk')))),
+        with_outputs=_count_if(
+            Exists(ConsoleAuxOutput.objects.filter(console=OuterRef('pk')))
+            | Exists(ConsoleMatrixOutput.objects.filter(console=OuterRef('pk')))
+        ),
+    )
+    stats['device'] = Device.objects.filter(project_id=project_id).aggregate(
+        total=Count('pk'),
+        with_inputs=_count_if(Exists(DeviceInput.objects.filter(device=OuterRef('pk')))),
+        with_outputs=_count_if(Exists(DeviceOutput.objects.filter(device=OuterRef('pk')))),
+    )
+    stats['processor'] = SystemProcessor.objects.filter(project_id=project_id).aggregate(
+        total=Count('pk'),
+        p1=_count_if(Q(device_type='P1')),
+        galaxy=_count_if(Q(device_type='GALAXY')),
+    )
+    stats['amp'] = Amp.objects.filter(project_id=project_id).aggregate(
+        total=Count('pk', distinct=True),
+        channels=Count('channels'),
+    )
+    stats['amp']['locations'] = AmpLocation.objects.filter(project_id=project_id).count()
+    stats['power'] = PowerDistributionPlan.objects.filter(project_id=project_id).aggregate(
+        plans=Count('pk', distinct=True),
+        amps_in_plans=Count('amplifier_assignments'),
+    )
+
+    cables = PACableSchedule.objects.filter(project_id=project_id).aggregate(
+        cable_runs=Count('pk'),
+        total_cables=Sum('count'),
+    )
+    stats['pa_cable'] = {
+        'cable_runs': cables['cable_runs'],
+        'zones': PAZone.objects.filter(project_id=project_id).count(),
+        'total_cables': cables['total_cables'] or 0,
+    }
+
+    mic = MicAssignment.objects.filter(session__day__project_id=project_id).aggregate(
+        assignments=Count('pk'),
+        micd=_count_if(Q(is_micd=True)),
+        d_mic=_count_if(Q(is_d_mic=True)),
+        shared=_count_if(Exists(SharedPresenterAssignment.objects.filter(mic_assignment=OuterRef('pk')))),
+    )
+    mic['total'] = mic['assignments']
+    mic['available'] = mic['assignments'] - mic['micd']
+    stats['mic'] = mic
+
+    stats['comm'] = CommBeltPack.objects.filter(project_id=project_id).aggregate(
+        total_packs=Count('pk'),
+        wireless=_count_if(Q(system_type='WIRELESS')),
+        hardwired=_count_if(Q(system_type='HARDWIRED')),
+        checked_out=_count_if(Q(checked_out=True)),
+    )
+    stats['soundvision'] = SoundvisionPrediction.objects.filter(project_id=project_id).aggregate(
+        predictions=Count('pk', distinct=True),
+        arrays=Count('speaker_arrays'),
+    )
+    stats['multitrack'] = {
+        'sessions': MultitrackSession.objects.filter(project_id=project_id).count(),
+    }
+
+    # Every show day with its session and mic counts, in date order; the
+    # dashboard lists the first few and the most recently added
+    days = list(
+        ShowDay.objects.filter(project_id=project_id)
+        .annotate(
+            session_count=Count('sessions', distinct=True),
+            mic_count=Count('sessions__mic_assignments'),
+        )
+        .order_by('date', 'pk')
+        .values('id', 'date', 'name', 'session_count', 'mic_count')
+    )
+    mic['sessions'] = sum(day.pop('session_count') for day in days)
+    stats['show_days'] = days[:SHOW_DAYS_LISTED]
+    stats['recent_show_days'] = sorted(days, key=lambda day: day['id'], reverse=True)[:RECENT_SHOW_DAYS]
+
+    stats['recent_cables'] = list(
+        PACableSchedule.objects.filter(project_id=project_id)
+        .order_by('-pk')
+        .values('id', 'label__name', 'destination', 'count', 'cable', 'length')[:RECENT_CABLES]
+    )
+    for cable in stats['recent_cables']:
+        cable['label'] = cable.pop('label__name') or ''
+
+    stats['status'] = {
+        'has_consoles': stats['console']['total'] > 0,
+        'has_devices': stats['device']['total'] > 0,
+        'has_amps': stats['amp']['total'] > 0,
+        'has_show_days': bool(days),
+        'has_comm': stats['comm']['total_packs'] > 0,
+    }
+    return stats
+
+
+class ProjectStatsCache:
+    """Per-project dashboard figures, reloaded when the project's revision
+    stamp moves. Thread-safe; holds at most `size` projects."""
+
+    def __init__(self, size=STATS_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # project_id -> (etag, stats)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, project_id, stamp=None):
+        """The project's figures. `stamp` is its revision_stamp() of
+        STATS_MODULES when the caller already has it."""
+        if stamp is None:
+            stamp = revision_stamp(project_id, STATS_MODULES)
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry is not None and entry[0] == stamp.etag:
+                self._entries.move_to_end(project_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        stats = load_project_stats(project_id)
+        with self._lock:
+            self._entries[project_id] = (stamp.etag, stats)
+            self._entries.move_to_end(project_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+project_stats = ProjectStatsCache()
@@ -0,0 +1,361 @@
+# planner/render_jobs.py
+#
+# Background PDF rendering with cached artifacts.
+#
+# Building a PDF inside the request holds a gunicorn worker for as long as
+# ReportLab takes to lay the pages out — many seconds for a big project's
+# Complete System Report. views.render_report instead hands the report to a
+# RenderJob and answers at once; the page polls views.render_job_status and
+# fetches views.render_job_download when the job is done.
+#
+#   - REPORTS lists the reports jobs can render: how to build each one, and
+#     which modules of the project it reads (project_revisions.py).
+#   - report_revision() is the revision stamp of those modules. A done job
+#     with the same revision is the cache: asking again returns it without
+#     rendering. Asking while one is queued or running returns that
+#     job, so a double click renders once.
+#   - PDFs are written to the default storage under render_cache/. When a
+#     newer revision of a report finishes, the older jobs and files go.
+#   - Jobs run on a local queue, no broker: by default a pool of
+#     RENDER_JOB_WORKERS threads in the web process that took the request
+#     (RENDER_JOB_QUEUE = 'inline' runs them in the caller instead). Job
+#     state lives in RenderJob rows, so any process can answer a poll. A job
+#     whose process died is given up RENDER_JOB_TIMEOUT after a worker picked
+#     it up (RENDER_JOB_QUEUE_TIMEOUT after it was queued, if none did) and
+#     the next request starts over.
+#   - A conditional unique constraint on RenderJob allows one queued or
+#     running job per report revision, so two requests at the same moment
+#     can't both queue one.
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Location, PACableSchedule, RenderJob, SoundvisionPrediction
+from .project_revisions import revision_stamp
+from .utils.pdf_exports.location_pdf import (
+    ALL_LOCATIONS_FILENAME, LOCATION_MODULES, build_all_locations_pdf, build_location_pdf,
+)
+from .utils.pdf_exports.system_report import (
+    SYSTEM_REPORT_MODULES, build_system_report, system_report_filename,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Bump when a report's layout changes, so cached PDFs are rendered again
+RENDER_CACHE_VERSION = 1
+
+# Seconds after which a running job is taken to be lost
+RENDER_JOB_TIMEOUT = 600
+
+# Seconds after which a job no worker has picked up is taken to be lost
+# (its process died before running it); generous, as jobs wait their turn
+RENDER_JOB_QUEUE_TIMEOUT = 3600
+
+
+class RenderError(ValueError):
+    """The render cannot be requested (unknown report, bad parameters)."""
+
+
+class ReportType:
+    """A PDF report render jobs can produce.
+
+    render(project, obj) returns (pdf bytes, filename); obj is the instance
+    named by the report's parameter, or None. modules are the
+    project_revisions.MODULES whose rows the report reads.
+    """
+
+    __slots__ = ('name', 'render', 'modules', 'param')
+
+    def __init__(self, name, render, modules, param=None):
+        self.name = name
+        self.render = render
+        self.modules = tuple(modules)
+        self.param = param   # (request parameter, model with a project FK)
+
+
+REPORTS = {}
+
+
+def report(name, modules, param=None):
+    """Register a render function as report `name`."""
+    def decorator(fn):
+        REPORTS[name] = ReportType(name, fn, modules, param)
+        return fn
+    return decorator
+
+
+# ──────────────────────────────────────────────
+# Reports
+# ──────────────────────────────────────────────
+
+@report('system_report', SYSTEM_REPORT_MODULES)
+def render_system_report(project, obj):
+    return build_system_report(project), system_report_filename(project)
+
+
+@report('all_locations', LOCATION_MODULES)
+def render_all_locations(project, obj):
+    return build_all_locations_pdf(project), ALL_LOCATIONS_FILENAME
+
+
+@report('location', LOCATION_MODULES, param=('location_id', Location))
+def render_location(project, location):
+    return build_location_pdf(location.pk)
+
+
+@report('all_devices', ('devices', 'consoles', 'locations'))
+def render_all_devices(project, obj):
+    from .utils.pdf_exports.device_pdf import export_all_devices_pdf
+    return export_all_devices_pdf(project).content, f'All_Devices_{project.name}.pdf'
+
+
+@report('amps', ('amps', 'amp_models'))
+def render_amps(project, obj):
+    from .utils.pdf_exports.amplifier_pdf import export_all_amps_pdf
+    return export_all_amps_pdf(project).content, 'Amplifier_Assignments.pdf'
+
+
+@report('system_processors', ('processors', 'locations'))
+def render_system_processors(project, obj):
+    from .utils.pdf_exports.system_processor_pdf import generate_system_processor_pdf
+    return generate_system_processor_pdf(project).getvalue(), 'system_processors.pdf'
+
+
+@report('comm', ('comm', 'locations'))
+def render_comm(project, obj):
+    from .utils.pdf_exports.comm_pdf import generate_comm_beltpacks_pdf
+    return generate_comm_beltpacks_pdf(project), 'comm_beltpacks.pdf'
+
+
+@report('pa_cables', ('pa_cables',))
+def render_pa_cables(project, obj):
+    from .utils.pdf_exports.pa_cable_pdf import generate_pa_cable_pdf
+    queryset = PACableSchedule.objects.filter(project=project).select_related('label').order_by(
+        'label__name', 'destination',
+    )
+    return generate_pa_cable_pdf(queryset), 'pa_cable_schedule.pdf'
+
+
+@report('soundvision', ('predictions', 'mic'), param=('prediction_id', SoundvisionPrediction))
+def render_soundvision(project, prediction):
+    from .utils.pdf_exports.soundvision_pdf import generate_soundvision_pdf
+    filename = f"Soundvision_{prediction.file_name.replace(' ', '_')}.pdf"
+    return generate_soundvision_pdf(prediction).getvalue(), filename
+
+
+@report('ip_addresses', ('consoles', 'devices', 'amps', 'amp_models', 'processors', 'locations', 'comm'))
+def render_ip_addresses(project, obj):
+    from .utils.pdf_exports.ip_address_report_pdf import generate_ip_address_report_pdf
+    return generate_ip_address_report_pdf(project=project).getvalue(), 'IP_Address_Report.pdf'
+
+
+@report('mic_tracker', ('mic',))
+def render_mic_tracker(project, obj):
+    from .views import build_mic_tracker_pdf, mic_tracker_pdf_filename
+    return build_mic_tracker_pdf(project), mic_tracker_pdf_filename()
+
+
+# ──────────────────────────────────────────────
+# Requesting and running jobs
+# ──────────────────────────────────────────────
+
+def report_revision(project, report_type, params=''):
+    """The cache key of a report: it changes whenever anything the report
+    reads does (project_revisions.revision_stamp())."""
+    stamp = revision_stamp(project.pk, report_type.modules)
+    key = f'{RENDER_CACHE_VERSION}:{report_type.name}:{params}:{stamp.etag}'
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _param_object(report_type, project, params):
+    """The instance a report's parameter names, and the canonical params
+    string. `params` is a mapping (request.POST) or a params string."""
+    if report_type.param is None:
+        return None, ''
+    name, model = report_type.param
+    if isinstance(params, str):
+        params = dict(part.split('=', 1) for part in params.split('&') if '=' in part)
+    try:
+        pk = int(params.get(name))
+    except (TypeError, ValueError):
+        raise RenderError(f'{name} is required')
+    obj = model.objects.filter(pk=pk, project=project).first()
+    if obj is None:
+        raise RenderError(f'{model._meta.verbose_name} {pk} not found')
+    return obj, f'{name}={pk}'
+
+
+def request_render(project, report_name, params=None, user=None):
+    """The RenderJob answering a request for `report_name` on `project`: the
+    cached one when nothing it reads has changed, one already queued or
+    running for the same data, or a new queued job. Raises RenderError."""
+    report_type = REPORTS.get(report_name)
+    if report_type is None:
+        raise RenderError(f'Unknown report: {report_name}')
+    _, params = _param_object(report_type, project, params or {})
+    revision = report_revision(project, report_type, params)
+
+    jobs = RenderJob.objects.filter(
+        project=project, report_type=report_name, params=params, revision=revision,
+    )
+    done = jobs.filter(status='done').first()
+    if done is not None and default_storage.exists(done.artifact.name):
+        return done
+
+    now = timezone.now()
+    jobs.filter(
+        Q(status='running', started_at__lt=now - timedelta(seconds=RENDER_JOB_TIMEOUT))
+        | Q(status='queued', created_at__lt=now - timedelta(seconds=RENDER_JOB_QUEUE_TIMEOUT)),
+    ).update(status='failed', error='Timed out', finished_at=now)
+    active = jobs.filter(status__in=('queued', 'running'))
+    pending = active.first()
+    if pending is not None:
+        return pending
+
+    try:
+        with transaction.atomic():
+            job = RenderJob.objects.create(
+                project=project, report_type=report_name, params=params, revision=revision,
+                requested_by=user if user is not None and user.is_authenticated else None,
+            )
+    except IntegrityError:
+        # Another request queued it first (unique_active_render_job)
+        return active.get()
+    transaction.on_commit(lambda: get_queue().submit(job.pk))
+    return job
+
+
+def artifact_name(job):
+    params = f"-{job.params.replace('=', '-').replace('&', '-')}" if job.params else ''
+    return f'render_cache/{job.project_id}/{job.report_type}{params}_{job.revision}.pdf'
+
+
+def _set_progress(job_id, progress, stage):
+    RenderJob.objects.filter(pk=job_id, status='running').update(progress=progress, stage=stage)
+
+
+def run_job(job_id):
+    """Render a queued job and store its PDF. Only the caller that moves the
+    job from queued to running renders it; other calls return at once."""
+    claimed = RenderJob.objects.filter(pk=job_id, status='queued').update(
+        status='running', started_at=timezone.now(), progress=5, stage='Loading data',
+    )
+    if not claimed:
+        return
+    job = RenderJob.objects.select_related('project').get(pk=job_id)
+    report_type = REPORTS[job.report_type]
+    started = time.perf_counter()
+    try:
+        obj, _ = _param_object(report_type, job.project, job.params)
+        _set_progress(job.pk, 20, 'Rendering')
+        pdf, filename = report_type.render(job.project, obj)
+        _set_progress(job.pk, 90, 'Saving')
+        name = artifact_name(job)
+        if not default_storage.exists(name):
+            name = default_storage.save(name, ContentFile(pdf))
+    except Exception as exc:
+        logger.exception('Render job %s (%s) failed', job.pk, job.report_type)
+        RenderJob.objects.filter(pk=job.pk, status='running').update(
+            status='failed', stage='', error=str(exc)[:500] or type(exc).__name__,
+            finished_at=timezone.now(),
+        )
+        return
+
+    # Only while still running: request_render may have timed the job out
+    # (and queued a replacement), and a failed job must stay failed
+    finished = RenderJob.objects.filter(pk=job.pk, status='running').update(
+        status='done', progress=100, stage='', artifact=name, filename=filename,
+        byte_size=len(pdf), finished_at=timezone.now(),
+    )
+    if not finished:
+        logger.warning('Render job %s (%s) finished after it timed out', job.pk, job.report_type)
+        return
+    logger.info('Rendered %s for project %s in %.0f ms (%d bytes)',
+                job.report_type, job.project_id, (time.perf_counter() - started) * 1000, len(pdf))
+    _prune(job, name)
+
+
+def _prune(job, name):
+    """Drop the report's finished jobs older than `job`, and their files."""
+    older = RenderJob.objects.filter(
+        project_id=job.project_id, report_type=job.report_type, params=job.params,
+        status__in=('done', 'failed'), created_at__lt=job.created_at,
+    ).exclude(pk=job.pk)
+    for old_name in set(older.exclude(artifact__in=('', name)).values_list('artifact', flat=True)):
+        default_storage.delete(old_name)
+    older.delete()
+
+
+def job_json(job):
+    """What render_report / render_job_status return for `job`."""
+    data = {
+        'success': True,
+        'id': str(job.pk),
+        'report_type': job.report_type,
+        'status': job.status,
+        'progress': job.progress,
+        'stage': job.stage,
+        'status_url': reverse('planner:render_job_status', args=[job.pk]),
+    }
+    if job.status == 'done':
+        data['download_url'] = reverse('planner:render_job_download', args=[job.pk])
+    elif job.status == 'failed':
+        data['error'] = job.error
+    return data
+
+
+# ──────────────────────────────────────────────
+# Queues
+# ──────────────────────────────────────────────
+
+class ThreadQueue:
+    """Runs jobs on a pool of threads in this process, started on first use."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, job_id):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'RENDER_JOB_WORKERS', 2),
+                    thread_name_prefix='render-job',
+                )
+        self._executor.submit(self._run, job_id)
+
+    @staticmethod
+    def _run(job_id):
+        try:
+            run_job(job_id)
+        except Exception:
+            logger.exception('Render job %s crashed', job_id)
+        finally:
+            connections.close_all()
+
+
+class InlineQueue:
+    """Runs each job in the submitting thread."""
+
+    def submit(self, job_id):
+        run_job(job_id)
+
+
+_queues = {'thread': ThreadQueue(), 'inline': InlineQueue()}
+
+
+def get_queue():
+    return _queues[getattr(settings, 'RENDER_JOB_QUEUE', 'thread')]
@@ -0,0 +1,245 @@
+# planner/signal_labels.py
+#
+# Signal-flow editor — in-memory signal-label index for
+# signal_flow_label_autocomplete.
+#
+# The autocomplete fires on every keystroke (200 ms debounce). Searching the
+# nine label sources with icontains per keystroke costs ten queries each
+# time, so each project's labels are loaded once into a SignalLabelIndex: a
+# sorted array of distinct labels, each with the source tags it appears
+# under. A keystroke is a scan of that array in memory that stops at the
+# eighth match, with no database access.
+#
+#   - The index is built lazily, in one UNION query over LABEL_SOURCES, on
+#     the first search after it is missing or stale.
+#   - signals.py invalidates a project's index whenever a label source row is
+#     saved or deleted (and when the device / console / amp / processor
+#     holding them is deleted).
+#   - Like monitor_agent_cache, the cache is per process. Another worker
+#     rebuilds within LABEL_INDEX_TTL of a change; so do writes that skip
+#     signals (queryset.update(), bulk_create).
+#   - stats() reports hit rate and search latency; it is also logged (INFO,
+#     this module's logger) every STATS_LOG_EVERY searches.
+
+import logging
+import threading
+import time
+from collections import deque
+
+from django.db.models import CharField, Value
+
+from .models import (
+    AmpChannel, ConsoleAuxOutput, ConsoleInput, DeviceInput, DeviceOutput,
+    GalaxyInput, GalaxyOutput, P1Input, P1Output,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds an index is trusted without a rebuild
+LABEL_INDEX_TTL = 60
+
+# D-03: max results per search
+MAX_RESULTS = 8
+
+# Log stats once per this many searches
+STATS_LOG_EVERY = 1000
+
+# Search latencies kept for the percentiles in stats()
+LATENCY_SAMPLES = 1000
+
+# (Model, label_field, project-scope lookup, human source tag), in the order
+# tags are listed for a label. SystemProcessor is intentionally NOT a source
+# (D-05: its name is a device identifier, not a signal name).
+#
+# DeviceInput appears TWICE under the same 'Device Input' tag — once for
+# console_input__source, once for signal_name. The DeviceInputInlineForm
+# (planner/forms.py:384-440) binds the engineer's pick to the console_input
+# FK and never writes signal_name, so the production data path leaves
+# signal_name='' and the visible label lives on the linked
+# ConsoleInput.source. The signal_name entry stays for legacy / direct-edit
+# rows. The index merges any overlap.
+LABEL_SOURCES = [
+    (DeviceInput,      'console_input__source', 'device__project',
+     'Device Input'),
+    (DeviceInput,      'signal_name',  'device__project',
+     'Device Input'),
+    (DeviceOutput,     'signal_name',  'device__project',
+     'Device Output'),
+    (ConsoleInput,     'source',       'console__project',
+     'Console Input'),
+    (ConsoleAuxOutput, 'name',         'console__project',
+     'Console Aux Out'),
+    (AmpChannel,       'channel_name', 'amp__project',
+     'Amp Channel'),
+    (P1Input,          'label',        'p1_processor__system_processor__project',
+     'P1 Input'),
+    (P1Output,         'label',        'p1_processor__system_processor__project',
+     'P1 Output'),
+    (GalaxyInput,      'label',        'galaxy_processor__system_processor__project',
+     'Galaxy Input'),
+    (GalaxyOutput,     'label',        'galaxy_processor__system_processor__project',
+     'Galaxy Output'),
+]
+
+_TAG_ORDER = {}
+for _source in LABEL_SOURCES:
+    _TAG_ORDER.setdefault(_source[3], len(_TAG_ORDER))
+
+
+def load_project_labels(project_id):
+    """Every non-blank (label, tag) pair of the project, in one query.
+    LBL-02 / T-10-01: every source is filtered by project."""
+    queries = [
+        Model.objects
+        .filter(**{scope: project_id})
+        .exclude(**{field: ''})
+        .exclude(**{f'{field}__isnull': True})
+        .annotate(label_tag=Value(tag, output_field=CharField()))
+        .values_list(field, 'label_tag')
+        .order_by()
+        .distinct()
+        for Model, field, scope, tag in LABEL_SOURCES
+    ]
+    return list(queries[0].union(*queries[1:], all=True))
+
+
+class SignalLabelIndex:
+    """Distinct labels of one project sorted case-insensitively, each with
+    its source tags in LABEL_SOURCES order."""
+
+    __slots__ = ('rows', 'expires')
+
+    def __init__(self, pairs, expires=None):
+        tags_by_label = {}
+        for label, tag in pairs:
+            tags = tags_by_label.setdefault(label, set())
+            tags.add(tag)
+        self.rows = sorted(
+            (label.lower(), label, tuple(sorted(tags, key=_TAG_ORDER.__getitem__)))
+            for label, tags in tags_by_label.items()
+        )
+        self.expires = expires
+
+    def __len__(self):
+        return len(self.rows)
+
+    def search(self, q='', tags=None, limit=MAX_RESULTS):
+        """Up to `limit` {label, source} dicts whose label contains `q`
+        (case-insensitive), alphabetical by label. `tags` limits the
+        sources (the shape_class allowlist)."""
+        needle = q.lower()
+        results = []
+        for key, label, label_tags in self.rows:
+            if needle not in key:
+                continue
+            for tag in label_tags:
+                if tags is None or tag in tags:
+                    results.append({'label': label, 'source': tag})
+                    if len(results) == limit:
+                        return results
+        return results
+
+
+class LabelIndexCache:
+    """Per-project SignalLabelIndex, built on demand. Thread-safe."""
+
+    def __init__(self, ttl=LABEL_INDEX_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._indexes = {}   # project_id -> SignalLabelIndex
+        # project_id -> invalidate() count; a build that started before the
+        # latest invalidation may have read the old rows and is not kept
+        self._generations = {}
+        self._clears = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.build_ms = 0.0
+
+    def get(self, project_id):
+        """The project's index, rebuilt first when missing or stale."""
+        with self._lock:
+            index = self._indexes.get(project_id)
+            generation = self._generation(project_id)
+        if index is not None and index.expires > self._clock():
+            self._count(hit=True)
+            return index
+        started = time.perf_counter()
+        index = SignalLabelIndex(load_project_labels(project_id), self._clock() + self.ttl)
+        with self._lock:
+            if self._generation(project_id) == generation:
+                self._indexes[project_id] = index
+            self.build_ms += (time.perf_counter() - started) * 1000
+        self._count(hit=False)
+        return index
+
+    def search(self, project_id, q='', tags=None, limit=MAX_RESULTS):
+        """SignalLabelIndex.search() on the project's index, timed for
+        stats()."""
+        index = self.get(project_id)
+        started = time.perf_counter()
+        results = index.search(q, tags, limit)
+        with self._lock:
+            self._latencies.append((time.perf_counter() - started) * 1000)
+        return results
+
+    def invalidate(self, project_id):
+        with self._lock:
+            self._generations[project_id] = self._generations.get(project_id, 0) + 1
+            if self._indexes.pop(project_id, None) is not None:
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._clears += 1
+            self._generations.clear()
+            self._indexes.clear()
+            self._latencies.clear()
+            self.hits = self.misses = self.invalidations = 0
+            self.build_ms = 0.0
+
+    def stats(self):
+        """Hit rate, index sizes and search latency (ms, over the last
+        LATENCY_SAMPLES searches)."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            latencies = sorted(self._latencies)
+            return {
+                'lookups': lookups,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+                'entries': len(self._indexes),
+                'labels': sum(len(index) for index in self._indexes.values()),
+                'build_ms_avg': round(self.build_ms / self.misses, 3) if self.misses else None,
+                'search_ms_p50': _percentile(latencies, 0.50),
+                'search_ms_p95': _percentile(latencies, 0.95),
+                'search_ms_max': round(latencies[-1], 3) if latencies else None,
+            }
+
+    def _generation(self, project_id):
+        # Caller holds self._lock
+        return self._clears, self._generations.get(project_id, 0)
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            lookups = self.hits + self.misses
+        if lookups % STATS_LOG_EVERY == 0:
+            logger.info('Signal label index: %s', self.stats())
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return None
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+
+label_index = LabelIndexCache()
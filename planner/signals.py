@@ -1,12 +1,19 @@
 from django.db import IntegrityError
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import (
-    UserProfile,
+    UserProfile, Project, ProjectMember,
     ConsoleInput, ConsoleAuxOutput, ConsoleMatrixOutput, ConsoleStereoOutput,
-    MicSession, MicAssignment,
+    ShowDay, MicSession, MicAssignment, PresenterSlot,
+    Console, Device, DeviceInput, DeviceOutput, Amp, AmpChannel,
+    SystemProcessor, P1Processor, P1Input, P1Output,
+    GalaxyProcessor, GalaxyInput, GalaxyOutput,
 )
+from .mic_changes import record_mic_changes
+from .project_access import bump_access_version
+from .project_revisions import TRACKED, begin_delete, record_delete, record_save
+from .signal_labels import label_index
 
 
 @receiver(post_save, sender=User)
@@ -114,4 +121,224 @@ def consolestereooutput_to_manual(sender, instance, **kwargs):
         # but may be empty/None for unset stereo_type — fall back to sentinel.
         display = instance.get_stereo_type_display() if instance.stereo_type else ''
         label = display or '(deleted stereo)'
-    _convert_orphans_to_manual('stereo', instance.pk, label)
\ No newline at end of file
+    _convert_orphans_to_manual('stereo', instance.pk, label)
+
+
+# ──────────────────────────────────────────────────────────────────
+# Mic tracker change feed (mic_changes.py)
+# Every save/delete of a mic tracker row bumps the project's revision and
+# logs the row. Deletes are logged for the object deleted directly; rows
+# removed by its cascade are implied by it (and when the cascade started
+# at the Project or above, there is no feed left to write to).
+# ──────────────────────────────────────────────────────────────────
+
+_MIC_KINDS = {
+    ShowDay: 'day',
+    MicSession: 'session',
+    MicAssignment: 'assignment',
+    PresenterSlot: 'slot',
+}
+
+# model -> (parent FK, parent model, parent's lookup of project_id)
+_MIC_PARENTS = {
+    MicSession: ('day', ShowDay, 'project_id'),
+    MicAssignment: ('session', MicSession, 'day__project_id'),
+    PresenterSlot: ('assignment', MicAssignment, 'session__day__project_id'),
+}
+
+
+def _mic_project_id(instance):
+    """Project of a mic tracker row, walking already-loaded parents before
+    falling back to one query."""
+    return _walk_project_id(instance, _MIC_PARENTS)
+
+
+def _walk_project_id(instance, parents):
+    while type(instance) in parents:
+        field, parent_model, lookup = parents[type(instance)]
+        if not getattr(type(instance), field).is_cached(instance):
+            return parent_model.objects.filter(
+                pk=getattr(instance, f'{field}_id')
+            ).values_list(lookup, flat=True).first()
+        instance = getattr(instance, field)
+    return instance.project_id
+
+
+def _is_delete_origin(instance, origin):
+    model = getattr(origin, 'model', type(origin))
+    return model is type(instance)
+
+
+@receiver(post_save, sender=ShowDay)
+@receiver(post_save, sender=MicSession)
+@receiver(post_save, sender=MicAssignment)
+@receiver(post_save, sender=PresenterSlot)
+def record_mic_tracker_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    record_mic_changes(_mic_project_id(instance), [(_MIC_KINDS[sender], instance.pk, 'save')])
+
+
+@receiver(post_delete, sender=ShowDay)
+@receiver(post_delete, sender=MicSession)
+@receiver(post_delete, sender=MicAssignment)
+@receiver(post_delete, sender=PresenterSlot)
+def record_mic_tracker_delete(sender, instance, origin=None, **kwargs):
+    if origin is not None and not _is_delete_origin(instance, origin):
+        return
+    record_mic_changes(_mic_project_id(instance), [(_MIC_KINDS[sender], instance.pk, 'delete')])
+
+
+# ──────────────────────────────────────────────────────────────────
+# Signal-label index (signal_labels.py)
+# Any save/delete of a label source row drops the project's in-memory
+# label index. A row removed by a cascade is covered by the delete of its
+# device / console / amp / system processor, which always invalidates (it
+# knows its project without a query); a project delete drops the index
+# outright.
+# ──────────────────────────────────────────────────────────────────
+
+_LABEL_PARENTS = {
+    DeviceInput: ('device', Device, 'project_id'),
+    DeviceOutput: ('device', Device, 'project_id'),
+    ConsoleInput: ('console', Console, 'project_id'),
+    ConsoleAuxOutput: ('console', Console, 'project_id'),
+    AmpChannel: ('amp', Amp, 'project_id'),
+    P1Input: ('p1_processor', P1Processor, 'system_processor__project_id'),
+    P1Output: ('p1_processor', P1Processor, 'system_processor__project_id'),
+    GalaxyInput: ('galaxy_processor', GalaxyProcessor, 'system_processor__project_id'),
+    GalaxyOutput: ('galaxy_processor', GalaxyProcessor, 'system_processor__project_id'),
+    P1Processor: ('system_processor', SystemProcessor, 'project_id'),
+    GalaxyProcessor: ('system_processor', SystemProcessor, 'project_id'),
+}
+
+
+@receiver(post_save, sender=DeviceInput)
+@receiver(post_save, sender=DeviceOutput)
+@receiver(post_save, sender=ConsoleInput)
+@receiver(post_save, sender=ConsoleAuxOutput)
+@receiver(post_save, sender=AmpChannel)
+@receiver(post_save, sender=P1Input)
+@receiver(post_save, sender=P1Output)
+@receiver(post_save, sender=GalaxyInput)
+@receiver(post_save, sender=GalaxyOutput)
+def signal_label_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        label_index.invalidate(_walk_project_id(instance, _LABEL_PARENTS))
+
+
+@receiver(post_delete, sender=DeviceInput)
+@receiver(post_delete, sender=DeviceOutput)
+@receiver(post_delete, sender=ConsoleInput)
+@receiver(post_delete, sender=ConsoleAuxOutput)
+@receiver(post_delete, sender=AmpChannel)
+@receiver(post_delete, sender=P1Input)
+@receiver(post_delete, sender=P1Output)
+@receiver(post_delete, sender=GalaxyInput)
+@receiver(post_delete, sender=GalaxyOutput)
+@receiver(post_delete, sender=P1Processor)
+@receiver(post_delete, sender=GalaxyProcessor)
+def signal_label_deleted(sender, instance, origin=None, **kwargs):
+    if origin is not None and not _is_delete_origin(instance, origin):
+        return
+    label_index.invalidate(_walk_project_id(instance, _LABEL_PARENTS))
+
+
+@receiver(post_delete, sender=Device)
+@receiver(post_delete, sender=Console)
+@receiver(post_delete, sender=Amp)
+@receiver(post_delete, sender=SystemProcessor)
+def signal_label_parent_deleted(sender, instance, **kwargs):
+    label_index.invalidate(instance.project_id)
+
+
+@receiver(post_save, sender=Project)
+def signal_label_project_created(sender, instance, created, **kwargs):
+    # A new project may reuse the id of a deleted one (SQLite)
+    if created:
+        label_index.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=Project)
+def signal_label_project_deleted(sender, instance, **kwargs):
+    label_index.invalidate(instance.pk)
+
+
+# ──────────────────────────────────────────────────────────────────
+# Project access stamps (project_access.py)
+# Bump the stamp of every user whose owned projects or memberships just
+# changed, so their cached access is recomputed on the next request.
+# Members of a deleted project are covered by the ProjectMember cascade.
+# ──────────────────────────────────────────────────────────────────
+
+@receiver(pre_save, sender=Project)
+def remember_project_owner(sender, instance, raw=False, **kwargs):
+    instance._saved_owner_id = None
+    if instance.pk is not None and not raw:
+        instance._saved_owner_id = (
+            Project.objects.filter(pk=instance.pk).values_list('owner_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Project)
+def project_owner_access_changed(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_saved_owner_id', None)
+    if created or previous != instance.owner_id:
+        bump_access_version(instance.owner_id, previous)
+
+
+def _is_user_delete(origin, user_id):
+    """True when the delete started at this very user: their stamp is going
+    away with them, so there is nothing left to invalidate."""
+    if isinstance(origin, User):
+        return origin.pk == user_id
+    if getattr(origin, 'model', None) is User:
+        return origin.filter(pk=user_id).exists()
+    return False
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted_access_changed(sender, instance, origin=None, **kwargs):
+    if not _is_user_delete(origin, instance.owner_id):
+        bump_access_version(instance.owner_id)
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def project_member_access_changed(sender, instance, raw=False, origin=None, **kwargs):
+    if not raw and not _is_user_delete(origin, instance.user_id):
+        bump_access_version(instance.user_id)
+
+
+@receiver(post_save, sender=UserProfile)
+def user_profile_access_changed(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        bump_access_version(instance.user_id)
+
+
+# ──────────────────────────────────────────────────────────────────
+# Project revisions (project_revisions.py)
+# Every save/delete of a row in one of the MODULES bumps that module's
+# counter in the row's project. Connected in a loop: the tracked models are
+# listed once, in project_revisions.MODULES.
+# ──────────────────────────────────────────────────────────────────
+
+def project_revision_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_save(instance)
+
+
+def project_revision_deleting(sender, instance, origin=None, **kwargs):
+    begin_delete(instance, origin)
+
+
+def project_revision_deleted(sender, instance, origin=None, **kwargs):
+    record_delete(instance, origin)
+
+
+for _model in TRACKED:
+    post_save.connect(project_revision_saved, sender=_model, dispatch_uid=f'project_revision_saved_{_model.__name__}')
+    pre_delete.connect(project_revision_deleting, sender=_model, dispatch_uid=f'project_revision_deleting_{_model.__name__}')
+    post_delete.connect(project_revision_deleted, sender=_model, dispatch_uid=f'project_revision_deleted_{_model.__name__}')
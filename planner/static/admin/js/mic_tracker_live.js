@@ -0,0 +1,154 @@
+// Live mic tracker updates (planner/mic_changes.py). Polls the change feed
+// for what other users changed since our revision, asks
+// views.mic_tracker_days to re-render just the show days those changes
+// touched, and swaps them into the page in place. A day holding what the
+// user is editing waits until they're done. Only when the feed answers
+// reset (its log no longer reaches our revision) does the page fall back to
+// options.onReset, which offers a full reload.
+//
+//   MicTrackerLive.start({
+//       page: 'tracker' | 'overview',     // which day partial to render
+//       container: element,               // holds the [data-day-id] days
+//       isEditing: function (dayEl),      // optional: defer swapping it
+//       afterSwap: function (dayEl),      // optional: re-apply UI state
+//       afterApply: function (),          // optional: after each batch
+//       onReset: function (),
+//   });
+(function () {
+    'use strict';
+
+    var POLL_MS = 5000;
+    var ATTRS = {
+        day: 'data-day-id',
+        session: 'data-session-id',
+        assignment: 'data-assignment-id',
+        slot: 'data-slot-id',
+    };
+    var KINDS = Object.keys(ATTRS);
+
+    function start(options) {
+        var container = options.container;
+        var revision = null;
+        var pending = {};   // kind -> {id: true}, not yet on the page
+        var busy = false;
+        KINDS.forEach(function (kind) { pending[kind] = {}; });
+
+        function hasPending() {
+            return KINDS.some(function (kind) { return Object.keys(pending[kind]).length > 0; });
+        }
+
+        function dayElements() {
+            var days = {};
+            container.querySelectorAll(':scope > [data-day-id]').forEach(function (el) {
+                days[el.getAttribute('data-day-id')] = el;
+            });
+            return days;
+        }
+
+        // The day an object is shown in now; deleted objects are only found here
+        function dayOf(kind, id) {
+            var el = container.querySelector('[' + ATTRS[kind] + '="' + id + '"]');
+            var day = el && el.closest('[data-day-id]');
+            return day ? day.getAttribute('data-day-id') : null;
+        }
+
+        function editing(dayEl) {
+            return !!(dayEl && options.isEditing && options.isEditing(dayEl));
+        }
+
+        function swap(data) {
+            var days = dayElements();
+            var ids = Object.keys(data.days);
+            var order = data.order.map(String);
+            if (ids.some(function (id) { return editing(days[id]); })) return false;
+            if (Object.keys(days).some(function (id) {
+                return order.indexOf(id) < 0 && editing(days[id]);
+            })) return false;
+
+            ids.forEach(function (id) {
+                var tpl = document.createElement('template');
+                tpl.innerHTML = data.days[id].trim();
+                var fresh = tpl.content.firstElementChild;
+                if (!fresh) return;
+                if (days[id]) {
+                    days[id].replaceWith(fresh);
+                } else {
+                    container.appendChild(fresh);
+                }
+                days[id] = fresh;
+                if (options.afterSwap) options.afterSwap(fresh);
+            });
+            Object.keys(days).forEach(function (id) {
+                if (order.indexOf(id) < 0) {
+                    days[id].remove();
+                    delete days[id];
+                }
+            });
+
+            // Move days only when they are out of order (a new day, a changed date)
+            var shown = order.filter(function (id) { return days[id]; });
+            var now = Array.prototype.map.call(
+                container.querySelectorAll(':scope > [data-day-id]'),
+                function (el) { return el.getAttribute('data-day-id'); }
+            );
+            if (now.join() !== shown.join()) {
+                shown.forEach(function (id) { container.appendChild(days[id]); });
+            }
+            if (options.afterApply) options.afterApply();
+            return true;
+        }
+
+        async function apply() {
+            var sent = {};
+            var params = new URLSearchParams({ page: options.page, t: Date.now() });
+            KINDS.forEach(function (kind) {
+                sent[kind] = Object.keys(pending[kind]);
+                sent[kind].forEach(function (id) {
+                    params.append(kind, id);
+                    var day = dayOf(kind, id);
+                    if (day) params.append('day', day);
+                });
+            });
+            var r = await fetch('/api/mic-tracker-days/?' + params, { cache: 'no-store', credentials: 'same-origin' });
+            if (!r.ok) return;
+            if (!swap(await r.json())) return;   // the user is editing: next poll
+            KINDS.forEach(function (kind) {
+                sent[kind].forEach(function (id) { delete pending[kind][id]; });
+            });
+        }
+
+        async function poll() {
+            if (busy) return;
+            busy = true;
+            try {
+                // Cache-bust + no-store so a caching proxy on a slow shared
+                // network can't feed this machine a stale revision.
+                var since = revision === null ? '' : '&since=' + revision;
+                var r = await fetch('/api/mic-tracker-changes/?t=' + Date.now() + since, { cache: 'no-store' });
+                if (r.ok) {
+                    var data = await r.json();
+                    if (data.revision !== null && data.revision !== undefined) {
+                        if (revision !== null && (data.reset || !container)) {
+                            if (data.revision !== revision) options.onReset();
+                            KINDS.forEach(function (kind) { pending[kind] = {}; });
+                        } else if (revision !== null) {
+                            data.changes.forEach(function (change) {
+                                if (pending[change.kind]) pending[change.kind][change.id] = true;
+                            });
+                        }
+                        revision = data.revision;
+                    }
+                }
+                if (container && hasPending()) await apply();
+            } catch (e) {
+            } finally {
+                busy = false;
+            }
+        }
+
+        setInterval(poll, POLL_MS);
+        setTimeout(poll, POLL_MS);
+    }
+
+    window.MicTrackerLive = { start: start };
+})();
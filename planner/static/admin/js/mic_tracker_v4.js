@@ -54,7 +54,7 @@ async function updateField(assignmentId, field, value) {
                 if (activeChip) activeChip.textContent = data.presenter_display || 'Unassigned';
                 // Issue #10: sync photo zone with the newly-assigned presenter's headshot
                 if (typeof syncAssignmentPhoto === 'function') {
-                    syncAssignmentPhoto(assignmentId, data.slot_photo_data || '', data.active_slot_id || null);
+                    syncAssignmentPhoto(assignmentId, data.slot_photo_url || '', data.active_slot_id || null);
                 }
             }
             
@@ -70,7 +70,7 @@ async function updateField(assignmentId, field, value) {
                 }
                 // Issue #10: sync photo zone with the newly-assigned presenter's headshot
                 if (typeof syncAssignmentPhoto === 'function') {
-                    syncAssignmentPhoto(assignmentId, data.slot_photo_data || '', data.active_slot_id || null);
+                    syncAssignmentPhoto(assignmentId, data.slot_photo_url || '', data.active_slot_id || null);
                 }
             }
             
@@ -0,0 +1,83 @@
+// Background PDF renders (planner/render_jobs.py). A PDF link carrying
+// data-render-url POSTs there instead of building the PDF in the request,
+// polls the job's status_url, shows the progress in the link text and opens
+// the job's download_url when it's done. data-render-params
+// ("location_id=12") is sent as form data. The link's href is the fallback
+// when the render endpoint fails.
+(function () {
+    'use strict';
+
+    var POLL_MS = 1000;
+
+    function getCookie(name) {
+        var cookies = document.cookie ? document.cookie.split(';') : [];
+        for (var i = 0; i < cookies.length; i++) {
+            var c = cookies[i].trim();
+            if (c.slice(0, name.length + 1) === name + '=') {
+                return decodeURIComponent(c.slice(name.length + 1));
+            }
+        }
+        return '';
+    }
+
+    function finish(link, label, win, url) {
+        link.dataset.rendering = '';
+        link.innerHTML = label;
+        if (win) {
+            win.location.href = url;
+        } else {
+            window.location.href = url;
+        }
+    }
+
+    function poll(link, label, win, job) {
+        if (job.status === 'done') {
+            finish(link, label, win, job.download_url);
+            return;
+        }
+        if (job.status === 'failed') {
+            link.dataset.rendering = '';
+            link.innerHTML = label;
+            if (win) win.close();
+            window.alert('PDF export failed: ' + (job.error || 'unknown error'));
+            return;
+        }
+        link.textContent = (job.stage || 'Queued') + '… ' + job.progress + '%';
+        setTimeout(function () {
+            fetch(job.status_url, { credentials: 'same-origin' })
+                .then(function (r) { return r.json(); })
+                .then(function (next) { poll(link, label, win, next); })
+                .catch(function () { finish(link, label, win, link.href); });
+        }, POLL_MS);
+    }
+
+    document.addEventListener('click', function (e) {
+        var link = e.target.closest('a[data-render-url]');
+        if (!link || e.ctrlKey || e.metaKey || e.shiftKey) return;
+        e.preventDefault();
+        if (link.dataset.rendering === '1') return;
+        link.dataset.rendering = '1';
+
+        var label = link.innerHTML;
+        // Open the tab now, while the click still counts as a user gesture;
+        // popup blockers would stop a window.open after the fetch.
+        var win = link.target === '_blank' ? window.open('', '_blank') : null;
+
+        fetch(link.dataset.renderUrl, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'X-CSRFToken': getCookie('csrftoken'),
+                'X-Requested-With': 'XMLHttpRequest',
+            },
+            body: link.dataset.renderParams || '',
+        })
+            .then(function (r) {
+                if (!r.ok && r.status !== 202) throw new Error(r.status);
+                return r.json();
+            })
+            .then(function (job) { poll(link, label, win, job); })
+            .catch(function () { finish(link, label, win, link.href); });
+    });
+})();
@@ -0,0 +1,128 @@
+"""Tests for the mic tracker read model (planner/mic_grid.py).
+
+The mic tracker pages and the PDF export render from build_mic_grid(); their
+query count must not depend on the size of the show.
+"""
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from planner.mic_grid import build_mic_grid
+from planner.models import (
+    MicAssignment,
+    MicGroup,
+    MicSession,
+    Presenter,
+    PresenterSlot,
+    Project,
+    SharedPresenterAssignment,
+    ShowDay,
+)
+
+User = get_user_model()
+
+
+def make_show(project, days, sessions, mics):
+    """days x sessions x mics grid with one slot per mic (two on RF 1), a
+    group on every session and a shared presenter on RF 1."""
+    presenter = Presenter.objects.create(name=f'Presenter {project.pk}', project=project)
+    show_days = [
+        ShowDay.objects.create(project=project, date=datetime.date(2026, 5, 1) + datetime.timedelta(days=d))
+        for d in range(days)
+    ]
+    # bulk_create skips MicSession.save(), which would create the assignments one by one
+    mic_sessions = MicSession.objects.bulk_create([
+        MicSession(day=day, name=f'Session {s}', order=s, num_mics=mics)
+        for day in show_days for s in range(sessions)
+    ])
+    groups = MicGroup.objects.bulk_create([MicGroup(session=s, name='Band') for s in mic_sessions])
+    assignments = MicAssignment.objects.bulk_create([
+        MicAssignment(session=s, rf_number=rf, is_micd=rf % 2 == 0)
+        for s in mic_sessions for rf in range(1, mics + 1)
+    ])
+    PresenterSlot.objects.bulk_create([
+        PresenterSlot(assignment=a, presenter=presenter, order=0, is_active=a.rf_number != 1)
+        for a in assignments
+    ] + [
+        PresenterSlot(assignment=a, order=1) for a in assignments if a.rf_number == 1
+    ])
+    first_mics = [a for a in assignments if a.rf_number == 1]
+    MicAssignment.groups.through.objects.bulk_create([
+        MicAssignment.groups.through(micassignment_id=a.pk, micgroup_id=g.pk)
+        for a, g in zip(first_mics, groups)
+    ])
+    SharedPresenterAssignment.objects.bulk_create([
+        SharedPresenterAssignment(mic_assignment=a, presenter=presenter) for a in first_mics
+    ])
+    return show_days
+
+
+class MicGridTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='a1', email='a1@example.com', password='pw', is_staff=True,
+        )
+        cls.small = Project.objects.create(name='Small Show', owner=cls.user)
+        cls.medium = Project.objects.create(name='Medium Show', owner=cls.user)
+        cls.large = Project.objects.create(name='Large Show', owner=cls.user)
+        make_show(cls.small, 1, 1, 2)
+        make_show(cls.medium, 2, 3, 6)
+        make_show(cls.large, 10, 8, 40)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        # Warm the session's cached project access
+        self.client.get(reverse('planner:mic_tracker_changes'))
+
+    def _count(self, project, url):
+        session = self.client.session
+        session['current_project_id'] = project.pk
+        session.save()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_grid_loads_10_days_8_sessions_40_mics_in_fixed_queries(self):
+        with self.assertNumQueries(8):
+            grid = build_mic_grid(ShowDay.objects.filter(project=self.large).order_by('date'))
+        with self.assertNumQueries(0):
+            for day in grid:
+                for session in day['sessions']:
+                    session.get_mic_usage_stats()
+                    for assignment in session.mic_assignments.all():
+                        assignment.active_slot
+                        for slot in assignment.presenter_slots.all():
+                            list(slot.groups.all())
+                            list(slot.a2_groups.all())
+                        list(assignment.groups.all())
+        self.assertEqual(len(grid), 10)
+        self.assertEqual(sum(len(day['sessions']) for day in grid), 80)
+        self.assertEqual(grid[0]['stats'], {'total': 320, 'used': 160, 'available': 160})
+
+    def test_pages_query_count_does_not_grow_with_the_show(self):
+        for name in ('planner:mic_tracker', 'planner:mic_tracker_overview', 'planner:export_mic_tracker_pdf'):
+            with self.subTest(name):
+                url = reverse(name)
+                small = self._count(self.small, url)
+                self.assertEqual(self._count(self.medium, url), small)
+                self.assertLess(small, 30)
+
+    def test_grid_stats_match_model_helpers(self):
+        grid = build_mic_grid(ShowDay.objects.filter(project=self.medium).order_by('date'))
+        session = grid[0]['sessions'][0]
+        with self.assertNumQueries(0):
+            stats = session.get_mic_usage_stats()
+            first = session.mic_assignments.all()[0]
+            active = first.active_slot
+        self.assertEqual(stats, MicSession.objects.get(pk=session.pk).get_mic_usage_stats())
+        self.assertEqual(active, MicAssignment.objects.get(pk=first.pk).active_slot)
+        self.assertEqual(active.order, 0)
+        self.assertEqual(grid[0]['stats'], grid[0]['day'].get_all_mics_status())
@@ -0,0 +1,125 @@
+"""Tests for the bulk MicSession paths: create_mic_assignments,
+renumber_assignments and duplicate_to_session.
+
+Each must issue the same number of queries whatever the session size, and
+still feed the mic tracker change log (mic_changes.py).
+"""
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from planner.mic_changes import current_revision, mic_changes_since
+from planner.models import (
+    MicAssignment,
+    MicSession,
+    Presenter,
+    PresenterSlot,
+    Project,
+    SharedPresenterAssignment,
+    ShowDay,
+)
+
+User = get_user_model()
+
+
+class MicSessionBulkTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='a1', email='a1@example.com', password='pw', is_staff=True,
+        )
+        cls.project = Project.objects.create(name='Summit', owner=cls.user)
+        cls.day = ShowDay.objects.create(project=cls.project, date=datetime.date(2026, 4, 1))
+        cls.presenter = Presenter.objects.create(name='Keynote Speaker', project=cls.project)
+
+    def _queries(self, fn, *args, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            fn(*args, **kwargs)
+        return len(ctx.captured_queries)
+
+    def _session(self, mics, name='Session'):
+        return MicSession.objects.create(day=self.day, name=name, num_mics=mics)
+
+    def test_create_mic_assignments_is_constant(self):
+        self._session(1, 'First')  # creates the project's revision counter
+        small = self._queries(self._session, 5, 'Small')
+        # 40 rows stay inside one SQLite bulk_create batch
+        large = self._queries(self._session, 40, 'Large')
+        self.assertEqual(small, large)
+        session = MicSession.objects.get(name='Large')
+        self.assertEqual(
+            list(session.mic_assignments.values_list('rf_number', flat=True)), list(range(1, 41)),
+        )
+
+    def test_renumber_assignments_is_constant(self):
+        counts = []
+        for mics in (5, 60):
+            session = self._session(mics, f'S{mics}')
+            MicAssignment.objects.filter(session=session, rf_number__in=(1, 3)).update(rf_number=0)
+            MicAssignment.objects.filter(session=session, rf_number=0).delete()
+            # Gaps left by an update that skipped the signal
+            MicAssignment.objects.filter(session=session, rf_number=4).update(rf_number=40 + mics)
+            start = current_revision(self.project.pk)
+            counts.append(self._queries(session.renumber_assignments))
+            self.assertEqual(
+                list(session.mic_assignments.values_list('rf_number', flat=True)),
+                list(range(1, mics - 1)),
+            )
+            session.refresh_from_db()
+            self.assertEqual(session.num_mics, mics - 2)
+            changed = mic_changes_since(self.project.pk, start)['changes']
+            self.assertEqual(len([c for c in changed if c['kind'] == 'assignment']), mics - 2)
+        self.assertEqual(counts[0], counts[1])
+
+    def _filled_session(self, mics, name):
+        session = self._session(mics, name)
+        for assignment in session.mic_assignments.all():
+            PresenterSlot.objects.create(assignment=assignment, presenter=self.presenter, is_active=True)
+            PresenterSlot.objects.create(assignment=assignment, order=1, notes='Q&A')
+            SharedPresenterAssignment.objects.create(
+                mic_assignment=assignment, presenter=self.presenter, placement='TIE',
+            )
+        return session
+
+    def test_duplicate_to_session_is_constant_and_copies_rows(self):
+        counts = []
+        for mics in (3, 30):
+            source = self._filled_session(mics, f'Source {mics}')
+            target = MicSession(day=self.day, name=f'Copy {mics}', num_mics=mics)
+            target.save(create_assignments=False)
+            start = current_revision(self.project.pk)
+            counts.append(self._queries(source.duplicate_to_session, target))
+
+            self.assertEqual(target.mic_assignments.count(), mics)
+            self.assertEqual(PresenterSlot.objects.filter(assignment__session=target).count(), 2 * mics)
+            self.assertEqual(
+                SharedPresenterAssignment.objects.filter(
+                    mic_assignment__session=target, placement='TIE',
+                ).count(),
+                mics,
+            )
+            first = target.mic_assignments.get(rf_number=1)
+            self.assertEqual(first.active_slot.presenter, self.presenter)
+            kinds = {c['kind'] for c in mic_changes_since(self.project.pk, start)['changes']}
+            self.assertEqual(kinds, {'assignment', 'slot'})
+        self.assertEqual(counts[0], counts[1])
+
+    def test_duplicate_session_view_copies_without_blank_assignments(self):
+        source = self._filled_session(4, 'Opening')
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(
+            reverse('planner:duplicate_session'),
+            data=json.dumps({'source_session_id': source.pk, 'target_session_name': 'Opening (copy)'}),
+            content_type='application/json',
+        )
+        self.assertTrue(response.json()['success'])
+        copy = MicSession.objects.get(pk=response.json()['session_id'])
+        self.assertEqual(list(copy.mic_assignments.values_list('rf_number', flat=True)), [1, 2, 3, 4])
+        self.assertEqual(PresenterSlot.objects.filter(assignment__session=copy).count(), 8)
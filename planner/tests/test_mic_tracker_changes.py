@@ -0,0 +1,154 @@
+"""Tests for the mic tracker change feed (planner/mic_changes.py).
+
+Covers the revision counter and change log written by the model signals,
+the bulk-update call sites that record their own rows, and the
+/api/mic-tracker-changes/ endpoint polled by the tracker pages.
+"""
+import datetime
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from planner import mic_changes
+from planner.mic_changes import current_revision, mic_changes_since, record_mic_changes
+from planner.models import (
+    MicAssignment,
+    MicSession,
+    MicTrackerChange,
+    PresenterSlot,
+    Project,
+    ShowDay,
+)
+
+User = get_user_model()
+
+
+class MicTrackerChangeFeedTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='a2-tablet', email='a2@example.com', password='pw', is_staff=True,
+        )
+        cls.project = Project.objects.create(name='Conference', owner=cls.user)
+        cls.day = ShowDay.objects.create(project=cls.project, date=datetime.date(2026, 3, 2))
+        cls.session = MicSession.objects.create(day=cls.day, name='Keynote', num_mics=4)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['current_project_id'] = self.project.id
+        session.save()
+
+    def _poll(self, since=None):
+        url = '/api/mic-tracker-changes/'
+        if since is not None:
+            url += f'?since={since}'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-store', response['Cache-Control'])
+        return json.loads(response.content)
+
+    def test_saves_and_deletes_bump_revision(self):
+        start = current_revision(self.project.id)
+        assignment = self.session.mic_assignments.get(rf_number=1)
+        assignment.is_micd = True
+        assignment.save()
+        slot = PresenterSlot.objects.create(assignment=assignment, order=0, is_active=True)
+        slot_id = slot.pk
+        slot.delete()
+
+        feed = mic_changes_since(self.project.id, start)
+        self.assertEqual(feed['revision'], start + 3)
+        self.assertFalse(feed['reset'])
+        self.assertEqual(feed['changes'], [
+            {'kind': 'assignment', 'id': assignment.pk, 'op': 'save'},
+            {'kind': 'slot', 'id': slot_id, 'op': 'delete'},
+        ])
+
+    def test_no_change_poll_is_one_query(self):
+        revision = current_revision(self.project.id)
+        with self.assertNumQueries(1):
+            feed = mic_changes_since(self.project.id, revision)
+        self.assertEqual(feed, {'revision': revision, 'changes': [], 'reset': False})
+
+    def test_cascade_delete_logs_only_the_deleted_object(self):
+        other = MicSession.objects.create(day=self.day, name='Panel', num_mics=3)
+        start = current_revision(self.project.id)
+        other_id = other.pk
+        other.delete()
+        feed = mic_changes_since(self.project.id, start)
+        self.assertEqual(feed['changes'], [{'kind': 'session', 'id': other_id, 'op': 'delete'}])
+
+    def test_project_delete_leaves_no_feed_rows(self):
+        project = Project.objects.create(name='Gone', owner=self.user)
+        day = ShowDay.objects.create(project=project, date=datetime.date(2026, 3, 3))
+        MicSession.objects.create(day=day, name='Breakout', num_mics=2)
+        project.delete()
+        self.assertFalse(MicTrackerChange.objects.filter(project_id=project.pk).exists())
+
+    def test_bulk_update_view_records_assignments(self):
+        start = current_revision(self.project.id)
+        response = self.client.post(
+            reverse('planner:bulk_update_mics'),
+            data=json.dumps({'session_id': self.session.pk, 'action': 'check_all_micd'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        feed = self._poll(start)
+        self.assertEqual(
+            {c['id'] for c in feed['changes'] if c['kind'] == 'assignment'},
+            set(self.session.mic_assignments.values_list('pk', flat=True)),
+        )
+
+    def test_endpoint_reports_reset_when_log_is_trimmed(self):
+        start = current_revision(self.project.id)
+        for _ in range(3):
+            record_mic_changes(self.project.id, [('day', self.day.pk, 'save')])
+        MicTrackerChange.objects.filter(project=self.project, revision=start + 1).delete()
+
+        self.assertEqual(self._poll()['revision'], start + 3)
+        self.assertTrue(self._poll(start)['reset'])
+        self.assertFalse(self._poll(start + 1)['reset'])
+        self.assertTrue(self._poll(start + 10)['reset'])
+
+    def test_log_is_trimmed_past_keep_window(self):
+        keep, every = mic_changes.CHANGE_LOG_KEEP, mic_changes.CHANGE_LOG_TRIM_EVERY
+        mic_changes.CHANGE_LOG_KEEP, mic_changes.CHANGE_LOG_TRIM_EVERY = 5, 5
+        try:
+            for _ in range(20):
+                record_mic_changes(self.project.id, [('day', self.day.pk, 'save')])
+        finally:
+            mic_changes.CHANGE_LOG_KEEP, mic_changes.CHANGE_LOG_TRIM_EVERY = keep, every
+        revision = current_revision(self.project.id)
+        oldest = MicTrackerChange.objects.filter(project=self.project).order_by('revision').first()
+        self.assertGreater(oldest.revision, revision - 10)
+
+    def test_checksum_endpoint_follows_revision(self):
+        first = json.loads(self.client.get('/api/mic-tracker-checksum/').content)['checksum']
+        MicAssignment.objects.filter(session=self.session).first().save()
+        second = json.loads(self.client.get('/api/mic-tracker-checksum/').content)['checksum']
+        self.assertNotEqual(first, second)
+
+    def test_days_endpoint_renders_only_the_touched_days(self):
+        later = ShowDay.objects.create(project=self.project, date=datetime.date(2026, 3, 3))
+        MicSession.objects.create(day=later, name='Closing', num_mics=2)
+        other = Project.objects.create(name='Other', owner=self.user)
+        other_day = ShowDay.objects.create(project=other, date=datetime.date(2026, 3, 1))
+        assignment = self.session.mic_assignments.get(rf_number=2)
+
+        url = '/api/mic-tracker-days/'
+        data = self.client.get(url, {'assignment': assignment.pk, 'day': other_day.pk}).json()
+        self.assertEqual(data['order'], [self.day.pk, later.pk])
+        self.assertEqual(list(data['days']), [str(self.day.pk)])
+        self.assertIn(f'id="a1-row-{assignment.pk}"', data['days'][str(self.day.pk)])
+
+        data = self.client.get(url, {'page': 'overview', 'day': later.pk}).json()
+        self.assertEqual(list(data['days']), [str(later.pk)])
+        self.assertIn(f'id="mto-day-{later.pk}"', data['days'][str(later.pk)])
+
+        self.assertEqual(self.client.get(url, {'page': 'nope'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'slot': 'x'}).status_code, 400)
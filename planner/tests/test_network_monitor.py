@@ -0,0 +1,1245 @@
+"""Regression tests for the Network Health Monitor agent API.
+
+The agent pushes one payload per cycle covering every monitored device.
+These tests pin down the cloud-side behaviour (N=3 state machine, events)
+and that each push costs a fixed number of queries whatever the device
+count — the per-IP create/save loop this replaced made thousands of
+round-trips per minute on a 300-device show network.
+"""
+import asyncio
+import contextlib
+import gzip
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from planner import monitor_retention, monitor_rollup
+from planner.management.commands import run_monitor
+from planner.monitor_agent_cache import AgentCache, agent_cache
+from planner.monitor_hub import event_stream, hub
+from planner.monitor_uplink import MonitorUplink
+from planner.models import (
+    DeviceEvent,
+    DiscoveredDevice,
+    MonitorSession,
+    PollResult,
+    PollRollup,
+    Project,
+    SwitchPortSnapshot,
+)
+
+User = get_user_model()
+
+
+class AgentApiTestCase(TestCase):
+    """Shared project / session / agent-auth plumbing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(
+            username='monitor-tester',
+            email='monitor-tester@example.com',
+            password='test-password-123',
+        )
+        cls.project = Project.objects.create(name='Monitor Show', owner=cls.owner)
+        cls.session = MonitorSession.objects.create(project=cls.project)
+
+    def setUp(self):
+        self.client = Client()
+        agent_cache.clear()
+
+    def agent_post(self, url_name, payload):
+        return self.client.post(
+            reverse(f'planner:{url_name}'),
+            data=json.dumps(payload),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.project.agent_api_key}',
+        )
+
+    def make_devices(self, count, **extra):
+        DiscoveredDevice.objects.bulk_create([
+            DiscoveredDevice(
+                project=self.project,
+                ip_address=f'10.0.{i // 256}.{i % 256}',
+                label=f'Device {i}',
+                **extra,
+            )
+            for i in range(count)
+        ])
+        return list(
+            DiscoveredDevice.objects.filter(project=self.project)
+            .order_by('pk').values_list('ip_address', flat=True)
+        )
+
+
+class AgentPollResultsTests(AgentApiTestCase):
+    """agent_poll_results: in-memory N=3 state machine, bulk writes."""
+
+    def poll(self, results):
+        response = self.agent_post('agent_poll_results', {'results': results})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_success_fires_online_and_records_poll(self):
+        [ip] = self.make_devices(1)
+        body = self.poll([{'ip': ip, 'is_alive': True, 'latency_ms': 1.5}])
+
+        self.assertEqual([e['type'] for e in body['events']], ['ONLINE'])
+        self.assertIsNotNone(body['events'][0]['id'])
+        self.assertEqual(body['events'][0]['device_name'], 'Device 0')
+
+        device = DiscoveredDevice.objects.get(ip_address=ip)
+        self.assertEqual(device.last_known_state, 'online')
+        self.assertIsNotNone(device.last_seen)
+        poll = PollResult.objects.get(device=device)
+        self.assertTrue(poll.is_reachable)
+        self.assertEqual(poll.latency_ms, 1.5)
+        self.assertIsNotNone(poll.polled_at)
+
+    def test_offline_fires_once_on_third_consecutive_failure(self):
+        [ip] = self.make_devices(1)
+        self.poll([{'ip': ip, 'is_alive': True, 'latency_ms': 1.0}])
+
+        fired = []
+        for _ in range(5):
+            fired += self.poll([{'ip': ip, 'is_alive': False}])['events']
+
+        self.assertEqual([e['type'] for e in fired], ['OFFLINE'])
+        device = DiscoveredDevice.objects.get(ip_address=ip)
+        self.assertEqual(device.consecutive_failures, 5)
+        self.assertEqual(device.status(), 'offline')
+
+    def test_never_seen_device_goes_offline_without_alert(self):
+        [ip] = self.make_devices(1)
+        for _ in range(3):
+            self.assertEqual(self.poll([{'ip': ip, 'is_alive': False}])['events'], [])
+        self.assertEqual(DiscoveredDevice.objects.get(ip_address=ip).status(), 'unreachable')
+
+    def test_unknown_and_inactive_ips_are_ignored(self):
+        ips = self.make_devices(2)
+        DiscoveredDevice.objects.filter(ip_address=ips[1]).update(is_active=False)
+        body = self.poll([
+            {'ip': ips[1], 'is_alive': True},
+            {'ip': '192.0.2.1', 'is_alive': True},
+        ])
+        self.assertEqual(body['events'], [])
+        self.assertEqual(body['processed'], 2)
+        self.assertFalse(PollResult.objects.exists())
+
+    def test_device_list_version_tracks_changes(self):
+        ips = self.make_devices(2)
+        listing = self.client.get(
+            reverse('planner:agent_device_list'),
+            HTTP_AUTHORIZATION=f'Bearer {self.project.agent_api_key}',
+        ).json()
+        self.assertEqual(sorted(listing['devices']), sorted(ips))
+        self.assertEqual(listing['critical'], [])
+        self.assertEqual(self.poll([])['devices_version'], listing['version'])
+
+        DiscoveredDevice.objects.create(
+            project=self.project, ip_address='10.1.0.1', label='Core', domain='switch')
+        version = self.poll([])['devices_version']
+        self.assertNotEqual(version, listing['version'])
+        listing = self.client.get(
+            reverse('planner:agent_device_list'),
+            HTTP_AUTHORIZATION=f'Bearer {self.project.agent_api_key}',
+        ).json()
+        self.assertEqual((listing['version'], listing['critical']), (version, ['10.1.0.1']))
+
+        # The version comes from the device rows the cycle already read
+        with CaptureQueriesContext(connection) as ctx:
+            self.poll([{'ip': ips[0], 'is_alive': True}])
+        reads = [q['sql'] for q in ctx.captured_queries
+                 if q['sql'].startswith('SELECT') and 'planner_discovereddevice' in q['sql']]
+        self.assertEqual(len(reads), 1)
+
+    def test_query_count_is_flat_in_device_count(self):
+        """Same query count for 10 and 150 devices (kept below SQLite's
+        bulk batch size so batching doesn't split the statements)."""
+        counts = []
+        for size in (10, 150):
+            DiscoveredDevice.objects.filter(project=self.project).delete()
+            ips = self.make_devices(size)
+            self.poll([{'ip': ip, 'is_alive': True, 'latency_ms': 0.5} for ip in ips])
+            payload = {'results': [
+                {'ip': ip, 'is_alive': bool(i % 2)} for i, ip in enumerate(ips)
+            ]}
+            with CaptureQueriesContext(connection) as ctx:
+                self.agent_post('agent_poll_results', payload)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(PollResult.objects.filter(session=self.session).count(), 300)
+        self.assertFalse(DeviceEvent.objects.filter(event_type='OFFLINE').exists())
+
+
+class AgentCacheTests(AgentApiTestCase):
+    """Agent key / active session lookups are cached between pushes."""
+
+    def test_repeat_pushes_skip_auth_queries(self):
+        self.agent_post('agent_poll_results', {'results': []})
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.agent_post('agent_poll_results', {'results': []})
+        self.assertEqual(response.status_code, 200)
+        tables = ' '.join(q['sql'] for q in ctx.captured_queries)
+        self.assertNotIn('planner_project', tables)
+        self.assertNotIn('planner_monitorsession', tables)
+        stats = agent_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (3, 1))
+        self.assertEqual(stats['hit_rate'], 0.75)
+
+    def test_stop_and_heartbeat_invalidate(self):
+        self.agent_post('agent_poll_results', {'results': []})
+        self.agent_post('agent_stop', {})
+        self.assertEqual(self.agent_post('agent_poll_results', {'results': []}).status_code, 400)
+
+        session_id = self.agent_post('agent_heartbeat', {}).json()['session_id']
+        self.assertNotEqual(session_id, self.session.pk)
+        self.assertEqual(self.agent_post('agent_poll_results', {'results': []}).status_code, 200)
+        self.assertEqual(agent_cache.stats()['invalidations'], 2)
+
+    def test_scan_flag_is_consumed_once(self):
+        self.agent_post('agent_poll_results', {'results': []})
+        MonitorSession.objects.filter(pk=self.session.pk).update(notes='SCAN_REQUESTED')
+        agent_cache.invalidate(self.project.pk)  # as dashboard_request_scan does
+        flags = [
+            self.agent_post('agent_poll_results', {'results': []}).json()['scan_requested']
+            for _ in range(3)
+        ]
+        self.assertEqual(flags, [True, False, False])
+
+    def test_entries_expire_and_copies_are_private(self):
+        now = [0.0]
+        cache = AgentCache(ttl=10, clock=lambda: now[0])
+        token = str(self.project.agent_api_key)
+        self.assertIsNone(cache.project('00000000-0000-0000-0000-000000000000'))
+
+        cache.project(token).name = 'Changed'
+        self.assertEqual(cache.project(token).name, 'Monitor Show')
+        self.assertEqual(cache.session(self.project).pk, self.session.pk)
+        now[0] = 11.0
+        with CaptureQueriesContext(connection) as ctx:
+            cache.session(self.project)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_a_rotated_key_stops_authenticating(self):
+        cache = AgentCache()
+        old = str(self.project.agent_api_key)
+        self.assertEqual(cache.project(old).pk, self.project.pk)
+
+        Project.objects.filter(pk=self.project.pk).update(agent_api_key=uuid.uuid4())
+        project = Project.objects.get(pk=self.project.pk)
+        cache.invalidate(project.pk)
+        cache.session(project)   # reloads the entry with the new key
+
+        self.assertIsNone(cache.project(old))
+        self.assertEqual(cache.project(str(project.agent_api_key)).pk, project.pk)
+
+
+class PollRollupTests(AgentApiTestCase):
+    """monitor_rollup: raw PollResults compacted into packed 1s/1min/1h buckets."""
+
+    T0 = datetime(2026, 7, 4, 20, 0, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        super().setUp()
+        [ip] = self.make_devices(1)
+        self.device = DiscoveredDevice.objects.get(ip_address=ip)
+
+    def add_polls(self, *polls):
+        """polls: (seconds after T0, latency_ms or None for a lost poll)."""
+        for offset, latency in polls:
+            row = PollResult.objects.create(
+                device=self.device, session=self.session,
+                is_reachable=latency is not None, latency_ms=latency,
+            )
+            PollResult.objects.filter(pk=row.pk).update(
+                polled_at=self.T0 + timedelta(seconds=offset))
+
+    def series(self, resolution, minutes=10):
+        return monitor_rollup.latency_series(
+            [self.device.pk], self.T0, self.T0 + timedelta(minutes=minutes),
+            resolution=resolution,
+        )['series'][self.device.pk]
+
+    def test_buckets_hold_min_max_avg_and_loss(self):
+        self.add_polls((0, 1.0), (0.5, 3.0), (1, None), (61, 2.0))
+        compacted = monitor_rollup.compact_all(until=self.T0 + timedelta(minutes=5))
+        self.assertEqual(compacted, 4)
+
+        per_second = self.series(1)
+        self.assertEqual(per_second['t'], [
+            int(self.T0.timestamp()), int(self.T0.timestamp()) + 1, int(self.T0.timestamp()) + 61,
+        ])
+        self.assertEqual(per_second['avg'], [2.0, None, 2.0])
+        self.assertEqual(per_second['min'], [1.0, None, 2.0])
+        self.assertEqual(per_second['max'], [3.0, None, 2.0])
+        self.assertEqual(per_second['loss_pct'], [0.0, 100.0, 0.0])
+
+        per_minute = self.series(60)
+        self.assertEqual(per_minute['avg'], [2.0, 2.0])
+        self.assertEqual(per_minute['loss_pct'], [33.3, 0.0])
+        # One packed row per tier: the 1s hour, the 1min day, the 1h month
+        self.assertEqual(PollRollup.objects.filter(device=self.device).count(), 3)
+
+    def test_replies_without_a_latency_do_not_dilute_the_average(self):
+        self.add_polls((0, 2.0), (10, 4.0))
+        row = PollResult.objects.create(
+            device=self.device, session=self.session, is_reachable=True, latency_ms=None)
+        PollResult.objects.filter(pk=row.pk).update(polled_at=self.T0 + timedelta(seconds=20))
+        monitor_rollup.compact_all(until=self.T0 + timedelta(minutes=5))
+
+        per_minute = self.series(60)
+        self.assertEqual(per_minute['avg'], [3.0])
+        self.assertEqual(per_minute['loss_pct'], [0.0])
+
+    def test_compaction_is_incremental(self):
+        self.add_polls((0, 1.0))
+        monitor_rollup.compact_all(until=self.T0 + timedelta(seconds=30))
+        self.add_polls((10, 5.0), (40, 3.0))
+        monitor_rollup.compact_all(until=self.T0 + timedelta(minutes=5))
+
+        per_minute = self.series(60)
+        # The poll at +10s landed behind the watermark and is skipped; the
+        # first poll is not double counted.
+        self.assertEqual(per_minute['avg'], [2.0])
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.rollup_watermark, self.T0 + timedelta(minutes=5))
+
+    def test_a_slice_is_compacted_once_by_concurrent_compactors(self):
+        self.add_polls((0, 1.0), (40, 3.0))
+        stale = MonitorSession.objects.get(pk=self.session.pk)
+        until = self.T0 + timedelta(minutes=5)
+        self.assertEqual(monitor_rollup.compact_session(self.session, until), 2)
+
+        # A second compactor loaded the session before the first moved its
+        # watermark: its claim fails and nothing is folded twice
+        self.assertEqual(monitor_rollup.compact_session(stale, until), 0)
+        self.assertEqual(self.series(60)['avg'], [2.0])
+        self.assertEqual(MonitorSession.objects.get(pk=self.session.pk).rollup_watermark, until)
+
+    def test_retention_drops_only_compacted_raw_rows_and_old_segments(self):
+        self.add_polls((0, 1.0), (7200, 1.0))
+        monitor_rollup.compact_all(until=self.T0 + timedelta(hours=1))
+        now = self.T0 + timedelta(days=2)
+
+        deleted = monitor_rollup.apply_retention(now=now)
+
+        self.assertEqual(deleted['raw'], 1)
+        self.assertEqual(PollResult.objects.count(), 1)
+        self.assertEqual(deleted[1], 1)
+        self.assertTrue(PollRollup.objects.filter(resolution=60).exists())
+
+    def test_pick_resolution_uses_coarser_tier_for_long_or_old_ranges(self):
+        now = timezone.now()
+        pick = monitor_rollup.pick_resolution
+        self.assertEqual(pick(now - timedelta(minutes=1), now, 120, now=now), 1)
+        self.assertEqual(pick(now - timedelta(hours=1), now, 120, now=now), 60)
+        self.assertEqual(pick(now - timedelta(days=3), now, 120, now=now), 3600)
+        # Short range, but older than the 1s tier keeps
+        old = now - timedelta(days=1)
+        self.assertEqual(pick(old, old + timedelta(minutes=1), 120, now=now), 60)
+
+    def test_latency_view_is_scoped_to_current_project(self):
+        other = Project.objects.create(name='Other Show', owner=self.owner)
+        foreign = DiscoveredDevice.objects.create(project=other, ip_address='10.9.9.9')
+        self.client.force_login(self.owner)
+        session = self.client.session
+        session['current_project_id'] = self.project.pk
+        session.save()
+
+        response = self.client.get(
+            reverse('planner:monitor_latency'),
+            {'device': [self.device.pk, foreign.pk], 'minutes': 1},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(list(body['series']), [str(self.device.pk)])
+        self.assertEqual(body['resolution'], 1)
+
+
+class MonitorRetentionTests(AgentApiTestCase):
+    """monitor_retention: archive closed sessions, then prune them in batches."""
+
+    # Recent, so the real-time compaction in the command test has little to walk
+    T0 = (timezone.now() - timedelta(days=1)).replace(minute=0, second=0, microsecond=0)
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        [ip] = self.make_devices(1)
+        self.device = DiscoveredDevice.objects.get(ip_address=ip)
+        self.closed = self.make_session(self.T0, self.T0 + timedelta(hours=2))
+
+    def make_session(self, started, ended):
+        session = MonitorSession.objects.create(project=self.project)
+        MonitorSession.objects.filter(pk=session.pk).update(started_at=started, ended_at=ended)
+        for minutes, latency in ((0, 1.0), (1, None), (90, 2.0)):
+            PollResult.objects.create(
+                device=self.device, session=session, polled_at=started + timedelta(minutes=minutes),
+                is_reachable=latency is not None, latency_ms=latency,
+            )
+        event = DeviceEvent.objects.create(
+            device=self.device, session=session, event_type='OFFLINE', details={'ip': '10.0.0.0'})
+        DeviceEvent.objects.filter(pk=event.pk).update(occurred_at=started + timedelta(minutes=1))
+        session.refresh_from_db()
+        return session
+
+    def test_closed_session_is_archived_before_anything_is_pruned(self):
+        summary = monitor_retention.run_housekeeping(now=self.T0 + timedelta(days=1))
+
+        self.assertEqual(summary['archived'], 1)
+        self.assertEqual((summary['events'], summary['sessions']), (0, 0))
+        self.closed.refresh_from_db()
+        self.assertIsNotNone(self.closed.archived_at)
+        records = list(monitor_retention.iter_archive(self.closed))
+        kinds = [r['kind'] for r in records]
+        self.assertEqual(kinds, ['session', 'device', 'event', 'latency'])
+        self.assertEqual(records[0]['session']['id'], self.closed.pk)
+        self.assertEqual(records[2]['type'], 'OFFLINE')
+        self.assertEqual(records[3]['loss_pct'], [0.0, 100.0, 0.0])
+        # The open session is never archived
+        self.assertIsNone(MonitorSession.objects.get(pk=self.session.pk).archived_at)
+
+        # A second pass has nothing left to export
+        self.assertEqual(monitor_retention.run_housekeeping(now=self.T0 + timedelta(days=1))['archived'], 0)
+
+    def test_overlapping_passes_compact_and_archive_once(self):
+        # The cron command loaded its sessions before the scheduler's pass ran
+        stale = MonitorSession.objects.get(pk=self.closed.pk)
+        now = self.T0 + timedelta(days=1)
+        summary = monitor_retention.run_housekeeping(now=now)
+        self.assertEqual((summary['compacted'], summary['archived']), (3, 1))
+
+        self.assertEqual(monitor_rollup.compact_session(stale, now), 0)
+        stale.refresh_from_db(fields=['rollup_watermark'])
+        self.assertFalse(monitor_retention.archive_session(stale, now))
+        series = monitor_rollup.latency_series(
+            [self.device.pk], self.T0, self.T0 + timedelta(hours=2), resolution=60,
+        )['series'][self.device.pk]
+        self.assertEqual(series['loss_pct'], [0.0, 100.0, 0.0])
+
+    def test_claim_without_an_archive_file_is_never_pruned_and_is_retaken(self):
+        # A pass claimed the session and was killed before writing the file
+        claimed_at = self.T0 + timedelta(days=1)
+        MonitorSession.objects.filter(pk=self.closed.pk).update(archived_at=claimed_at)
+
+        summary = monitor_retention.prune_archived_sessions(now=self.T0 + timedelta(days=100))
+        self.assertEqual((summary['events'], summary['sessions']), (0, 0))
+        self.assertEqual(PollResult.objects.filter(session=self.closed).count(), 3)
+
+        self.assertEqual(monitor_retention.archive_closed_sessions(now=claimed_at + timedelta(minutes=5)), 0)
+        self.assertEqual(monitor_retention.archive_closed_sessions(now=claimed_at + timedelta(hours=2)), 1)
+        self.closed.refresh_from_db()
+        self.assertTrue(self.closed.archive_file.name)
+
+    def test_windows_prune_events_then_whole_sessions_in_batches(self):
+        self.enterContext(mock.patch.object(monitor_rollup, 'DELETE_BATCH_SIZE', 1))
+        unarchived = self.make_session(self.T0, self.T0 + timedelta(hours=1))
+        MonitorSession.objects.filter(pk=unarchived.pk).update(archived_at=None, rollup_watermark=None)
+        monitor_retention.archive_session(self.closed)
+        compact = mock.patch.object(monitor_retention, 'compact_all', return_value=0)
+        self.enterContext(compact)
+
+        summary = monitor_retention.run_housekeeping(now=self.T0 + timedelta(days=40))
+        self.assertEqual((summary['events'], summary['sessions']), (1, 0))
+        self.assertFalse(DeviceEvent.objects.filter(session=self.closed).exists())
+        self.assertTrue(DeviceEvent.objects.filter(session=unarchived).exists())
+
+        summary = monitor_retention.run_housekeeping(now=self.T0 + timedelta(days=100))
+        self.assertEqual(summary['sessions'], 1)
+        self.assertEqual(summary['session_rows'], 3)
+        self.assertFalse(MonitorSession.objects.filter(pk=self.closed.pk).exists())
+        self.assertTrue(MonitorSession.objects.filter(pk=unarchived.pk).exists())
+        self.assertTrue(os.listdir(os.path.join(settings.MEDIA_ROOT, 'monitor_archives')))
+
+    def test_command_and_scheduler_opt_in(self):
+        out = io.StringIO()
+        call_command('prune_monitor_history', '--archive-only', stdout=out)
+        self.assertIn('archived 1 session(s)', out.getvalue())
+        self.assertEqual(PollResult.objects.filter(session=self.closed).count(), 3)
+
+        scheduler = monitor_retention.RetentionScheduler()
+        with override_settings(MONITOR_RETENTION_INTERVAL=None):
+            self.assertFalse(scheduler.ensure_started())
+        with override_settings(MONITOR_RETENTION_INTERVAL=3600):
+            self.assertTrue(scheduler.ensure_started())
+            self.assertFalse(scheduler.ensure_started())
+        scheduler.stop(timeout=5)
+        self.assertFalse(scheduler.running)
+
+
+class MonitorStatusDeltaTests(AgentApiTestCase):
+    """monitor_status_view: cursor deltas, 304s and a flat query count."""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.owner)
+        session = self.client.session
+        session['current_project_id'] = self.project.pk
+        session.save()
+        self.ips = self.make_devices(3)
+        self.switch = DiscoveredDevice.objects.create(
+            project=self.project, ip_address='10.1.0.1', label='Core', domain='switch')
+        SwitchPortSnapshot.objects.bulk_create([
+            SwitchPortSnapshot(device=self.switch, session=self.session, port_index=i,
+                               oper_status='up', speed_mbps=1000)
+            for i in (1, 2)
+        ])
+        self.settle()
+
+    def settle(self):
+        """Age every change stamp past the overlap window."""
+        old = timezone.now() - timedelta(minutes=1)
+        DiscoveredDevice.objects.update(changed_at=old)
+        SwitchPortSnapshot.objects.update(changed_at=old)
+
+    def status(self, cursor=None, etag=None):
+        params = {'last_event_id': 0}
+        if cursor is not None:
+            params['cursor'] = cursor
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse('planner:monitor_status'), params, **headers)
+
+    def test_full_snapshot_then_304_when_nothing_changed(self):
+        first = self.status()
+        body = first.json()
+        self.assertTrue(body['full'])
+        self.assertEqual(len(body['devices']), 4)
+        self.assertEqual([p['port_index'] for p in body['switch_ports'][str(self.switch.pk)]], [1, 2])
+        self.assertEqual(body['members']['count'], 4)
+
+        again = self.status(cursor=body['cursor'], etag=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def poll_at(self, when):
+        """One healthy ping of ips[0], ingested as if at `when`."""
+        with mock.patch('planner.monitor_ingest.timezone') as ingest_tz:
+            ingest_tz.now.return_value = when
+            self.agent_post('agent_poll_results', {'results': [{'ip': self.ips[0], 'is_alive': True}]})
+
+    def minute_ahead(self):
+        """The start of a minute ahead of now, so ingest stamps are past any cursor."""
+        return (timezone.now() + timedelta(minutes=5)).replace(second=0, microsecond=0)
+
+    def test_last_seen_refresh_within_a_minute_is_not_a_change(self):
+        start = self.minute_ahead()
+        self.poll_at(start + timedelta(seconds=10))
+        self.settle()
+        first = self.status()
+
+        self.poll_at(start + timedelta(seconds=40))
+        self.assertEqual(self.status(cursor=first.json()['cursor'], etag=first['ETag']).status_code, 304)
+
+    def test_last_seen_moving_to_a_new_minute_is_sent(self):
+        start = self.minute_ahead()
+        self.poll_at(start + timedelta(seconds=50))
+        self.settle()
+        first = self.status().json()
+
+        self.poll_at(start + timedelta(seconds=70))
+        body = self.status(cursor=first['cursor']).json()
+        self.assertEqual([d['ip'] for d in body['devices']], [self.ips[0]])
+        self.assertEqual(body['devices'][0]['last_seen'], (start + timedelta(seconds=70)).isoformat())
+
+    def test_delta_carries_only_changed_rows(self):
+        first = self.status().json()
+        self.agent_post('agent_poll_results', {'results': [{'ip': self.ips[1], 'is_alive': True}]})
+        SwitchPortSnapshot.objects.filter(port_index=2).update(
+            oper_status='down', changed_at=timezone.now())
+        DiscoveredDevice.objects.get(ip_address=self.ips[2]).delete()
+
+        body = self.status(cursor=first['cursor']).json()
+
+        self.assertFalse(body['full'])
+        self.assertEqual([d['ip'] for d in body['devices']], [self.ips[1]])
+        self.assertEqual(body['switch_ports'], {
+            str(self.switch.pk): [{
+                'port_index': 2, 'port_description': '', 'oper_status': 'down',
+                'speed_mbps': 1000, 'bandwidth_pct': None, 'error_count': 0,
+            }],
+        })
+        # The hard delete only shows up in the membership summary
+        self.assertEqual(body['members']['count'], 3)
+
+    def test_deactivated_device_is_reported_as_removed(self):
+        first = self.status().json()
+        device = DiscoveredDevice.objects.get(ip_address=self.ips[0])
+        self.client.post(reverse('planner:dashboard_remove_device', args=[device.pk]))
+
+        body = self.status(cursor=first['cursor']).json()
+        self.assertEqual(body['removed'], [device.pk])
+        self.assertEqual(body['devices'], [])
+
+    def test_full_snapshot_query_count_does_not_grow_with_switches(self):
+        self.status()  # warm the session's cached project access
+        counts = []
+        for extra in (0, 20):
+            for i in range(extra):
+                switch = DiscoveredDevice.objects.create(
+                    project=self.project, ip_address=f'10.2.0.{i + 1}', domain='switch')
+                SwitchPortSnapshot.objects.create(device=switch, session=self.session, port_index=1)
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.status().status_code, 200)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class MonitorHubTests(AgentApiTestCase):
+    """Agent cycles are pushed to subscribed dashboards once they commit."""
+
+    def subscribe(self):
+        received = []
+        subscription = hub.subscribe(self.project.pk, lambda: received.extend(subscription.drain()))
+        self.addCleanup(hub.unsubscribe, subscription)
+        return received
+
+    def test_poll_cycle_is_published_after_commit(self):
+        ips = self.make_devices(2)
+        DiscoveredDevice.objects.update(last_known_state='online', last_seen=timezone.now())
+        received = self.subscribe()
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.agent_post('agent_poll_results', {'results': [
+                {'ip': ip, 'is_alive': False} for ip in ips
+            ]})
+        self.assertEqual(received, [])  # nothing before commit
+        for callback in callbacks:
+            callback()
+
+        self.assertEqual(received, [{'events': [], 'changed': True}])
+
+    def test_offline_event_reaches_every_subscriber_of_the_project(self):
+        ip = self.make_devices(1)[0]
+        DiscoveredDevice.objects.update(
+            last_known_state='online', last_seen=timezone.now(), consecutive_failures=2)
+        first, second = self.subscribe(), self.subscribe()
+        other = []
+        subscription = hub.subscribe(self.project.pk + 1000, lambda: other.append(True))
+        self.addCleanup(hub.unsubscribe, subscription)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agent_post('agent_poll_results', {'results': [{'ip': ip, 'is_alive': False}]})
+
+        self.assertEqual(first, second)
+        self.assertEqual([ev['type'] for ev in first[0]['events']], ['OFFLINE'])
+        self.assertEqual(other, [])
+
+    def test_unchanged_cycle_publishes_nothing(self):
+        ip = self.make_devices(1)[0]
+        DiscoveredDevice.objects.update(last_known_state='online', last_seen=timezone.now())
+        received = self.subscribe()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agent_post('agent_poll_results', {'results': [{'ip': ip, 'is_alive': True}]})
+
+        self.assertEqual(received, [])
+
+    def test_event_stream_yields_frames_and_unsubscribes(self):
+        async def run():
+            stream = event_stream(self.project.pk, heartbeat=0.05)
+            frames = [await stream.__anext__()]
+            hub.publish(self.project.pk, {'events': [{'id': 7, 'type': 'OFFLINE'}], 'changed': True})
+            frames.append(await stream.__anext__())
+            frames.append(await stream.__anext__())  # idle -> keep-alive
+            self.assertEqual(hub.subscriber_count(self.project.pk), 1)
+            await stream.aclose()
+            return frames
+
+        frames = asyncio.run(run())
+        self.assertTrue(frames[0].startswith('retry: '))
+        self.assertTrue(frames[1].startswith('id: 7\nevent: monitor\ndata: '))
+        self.assertEqual(frames[2], ': keepalive\n\n')
+        self.assertEqual(hub.subscriber_count(self.project.pk), 0)
+
+    def test_stream_view_declines_under_wsgi(self):
+        self.client.force_login(self.owner)
+        session = self.client.session
+        session['current_project_id'] = self.project.pk
+        session.save()
+
+        response = self.client.get(reverse('planner:monitor_stream'))
+        self.assertEqual(response.status_code, 204)
+
+
+class AgentSnmpResultsTests(AgentApiTestCase):
+    """agent_snmp_results: in-memory change detection, one bulk upsert."""
+
+    def make_switches(self, count, start=1):
+        return [
+            DiscoveredDevice.objects.create(
+                project=self.project, ip_address=f'10.1.0.{i}', label=f'Switch {i}', domain='switch')
+            for i in range(start, start + count)
+        ]
+
+    def snmp_post(self, switches, ports=2, down=(), bandwidth=10.0, error=None):
+        return self.agent_post('agent_snmp_results', {'results': [
+            {'device_id': switch.pk, 'error': error, 'ports': [
+                {'port_index': i, 'port_description': f'Port {i}',
+                 'oper_status': 'down' if i in down else 'up',
+                 'speed_mbps': 1000, 'bandwidth_pct': bandwidth, 'error_count': 0}
+                for i in range(1, ports + 1)
+            ]}
+            for switch in switches
+        ]})
+
+    def test_port_status_change_updates_snapshot_and_fires_event(self):
+        switch, = self.make_switches(1)
+        self.assertEqual(self.snmp_post([switch]).json()['events'], [])
+        old = timezone.now() - timedelta(minutes=1)
+        SwitchPortSnapshot.objects.update(changed_at=old)
+
+        events = self.snmp_post([switch], down={2}).json()['events']
+
+        self.assertEqual([(e['type'], e['details']['port_index']) for e in events], [('PORT_DOWN', 2)])
+        snaps = {s.port_index: s for s in SwitchPortSnapshot.objects.filter(device=switch)}
+        self.assertEqual(len(snaps), 2)
+        self.assertEqual(snaps[2].oper_status, 'down')
+        self.assertEqual(snaps[1].changed_at, old)
+        self.assertGreater(snaps[2].changed_at, old)
+
+    def test_bandwidth_events_and_setup_mode_suppression(self):
+        switch, = self.make_switches(1)
+        events = self.snmp_post([switch], ports=1, bandwidth=95.0).json()['events']
+        self.assertEqual([e['type'] for e in events], ['BW_CRITICAL'])
+
+        MonitorSession.objects.filter(pk=self.session.pk).update(show_mode='setup')
+        agent_cache.invalidate(self.project.pk)
+        self.assertEqual(self.snmp_post([switch], ports=1, down={1}, bandwidth=80.0).json()['events'], [])
+        self.assertEqual(SwitchPortSnapshot.objects.get(device=switch).oper_status, 'down')
+
+    def test_erroring_and_foreign_switches_are_skipped(self):
+        switch, = self.make_switches(1)
+        self.snmp_post([switch], error='timeout')
+        self.agent_post('agent_snmp_results', {'results': [{'device_id': 999999, 'ports': [{'port_index': 1}]}]})
+        self.assertFalse(SwitchPortSnapshot.objects.exists())
+
+    def test_query_count_is_flat_in_port_count(self):
+        # Kept under SQLite's 999-parameter batch size so the upsert is one statement
+        counts = []
+        for switches, ports in ((self.make_switches(1), 2), (self.make_switches(2, start=10), 40)):
+            self.snmp_post(switches, ports=ports)
+            with CaptureQueriesContext(connection) as ctx:
+                self.snmp_post(switches, ports=ports, down={1})
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class AgentDanteResultsTests(AgentApiTestCase):
+    """agent_dante_results / agent_scan_results: one read, bulk reconcile."""
+
+    def dante_post(self, entries):
+        response = self.agent_post('agent_dante_results', {'results': entries})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['events']
+
+    def dante_entries(self, count, clock_role='locked', start=0):
+        return [
+            {'name': f'Stagebox-{i}', 'ip': f'10.2.{i // 256}.{i % 256}',
+             'clock_role': clock_role, 'tx_count': 32, 'rx_count': 32,
+             'model_id': 'DIO', 'mac_address': f'00:1d:c1:00:{i // 256:02x}:{i % 256:02x}'}
+            for i in range(start, start + count)
+        ]
+
+    def test_discovery_creates_updates_and_deactivates(self):
+        events = self.dante_post(self.dante_entries(3))
+        self.assertEqual([e['type'] for e in events], ['DANTE_DISCOVERED'] * 3)
+        self.assertEqual(events[0]['details']['name'], 'Stagebox-0')
+
+        old = timezone.now() - timedelta(minutes=1)
+        # Pin the cycle inside the minute of the last sighting, so the
+        # refreshed last_seen stays in the same bucket (last_seen_moved)
+        cycle = (timezone.now() + timedelta(minutes=5)).replace(second=30, microsecond=0)
+        DiscoveredDevice.objects.update(changed_at=old, last_seen=cycle - timedelta(seconds=20))
+        entries = self.dante_entries(2, clock_role='bogus')
+        entries[1]['clock_role'] = 'locked'
+        with mock.patch('planner.monitor_ingest.timezone') as ingest_tz:
+            ingest_tz.now.return_value = cycle
+            self.assertEqual(self.dante_post(entries), [])
+
+        devices = {d.dante_device_name: d for d in DiscoveredDevice.objects.filter(project=self.project)}
+        self.assertEqual(devices['Stagebox-0'].clock_role, 'unknown')
+        self.assertGreater(devices['Stagebox-0'].changed_at, old)
+        # Unchanged device: last_seen refreshed, change stamp left alone
+        self.assertEqual(devices['Stagebox-1'].changed_at, old)
+        self.assertEqual(devices['Stagebox-1'].last_seen, cycle)
+        self.assertFalse(devices['Stagebox-2'].is_active)
+        self.assertGreater(devices['Stagebox-2'].changed_at, old)
+
+    def test_device_that_moved_ip_replaces_stale_record(self):
+        self.dante_post(self.dante_entries(1))
+        moved = dict(self.dante_entries(1)[0], ip='10.2.9.9')
+        events = self.dante_post([moved])
+
+        self.assertEqual([e['details']['ip'] for e in events], ['10.2.9.9'])
+        device = DiscoveredDevice.objects.get(project=self.project)
+        self.assertEqual(device.ip_address, '10.2.9.9')
+        self.assertTrue(device.is_active)
+
+    def test_scan_adds_updates_and_reactivates(self):
+        ips = self.make_devices(2)
+        DiscoveredDevice.objects.filter(ip_address=ips[1]).update(
+            is_active=False, consecutive_failures=4, last_known_state='offline')
+        response = self.agent_post('agent_scan_results', {'devices': [
+            {'ip': ips[0], 'label': 'Device 0'},
+            {'ip': ips[1], 'domain': 'dante'},
+            {'ip': '10.3.0.1', 'label': 'New'},
+            {'ip': ' '},
+        ]})
+
+        self.assertEqual(response.json(), {'ok': True, 'added': 1, 'updated': 1})
+        revived = DiscoveredDevice.objects.get(ip_address=ips[1])
+        self.assertEqual((revived.is_active, revived.domain, revived.last_known_state,
+                          revived.consecutive_failures), (True, 'dante', 'unknown', 0))
+        self.assertEqual(DiscoveredDevice.objects.get(ip_address='10.3.0.1').domain, 'unknown')
+        scan = DeviceEvent.objects.get(event_type='SCAN_STARTED')
+        self.assertEqual(scan.details, {'device_count': 4, 'added': 1})
+
+    def test_query_count_is_flat_in_network_size(self):
+        counts = []
+        for size, start in ((5, 0), (60, 100)):
+            self.dante_post(self.dante_entries(size, start=start))
+            # Every device changes, one drops out and one new device appears
+            entries = self.dante_entries(size, clock_role='master', start=start + 1)
+            with CaptureQueriesContext(connection) as ctx:
+                self.dante_post(entries)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class FakeSwitch:
+    """Stands in for bulk_cmd: answers GETBULK from a dict of IF-MIB columns.
+    Requested var-binds arrive as plain (oid,) tuples; see fake_snmp()."""
+
+    def __init__(self, ports, delay=0.0):
+        from pysnmp.proto import rfc1902
+        self.requests = 0
+        self.delay = delay
+        self.oids = sorted(
+            (tuple(int(x) for x in f'{root}.{port}'.split('.')), rfc1902.OctetString(str(value)))
+            for field, root in run_monitor.IF_MIB_ROOTS.items()
+            for port, value in ports.items()
+            for value in [value if field == 'oper_status' else port * 10]
+        )
+
+    async def __call__(self, engine, auth, transport, context, non_rep, max_rep, *var_binds, **options):
+        from pysnmp.proto import rfc1902, rfc1905
+        self.requests += 1
+        await asyncio.sleep(self.delay)
+        out = [[] for _ in var_binds]
+        for column, vb in enumerate(var_binds):
+            start = tuple(int(x) for x in str(vb[0]).split('.'))
+            following = [item for item in self.oids if item[0] > start][:max_rep]
+            following += [(None, rfc1905.endOfMibView)] * (max_rep - len(following))
+            for oid, value in following:
+                name = rfc1902.ObjectName(oid or start)
+                out[column].append((name, value))
+        # Row-major, as pysnmp flattens GETBULK responses
+        return None, 0, 0, tuple(out[c][r] for r in range(max_rep) for c in range(len(var_binds)))
+
+
+def fake_snmp(bulk_cmd):
+    """Patch run_monitor so requests go to `bulk_cmd` as plain OID tuples."""
+    stack = contextlib.ExitStack()
+    stack.enter_context(mock.patch.object(run_monitor, 'bulk_cmd', bulk_cmd))
+    stack.enter_context(mock.patch.object(run_monitor, 'ObjectIdentity', str))
+    stack.enter_context(mock.patch.object(run_monitor, 'ObjectType', lambda oid: (oid,)))
+    return stack
+
+
+class SnmpPollerTests(SimpleTestCase):
+    """run_monitor's GETBULK walker and concurrent poller, against a fake agent."""
+
+    def test_bulk_walk_fetches_all_columns_together(self):
+        fake = FakeSwitch({1: 1, 2: 2, 3: 1, 4: 1, 5: 1})
+        with fake_snmp(fake), mock.patch.object(run_monitor, 'SNMP_MAX_REPETITIONS', 2):
+            poller = run_monitor.SnmpPoller()
+            try:
+                result, = poller.poll([{'id': 7, 'ip': '127.0.0.1'}], 'public')
+            finally:
+                poller.close()
+
+        ports = result['ports']
+        self.assertEqual(sorted(ports), [1, 2, 3, 4, 5])
+        self.assertEqual(ports[2]['oper_status'], 'down')
+        self.assertEqual(ports[3]['in_errors'], 30)
+        # 5 rows at 2 per request: three requests for all six columns, not six walks
+        self.assertEqual(fake.requests, 3)
+
+    def test_slow_switch_times_out_without_holding_up_the_rest(self):
+        fast, slow = FakeSwitch({1: 1}), FakeSwitch({1: 1}, delay=5)
+
+        async def route(engine, auth, transport, *args, **kwargs):
+            target = slow if transport.transport_address[0] == '127.0.0.2' else fast
+            return await target(engine, auth, transport, *args, **kwargs)
+
+        with fake_snmp(route):
+            poller = run_monitor.SnmpPoller(switch_timeout=0.2)
+            try:
+                results = poller.poll([
+                    {'id': 1, 'ip': '127.0.0.1'}, {'id': 2, 'ip': '127.0.0.2'}, {'id': 3, 'ip': '127.0.0.3'},
+                ], 'public')
+            finally:
+                poller.close()
+
+        self.assertEqual([r['ports'] is None for r in results], [False, True, False])
+        self.assertLess(max(r['poll_ms'] for r in results), 1000)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class IcmpSchedulerTests(SimpleTestCase):
+    """run_monitor's adaptive ICMP cadence and device-list caching."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.scheduler = run_monitor.IcmpScheduler(10, clock=self.clock)
+
+    def next_due(self, ip, alive=True):
+        """Ping `ip` now with the given result; return seconds to its next ping."""
+        self.assertLessEqual(self.scheduler.targets[ip].due, self.clock.now)
+        self.scheduler.record(ip, alive)
+        return self.scheduler.targets[ip].due - self.clock.now
+
+    def test_stable_devices_back_off_and_critical_ones_stay_fast(self):
+        self.scheduler.update_devices(['10.0.0.1', '10.0.0.2'], critical=['10.0.0.2'], version='v1')
+        gaps = []
+        for _ in range(run_monitor.ICMP_STABLE_AFTER):
+            gaps.append(self.next_due('10.0.0.1'))
+            self.clock.now += gaps[-1]
+        self.assertEqual(gaps[0], 10)
+        self.assertEqual(gaps[-1], 10 * run_monitor.ICMP_STABLE_FACTOR)
+        self.assertEqual(self.next_due('10.0.0.2'), run_monitor.ICMP_FAST_INTERVAL)
+        # Routine results wait for the interval; nothing urgent happened
+        self.assertEqual(self.scheduler.take_results(), [])
+        self.assertEqual(len(self.scheduler.take_results(force=True)), run_monitor.ICMP_STABLE_AFTER + 1)
+
+    def test_failing_and_flapping_devices_go_fast(self):
+        self.scheduler.update_devices(['10.0.0.1', '10.0.0.2'])
+        self.clock.now += self.next_due('10.0.0.1')
+        self.scheduler.take_results(force=True)
+        self.assertEqual(self.next_due('10.0.0.1', alive=False), run_monitor.ICMP_FAST_INTERVAL)
+        self.assertEqual(self.scheduler.take_results(),
+                         [{'ip': '10.0.0.1', 'is_alive': False, 'latency_ms': None}])
+        self.clock.now += run_monitor.ICMP_FAST_INTERVAL
+        self.assertEqual(self.next_due('10.0.0.1', alive=False), run_monitor.ICMP_FAST_INTERVAL)
+        # Down for a while: back to the normal cadence to notice recovery
+        self.clock.now += run_monitor.ICMP_DOWN_FAST_SECONDS
+        self.assertEqual(self.next_due('10.0.0.1', alive=False), 10)
+
+        # Up, down, up, down within the flap window: stays fast once back up
+        gap = 0
+        for alive in (True, False, True, False):
+            self.clock.now += gap
+            gap = self.next_due('10.0.0.2', alive)
+        self.clock.now += run_monitor.ICMP_DOWN_FAST_SECONDS
+        self.assertEqual(self.next_due('10.0.0.2', True), run_monitor.ICMP_FAST_INTERVAL)
+
+    def test_device_list_refetched_only_on_a_new_version(self):
+        self.assertTrue(self.scheduler.refresh_due())
+        self.scheduler.update_devices(['10.0.0.1', '10.0.0.2'], version='v1')
+        self.next_due('10.0.0.1')
+        self.scheduler.request_refresh('v1')
+        self.assertFalse(self.scheduler.refresh_due())
+        self.scheduler.request_refresh('v2')
+        self.assertTrue(self.scheduler.refresh_due())
+
+        streak = self.scheduler.targets['10.0.0.1'].streak
+        self.scheduler.update_devices(['10.0.0.1', '10.0.0.3'], version='v2')
+        self.assertEqual(sorted(self.scheduler.targets), ['10.0.0.1', '10.0.0.3'])
+        self.assertEqual(self.scheduler.targets['10.0.0.1'].streak, streak)
+        self.scheduler.record('10.0.0.2', True)  # in flight when it was dropped
+        self.assertEqual(self.scheduler.concurrency, run_monitor.ICMP_MIN_CONCURRENCY)
+
+    def test_run_pings_concurrently_and_hands_over_failures_at_once(self):
+        pinged, delivered = [], []
+
+        async def fake_ping(ip, count, timeout, privileged):
+            pinged.append((ip, timeout))
+            await asyncio.sleep(0.05)
+            return mock.Mock(is_alive=ip != '10.0.0.3', avg_rtt=0.5)
+
+        async def refresh():
+            return ['10.0.0.1', '10.0.0.2', '10.0.0.3'], ['10.0.0.2'], 'v1'
+
+        stop = threading.Event()
+
+        def on_results(results):
+            delivered.append(results)
+            stop.set()
+
+        scheduler = run_monitor.IcmpScheduler(10, ping=fake_ping)
+        started = time.monotonic()
+        asyncio.run(asyncio.wait_for(scheduler.run(stop, refresh, on_results), 5))
+
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(scheduler.version, 'v1')
+        self.assertEqual(dict(pinged), {
+            '10.0.0.1': run_monitor.ICMP_TIMEOUT,
+            '10.0.0.2': run_monitor.ICMP_FAST_TIMEOUT,
+            '10.0.0.3': run_monitor.ICMP_TIMEOUT,
+        })
+        results = {r['ip']: r for r in delivered[0]}
+        self.assertFalse(results['10.0.0.3']['is_alive'])
+        self.assertEqual(results['10.0.0.1']['latency_ms'], 0.5)
+
+
+class AgentBatchTests(AgentApiTestCase):
+    """agent_batch: one gzipped request per agent tick, replays filed as history."""
+
+    def batch_post(self, items):
+        return self.client.post(
+            reverse('planner:agent_batch'),
+            data=gzip.compress(json.dumps({'items': items}).encode()),
+            content_type='application/json',
+            HTTP_CONTENT_ENCODING='gzip',
+            HTTP_AUTHORIZATION=f'Bearer {self.project.agent_api_key}',
+        )
+
+    def test_items_are_applied_in_order_with_one_response_each(self):
+        ip = self.make_devices(1)[0]
+        switch = DiscoveredDevice.objects.create(
+            project=self.project, ip_address='10.1.0.1', label='Core', domain='switch')
+
+        response = self.batch_post([
+            {'kind': 'poll-results', 'body': {'results': [{'ip': ip, 'is_alive': True, 'latency_ms': 1.0}]}},
+            {'kind': 'snmp-results', 'body': {'results': [
+                {'device_id': switch.pk, 'ports': [{'port_index': 1, 'oper_status': 'up'}]}]}},
+            {'kind': 'dante-results', 'body': {'results': [{'name': 'Desk', 'ip': '10.2.0.1'}]}},
+            {'kind': 'bogus', 'body': {}},
+        ])
+
+        results = response.json()['results']
+        self.assertEqual([r['ok'] for r in results], [True, True, True, False])
+        self.assertEqual([e['type'] for e in results[2]['events']], ['DANTE_DISCOVERED'])
+        self.assertEqual([e['type'] for e in results[0]['events']], ['ONLINE'])
+        self.assertEqual(DiscoveredDevice.objects.get(ip_address=ip).last_known_state, 'online')
+        self.assertTrue(SwitchPortSnapshot.objects.filter(device=switch, port_index=1).exists())
+
+    def test_replayed_cycle_is_history_only_and_reaches_the_rollups(self):
+        ip = self.make_devices(1)[0]
+        DiscoveredDevice.objects.update(last_known_state='online', last_seen=timezone.now())
+        observed = (timezone.now() - timedelta(minutes=30)).replace(microsecond=0)
+        MonitorSession.objects.filter(pk=self.session.pk).update(rollup_watermark=timezone.now())
+
+        response = self.batch_post([{
+            'kind': 'poll-results', 'replay': True, 'observed_at': observed.isoformat(),
+            'body': {'results': [{'ip': ip, 'is_alive': False}]},
+        }])
+
+        self.assertEqual(response.json()['results'][0]['processed'], 1)
+        self.assertEqual(PollResult.objects.get().polled_at, observed)
+        device = DiscoveredDevice.objects.get(ip_address=ip)
+        self.assertEqual(device.consecutive_failures, 0)  # state machine untouched
+        self.assertFalse(DeviceEvent.objects.exists())
+        series = monitor_rollup.latency_series(
+            [device.pk], observed - timedelta(minutes=1), observed + timedelta(minutes=1),
+            resolution=60,
+        )['series'][device.pk]
+        self.assertEqual(series['loss_pct'], [100.0])
+
+    def test_plain_json_and_single_endpoints_still_work(self):
+        ip = self.make_devices(1)[0]
+        response = self.agent_post('agent_batch', {'items': [
+            {'kind': 'poll-results', 'body': {'results': [{'ip': ip, 'is_alive': True}]}},
+        ]})
+        self.assertEqual(response.json()['results'][0]['processed'], 1)
+
+
+def requests_connection_error(*args, **kwargs):
+    raise requests.ConnectionError('uplink down')
+
+
+class MonitorUplinkTests(SimpleTestCase):
+    """The agent side: coalescing, gzip, and the on-disk spool."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.spool_path = os.path.join(tmp.name, 'spool.jsonl')
+        self.uplink = MonitorUplink('http://showstack.test/api', 'key', spool_path=self.spool_path)
+        self.addCleanup(self.uplink.close)
+        self.sent = []
+
+    def respond(self, *args, **kwargs):
+        body = kwargs['data']
+        if kwargs['headers'].get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        payload = json.loads(body)
+        self.sent.append(payload['items'])
+        response = mock.Mock(status_code=200)
+        response.json.return_value = {'results': [{'ok': True, 'n': i} for i in range(len(payload['items']))]}
+        return response
+
+    def test_one_request_per_tick_with_snapshots_coalesced(self):
+        received = []
+        self.uplink.submit('snmp-results', {'results': ['old']}, received.append)
+        self.uplink.submit('poll-results', {'results': [{'ip': '10.0.0.1'}] * 100})
+        self.uplink.submit('snmp-results', {'results': ['new']}, received.append)
+
+        with mock.patch.object(self.uplink.session, 'request', side_effect=self.respond) as request:
+            self.assertTrue(self.uplink.flush())
+
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(request.call_args.kwargs['headers'], {'Content-Encoding': 'gzip'})
+        self.assertEqual([item['kind'] for item in self.sent[0]], ['poll-results', 'snmp-results'])
+        self.assertEqual(self.sent[0][1]['body'], {'results': ['new']})
+        self.assertEqual(received, [{'ok': True, 'n': 1}])
+
+    def test_ping_cycles_are_spooled_through_an_outage_and_replayed(self):
+        self.uplink.submit('poll-results', {'results': [{'ip': '10.0.0.1', 'is_alive': True}]})
+        self.uplink.submit('dante-results', {'results': []})
+        with mock.patch.object(self.uplink.session, 'request', side_effect=requests_connection_error):
+            self.assertFalse(self.uplink.flush())
+        self.assertEqual(len(self.uplink.spool), 1)  # the Dante snapshot is not kept
+
+        # The spool survives an agent restart
+        restarted = MonitorUplink('http://showstack.test/api', 'key', spool_path=self.spool_path)
+        self.addCleanup(restarted.close)
+        restarted.submit('poll-results', {'results': []})
+        with mock.patch.object(restarted.session, 'request', side_effect=self.respond):
+            self.assertTrue(restarted.flush())
+
+        self.assertEqual([item.get('replay', False) for item in self.sent[0]], [True, False])
+        self.assertEqual(len(restarted.spool), 0)
+        with open(self.spool_path) as f:
+            self.assertEqual(f.read(), '')
+
+    def test_spool_is_bounded(self):
+        uplink = MonitorUplink('http://showstack.test/api', 'key', spool_path=self.spool_path, spool_limit=3)
+        self.addCleanup(uplink.close)
+        for i in range(5):
+            uplink.submit('poll-results', {'results': [i]})
+        with mock.patch.object(uplink.session, 'request', side_effect=requests_connection_error):
+            uplink.flush()
+        self.assertEqual([item['body']['results'] for item in uplink.spool.peek(10)], [[2], [3], [4]])
+
+    def test_rejected_replay_is_set_aside_and_sending_backs_off(self):
+        self.uplink.submit('poll-results', {'results': ['spooled']})
+        with mock.patch.object(self.uplink.session, 'request', side_effect=requests_connection_error):
+            self.uplink.flush()
+        self.uplink._retry_at = None
+
+        self.uplink.submit('poll-results', {'results': ['new']})
+        with mock.patch.object(self.uplink.session, 'request',
+                               return_value=mock.Mock(status_code=400)) as request:
+            self.assertFalse(self.uplink.flush())
+            self.uplink.flush()  # still backing off: not sent
+        self.assertEqual(request.call_count, 1)
+        self.assertEqual(len(self.uplink.spool), 0)
+        with open(self.spool_path + '.rejected') as f:
+            self.assertEqual([json.loads(line)['body'] for line in f], [{'results': ['spooled']}])
+
+    def test_unreadable_ok_response_counts_as_delivered(self):
+        self.uplink.submit('poll-results', {'results': ['spooled']})
+        with mock.patch.object(self.uplink.session, 'request', side_effect=requests_connection_error):
+            self.uplink.flush()
+        self.uplink._retry_at = None
+
+        response = mock.Mock(status_code=200)
+        response.json.side_effect = ValueError('truncated')
+        self.uplink.submit('poll-results', {'results': ['new']})
+        with mock.patch.object(self.uplink.session, 'request', return_value=response):
+            self.assertTrue(self.uplink.flush())
+        self.assertEqual(len(self.uplink.spool), 0)
+        self.assertTrue(self.uplink.online)
+
+
+class FakeDanteDevice:
+    """Counts queries; each takes `delay` seconds."""
+
+    def __init__(self, server_name, ipv4, delay=0.05):
+        self.server_name, self.ipv4, self.delay = server_name, ipv4, delay
+        self.name, self.clock_role = server_name.split('.')[0], 'Leader'
+        self.tx_count = self.rx_count = 2
+        self.queries = []
+
+    async def _query(self, name):
+        self.queries.append(name)
+        await asyncio.sleep(self.delay)
+
+    async def get_clocking_status(self):
+        await self._query('clock')
+
+    async def get_tx_channels(self):
+        await self._query('tx')
+
+    async def get_rx_channels(self):
+        await self._query('rx')
+
+
+class DanteWatcherTests(SimpleTestCase):
+    """run_monitor.DanteWatcher: concurrent queries, channels only on change."""
+
+    def setUp(self):
+        self.watcher = run_monitor.DanteWatcher()
+        self.built = {}
+
+        def build(server_name, services):
+            device = FakeDanteDevice(server_name, next(iter(services.values()))['ipv4'])
+            self.built.setdefault(server_name, []).append(device)
+            return device
+        self.watcher._build_device = build
+
+    def announce(self, host, ip, rate='48000'):
+        self.watcher._services[f'{host}._netaudio-arc._udp.local.'] = {
+            'ipv4': ip, 'port': 4440, 'server_name': f'{host}.local.',
+            'properties': {'rate': rate}, 'type': '_netaudio-arc._udp.local.',
+        }
+
+    def refresh(self):
+        return asyncio.run(self.watcher.refresh())
+
+    def test_devices_are_queried_concurrently(self):
+        for i in range(20):
+            self.announce(f'stagebox-{i}', f'169.254.0.{i + 1}')
+        started = time.monotonic()
+        entries = self.refresh()
+        self.assertEqual(len(entries), 20)
+        # 20 devices x 3 queries x 50 ms one after another would be 3 s
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_channels_are_requeried_only_when_the_announcement_changes(self):
+        self.announce('desk', '169.254.0.1')
+        self.announce('amp', '169.254.0.2')
+        self.refresh()
+        self.refresh()
+        self.assertEqual(self.built['desk.local.'][0].queries, ['clock', 'tx', 'rx', 'clock'])
+
+        self.announce('amp', '169.254.0.2', rate='96000')
+        self.refresh()
+        self.assertEqual(len(self.built['amp.local.']), 2)
+        self.assertEqual(self.built['amp.local.'][1].queries, ['clock', 'tx', 'rx'])
+        self.assertEqual(len(self.built['desk.local.']), 1)
+
+    def test_withdrawn_device_drops_out(self):
+        self.announce('desk', '169.254.0.1')
+        self.announce('amp', '169.254.0.2')
+        self.refresh()
+        del self.watcher._services['amp._netaudio-arc._udp.local.']
+        self.assertEqual([e['name'] for e in self.refresh()], ['desk'])
@@ -273,3 +273,105 @@ class NuendoLiveExportIdUniquenessTests(_SessionFixtureMixin, TestCase):
                 outer.get('value'),
                 'Track name empty after export.',
             )
+
+
+class NuendoLiveStreamingTests(_SessionFixtureMixin, TestCase):
+    """iter_nlpr streams the compiled template (prefix, one fragment per
+    track, suffix) and the download view serves it as a
+    StreamingHttpResponse."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = cls._build_user()
+        cls.user.is_staff = True
+        cls.user.save()
+        cls.project = cls._build_project(cls.user)
+        cls.console = cls._build_console(cls.project)
+        cls.session = cls._build_session(
+            cls.project, cls.console, mode='custom', name='Streamed',
+        )
+        MultitrackTrack.objects.bulk_create([
+            MultitrackTrack(
+                session=cls.session, track_number=n, source_type='manual',
+                label_override=f'Track {n} & "more"',
+                color_override='#FF0000' if n % 2 else '',
+            )
+            for n in range(1, 301)
+        ])
+
+    def setUp(self):
+        self._orig_path = nle._TEMPLATE_PATH
+        self._orig_tree = nle._TEMPLATE_TREE
+        nle._TEMPLATE_PATH = FAKE_TEMPLATE
+        nle._TEMPLATE_TREE = None
+
+    def tearDown(self):
+        nle._TEMPLATE_PATH = self._orig_path
+        nle._TEMPLATE_TREE = self._orig_tree
+
+    def test_chunks_join_to_a_valid_document(self):
+        chunks = list(nle.iter_nlpr(self.session))
+        self.assertGreater(len(chunks), 3)
+        root = etree.fromstring(b''.join(chunks))
+        events = root.xpath(".//obj[@class='MAudioTrackEvent']")
+        self.assertEqual(len(events), 300)
+        first, second = events[0], events[1]
+        self.assertEqual(
+            first.find("./obj[@class='MListNode']/string[@name='Name']").get('value'),
+            'Track 1 & "more"',
+        )
+        self.assertEqual(
+            first.find(".//int[@name='Farb']").get('value'), str(nle.YAMAHA_TO_FARB['Red']),
+        )
+        self.assertIsNone(second.find(".//int[@name='Farb']"))
+        self.assertEqual(
+            second.find(".//obj[@class='MAudioTrack']/int[@name='Channel ID']").get('value'), '2',
+        )
+
+    def test_template_is_compiled_once(self):
+        build_nlpr(self.session)
+        compiled = nle._COMPILED
+        build_nlpr(self.session)
+        self.assertIs(nle._COMPILED, compiled)
+        nle._TEMPLATE_TREE = None  # reparse -> recompile
+        build_nlpr(self.session)
+        self.assertIsNot(nle._COMPILED, compiled)
+
+    def test_missing_template_is_raised_before_streaming(self):
+        nle._TEMPLATE_PATH = FAKE_TEMPLATE.with_name('missing.nlpr')
+        with self.assertRaises(nle.ExportTemplateError):
+            nle.iter_nlpr(self.session)
+
+    def test_download_view_streams(self):
+        from django.urls import reverse
+
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['current_project_id'] = self.project.pk
+        session.save()
+        response = self.client.get(
+            reverse('planner:multitrack_export_nlpr', args=[self.session.pk]),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), build_nlpr(self.session))
+
+    async def test_download_view_streams_under_asgi(self):
+        from asgiref.sync import sync_to_async
+        from django.urls import reverse
+
+        await self.async_client.aforce_login(self.user)
+        session = await self.async_client.asession()
+        await session.aset('current_project_id', self.project.pk)
+        await session.asave()
+        response = await self.async_client.get(
+            reverse('planner:multitrack_export_nlpr', args=[self.session.pk]),
+        )
+        self.assertEqual(response.status_code, 200)
+        # An async body is streamed as-is; a sync one would be read into
+        # memory first (with a "must consume synchronous iterators" warning)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 3)
+        expected = await sync_to_async(build_nlpr)(self.session)
+        self.assertEqual(b''.join(chunks), expected)
@@ -0,0 +1,158 @@
+"""Tests for the content-addressed presenter slot photo store
+(planner/photo_store.py) and the slot photo endpoints."""
+import datetime
+import importlib
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from planner.models import MicSession, PresenterSlot, Project, ShowDay, StoredPhoto
+from planner.photo_store import PhotoError, store_photo, thumbnail_name
+
+User = get_user_model()
+
+
+def make_image(size=(900, 600), mode='RGB', fmt='PNG', color='red'):
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class _MediaRootMixin:
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class PhotoStoreTests(_MediaRootMixin, TestCase):
+
+    def test_identical_uploads_share_one_photo(self):
+        data = make_image()
+        photo = store_photo(data)
+        self.assertIs(type(photo), StoredPhoto)
+        self.assertEqual((photo.width, photo.height, photo.content_type), (900, 600, 'image/png'))
+        self.assertEqual(store_photo(data).pk, photo.pk)
+        self.assertEqual(StoredPhoto.objects.count(), 1)
+        self.assertTrue(default_storage.exists(photo.original.name))
+
+        for size, pixels in StoredPhoto.THUMBNAIL_SIZES.items():
+            with default_storage.open(thumbnail_name(photo.pk, size)) as f:
+                thumb = Image.open(f)
+                self.assertEqual(thumb.format, 'JPEG')
+                self.assertEqual(max(thumb.size), pixels)
+
+    def test_transparent_images_get_jpeg_thumbnails(self):
+        photo = store_photo(make_image(mode='RGBA', color=(0, 0, 0, 0)))
+        with default_storage.open(thumbnail_name(photo.pk, 'sm')) as f:
+            self.assertEqual(Image.open(f).getpixel((0, 0)), (255, 255, 255))
+
+    def test_rejects_non_images_and_oversized_uploads(self):
+        with self.assertRaises(PhotoError):
+            store_photo(b'<svg xmlns="http://www.w3.org/2000/svg"/>')
+        with self.assertRaises(PhotoError):
+            store_photo(b'\0' * (5 * 1024 * 1024 + 1))
+        self.assertFalse(StoredPhoto.objects.exists())
+
+
+class LegacyPhotoMigrationTests(_MediaRootMixin, TestCase):
+    """0188 moves every old inline photo, with none of the upload limits."""
+
+    migration = importlib.import_module('planner.migrations.0188_photo_store')
+
+    def test_undecodable_photo_keeps_its_original(self):
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg"/>'
+        photo = self.migration.store_legacy_photo(svg, 'image/svg+xml', StoredPhoto)
+        self.assertEqual((photo.width, photo.height, photo.content_type), (0, 0, 'image/svg+xml'))
+        self.assertTrue(photo.original.name.endswith('.svg'))
+        with default_storage.open(photo.original.name) as f:
+            self.assertEqual(f.read(), svg)
+        self.assertFalse(default_storage.exists(thumbnail_name(photo.pk, 'sm')))
+
+    def test_oversized_photo_is_moved_with_thumbnails(self):
+        data = make_image() + b'\0' * (5 * 1024 * 1024)  # trailing bytes PNG ignores
+        photo = self.migration.store_legacy_photo(data, 'image/png', StoredPhoto)
+        self.assertEqual((photo.width, photo.height, photo.byte_size), (900, 600, len(data)))
+        self.assertTrue(default_storage.exists(thumbnail_name(photo.pk, 'lg')))
+
+
+class SlotPhotoEndpointTests(_MediaRootMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('a2', password='pw', is_staff=True)
+        project = Project.objects.create(name='Gala', owner=cls.user)
+        day = ShowDay.objects.create(project=project, date=datetime.date(2026, 9, 1))
+        cls.session = MicSession.objects.create(day=day, name='Awards', num_mics=2)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def upload(self, slot, data):
+        return self.client.post(reverse('planner:upload_slot_photo'), {
+            'slot_id': slot.pk,
+            'photo': SimpleUploadedFile('headshot.png', data, content_type='image/png'),
+        }).json()
+
+    def test_upload_stores_photo_and_serves_cacheable_thumbnails(self):
+        first, second = (
+            PresenterSlot.objects.create(assignment=assignment, is_active=True)
+            for assignment in self.session.mic_assignments.all()
+        )
+        data = make_image()
+        response = self.upload(first, data)
+        self.assertTrue(response['success'])
+        first.refresh_from_db()
+        self.assertEqual(response['photo_url'], first.photo_large_url)
+        self.assertTrue(first.photo_url.endswith(f'/{first.stored_photo_id}/sm.jpg'))
+
+        self.upload(second, data)
+        second.refresh_from_db()
+        self.assertEqual(second.stored_photo_id, first.stored_photo_id)
+
+        thumb = self.client.get(first.photo_url)
+        self.assertEqual(thumb.status_code, 200)
+        self.assertEqual(thumb['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', thumb['Cache-Control'])
+        self.assertEqual(self.client.get(first.photo_url.replace('sm.jpg', 'xl.jpg')).status_code, 404)
+
+    def test_upload_rejects_non_images(self):
+        slot = PresenterSlot.objects.create(assignment=self.session.mic_assignments.first())
+        response = self.upload(slot, b'not an image')
+        self.assertFalse(response['success'])
+        slot.refresh_from_db()
+        self.assertIsNone(slot.stored_photo_id)
+
+    def test_duplicated_session_shares_the_photo(self):
+        slot = PresenterSlot.objects.create(
+            assignment=self.session.mic_assignments.first(), stored_photo=store_photo(make_image()),
+        )
+        target = MicSession.objects.create(day=self.session.day, name='Encore', num_mics=0)
+        self.session.duplicate_to_session(target)
+        copy = PresenterSlot.objects.get(assignment__session=target)
+        self.assertEqual(copy.stored_photo_id, slot.stored_photo_id)
+
+    def test_photo_without_thumbnails_serves_its_original_sandboxed(self):
+        migration = importlib.import_module('planner.migrations.0188_photo_store')
+        photo = migration.store_legacy_photo(
+            b'<svg xmlns="http://www.w3.org/2000/svg"/>', 'image/svg+xml', StoredPhoto,
+        )
+        slot = PresenterSlot.objects.create(
+            assignment=self.session.mic_assignments.first(), stored_photo=photo,
+        )
+        response = self.client.get(slot.photo_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn('sandbox', response['Content-Security-Policy'])
@@ -0,0 +1,90 @@
+"""Tests for per-request project access resolution (planner/project_access.py).
+
+Covers the session-cached ProjectAccess snapshot, its invalidation by
+Project / ProjectMember changes, and CurrentProjectMiddleware on top of it.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+
+from planner.middleware import CurrentProjectMiddleware
+from planner.models import Project, ProjectMember
+from planner.project_access import get_project_access
+
+User = get_user_model()
+
+
+class ProjectAccessTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='pw', is_staff=True)
+        cls.crew = User.objects.create_user(username='crew', password='pw', is_staff=True)
+        cls.project = Project.objects.create(name='Main Show', owner=cls.owner)
+        cls.other = Project.objects.create(name='Second Show', owner=cls.owner)
+
+    def setUp(self):
+        self.sessions = {}
+
+    def _request(self, user, project_id=None):
+        # One persistent session per user, like a browser
+        session = self.sessions.setdefault(user.pk, SessionStore())
+        if project_id is not None:
+            session['current_project_id'] = project_id
+        request = RequestFactory().get('/')
+        request.user = user
+        request.session = session
+        return request
+
+    def _middleware(self, request):
+        CurrentProjectMiddleware(lambda r: HttpResponse())(request)
+        return request.current_project
+
+    def test_cached_access_costs_one_query(self):
+        get_project_access(self._request(self.owner))
+        request = self._request(self.owner)
+        with self.assertNumQueries(1):
+            access = get_project_access(request)
+            self.assertIs(get_project_access(request), access)
+        self.assertEqual(access.role_for(self.project.pk), 'owner')
+        self.assertEqual(set(access.owned_ids), {self.project.pk, self.other.pk})
+
+    def test_membership_changes_invalidate_cache(self):
+        self.assertIsNone(self._middleware(self._request(self.crew, self.project.pk)))
+
+        member = ProjectMember.objects.create(
+            project=self.project, user=self.crew, role='viewer', invited_by=self.owner,
+        )
+        self.assertEqual(self._middleware(self._request(self.crew, self.project.pk)), self.project)
+        self.assertTrue(get_project_access(self._request(self.crew)).is_viewer_only)
+
+        member.role = 'editor'
+        member.save()
+        self.assertFalse(get_project_access(self._request(self.crew)).is_viewer_only)
+
+        member.delete()
+        self.assertFalse(get_project_access(self._request(self.crew)).can_access(self.project.pk))
+
+    def test_invited_user_falls_back_to_first_membership(self):
+        ProjectMember.objects.create(
+            project=self.other, user=self.crew, role='editor', invited_by=self.owner,
+        )
+        request = self._request(self.crew, self.project.pk)
+        self.assertEqual(self._middleware(request), self.other)
+        self.assertEqual(request.session['current_project_id'], self.other.pk)
+
+    def test_ownership_transfer_revokes_previous_owner(self):
+        self.assertEqual(self._middleware(self._request(self.owner, self.other.pk)), self.other)
+        self.other.owner = self.crew
+        self.other.save()
+        self.assertFalse(get_project_access(self._request(self.owner)).can_access(self.other.pk))
+        self.assertEqual(get_project_access(self._request(self.crew)).role_for(self.other.pk), 'owner')
+
+    def test_deleting_a_user_with_projects(self):
+        user = User.objects.create_user(username='temp', password='pw')
+        project = Project.objects.create(name='Temp Show', owner=user)
+        ProjectMember.objects.create(project=project, user=self.crew, invited_by=user)
+        self.assertTrue(get_project_access(self._request(self.crew)).is_invited)
+        user.delete()
+        self.assertFalse(get_project_access(self._request(self.crew)).is_invited)
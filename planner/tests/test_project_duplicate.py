@@ -0,0 +1,133 @@
+"""Tests for Project.duplicate() and its bulk copy engine (planner/project_clone.py)."""
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from planner.models import (
+    Amp, AmpChannel, AmpLocation, AmpModel, CommBeltPack, CommBeltPackChannel,
+    CommChannel, Console, ConsoleAuxOutput, ConsoleInput, Device, DeviceInput,
+    DeviceOutput, Location, MicAssignment, MicGroup, MicSession, P1Input,
+    P1Processor, PACableSchedule, PAZone, Presenter, PresenterSlot, Project,
+    SharedPresenterAssignment, ShowDay, SystemProcessor,
+)
+
+User = get_user_model()
+
+
+def make_template(project, consoles=1, inputs=8):
+    """A small show touching each kind of cross-table link."""
+    location = Location.objects.create(project=project, name='FOH')
+    amp_location = AmpLocation.objects.create(project=project, name='SL Rack')
+    amp_model, _ = AmpModel.objects.get_or_create(
+        manufacturer='Test', model_name='LA4X', defaults={'channel_count': 4},
+    )
+    for c in range(consoles):
+        console = Console.objects.create(project=project, location=location, name=f'Console {c}')
+        ConsoleInput.objects.bulk_create([
+            ConsoleInput(console=console, input_ch=n + 1, source=f'Vox {n + 1}') for n in range(inputs)
+        ])
+        aux = ConsoleAuxOutput.objects.create(console=console, aux_number=1, name='Wedge 1')
+
+    device = Device.objects.create(project=project, location=location, name='Stagebox')
+    DeviceInput.objects.create(
+        device=device, input_number=1, signal_name='Vox 1', console_input=ConsoleInput.objects.filter(
+            console__project=project).first(),
+    )
+    DeviceOutput.objects.create(
+        device=device, output_number=1, signal_name='Wedge 1',
+        content_type=ContentType.objects.get_for_model(ConsoleAuxOutput), object_id=aux.pk,
+    )
+
+    amp = Amp.objects.create(project=project, location=amp_location, amp_model=amp_model, name='Amp 1')
+    amp.channels.filter(channel_number=1).update(channel_name='Main L')
+
+    channel = CommChannel.objects.create(project=project, channel_number='1', name='Production')
+    beltpack = CommBeltPack.objects.create(project=project, bp_number=1, unit_location=location)
+    CommBeltPackChannel.objects.create(beltpack=beltpack, channel_number=1, channel=channel)
+
+    presenter = Presenter.objects.create(project=project, name='Host')
+    day = ShowDay.objects.create(project=project, date=datetime.date(2026, 8, 1))
+    session = MicSession.objects.create(day=day, name='Opening', num_mics=4)
+    group = MicGroup.objects.create(session=session, name='Band')
+    first = session.mic_assignments.get(rf_number=1)
+    first.groups.add(group)
+    slot = PresenterSlot.objects.create(assignment=first, presenter=presenter, is_active=True, group=group)
+    slot.a2_groups.add(group)
+    SharedPresenterAssignment.objects.create(mic_assignment=first, presenter=presenter)
+
+    processor = SystemProcessor.objects.create(
+        project=project, name='P1', device_type='P1', location=location,
+    )
+    P1Processor.objects.create(system_processor=processor)
+    P1Input.objects.filter(p1_processor__system_processor=processor, channel_number=1).update(label='Main')
+
+    zone = PAZone.objects.create(project=project, name='HL')
+    PACableSchedule.objects.create(project=project, label=zone, destination='Hang L', count=2, cable='100_NL8')
+
+
+class ProjectDuplicateTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(username='owner', password='pw')
+        cls.project = Project.objects.create(name='Festival', owner=cls.owner, venue='Park')
+        make_template(cls.project)
+
+    def test_copies_rows_once_with_remapped_links(self):
+        copy = self.project.duplicate()
+        self.assertEqual(copy.name, 'Copy of Festival')
+        self.assertEqual(copy.owner, self.owner)
+        self.assertEqual(copy.venue, 'Park')
+
+        # The save() hooks did not add blank rows next to the copies
+        self.assertEqual(AmpChannel.objects.filter(amp__project=copy).count(), 4)
+        self.assertEqual(MicAssignment.objects.filter(session__day__project=copy).count(), 4)
+        self.assertEqual(P1Input.objects.filter(p1_processor__system_processor__project=copy).count(), 16)
+        self.assertEqual(Presenter.objects.filter(project=copy).count(), 1)
+        self.assertEqual(AmpChannel.objects.get(amp__project=copy, channel_number=1).channel_name, 'Main L')
+        self.assertEqual(
+            P1Input.objects.get(p1_processor__system_processor__project=copy, input_type='ANALOG',
+                                channel_number=1).label,
+            'Main',
+        )
+
+        device_input = DeviceInput.objects.get(device__project=copy)
+        self.assertEqual(device_input.console_input.console.project, copy)
+        self.assertEqual(DeviceOutput.objects.get(device__project=copy).console_output.console.project, copy)
+        self.assertEqual(
+            CommBeltPackChannel.objects.get(beltpack__project=copy).channel.project, copy,
+        )
+        self.assertEqual(CommBeltPack.objects.get(project=copy).unit_location.project, copy)
+
+        first = MicAssignment.objects.get(session__day__project=copy, rf_number=1)
+        group = MicGroup.objects.get(session__day__project=copy)
+        self.assertEqual(list(first.groups.all()), [group])
+        self.assertEqual(first.shared_presenters.get().project, copy)
+        slot = first.presenter_slots.get()
+        self.assertEqual((slot.presenter.project, slot.group), (copy, group))
+        self.assertEqual(list(slot.a2_groups.all()), [group])
+
+        cable = PACableSchedule.objects.get(project=copy)
+        self.assertEqual((cable.label.project, cable.label.name, cable.zone), (copy, 'HL', 'HL'))
+        self.assertEqual(cable.length_per_run, 100)
+
+        # The source is untouched
+        self.assertEqual(AmpChannel.objects.filter(amp__project=self.project).count(), 4)
+        self.assertEqual(MicAssignment.objects.filter(session__day__project=self.project).count(), 4)
+
+    def test_query_count_does_not_grow_with_the_project(self):
+        bigger = Project.objects.create(name='Bigger Festival', owner=self.owner)
+        # 60 inputs stay inside one SQLite bulk_create batch
+        make_template(bigger, consoles=3, inputs=20)
+
+        counts = []
+        for project in (self.project, bigger):
+            with CaptureQueriesContext(connection) as ctx:
+                project.duplicate(new_name=f'{project.name} 2027')
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(ConsoleInput.objects.filter(console__project__name='Bigger Festival 2027').count(), 60)
@@ -0,0 +1,133 @@
+"""Tests for project revision stamps (planner/project_revisions.py): the
+signal receivers in signals.py, bulk-write bumps, and @revision_conditional."""
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from planner.mic_changes import record_queryset_changes
+from planner.models import (
+    AmpModel, Console, ConsoleInput, Location, MicAssignment, MicSession,
+    PACableSchedule, PAZone, Project, ShowDay, SystemProcessor,
+)
+from planner.project_revisions import (
+    MODULES, current_revisions, revision_stamp, touch, touch_queryset,
+)
+
+
+def revision(project, module):
+    return current_revisions(project.pk, [module])[module][0]
+
+
+class ProjectRevisionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='pw', is_staff=True)
+        cls.project = Project.objects.create(name='Festival', owner=cls.user)
+        cls.other = Project.objects.create(name='Club', owner=cls.user)
+        cls.location = Location.objects.create(project=cls.project, name='FOH')
+        cls.console = Console.objects.create(project=cls.project, name='DM7')
+
+    def test_saves_bump_their_module_in_their_project(self):
+        consoles, locations = revision(self.project, 'consoles'), revision(self.project, 'locations')
+        stamp = revision_stamp(self.project.pk, ['consoles'])
+
+        # The parent isn't loaded: one query finds the project
+        ConsoleInput.objects.create(console_id=self.console.pk, input_ch='1', source='Kick')
+
+        self.assertEqual(revision(self.project, 'consoles'), consoles + 1)
+        self.assertEqual(revision(self.project, 'locations'), locations)
+        self.assertEqual(revision(self.other, 'consoles'), 0)
+        self.assertNotEqual(revision_stamp(self.project.pk, ['consoles']).etag, stamp.etag)
+        self.assertEqual(revision_stamp(self.project.pk, ['locations']).etag,
+                         revision_stamp(self.project.pk, ['locations']).etag)
+
+    def test_a_cascade_bumps_each_module_once(self):
+        for number in range(1, 9):
+            ConsoleInput.objects.create(console=self.console, input_ch=str(number))
+        SystemProcessor.objects.create(project=self.project, name='P1', device_type='P1', location=self.location)
+        before = current_revisions(self.project.pk)
+
+        self.console.delete()
+        self.assertEqual(revision(self.project, 'consoles'), before['consoles'][0] + 1)
+
+        self.location.delete()
+        after = current_revisions(self.project.pk)
+        self.assertEqual(after['locations'][0], before['locations'][0] + 1)
+        self.assertEqual(after['processors'][0], before['processors'][0] + 1)
+
+    def test_deleting_a_project_drops_its_counters(self):
+        Console.objects.create(project=self.other, name='Spare')
+        self.other.delete()
+        self.assertEqual(current_revisions(self.other.pk)['consoles'], (0, None))
+
+    def test_catalogue_tables_count_for_every_project(self):
+        stamps = [revision_stamp(project.pk, ['amp_models']).etag for project in (self.project, self.other)]
+        AmpModel.objects.create(manufacturer='L-Acoustics', model_name='LA4X', channel_count=4)
+        for project, stamp in zip((self.project, self.other), stamps):
+            self.assertNotEqual(revision_stamp(project.pk, ['amp_models']).etag, stamp)
+
+    def test_bulk_writes_bump_through_their_call_sites(self):
+        zone = PAZone.objects.create(project=self.project, name='Main')
+        PACableSchedule.objects.create(project=self.project, label=zone)
+        cables = PACableSchedule.objects.filter(project=self.project)
+        before = revision(self.project, 'pa_cables')
+        cables.update(color='#ff0000')
+        touch_queryset(cables)
+        self.assertEqual(revision(self.project, 'pa_cables'), before + 1)
+
+        day = ShowDay.objects.create(project=self.project, date='2026-06-01')
+        session = MicSession.objects.create(day=day, name='Keynote', num_mics=4)
+        before = revision(self.project, 'mic')
+        session.mic_assignments.update(is_micd=True)
+        record_queryset_changes(self.project.pk, 'assignment', MicAssignment.objects.filter(session=session))
+        self.assertEqual(revision(self.project, 'mic'), before + 1)
+
+    def test_a_duplicated_project_gets_its_own_stamp(self):
+        copy = self.project.duplicate()
+        self.assertEqual(revision(copy, 'consoles'), 1)
+        self.assertNotEqual(revision_stamp(copy.pk).etag, revision_stamp(self.project.pk).etag)
+
+    def test_unknown_modules_are_refused(self):
+        with self.assertRaises(ValueError):
+            touch(self.project.pk, 'consoles', 'nope')
+        self.assertIn('consoles', MODULES)
+
+
+class RevisionConditionalTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='pw', is_staff=True)
+        cls.project = Project.objects.create(name='Festival', owner=cls.user)
+        zone = PAZone.objects.create(project=cls.project, name='Main')
+        PACableSchedule.objects.create(project=cls.project, label=zone)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['current_project_id'] = self.project.id
+        session.save()
+
+    def test_unchanged_export_answers_304(self):
+        url = reverse('planner:all_pa_cables_pdf_export')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        cable = PACableSchedule.objects.get(project=self.project)
+        cable.destination = 'SR'
+        cable.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_stamp_follows_the_exported_objects_project(self):
+        other = Project.objects.create(name='Club', owner=self.user)
+        console = Console.objects.create(project=other, name='SQ5')
+        url = reverse('planner:console_pdf_export', args=[console.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(etag, revision_stamp(other.pk, ['consoles', 'locations']).etag)
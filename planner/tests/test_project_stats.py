@@ -0,0 +1,135 @@
+"""Tests for the dashboard figures (planner/project_stats.py) and the
+dashboard / dashboard_stats views."""
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from planner import views
+from planner.models import (
+    Console, MicSession, PACableSchedule, PAZone, Presenter, Project,
+    SharedPresenterAssignment, ShowDay,
+)
+from planner.project_stats import load_project_stats, project_stats
+from planner.tests.test_report_data import populate
+
+
+def add_mic_day(project, date, mics, micd=0):
+    day = ShowDay.objects.create(project=project, date=date, name=f'Day {date}')
+    session = MicSession.objects.create(day=day, name='Keynote', num_mics=mics)
+    session.mic_assignments.filter(rf_number__lte=micd).update(is_micd=True)
+    return day, session
+
+
+class ProjectStatsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='pw', is_staff=True)
+        cls.project = Project.objects.create(name='Festival', owner=cls.user)
+        cls.other = Project.objects.create(name='Club', owner=cls.user)
+        populate(cls.project, 3)
+        populate(cls.other, 2)
+        Console.objects.create(project=cls.project, name='Spare')
+        PACableSchedule.objects.filter(project=cls.project).update(count=4)
+
+        _, session = add_mic_day(cls.project, '2026-06-02', 6, micd=2)
+        add_mic_day(cls.project, '2026-06-01', 4)
+        add_mic_day(cls.other, '2026-06-01', 8, micd=8)
+        presenter = Presenter.objects.create(project=cls.project, name='Guest')
+        SharedPresenterAssignment.objects.create(
+            mic_assignment=session.mic_assignments.first(), presenter=presenter,
+        )
+
+    def setUp(self):
+        project_stats.clear()
+
+    def test_figures_count_the_project_only(self):
+        stats = load_project_stats(self.project.pk)
+        self.assertEqual(stats['console'], {'total': 4, 'with_inputs': 3, 'with_outputs': 3})
+        self.assertEqual(stats['device'], {'total': 3, 'with_inputs': 3, 'with_outputs': 3})
+        self.assertEqual(stats['processor'], {'total': 3, 'p1': 3, 'galaxy': 0})
+        self.assertEqual(stats['pa_cable'], {'cable_runs': 3, 'zones': 3, 'total_cables': 12})
+        self.assertEqual(stats['comm'], {'total_packs': 3, 'wireless': 2, 'hardwired': 1, 'checked_out': 0})
+        self.assertEqual(stats['power'], {'plans': 3, 'amps_in_plans': 3})
+        self.assertEqual(stats['soundvision'], {'predictions': 3, 'arrays': 3})
+        self.assertEqual(
+            stats['mic'],
+            {'assignments': 10, 'total': 10, 'sessions': 2, 'micd': 2, 'd_mic': 0, 'available': 8, 'shared': 1},
+        )
+        self.assertEqual([(str(day['date']), day['mic_count']) for day in stats['show_days']],
+                         [('2026-06-01', 4), ('2026-06-02', 6)])
+        self.assertEqual(stats['recent_show_days'][0]['date'].isoformat(), '2026-06-01')
+        self.assertEqual(stats['recent_cables'][0]['label'], 'Zone 2')
+        self.assertEqual(stats['status'], {
+            'has_consoles': True, 'has_devices': True, 'has_amps': False, 'has_show_days': True, 'has_comm': True,
+        })
+
+        empty = load_project_stats(Project.objects.create(name='New', owner=self.user).pk)
+        self.assertEqual(empty['pa_cable']['total_cables'], 0)
+        self.assertFalse(any(empty['status'].values()))
+
+    def test_queries_do_not_grow_with_other_projects(self):
+        with self.assertNumQueries(14):
+            load_project_stats(self.project.pk)
+        populate(Project.objects.create(name='Arena', owner=self.user), 4)
+        with self.assertNumQueries(14):
+            load_project_stats(self.project.pk)
+
+    def test_figures_are_cached_until_the_project_changes(self):
+        stats = project_stats.get(self.project.pk)
+        with self.assertNumQueries(1):
+            self.assertIs(project_stats.get(self.project.pk), stats)
+
+        Console.objects.create(project=self.other, name='Elsewhere')
+        self.assertIs(project_stats.get(self.project.pk), stats)
+
+        zone = PAZone.objects.create(project=self.project, name='Delays')
+        PACableSchedule.objects.create(project=self.project, label=zone, count=2)
+        stats = project_stats.get(self.project.pk)
+        self.assertEqual(stats['pa_cable']['total_cables'], 14)
+        self.assertEqual(project_stats.stats(), {'hits': 2, 'misses': 2, 'entries': 1})
+
+
+class DashboardViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='pw', is_staff=True)
+        cls.project = Project.objects.create(name='Festival', owner=cls.user)
+        cls.other = Project.objects.create(name='Club', owner=cls.user)
+        populate(cls.project, 2)
+        populate(cls.other, 1)
+        add_mic_day(cls.project, '2026-06-01', 4, micd=1)
+
+    def setUp(self):
+        project_stats.clear()
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['current_project_id'] = self.project.id
+        session.save()
+
+    def test_stats_json_and_revalidation(self):
+        url = reverse('planner:dashboard_stats')
+        response = self.client.get(url)
+        data = response.json()
+        self.assertEqual(data['project_name'], 'Festival')
+        self.assertEqual((data['console_total'], data['pa_zones'], data['sv_arrays']), (2, 2, 2))
+        self.assertEqual((data['mic_total'], data['mic_micd'], data['power_amps']), (4, 1, 2))
+        self.assertEqual(data['show_days'], [{'date': '2026-06-01', 'name': 'Day 2026-06-01', 'mic_count': 4}])
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        Console.objects.create(project=self.project, name='Spare')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.json()['console_total'], 3)
+
+    def test_dashboard_page(self):
+        request = RequestFactory().get('/dashboard/')
+        request.user = self.user
+        request.current_project = self.project
+        response = views.dashboard(request)
+        self.assertContains(response, 'Festival')
+        self.assertContains(response, 'Day 2026-06-01')
+        self.assertContains(response, 'Zone 1')
+
+        request.current_project = None
+        self.assertContains(views.dashboard(request), 'Select a project')
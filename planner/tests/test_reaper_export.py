@@ -558,3 +558,58 @@ class QuoteSanitizationInRppTests(_SessionFixtureMixin, TestCase):
         self.assertIn("NAME \"Lead Vox 'Frank' L\"", out)
         # And the raw double-quoted label MUST NOT appear (would break parser).
         self.assertNotIn('Lead Vox "Frank" L', out)
+
+
+class ExportQueryCountTests(_SessionFixtureMixin, TestCase):
+    """Source channels are batch-loaded (MultitrackTrack.resolve_sources):
+    one query for the tracks plus one per source type, whatever the track
+    count."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = cls._build_user()
+        project = cls._build_project(user)
+        console = cls._build_console(project)
+        cls.session = cls._build_session(project, console, mode='dante')
+
+        inputs = ConsoleInput.objects.bulk_create([
+            ConsoleInput(console=console, input_ch=str(n), dante_number=str(n), source=f'Ch {n}')
+            for n in range(1, 121)
+        ])
+        aux = ConsoleAuxOutput.objects.create(console=console, aux_number=1, dante_number=200)
+        matrix = ConsoleMatrixOutput.objects.create(console=console, matrix_number=1, name='Delay')
+        stereo = ConsoleStereoOutput.objects.create(console=console, stereo_type='L', dante_number=210)
+        sources = [('input', i.id) for i in inputs] + [
+            ('aux', aux.id), ('matrix', matrix.id), ('stereo', stereo.id),
+            ('input', 999999),  # orphan: source row gone
+        ]
+        MultitrackTrack.objects.bulk_create([
+            MultitrackTrack(session=cls.session, track_number=n, source_type=t, source_id=sid)
+            for n, (t, sid) in enumerate(sources, start=1)
+        ] + [
+            MultitrackTrack(session=cls.session, track_number=200 + n, source_type='manual',
+                            label_override=f'Manual {n}')
+            for n in range(4)
+        ])
+
+    def test_rpp_export_is_one_query_per_source_type(self):
+        for mode in ('console', 'dante', 'custom'):
+            with self.subTest(mode):
+                self.session.track_order_mode = mode
+                with self.assertNumQueries(5):
+                    out = build_rpp(self.session)
+                self.assertEqual(out.count('<TRACK '), 128)
+        self.assertIn('NAME "Ch 120"', out)
+        self.assertIn('NAME "Aux 1"', out)
+        self.assertIn('NAME "Delay"', out)
+        self.assertIn('NAME "(untitled)"', out)
+
+    def test_resolved_source_follows_source_changes(self):
+        track = MultitrackTrack.resolve_sources(
+            self.session.tracks.filter(source_type='matrix')
+        )[0]
+        with self.assertNumQueries(0):
+            self.assertEqual(track.resolved_label, 'Delay')
+        track.source_type, track.source_id = 'input', ConsoleInput.objects.get(input_ch='7').id
+        self.assertEqual(track.resolved_label, 'Ch 7')
+        self.assertEqual(track.resolved_dante_number, 7)
@@ -0,0 +1,146 @@
+"""Tests for background PDF renders (planner/render_jobs.py) and the
+render_report / render_job_status / render_job_download endpoints."""
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from planner.models import Console, Location, Project, RenderJob, SoundvisionPrediction
+from planner import render_jobs
+from planner.render_jobs import (
+    RENDER_JOB_TIMEOUT, REPORTS, RenderError, report_revision, request_render,
+)
+from planner.tests.test_report_data import populate
+
+
+@override_settings(RENDER_JOB_QUEUE='inline')
+class RenderJobTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='pw', is_staff=True)
+        cls.project = Project.objects.create(name='Festival', owner=cls.user)
+        cls.other = Project.objects.create(name='Club', owner=cls.user)
+        populate(cls.project, 2)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.client.force_login(self.user)
+        self.use_project(self.project)
+
+    def use_project(self, project):
+        session = self.client.session
+        session['current_project_id'] = project.id
+        session.save()
+
+    def render(self, report_type, **params):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('planner:render_report', args=[report_type]), params)
+
+    def test_render_status_and_download(self):
+        response = self.render('system_report')
+        self.assertEqual(response.status_code, 202)
+        status = self.client.get(response.json()['status_url']).json()
+        self.assertEqual((status['status'], status['progress']), ('done', 100))
+
+        pdf = self.client.get(status['download_url'])
+        self.assertEqual(pdf['Content-Type'], 'application/pdf')
+        self.assertIn('immutable', pdf['Cache-Control'])
+        self.assertTrue(b''.join(pdf.streaming_content).startswith(b'%PDF'))
+
+    def test_unchanged_data_reuses_the_rendered_pdf(self):
+        job_id = self.render('pa_cables').json()['id']
+        response = self.render('pa_cables')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], job_id)
+        self.assertEqual(RenderJob.objects.count(), 1)
+
+    def test_changed_data_renders_again_and_drops_the_old_pdf(self):
+        old = RenderJob.objects.get(pk=self.render('system_report').json()['id'])
+        console = Console.objects.filter(project=self.project).first()
+        console.name = 'Renamed'
+        console.save()
+
+        new = RenderJob.objects.get(pk=self.render('system_report').json()['id'])
+        self.assertNotEqual(new.revision, old.revision)
+        self.assertEqual(new.status, 'done')
+        self.assertFalse(RenderJob.objects.filter(pk=old.pk).exists())
+        self.assertFalse(default_storage.exists(old.artifact.name))
+        self.assertTrue(default_storage.exists(new.artifact.name))
+
+    def test_other_projects_do_not_change_the_revision(self):
+        report_type = REPORTS['system_report']
+        before = report_revision(self.project, report_type)
+        Console.objects.create(project=self.other, name='Elsewhere')
+        Location.objects.create(project=self.other, name='Elsewhere')
+        self.assertEqual(report_revision(self.project, report_type), before)
+
+    def test_every_report_renders(self):
+        location = Location.objects.filter(project=self.project).first()
+        prediction = SoundvisionPrediction.objects.filter(project=self.project).first()
+        params = {'location': f'location_id={location.pk}', 'soundvision': f'prediction_id={prediction.pk}'}
+        for name in REPORTS:
+            with self.subTest(report=name), self.captureOnCommitCallbacks(execute=True):
+                job = request_render(self.project, name, params.get(name, ''))
+            job.refresh_from_db()
+            self.assertEqual((name, job.status, job.error), (name, 'done', ''))
+            self.assertTrue(job.artifact.read(4) == b'%PDF')
+            job.artifact.close()
+
+    def test_bad_requests(self):
+        self.assertEqual(self.render('no_such_report').status_code, 400)
+        self.assertEqual(self.render('location').status_code, 400)
+        other_location = Location.objects.create(project=self.other, name='Elsewhere')
+        self.assertEqual(self.render('location', location_id=other_location.pk).status_code, 400)
+        with self.assertRaises(RenderError):
+            request_render(self.project, 'location', {'location_id': 'x'})
+
+    def test_jobs_are_scoped_to_the_current_project(self):
+        status_url = self.render('comm').json()['status_url']
+        self.use_project(self.other)
+        self.assertEqual(self.client.get(status_url).status_code, 404)
+
+    def test_one_active_job_per_revision(self):
+        job = request_render(self.project, 'comm')
+        self.assertEqual(request_render(self.project, 'comm').pk, job.pk)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RenderJob.objects.create(
+                project=self.project, report_type='comm', params='', revision=job.revision,
+            )
+
+    def test_timeout_counts_from_when_a_worker_picked_the_job_up(self):
+        long_ago = timezone.now() - timedelta(seconds=RENDER_JOB_TIMEOUT + 60)
+        waiting = request_render(self.project, 'comm')
+        RenderJob.objects.filter(pk=waiting.pk).update(created_at=long_ago)
+        self.assertEqual(request_render(self.project, 'comm').pk, waiting.pk)
+
+        RenderJob.objects.filter(pk=waiting.pk).update(status='running', started_at=long_ago)
+        replacement = request_render(self.project, 'comm')
+        self.assertNotEqual(replacement.pk, waiting.pk)
+        self.assertEqual(RenderJob.objects.get(pk=waiting.pk).status, 'failed')
+
+    def test_job_that_timed_out_stays_failed_when_it_finishes(self):
+        job = request_render(self.project, 'comm')
+        render = REPORTS['comm'].render
+
+        def slow_render(project, obj):
+            # request_render gave up on the job while it was rendering
+            RenderJob.objects.filter(pk=job.pk).update(status='failed', error='Timed out')
+            return render(project, obj)
+
+        with mock.patch.object(REPORTS['comm'], 'render', side_effect=slow_render):
+            render_jobs.run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', 'Timed out'))
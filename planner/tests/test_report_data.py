@@ -0,0 +1,127 @@
+"""Tests for the shared PDF report loader
+(planner/utils/pdf_exports/report_data.py) and the query budget of the
+Complete System Report."""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from planner.models import (
+    AmplifierAssignment, AmplifierProfile, CommBeltPack, CommBeltPackChannel,
+    CommChannel, CommConfig, CommConfigRole, CommCrewName, CommPosition, Console, ConsoleAuxOutput,
+    ConsoleInput, ConsoleMatrixOutput, ConsoleStereoOutput, Device, DeviceInput,
+    DeviceOutput, Location, P1Processor, PACableSchedule, PAFanOut, PAZone,
+    PowerDistributionPlan, Project, SoundvisionPrediction, SpeakerArray, SpeakerCabinet, SystemProcessor,
+)
+from planner.utils.pdf_exports.ip_address_report_pdf import generate_ip_address_report_pdf
+from planner.utils.pdf_exports.report_data import ReportData, load_consoles
+
+# Queries for a whole system report, whatever the project size
+SYSTEM_REPORT_QUERY_BUDGET = 30
+
+
+def populate(project, n):
+    """`n` of every report section's parent rows, each with a few children."""
+    location = Location.objects.create(project=project, name='FOH')
+    amplifier = AmplifierProfile.objects.create(
+        manufacturer='L-Acoustics', model=f'LA12X {project.pk}', idle_power_watts=100,
+        rated_power_watts=1000, peak_power_watts=2000, max_power_watts=3000,
+    )
+    comm_channel = CommChannel.objects.create(
+        project=project, channel_type='4W', channel_number='1', name='Production', abbreviation='PROD',
+    )
+    for i in range(n):
+        console = Console.objects.create(project=project, name=f'Console {i}')
+        for number in ('10', '2', '1'):
+            ConsoleInput.objects.create(console=console, dante_number=number, input_ch=number, source=f'Src {number}')
+        ConsoleAuxOutput.objects.create(console=console, aux_number='1', name='Wedge')
+        ConsoleMatrixOutput.objects.create(console=console, matrix_number='1', name='Delay')
+        ConsoleStereoOutput.objects.create(console=console, stereo_type='L', name='Main')
+
+        device = Device.objects.create(project=project, name=f'Stagebox {i}', location=location)
+        DeviceInput.objects.create(
+            device=device, input_number=1, console_input=console.consoleinput_set.first(),
+        )
+        DeviceOutput.objects.create(device=device, output_number=1, console_output=console.consoleauxoutput_set.get())
+
+        processor = SystemProcessor.objects.create(project=project, name=f'P1 {i}', device_type='P1', location=location)
+        P1Processor.objects.create(system_processor=processor)
+
+        cable = PACableSchedule.objects.create(
+            project=project, label=PAZone.objects.create(project=project, name=f'Zone {i}'), to_location='SL',
+        )
+        PAFanOut.objects.create(cable_schedule=cable, fan_out_type='NL4_Y', quantity=2)
+
+        pack = CommBeltPack.objects.create(
+            project=project, bp_number=i + 1, system_type=('WIRELESS', 'HARDWIRED')[i % 2],
+            position=CommPosition.objects.create(project=project, name=f'A{i}'),
+            name=CommCrewName.objects.create(project=project, name=f'Crew {i}'),
+            unit_location=location,
+        )
+        CommBeltPackChannel.objects.create(beltpack=pack, channel_number=1, channel=comm_channel)
+
+        plan = PowerDistributionPlan.objects.create(project=project, venue_name=f'Venue {i}')
+        AmplifierAssignment.objects.create(distribution_plan=plan, amplifier=amplifier, position='SL', quantity=2)
+
+        prediction = SoundvisionPrediction.objects.create(project=project, file_name=f'show {i}.xmlp')
+        array = SpeakerArray.objects.create(prediction=prediction, source_name=f'Main {i}')
+        for position in (2, 1):
+            SpeakerCabinet.objects.create(array=array, position_number=position, speaker_model='KARA II')
+
+
+class ReportDataTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='pw', is_staff=True)
+        cls.small = Project.objects.create(name='Club', owner=cls.user)
+        cls.large = Project.objects.create(name='Festival', owner=cls.user)
+        populate(cls.small, 1)
+        populate(cls.large, 6)
+
+    def test_sections_are_loaded_in_report_order(self):
+        report = ReportData(self.small)
+        with self.assertNumQueries(0):
+            consoles = load_consoles(Console.objects.none())
+        self.assertEqual(consoles, [])
+
+        console, = report.consoles
+        self.assertEqual([inp.dante_number for inp in console.report_inputs], ['1', '2', '10'])
+        prediction, = report.predictions
+        device, = report.devices
+        with self.assertNumQueries(0):
+            self.assertEqual([cab.position_number for cab in prediction.report_arrays[0].report_cabinets], [1, 2])
+            self.assertEqual(device.report_outputs[0].console_output.console.name, 'Console 0')
+            self.assertEqual(device.report_inputs[0].console_input.console.name, 'Console 0')
+
+    def system_report_queries(self, project):
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['current_project_id'] = project.id
+        session.save()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('planner:system_report_pdf'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        return len(ctx.captured_queries)
+
+    def test_system_report_query_count_does_not_grow_with_the_project(self):
+        self.system_report_queries(self.small)  # warm the session and content type caches
+        small = self.system_report_queries(self.small)
+        self.assertEqual(self.system_report_queries(self.large), small)
+        self.assertLessEqual(small, SYSTEM_REPORT_QUERY_BUDGET)
+
+    def ip_report_queries(self, project, configs):
+        for i in range(configs):
+            config = CommConfig.objects.create(project=project, name=f'Arcadia {i}')
+            for number in (2, 1):
+                CommConfigRole.objects.create(
+                    config=config, role_number=number, device_type='FSII-BP', label=f'BP {number}',
+                )
+        with CaptureQueriesContext(connection) as ctx:
+            generate_ip_address_report_pdf(project)
+        return len(ctx.captured_queries)
+
+    def test_ip_report_query_count_does_not_grow_with_comm_configs(self):
+        self.assertEqual(self.ip_report_queries(self.large, 6), self.ip_report_queries(self.small, 1))
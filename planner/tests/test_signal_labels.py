@@ -0,0 +1,162 @@
+"""Tests for the in-memory signal-label index behind
+signal_flow_label_autocomplete (planner/signal_labels.py)."""
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from planner.models import (
+    Amp, AmpLocation, AmpModel, Console, ConsoleAuxOutput, ConsoleInput,
+    Device, DeviceInput, DeviceOutput, Location, P1Input, P1Processor, Project,
+    SystemProcessor,
+)
+from planner.signal_labels import LabelIndexCache, SignalLabelIndex, label_index
+
+
+class SignalLabelIndexTests(TestCase):
+
+    def test_search_is_case_insensitive_alphabetical_and_capped(self):
+        index = SignalLabelIndex(
+            [(f'Vox {n:02d}', 'Console Input') for n in range(20)]
+            + [('vox 00', 'Amp Channel'), ('Kick', 'Console Input')]
+        )
+        labels = [r['label'] for r in index.search('VOX')]
+        self.assertEqual(len(labels), 8)
+        self.assertEqual(labels[:3], ['Vox 00', 'vox 00', 'Vox 01'])
+        self.assertEqual(index.search('kic'), [{'label': 'Kick', 'source': 'Console Input'}])
+        self.assertEqual(index.search(''), index.search('', limit=8))
+
+    def test_tags_follow_source_order_and_filter(self):
+        index = SignalLabelIndex([
+            ('Main L', 'Amp Channel'), ('Main L', 'Device Input'), ('Main L', 'Device Input'),
+        ])
+        self.assertEqual(
+            index.search('main'),
+            [{'label': 'Main L', 'source': 'Device Input'},
+             {'label': 'Main L', 'source': 'Amp Channel'}],
+        )
+        self.assertEqual(
+            index.search('main', tags={'Amp Channel'}),
+            [{'label': 'Main L', 'source': 'Amp Channel'}],
+        )
+
+    def test_cache_expires_after_ttl(self):
+        now = [0.0]
+        cache = LabelIndexCache(ttl=60, clock=lambda: now[0])
+        project = Project.objects.create(name='Gig', owner=User.objects.create_user('u'))
+        first = cache.get(project.pk)
+        self.assertIs(cache.get(project.pk), first)
+        now[0] = 61
+        self.assertIsNot(cache.get(project.pk), first)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+    def test_build_overtaken_by_an_invalidation_is_not_kept(self):
+        from planner import signal_labels
+
+        cache = LabelIndexCache()
+        load = signal_labels.load_project_labels
+
+        def load_then_write(project_id):
+            pairs = load(project_id)
+            cache.invalidate(project_id)  # a label saved mid-build
+            return pairs
+
+        with mock.patch.object(signal_labels, 'load_project_labels', side_effect=load_then_write):
+            stale = cache.get(42)
+        self.assertIsNot(cache.get(42), stale)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+
+class SignalLabelAutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='pw', is_staff=True)
+        cls.project = Project.objects.create(name='Gig', owner=cls.user)
+        cls.other = Project.objects.create(name='Other Gig', owner=cls.user)
+        cls.console = Console.objects.create(project=cls.project, name='FOH')
+        ConsoleInput.objects.create(console=cls.console, source='Lead Vox')
+        ConsoleInput.objects.create(console=cls.console, source='')
+        ConsoleAuxOutput.objects.create(console=cls.console, aux_number='1', name='Vox Wedge')
+        cls.device = Device.objects.create(project=cls.project, name='Stagebox')
+        DeviceOutput.objects.create(device=cls.device, output_number=1, signal_name='Vox Return')
+        other_console = Console.objects.create(project=cls.other, name='Other')
+        ConsoleInput.objects.create(console=other_console, source='Other Vox')
+
+    def setUp(self):
+        label_index.clear()
+        self.client.force_login(self.user)
+        session = self.client.session
+        session['current_project_id'] = self.project.id
+        session.save()
+
+    def search(self, q, **params):
+        response = self.client.get(
+            reverse('planner:signal_flow_label_autocomplete'), {'q': q, **params},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_results_are_project_scoped_and_tagged(self):
+        self.assertEqual(self.search('vox'), [
+            {'label': 'Lead Vox', 'source': 'Console Input'},
+            {'label': 'Vox Return', 'source': 'Device Output'},
+            {'label': 'Vox Wedge', 'source': 'Console Aux Out'},
+        ])
+        self.assertEqual(
+            self.search('vox', shape_class='showstack.Console'),
+            [{'label': 'Lead Vox', 'source': 'Console Input'},
+             {'label': 'Vox Wedge', 'source': 'Console Aux Out'}],
+        )
+
+    def test_keystrokes_after_the_first_do_not_query_labels(self):
+        self.search('v')
+        with CaptureQueriesContext(connection) as ctx:
+            self.search('vo')
+            self.search('vox')
+        label_queries = [q for q in ctx.captured_queries if 'UNION' in q['sql']]
+        self.assertEqual(label_queries, [])
+        self.assertEqual(label_index.stats()['misses'], 1)
+
+    def test_saves_and_deletes_invalidate_the_index(self):
+        self.search('vox')
+        DeviceInput.objects.create(device=self.device, input_number=1, signal_name='Vox Spare')
+        self.assertIn({'label': 'Vox Spare', 'source': 'Device Input'}, self.search('vox'))
+
+        # Deleted directly
+        ConsoleInput.objects.filter(source='Lead Vox').get().delete()
+        self.assertNotIn('Lead Vox', [r['label'] for r in self.search('vox')])
+
+        # Rows removed by a cascade
+        self.console.delete()
+        self.assertEqual(
+            [r['label'] for r in self.search('vox')], ['Vox Return', 'Vox Spare'],
+        )
+
+    def test_processor_and_amp_labels_invalidate_through_their_parents(self):
+        self.search('main')
+        amp_model = AmpModel.objects.create(manufacturer='Test', model_name='LA4X', channel_count=4)
+        amp = Amp.objects.create(
+            project=self.project, amp_model=amp_model, name='Amp 1',
+            location=AmpLocation.objects.create(project=self.project, name='SL'),
+        )
+        channel = amp.channels.get(channel_number=1)
+        channel.channel_name = 'Main L'
+        channel.save()
+        processor = SystemProcessor.objects.create(
+            project=self.project, name='P1', device_type='P1',
+            location=Location.objects.create(project=self.project, name='FOH'),
+        )
+        p1 = P1Processor.objects.create(system_processor=processor)
+        P1Input.objects.create(p1_processor=p1, input_type='ANALOG', channel_number=99, label='Main R')
+        self.assertEqual(self.search('main'), [
+            {'label': 'Main L', 'source': 'Amp Channel'},
+            {'label': 'Main R', 'source': 'P1 Input'},
+        ])
+
+        processor.delete()
+        amp.location.delete()
+        self.assertEqual(self.search('main'), [])
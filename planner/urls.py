@@ -181,6 +181,7 @@ urlpatterns = [
     path('api/mic/slot/upload-photo/', views.upload_slot_photo, name='upload_slot_photo'),
     # Issue #39: server-side fetch of a dragged image URL (CORS workaround).
     path('api/mic/slot/upload-photo-from-url/', views.upload_slot_photo_from_url, name='upload_slot_photo_from_url'),
+    path('api/mic/photo/<slug:digest>/<slug:size>.jpg', views.stored_photo, name='stored_photo'),
 
     path('api/mic/slot/update/', views.update_slot_field, name='update_slot_field'),
     path('api/mic/slot/assign-group/', views.assign_slot_group, name='assign_slot_group'),
@@ -233,6 +234,11 @@ urlpatterns = [
      path('ip-addresses/export-pdf/', views.export_ip_address_report_pdf, name='export_ip_address_report_pdf'),
      path('ip-addresses/export-csv/', views.export_ip_address_report_csv, name='export_ip_address_report_csv'), 
 
+     #-------Background PDF renders---
+     path('api/reports/<slug:report_type>/render/', views.render_report, name='render_report'),
+     path('api/reports/jobs/<uuid:job_id>/', views.render_job_status, name='render_job_status'),
+     path('api/reports/jobs/<uuid:job_id>/pdf/', views.render_job_download, name='render_job_download'),
+
 
      #-------Device PDF-----
      # Device PDF exports
@@ -294,6 +300,8 @@ urlpatterns = [
     #------Auto Refresh for Mic Trackser---
 
     path('api/mic-tracker-checksum/', views.mic_tracker_checksum, name='mic_tracker_checksum'),
+    path('api/mic-tracker-changes/', views.mic_tracker_changes, name='mic_tracker_changes'),
+    path('api/mic-tracker-days/', views.mic_tracker_days, name='mic_tracker_days'),
 
 
     path('debug-device-ordering/', views.debug_device_ordering, name='debug_device_ordering'),
@@ -317,6 +325,8 @@ urlpatterns = [
     # Network Health Monitor — Dashboard (session auth)
     path('network-monitor/', views_monitor.network_monitor_view, name='network_monitor'),
     path('network-monitor/status/', views_monitor.monitor_status_view, name='monitor_status'),
+    path('network-monitor/latency/', views_monitor.monitor_latency_view, name='monitor_latency'),
+    path('network-monitor/stream/', views_monitor.monitor_stream_view, name='monitor_stream'),
 
     # Network Health Monitor — Dashboard management (session auth)
     path('network-monitor/devices/<int:device_id>/remove/', views_monitor.dashboard_remove_device, name='dashboard_remove_device'),
@@ -345,6 +355,7 @@ urlpatterns = [
 
     # Network Health Monitor — Phase 3: Dante (agent)
     path('network-monitor/api/dante-results/', views_monitor.agent_dante_results, name='agent_dante_results'),
+    path('network-monitor/api/batch/', views_monitor.agent_batch, name='agent_batch'),
 
     # ── Signal Flow Diagrammer (v2.2) ─────────────────────────────────────────
     # DGM-01..DGM-05 + DGM-08 (autosave URL stub).
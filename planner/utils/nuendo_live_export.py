@@ -20,6 +20,7 @@ bytes-builder with no DB writes.
 from __future__ import annotations
 
 import copy
+import re
 from pathlib import Path
 
 from lxml import etree
@@ -52,11 +53,18 @@ _TEMPLATE_PATH = (
     / 'nuendo_live_3_template.nlpr'
 )
 
-# Module-level cache; populated by _load_template() on first call. We
-# cache the parsed ElementTree and deepcopy the root per export so the
-# cache never sees mutations (Pitfall 3).
+# Module-level cache; populated by _parse_template() on first call. The
+# parsed tree is never mutated (Pitfall 3): exports render from the
+# _CompiledTemplate built from it, and _load_template() hands out deepcopies.
 _TEMPLATE_TREE: etree._ElementTree | None = None
 
+# _CompiledTemplate for the tree currently in _TEMPLATE_TREE (rebuilt if the
+# tree is reparsed).
+_COMPILED: _CompiledTemplate | None = None
+
+# Streamed responses are flushed in chunks of about this many bytes.
+STREAM_CHUNK_BYTES = 64 * 1024
+
 # ──────────────────────────────────────────────────────────────────
 # Errors
 # ──────────────────────────────────────────────────────────────────
@@ -76,12 +84,8 @@ class ExportTemplateError(Exception):
 # ──────────────────────────────────────────────────────────────────
 
 
-def _load_template():
-    """Return a deepcopy of the bundled template root.
-
-    Parses the template once and caches the parsed tree. Each caller
-    gets a deepcopy so mutations never leak back into the cache
-    (RESEARCH Pitfall 3).
+def _parse_template():
+    """Return the bundled template's parsed ElementTree, parsing it once.
 
     Uses lxml's recover-mode parser because real Nuendo Live 3 output
     embeds raw control bytes (e.g. 0x01-0x08) inside `wide="true"`
@@ -91,6 +95,8 @@ def _load_template():
     deep-copies into output (the seed track itself is clean ASCII).
     huge_tree disables libxml2's security caps so 60KB+ Mac-saved
     fixtures parse without surprises.
+
+    The returned tree is shared — callers must not mutate it.
     """
     global _TEMPLATE_TREE
     if _TEMPLATE_TREE is None:
@@ -109,7 +115,12 @@ def _load_template():
             raise ExportTemplateError(
                 f'Nuendo Live template malformed: {exc}'
             ) from exc
-    return copy.deepcopy(_TEMPLATE_TREE.getroot())
+    return _TEMPLATE_TREE
+
+
+def _load_template():
+    """Return a deepcopy of the bundled template root (safe to mutate)."""
+    return copy.deepcopy(_parse_template().getroot())
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -301,57 +312,186 @@ def _sanitize_label(label):
 
 
 # ──────────────────────────────────────────────────────────────────
-# Public builder
+# Compiled template
 # ──────────────────────────────────────────────────────────────────
 
+# Slot markers written into the template while compiling it. U+E000 is a
+# private-use code point lxml serialises verbatim; it never appears in the
+# template itself.
+_SLOT_MARK = '\ue000'
+_SLOT_RE = re.compile(f'{_SLOT_MARK}([a-z]+):?([0-9]*){_SLOT_MARK}'.encode('utf-8'))
 
-def build_nlpr(session) -> bytes:
-    """Generate a Nuendo Live 3 .nlpr file as UTF-8 bytes.
-
-    Algorithm (RESEARCH Pattern 1 / spec §template-injection):
-      1. Load the bundled template (cached, deepcopy per call).
-      2. Locate the seed <obj class='MAudioTrackEvent'> and its
-         <list name='Tracks'> container. Works for both Windows-saved
-         (seed nested in MFolderTrack[name='Audio']) and Mac-saved
-         (seed directly in top-level MTrackList) templates.
-      3. Compute the next free ID as max(existing) + 1000 (D-08).
-      4. For each enabled track in session order:
-            a. deepcopy the seed
-            b. replace every ID/RuntimeID with sequential fresh IDs
-            c. set both Name elements to the resolved label
-            d. set Channel ID to the 1-based index
-            e. apply or strip Farb per resolved_yamaha_name
-            f. append to the <list> alongside the seed
-      5. Remove the seed (D-10 — every output track is generated
-         identically; the seed never appears in the output).
-      6. Serialize via etree.tostring with xml_declaration=True,
-         encoding='utf-8'.
-
-    Returns bytes (NOT str). The view layer wraps in HttpResponse with
-    content_type='application/xml; charset=utf-8'.
 
-    Raises:
-        ExportTemplateError — bundled fixture missing / malformed /
-            doesn't parse to exactly one MAudioTrackEvent seed inside
-            a <list name='Tracks'> container. Caller catches and
-            renders editor.html with export_error (D-03).
+def _slot(kind, n=''):
+    return f'{_SLOT_MARK}{kind}:{n}{_SLOT_MARK}' if n != '' else f'{_SLOT_MARK}{kind}{_SLOT_MARK}'
+
+
+def _escape_attr(value):
+    """Escape `value` for a double-quoted attribute exactly as lxml's
+    serialiser does."""
+    return (
+        value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        .replace('"', '&quot;').replace('\n', '&#10;').replace('\r', '&#13;')
+        .replace('\t', '&#9;')
+    )
+
+
+class _TrackFragment:
+    """One serialised seed-track variant, cut at its slots.
+
+    `parts` alternates literal bytes and (kind, n) slots: ('id', n) is the
+    n-th fresh ID of the track, ('name',) the label, ('channel',) the
+    1-based index and ('farb',) the Farb value.
+    """
+
+    def __init__(self, seed, with_farb):
+        track = copy.deepcopy(seed)
+        # Built with the same helpers the per-track algorithm used, so the
+        # rendered bytes match it exactly.
+        _apply_farb(track, next(iter(YAMAHA_TO_FARB)) if with_farb else None)
+        # _replace_all_ids numbers the IDs 0..k-1 in allocation order; each
+        # becomes the slot for first_id + n.
+        self.id_count = _replace_all_ids(track, 0)
+        for elem in track.xpath("descendant-or-self::*[@ID]"):
+            elem.set('ID', _slot('id', elem.get('ID')))
+        for elem in track.xpath(".//int[@name='RuntimeID' or @name='ID']"):
+            elem.set('value', _slot('id', elem.get('value')))
+        _set_names(track, _slot('name'))
+        _set_channel_id(track, _slot('channel'))
+        if with_farb:
+            track.find(
+                ".//member[@name='Additional Attributes']/int[@name='Farb']"
+            ).set('value', _slot('farb'))
+
+        self.parts = []
+        raw = etree.tostring(track, encoding='utf-8')
+        pos = 0
+        for match in _SLOT_RE.finditer(raw):
+            self.parts.append(raw[pos:match.start()])
+            kind, number = match.group(1).decode(), match.group(2)
+            self.parts.append((kind, int(number)) if number else (kind,))
+            pos = match.end()
+        self.parts.append(raw[pos:])
+
+    def render(self, first_id, label, channel, farb):
+        values = {
+            'name': _escape_attr(label).encode('utf-8'),
+            'channel': str(channel).encode(),
+            'farb': str(farb).encode(),
+        }
+        out = []
+        for part in self.parts:
+            if isinstance(part, bytes):
+                out.append(part)
+            elif part[0] == 'id':
+                out.append(str(first_id + part[1]).encode())
+            else:
+                out.append(values[part[0]])
+        return b''.join(out)
+
+
+class _CompiledTemplate:
+    """The template split once into the bytes before the generated tracks,
+    the seed track (with and without Farb) and the bytes after them.
+
+    Equivalent to the D-08/D-10 algorithm: tracks go at the end of the
+    seed's <list name='Tracks'>, the seed is dropped, and IDs are allocated
+    sequentially from max(existing) + 1000.
     """
-    root = _load_template()
-    seed_track, track_list = _find_seed_and_container(root)
 
-    next_id = _scan_max_id(root) + 1000
+    def __init__(self, tree):
+        self.tree = tree
+        root = copy.deepcopy(tree.getroot())
+        seed, container = _find_seed_and_container(root)
+        self.first_id = _scan_max_id(root) + 1000
+        self.tracks = {
+            True: _TrackFragment(seed, with_farb=True),
+            False: _TrackFragment(seed, with_farb=False),
+        }
 
-    enabled_tracks = _ordered_enabled_tracks(session)
-    for n, mt_track in enumerate(enabled_tracks, start=1):
-        new_track = copy.deepcopy(seed_track)
-        next_id = _replace_all_ids(new_track, next_id)
-        _set_names(new_track, _sanitize_label(mt_track.resolved_label))
-        _set_channel_id(new_track, n)
-        _apply_farb(new_track, mt_track.resolved_yamaha_name)
-        track_list.append(new_track)
+        container.remove(seed)
+        etree.SubElement(container, 'nlpr-tracks')
+        raw = etree.tostring(root, xml_declaration=True, encoding='utf-8')
+        self.prefix, self.suffix = raw.split(b'<nlpr-tracks/>')
 
-    # D-10: drop the seed AFTER the loop so its IDs never appear in the
-    # output. Every output track came from the sequential allocator.
-    track_list.remove(seed_track)
 
-    return etree.tostring(root, xml_declaration=True, encoding='utf-8')
+def _compiled_template():
+    global _COMPILED
+    tree = _parse_template()
+    if _COMPILED is None or _COMPILED.tree is not tree:
+        _COMPILED = _CompiledTemplate(tree)
+    return _COMPILED
+
+
+# ──────────────────────────────────────────────────────────────────
+# Public builders
+# ──────────────────────────────────────────────────────────────────
+
+
+def iter_nlpr(session):
+    """Generate a Nuendo Live 3 .nlpr file as an iterator of UTF-8 byte
+    chunks, for a StreamingHttpResponse.
+
+    Algorithm (RESEARCH Pattern 1 / spec §template-injection), with the
+    template work done once per process by _CompiledTemplate:
+      1. Prefix: the bundled template up to the seed's
+         <list name='Tracks'> contents (seed removed — D-10).
+      2. For each enabled track in session order, the seed fragment with
+         fresh sequential IDs (D-08), both Name elements set to the
+         resolved label, Channel ID set to the 1-based index, and Farb
+         set or stripped per resolved_yamaha_name.
+      3. Suffix: the rest of the template.
+
+    The template is compiled and the tracks are loaded before this
+    returns, so ExportTemplateError (bundled fixture missing / malformed /
+    no single MAudioTrackEvent seed inside a <list name='Tracks'>) is
+    raised here and never mid-stream. Caller catches and renders
+    editor.html with export_error (D-03).
+    """
+    template = _compiled_template()
+    tracks = _ordered_enabled_tracks(session)
+    return _stream(template, tracks)
+
+
+async def aiter_chunks(chunks):
+    """Serve iter_nlpr's chunks as an async iterator, for a
+    StreamingHttpResponse under ASGI. Django reads a sync iterator there
+    into memory in one go (sync_to_async(list)), which would undo the
+    streaming. The chunks only format tracks iter_nlpr already loaded, so
+    producing them on the event loop never touches the database.
+    """
+    for chunk in chunks:
+        yield chunk
+
+
+def _stream(template, tracks):
+    yield template.prefix
+    next_id = template.first_id
+    buffer, size = [], 0
+    for n, mt_track in enumerate(tracks, start=1):
+        farb = YAMAHA_TO_FARB.get(mt_track.resolved_yamaha_name)
+        fragment = template.tracks[farb is not None]
+        chunk = fragment.render(
+            next_id, _sanitize_label(mt_track.resolved_label), n, farb,
+        )
+        next_id += fragment.id_count
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_CHUNK_BYTES:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+    yield template.suffix
+
+
+def build_nlpr(session) -> bytes:
+    """Generate a Nuendo Live 3 .nlpr file as UTF-8 bytes (iter_nlpr,
+    joined).
+
+    Returns bytes (NOT str). The download view streams iter_nlpr instead.
+
+    Raises:
+        ExportTemplateError — see iter_nlpr.
+    """
+    return b''.join(iter_nlpr(session))
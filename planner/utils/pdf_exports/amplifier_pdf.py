@@ -14,6 +14,7 @@ from collections import defaultdict
 import ipaddress
 
 from .pdf_styles import PDFStyles, LANDSCAPE_PAGE, MARGIN, BRAND_BLUE, DARK_GRAY
+from .report_data import load_amps
 
 
 def export_all_amps_pdf(current_project):
@@ -62,14 +63,14 @@ def export_all_amps_pdf(current_project):
     # CRITICAL: Filter by current project ONLY
     amps = Amp.objects.filter(
         project=current_project  # MUST FILTER BY PROJECT
-    ).select_related('location', 'amp_model').prefetch_related('channels')
+    )
     
     # Filter out test amps
-    amps = amps.exclude(name__icontains='test').exclude(name__iexact='kara')
+    amps = load_amps(amps.exclude(name__icontains='test').exclude(name__iexact='kara'))
     
     # Check if we have any amps
     if not amps:
-        story.append(Paragraph(f"No amplifiers found in project: {current_project.name}", styles.get_normal_style()))
+        story.append(Paragraph(f"No amplifiers found in project: {current_project.name}", styles.get_body_style()))
         doc.build(story)
         buffer.seek(0)
         response = HttpResponse(buffer.read(), content_type='application/pdf')
@@ -140,7 +141,7 @@ def export_all_amps_pdf(current_project):
             story.append(Spacer(1, 0.15 * inch))
             
             # SECTION 1: Amp Channels (Inputs) - AT THE TOP
-            channels = list(amp.channels.all().order_by('channel_number'))
+            channels = amp.report_channels
             
             if channels:
                 # Build channel table
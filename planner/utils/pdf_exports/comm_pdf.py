@@ -10,6 +10,7 @@ from io import BytesIO
 from itertools import groupby
 
 from .pdf_styles import PDFStyles, MARGIN, BRAND_BLUE, DARK_GRAY
+from .report_data import load_belt_packs
 
 
 def get_channel_abbrev(channel):
@@ -31,8 +32,9 @@ def get_channel_abbrev(channel):
     return channel_str[:4].upper()
 
 
-def generate_comm_beltpacks_pdf():
-    """Generate PDF for all Comm Belt Packs grouped by system type and manufacturer."""
+def generate_comm_beltpacks_pdf(project=None):
+    """Generate PDF for all Comm Belt Packs grouped by system type and manufacturer.
+    `project` limits it to one project's belt packs."""
     from planner.models import CommBeltPack
     
     buf = BytesIO()
@@ -97,11 +99,12 @@ def generate_comm_beltpacks_pdf():
     first_section = True
     for system_type, type_name in [('HARDWIRED', 'Hardwired'), ('WIRELESS', 'Wireless')]:
         # Get all belt packs for this type
-        bps = CommBeltPack.objects.filter(
-            system_type=system_type
-        ).order_by('manufacturer', 'bp_number').prefetch_related('channels__channel')
+        bps = CommBeltPack.objects.filter(system_type=system_type)
+        if project is not None:
+            bps = bps.filter(project=project)
+        bps = load_belt_packs(bps.order_by('manufacturer', 'bp_number'))
         
-        if not bps.exists():
+        if not bps:
             continue
         
         # Add page break before new section (except first)
@@ -147,7 +150,7 @@ def generate_comm_beltpacks_pdf():
             # Determine max channels needed for this group
             max_channels = 0
             for bp in manufacturer_bps:
-                channel_count = bp.channels.count()
+                channel_count = len(bp.report_channels)
                 if channel_count > max_channels:
                     max_channels = channel_count
             
@@ -165,7 +168,7 @@ def generate_comm_beltpacks_pdf():
             # Add data rows
             for bp in manufacturer_bps:
                 # Get all channels for this belt pack
-                channels = list(bp.channels.all().order_by('channel_number'))
+                channels = bp.report_channels
                 
                 # Create channel summary
                 if len(channels) == 0:
@@ -246,7 +249,7 @@ def generate_comm_beltpacks_pdf():
                 detail_paragraphs = [detail_header, Spacer(1, 0.05*inch)]
                 
                 for bp in detailed_bps:
-                    channels = list(bp.channels.all().order_by('channel_number'))
+                    channels = bp.report_channels
                     
                     # Belt pack identifier
                     bp_id = f"<b>BP #{bp.bp_number}</b>"
@@ -10,6 +10,7 @@ from io import BytesIO
 from django.http import HttpResponse
 
 from .pdf_styles import PDFStyles, LANDSCAPE_PAGE, MARGIN
+from .report_data import load_consoles
 
 
 def export_console_pdf(console):
@@ -22,6 +23,10 @@ def export_console_pdf(console):
     Returns:
         HttpResponse with PDF content
     """
+    from planner.models import Console
+
+    console = load_consoles(Console.objects.filter(pk=console.pk))[0]
+
     # Create PDF in memory
     buffer = BytesIO()
     
@@ -50,14 +55,14 @@ def export_console_pdf(console):
     story.append(Spacer(1, 0.2 * inch))
     
     # Section 1: Console Inputs
-    if console.consoleinput_set.exists():
+    if console.report_inputs:
         story.append(Paragraph("Console Inputs", styles.get_section_style()))
         story.append(Spacer(1, 0.1 * inch))
         
         # Build table data with all fields including source_hardware
         data = [['Dante #', 'Input Ch', 'Source', 'Src Hardware', 'Group', 'DCA', 'Mute', 'Direct Out', 'Omni In']]
         
-        for inp in console.consoleinput_set.all().order_by('dante_number'):
+        for inp in console.report_inputs:
             # Only include if at least one field has data
             if inp.dante_number or inp.input_ch or inp.source or inp.group or inp.dca or inp.mute or inp.direct_out or inp.omni_in:
                 data.append([
@@ -83,17 +88,13 @@ def export_console_pdf(console):
             story.append(PageBreak())
     
     # Section 2: Aux Outputs
-    if console.consoleauxoutput_set.exists():
+    if console.report_aux:
         story.append(Paragraph("Aux Outputs", styles.get_section_style()))
         story.append(Spacer(1, 0.1 * inch))
         
         data = [['Dante #', 'Aux', 'Name', 'Mono/Stereo', 'Bus Type', 'Omni Out']]
         
-        # Get all aux outputs and sort them numerically
-        aux_outputs = list(console.consoleauxoutput_set.all())
-        aux_outputs.sort(key=lambda x: int(x.aux_number) if x.aux_number and x.aux_number.isdigit() else 999)
-        
-        for aux in aux_outputs:
+        for aux in console.report_aux:
             # Only include if at least one field has data
             if aux.aux_number or aux.dante_number or aux.name or aux.mono_stereo or hasattr(aux, 'bus_type') and aux.bus_type or hasattr(aux, 'omni_out') and aux.omni_out:
                 data.append([
@@ -114,17 +115,13 @@ def export_console_pdf(console):
             story.append(PageBreak())
     
     # Section 3: Matrix Outputs
-    if console.consolematrixoutput_set.exists():
+    if console.report_matrix:
         story.append(Paragraph("Matrix Outputs", styles.get_section_style()))
         story.append(Spacer(1, 0.1 * inch))
         
         data = [['Dante #', 'Matrix', 'Name', 'Mono/Stereo', 'Destination', 'Omni Out']]
         
-        # Get all matrix outputs and sort them numerically
-        matrix_outputs = list(console.consolematrixoutput_set.all())
-        matrix_outputs.sort(key=lambda x: int(x.matrix_number) if x.matrix_number and x.matrix_number.isdigit() else 999)
-        
-        for mtx in matrix_outputs:
+        for mtx in console.report_matrix:
             # Only include if at least one field has data
             if mtx.matrix_number or mtx.dante_number or mtx.name or mtx.mono_stereo or hasattr(mtx, 'destination') and mtx.destination or hasattr(mtx, 'omni_out') and mtx.omni_out:
                 data.append([
@@ -145,17 +142,14 @@ def export_console_pdf(console):
             story.append(PageBreak())
     
     # Section 4: Stereo Outputs
-    if console.consolestereooutput_set.exists():
+    if console.report_stereo:
         story.append(Paragraph("Stereo Outputs", styles.get_section_style()))
         story.append(Spacer(1, 0.1 * inch))
 
         data = [['Dante #', 'Buss', 'Name', 'Omni Out']]
 
-        # Get all stereo outputs for this console
-        stereo_outputs = console.consolestereooutput_set.all()
-
         # Add each stereo output to the table
-        for stereo in stereo_outputs:
+        for stereo in console.report_stereo:
             data.append([
                 str(stereo.dante_number or ''),
                 stereo.get_stereo_type_display() if stereo.stereo_type else '',
@@ -11,6 +11,7 @@ from io import BytesIO
 from django.http import HttpResponse
 
 from .pdf_styles import PDFStyles, LANDSCAPE_PAGE, MARGIN, BRAND_BLUE
+from .report_data import load_devices
 
 
 def export_device_pdf(device):
@@ -23,6 +24,10 @@ def export_device_pdf(device):
     Returns:
         HttpResponse with PDF content
     """
+    from planner.models import Device
+
+    device = load_devices(Device.objects.filter(pk=device.pk))[0]
+
     buffer = BytesIO()
     
     doc = SimpleDocTemplate(
@@ -48,10 +53,9 @@ def export_device_pdf(device):
     story.append(Paragraph("<b>INPUTS</b>", styles.get_section_style()))
     story.append(Spacer(1, 0.1 * inch))
     
-    # CRITICAL: Order by input_number (now that they're populated!)
-    device_inputs = device.inputs.filter(input_number__isnull=False).order_by('input_number')
+    device_inputs = device.report_inputs
     
-    if device_inputs.exists():
+    if device_inputs:
         input_data = [['#', 'Input', 'Console Source']]
         
         # Build a dict for quick lookup by input_number
@@ -108,10 +112,9 @@ def export_device_pdf(device):
     story.append(Paragraph("<b>OUTPUTS</b>", styles.get_section_style()))
     story.append(Spacer(1, 0.1 * inch))
     
-    # CRITICAL: Order by output_number (now that they're populated!)
-    device_outputs = device.outputs.filter(output_number__isnull=False).order_by('output_number')
+    device_outputs = device.report_outputs
     
-    if device_outputs.exists():
+    if device_outputs:
         output_data = [['#', 'Output', 'Console Destination']]
         
         # Build a dict for quick lookup by output_number
@@ -217,14 +220,9 @@ def export_all_devices_pdf(current_project):
     story.append(Spacer(1, 0.3 * inch))
     
     # CRITICAL: Filter by current project AND order by name
-    devices = Device.objects.filter(
-        project=current_project
-    ).select_related('location').prefetch_related(
-        'inputs__console_input__console',
-        'outputs__console_output'
-    ).order_by('name')
+    devices = load_devices(Device.objects.filter(project=current_project).order_by('name'))
     
-    if not devices.exists():
+    if not devices:
         story.append(Paragraph("No devices found in this project", styles.get_subsection_style()))
     else:
         first_device = True
@@ -241,9 +239,9 @@ def export_all_devices_pdf(current_project):
             story.append(Spacer(1, 0.2 * inch))
             
             # INPUTS
-            device_inputs = device.inputs.filter(input_number__isnull=False).order_by('input_number')
+            device_inputs = device.report_inputs
             
-            if device_inputs.exists():
+            if device_inputs:
                 story.append(Paragraph("<b>INPUTS</b>", styles.get_subsection_style()))
                 story.append(Spacer(1, 0.1 * inch))
                 
@@ -293,9 +291,9 @@ def export_all_devices_pdf(current_project):
                 story.append(Spacer(1, 0.2 * inch))
             
             # OUTPUTS
-            device_outputs = device.outputs.filter(output_number__isnull=False).order_by('output_number')
+            device_outputs = device.report_outputs
             
-            if device_outputs.exists():
+            if device_outputs:
                 story.append(Paragraph("<b>OUTPUTS</b>", styles.get_subsection_style()))
                 story.append(Spacer(1, 0.1 * inch))
                 
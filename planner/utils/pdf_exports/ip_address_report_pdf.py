@@ -9,6 +9,8 @@ from reportlab.lib.enums import TA_CENTER
 from io import BytesIO
 from datetime import datetime
 
+from .report_data import load_comm_configs
+
 try:
     from .pdf_styles import MARGIN, BRAND_BLUE, DARK_GRAY
 except ImportError:
@@ -35,7 +37,6 @@ def generate_ip_address_report_pdf(project=None):
     SystemProcessor = apps.get_model('planner', 'SystemProcessor')
     CommBeltPack = apps.get_model('planner', 'CommBeltPack')
     CommConfig = apps.get_model('planner', 'CommConfig')
-    CommConfigRole = apps.get_model('planner', 'CommConfigRole')
     
     buf = BytesIO()
     doc = SimpleDocTemplate(
@@ -110,9 +111,9 @@ def generate_ip_address_report_pdf(project=None):
     section = Paragraph("MIXING CONSOLES", section_style)
     elements.append(section)
     
-    consoles = Console.objects.filter(project=project).order_by('name') if project else Console.objects.none()
+    consoles = list(Console.objects.filter(project=project).order_by('name')) if project else []
     
-    if consoles.exists():
+    if consoles:
         console_data = [['Console Name', 'Primary IP Address', 'Secondary IP Address']]
         
         for console in consoles:
@@ -138,9 +139,9 @@ def generate_ip_address_report_pdf(project=None):
     section = Paragraph("I/O DEVICES", section_style)
     elements.append(section)
     
-    devices = Device.objects.filter(project=project).order_by('name') if project else Device.objects.none()
+    devices = list(Device.objects.filter(project=project).order_by('name')) if project else []
     
-    if devices.exists():
+    if devices:
         device_data = [['Device Name', 'Primary IP Address', 'Secondary IP Address']]
         
         for device in devices:
@@ -166,9 +167,9 @@ def generate_ip_address_report_pdf(project=None):
     section = Paragraph("AMPLIFIERS", section_style)
     elements.append(section)
     
-    amps = Amp.objects.filter(project=project).order_by('location__name', 'name') if project else Amp.objects.none()
+    amps = list(Amp.objects.select_related('location').filter(project=project).order_by('location__name', 'name')) if project else []
     
-    if amps.exists():
+    if amps:
         amp_data = [['Amplifier Name', 'Location', 'IP Address (AVB Network)']]
         
         for amp in amps:
@@ -194,9 +195,9 @@ def generate_ip_address_report_pdf(project=None):
     section = Paragraph("SYSTEM PROCESSORS", section_style)
     elements.append(section)
     
-    processors = SystemProcessor.objects.filter(project=project).order_by('device_type', 'name') if project else SystemProcessor.objects.none()
+    processors = list(SystemProcessor.objects.filter(project=project).order_by('device_type', 'name')) if project else []
     
-    if processors.exists():
+    if processors:
         processor_data = [['Processor Name', 'Type', 'IP Address (AVB Network)']]
         
         for processor in processors:
@@ -219,12 +220,13 @@ def generate_ip_address_report_pdf(project=None):
     elements.append(Spacer(1, 0.2*inch))
     
     # ==================== COMM CONFIG BELTPACKS ====================
-    comm_configs = CommConfig.objects.filter(project=project, is_template=False).order_by('name') if project else CommConfig.objects.none()
+    comm_configs = load_comm_configs(
+        CommConfig.objects.filter(project=project, is_template=False).order_by('name') if project else CommConfig.objects.none(),
+        device_types=['FSII-BP', 'E-BP', 'HBP-2X', 'HMS-4X', 'HRM-4X', 'V12', 'V24', 'V32'],
+    )
     for config in comm_configs:
-        roles = config.roles.filter(
-            device_type__in=['FSII-BP', 'E-BP', 'HBP-2X', 'HMS-4X', 'HRM-4X', 'V12', 'V24', 'V32']
-        ).order_by('role_number')
-        if roles.exists():
+        roles = config.report_roles
+        if roles:
             section = Paragraph(f"COMM CONFIG — {config.name.upper()}", section_style)
             elements.append(section)
             role_data = [['Role Name', 'Device Type', 'IP Address']]
@@ -252,9 +254,9 @@ def generate_ip_address_report_pdf(project=None):
     section = Paragraph("COMM BELT PACKS (HARDWIRED)", section_style)
     elements.append(section)
     
-    belt_packs = CommBeltPack.objects.filter(project=project, system_type='HARDWIRED').order_by('bp_number') if project else CommBeltPack.objects.none()
+    belt_packs = list(CommBeltPack.objects.select_related('position', 'name').filter(project=project, system_type='HARDWIRED').order_by('bp_number')) if project else []
     
-    if belt_packs.exists():
+    if belt_packs:
         bp_data = [['BP #', 'Position', 'Name', 'IP Address']]
         
         for bp in belt_packs:
@@ -17,6 +17,9 @@ from django.http import HttpResponse
 from datetime import datetime
 import io
 
+from planner.models import Location
+from planner.project_revisions import object_project, revision_conditional
+
 
 # Brand colors (matching your existing PDF exports)
 BRAND_BLUE = colors.HexColor('#4a9eff')
@@ -25,23 +28,35 @@ MEDIUM_GRAY = colors.HexColor('#666666')
 LIGHT_GRAY = colors.HexColor('#cccccc')
 BACKGROUND_GRAY = colors.HexColor('#f5f5f5')
 
+ALL_LOCATIONS_FILENAME = "All_Locations_Equipment_List.pdf"
+
+# What the location lists read (project_revisions.MODULES)
+LOCATION_MODULES = ('locations', 'consoles', 'devices', 'processors', 'comm')
+
 
+@revision_conditional(*LOCATION_MODULES)
 def export_all_locations_pdf(request):
     """
     Generate PDF showing ALL locations with their equipment
     Organized by location, then by module within each location
     """
+    response = HttpResponse(content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{ALL_LOCATIONS_FILENAME}"'
+    response.write(build_all_locations_pdf(getattr(request, 'current_project', None)))
+    return response
+
+
+def build_all_locations_pdf(project):
+    """Every location of `project` with its equipment, as PDF bytes."""
     from planner.models import Location, Amp
     
     # Get all locations for current project
-    if hasattr(request, 'current_project') and request.current_project:
+    if project:
         locations = Location.objects.filter(
-            project=request.current_project
+            project=project
         ).prefetch_related(
             'consoles',
             'devices',
-            'amps__amp_model',
-            'amps__channels',
             'system_processors',
             'comm_beltpacks__position',
             'comm_beltpacks__name'
@@ -49,11 +64,6 @@ def export_all_locations_pdf(request):
     else:
         locations = Location.objects.none()
     
-    # Create response
-    response = HttpResponse(content_type='application/pdf')
-    filename = f"All_Locations_Equipment_List.pdf"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    
     # Create PDF document
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
@@ -108,8 +118,8 @@ def export_all_locations_pdf(request):
     )
     
     # Main header
-    if hasattr(request, 'current_project') and request.current_project:
-        project_name = request.current_project.name
+    if project:
+        project_name = project.name
     else:
         project_name = "All Projects"
     
@@ -320,36 +330,39 @@ def export_all_locations_pdf(request):
     # Build PDF
     doc.build(story)
     
-    # Get PDF data and return
     pdf = buffer.getvalue()
     buffer.close()
-    response.write(pdf)
     
-    return response
+    return pdf
 
 
+@revision_conditional(*LOCATION_MODULES, project=object_project(Location, 'location_id'))
 def export_location_pdf(request, location_id):
     """
     Generate PDF showing all equipment in a specific location
     Organized by module: Consoles, Devices, Amps, System Processors, Comm Belt Packs
     """
+    pdf, filename = build_location_pdf(location_id)
+    response = HttpResponse(content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.write(pdf)
+    return response
+
+
+def build_location_pdf(location_id):
+    """(PDF bytes, filename) of one location's equipment list."""
     from planner.models import Location, Amp
     
     # Get location and related equipment
     location = Location.objects.select_related('project').prefetch_related(
         'consoles',
         'devices',
-        'amps__amp_model',
-        'amps__channels',
         'system_processors',
         'comm_beltpacks__position',
         'comm_beltpacks__name'
     ).get(id=location_id)
     
-    # Create response
-    response = HttpResponse(content_type='application/pdf')
     filename = f"{location.name.replace(' ', '_')}_Equipment_List.pdf"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     
     # Create PDF document
     buffer = io.BytesIO()
@@ -640,9 +653,7 @@ def export_location_pdf(request, location_id):
     # Build PDF
     doc.build(story)
     
-    # Get PDF data and return
     pdf = buffer.getvalue()
     buffer.close()
-    response.write(pdf)
     
-    return response
\ No newline at end of file
+    return pdf, filename
@@ -0,0 +1,202 @@
+# planner/utils/pdf_exports/report_data.py
+"""
+Report data loader shared by the PDF exports.
+
+Each load_* function takes a queryset of parent rows and returns them as a
+list with their children prefetched, already ordered, into plain list
+attributes (report_inputs, report_channels ...). A loader issues one query
+per table however many parents there are, so building a report never goes
+back to the database once ReportLab starts laying out pages.
+
+ReportData bundles the loaders for one project; each section is loaded on
+first use, so an export only pays for the tables it prints.
+"""
+
+from functools import cached_property
+
+from django.contrib.contenttypes.prefetch import GenericPrefetch
+from django.db.models import Prefetch
+
+
+def number_key(value):
+    """Sort key for numbers stored as text ('2' before '10'); blanks and
+    non-numbers sort last."""
+    text = str(value).strip() if value is not None else ''
+    return (0, int(text)) if text.isdigit() else (1, 0)
+
+
+def load_consoles(consoles):
+    """Consoles with report_inputs (by Dante number), report_aux and
+    report_matrix (by bus number) and report_stereo."""
+    from planner.models import ConsoleAuxOutput, ConsoleInput, ConsoleMatrixOutput, ConsoleStereoOutput
+
+    consoles = list(consoles.prefetch_related(
+        Prefetch('consoleinput_set', queryset=ConsoleInput.objects.order_by('pk'), to_attr='report_inputs'),
+        Prefetch('consoleauxoutput_set', queryset=ConsoleAuxOutput.objects.all(), to_attr='report_aux'),
+        Prefetch('consolematrixoutput_set', queryset=ConsoleMatrixOutput.objects.all(), to_attr='report_matrix'),
+        Prefetch('consolestereooutput_set', queryset=ConsoleStereoOutput.objects.all(), to_attr='report_stereo'),
+    ))
+    for console in consoles:
+        console.report_inputs.sort(key=lambda inp: number_key(inp.dante_number))
+        console.report_aux.sort(key=lambda aux: number_key(aux.aux_number))
+        console.report_matrix.sort(key=lambda mtx: number_key(mtx.matrix_number))
+    return consoles
+
+
+def load_devices(devices):
+    """Devices (with location) with their numbered report_inputs and
+    report_outputs, each with the console input / aux / matrix (and its
+    console) it is patched to."""
+    from planner.models import ConsoleAuxOutput, ConsoleMatrixOutput, DeviceInput, DeviceOutput
+
+    outputs = DeviceOutput.objects.filter(output_number__isnull=False).order_by('output_number').prefetch_related(
+        GenericPrefetch('console_output', [
+            ConsoleAuxOutput.objects.select_related('console'),
+            ConsoleMatrixOutput.objects.select_related('console'),
+        ]),
+    )
+    return list(devices.select_related('location').prefetch_related(
+        Prefetch(
+            'inputs',
+            queryset=DeviceInput.objects.filter(input_number__isnull=False)
+            .select_related('console_input__console').order_by('input_number'),
+            to_attr='report_inputs',
+        ),
+        Prefetch('outputs', queryset=outputs, to_attr='report_outputs'),
+    ))
+
+
+def load_amps(amps):
+    """Amps (with location and model) with report_channels."""
+    from planner.models import AmpChannel
+
+    return list(amps.select_related('location', 'amp_model').prefetch_related(
+        Prefetch('channels', queryset=AmpChannel.objects.order_by('channel_number'), to_attr='report_channels'),
+    ))
+
+
+def load_processors(processors):
+    """System processors (with location and P1 / Galaxy config); each
+    config carries report_inputs and report_outputs by channel number."""
+    from planner.models import GalaxyInput, GalaxyOutput, P1Input, P1Output
+
+    return list(processors.select_related('location', 'p1_config', 'galaxy_config').prefetch_related(
+        Prefetch('p1_config__inputs', queryset=P1Input.objects.order_by('channel_number'),
+                 to_attr='report_inputs'),
+        Prefetch('p1_config__outputs', queryset=P1Output.objects.order_by('channel_number'),
+                 to_attr='report_outputs'),
+        Prefetch('galaxy_config__inputs', queryset=GalaxyInput.objects.order_by('channel_number'),
+                 to_attr='report_inputs'),
+        Prefetch('galaxy_config__outputs', queryset=GalaxyOutput.objects.order_by('channel_number'),
+                 to_attr='report_outputs'),
+    ))
+
+
+def load_pa_cables(cables):
+    """PA cable runs (with zone label) with report_fan_outs."""
+    from planner.models import PAFanOut
+
+    return list(cables.select_related('label').prefetch_related(
+        Prefetch('fan_outs', queryset=PAFanOut.objects.all(), to_attr='report_fan_outs'),
+    ))
+
+
+def load_belt_packs(belt_packs):
+    """Belt packs (with position, crew name and location) with
+    report_channels by channel number, each with its comm channel."""
+    from planner.models import CommBeltPackChannel
+
+    return list(belt_packs.select_related('position', 'name', 'unit_location').prefetch_related(
+        Prefetch(
+            'channels',
+            queryset=CommBeltPackChannel.objects.select_related('channel').order_by('channel_number'),
+            to_attr='report_channels',
+        ),
+    ))
+
+
+def load_comm_configs(configs, device_types=None):
+    """Comm configs with report_roles by role number, limited to
+    `device_types` when given."""
+    from planner.models import CommConfigRole
+
+    roles = CommConfigRole.objects.order_by('role_number')
+    if device_types is not None:
+        roles = roles.filter(device_type__in=device_types)
+    return list(configs.prefetch_related(
+        Prefetch('roles', queryset=roles, to_attr='report_roles'),
+    ))
+
+
+def load_power_plans(plans):
+    """Power distribution plans with report_assignments by phase and
+    position, each with its amplifier profile."""
+    from planner.models import AmplifierAssignment
+
+    return list(plans.prefetch_related(
+        Prefetch(
+            'amplifier_assignments',
+            queryset=AmplifierAssignment.objects.select_related('amplifier')
+            .order_by('phase_assignment', 'position'),
+            to_attr='report_assignments',
+        ),
+    ))
+
+
+def load_predictions(predictions, cabinet_order=('position_number',)):
+    """Soundvision predictions (with show day) with report_arrays by source
+    name, each with report_cabinets in `cabinet_order`."""
+    from planner.models import SpeakerArray, SpeakerCabinet
+
+    return list(predictions.select_related('show_day').prefetch_related(
+        Prefetch(
+            'speaker_arrays',
+            queryset=SpeakerArray.objects.order_by('source_name').prefetch_related(
+                Prefetch('cabinets', queryset=SpeakerCabinet.objects.order_by(*cabinet_order),
+                         to_attr='report_cabinets'),
+            ),
+            to_attr='report_arrays',
+        ),
+    ))
+
+
+class ReportData:
+    """Every report section of one project, each loaded on first use."""
+
+    def __init__(self, project):
+        self.project = project
+
+    @cached_property
+    def consoles(self):
+        from planner.models import Console
+        return load_consoles(Console.objects.filter(project=self.project).order_by('name'))
+
+    @cached_property
+    def devices(self):
+        from planner.models import Device
+        return load_devices(Device.objects.filter(project=self.project).order_by('name'))
+
+    @cached_property
+    def processors(self):
+        from planner.models import SystemProcessor
+        return load_processors(SystemProcessor.objects.filter(project=self.project).order_by('name'))
+
+    @cached_property
+    def pa_cables(self):
+        from planner.models import PACableSchedule
+        return load_pa_cables(PACableSchedule.objects.filter(project=self.project).order_by('label'))
+
+    @cached_property
+    def belt_packs(self):
+        from planner.models import CommBeltPack
+        return load_belt_packs(CommBeltPack.objects.filter(project=self.project).order_by('bp_number'))
+
+    @cached_property
+    def power_plans(self):
+        from planner.models import PowerDistributionPlan
+        return load_power_plans(PowerDistributionPlan.objects.filter(project=self.project))
+
+    @cached_property
+    def predictions(self):
+        from planner.models import SoundvisionPrediction
+        return load_predictions(SoundvisionPrediction.objects.filter(project=self.project))
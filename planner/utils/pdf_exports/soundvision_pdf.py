@@ -9,6 +9,8 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from io import BytesIO
 from decimal import Decimal
 
+from .report_data import load_predictions
+
 try:
     from .pdf_styles import PDFStyles, MARGIN, BRAND_BLUE, DARK_GRAY
 except ImportError:
@@ -28,6 +30,12 @@ def generate_soundvision_pdf(prediction):
     Returns:
         BytesIO buffer containing the PDF
     """
+    from planner.models import SoundvisionPrediction
+
+    prediction = load_predictions(
+        SoundvisionPrediction.objects.filter(pk=prediction.pk), cabinet_order=('id',),
+    )[0]
+
     buf = BytesIO()
     doc = SimpleDocTemplate(
         buf,
@@ -132,16 +140,16 @@ def generate_soundvision_pdf(prediction):
     
     elements.append(Spacer(1, 0.15*inch))
     
-    # Get all arrays ordered by source name
-    arrays = prediction.speaker_arrays.all().order_by('source_name')
+    # Arrays ordered by source name
+    arrays = prediction.report_arrays
     
-    if not arrays.exists():
+    if not arrays:
         no_arrays = Paragraph("No speaker arrays found in this prediction.", info_style)
         elements.append(no_arrays)
     else:
         # System Summary
-        total_arrays = arrays.count()
-        total_cabinets = sum(array.cabinets.count() for array in arrays)
+        total_arrays = len(arrays)
+        total_cabinets = sum(len(array.report_cabinets) for array in arrays)
         
         summary_data = [
             ['TOTAL ARRAYS', 'TOTAL CABINETS'],
@@ -222,9 +230,9 @@ def generate_soundvision_pdf(prediction):
             elements.append(Spacer(1, 0.08*inch))
             
             # Get cabinets for this array
-            cabinets = array.cabinets.all().order_by('id')
+            cabinets = array.report_cabinets
             
-            if cabinets.exists():
+            if cabinets:
                 # Determine which columns to include
                 first_cabinet = cabinets[0]
                 
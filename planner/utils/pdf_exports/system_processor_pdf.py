@@ -14,6 +14,7 @@ from django.utils import timezone
 
 from planner.models import SystemProcessor
 from .pdf_styles import BRAND_BLUE, DARK_GRAY, MARGIN, PDFStyles
+from .report_data import load_processors
 
 
 def generate_system_processor_pdf(current_project):
@@ -90,11 +91,11 @@ def generate_system_processor_pdf(current_project):
         elements.append(no_project)
     else:
         # Get processors filtered by current project, ordered by location then name
-        processors = SystemProcessor.objects.filter(
+        processors = load_processors(SystemProcessor.objects.filter(
             project=current_project
-        ).select_related('location').order_by('location__name', 'name')
+        ).order_by('location__name', 'name'))
         
-        if not processors.exists():
+        if not processors:
             no_data = Paragraph(f"No system processors found in project: {current_project.name}", cell_style)
             elements.append(no_data)
         else:
@@ -200,14 +201,14 @@ def _generate_p1_config(proc, section_style, header_style, cell_style):
     # Try to get the P1Processor config
     try:
         p1_proc = proc.p1_config
-        # Get all inputs and outputs with proper ordering
-        analog_inputs = list(p1_proc.inputs.filter(input_type='ANALOG').order_by('channel_number'))
-        aes_inputs = list(p1_proc.inputs.filter(input_type='AES').order_by('channel_number'))
-        avb_inputs = list(p1_proc.inputs.filter(input_type='AVB').order_by('channel_number'))
+        # Inputs and outputs come prefetched in channel order
+        analog_inputs = [i for i in p1_proc.report_inputs if i.input_type == 'ANALOG']
+        aes_inputs = [i for i in p1_proc.report_inputs if i.input_type == 'AES']
+        avb_inputs = [i for i in p1_proc.report_inputs if i.input_type == 'AVB']
         
-        analog_outputs = list(p1_proc.outputs.filter(output_type='ANALOG').order_by('channel_number'))
-        aes_outputs = list(p1_proc.outputs.filter(output_type='AES').order_by('channel_number'))
-        avb_outputs = list(p1_proc.outputs.filter(output_type='AVB').order_by('channel_number'))
+        analog_outputs = [o for o in p1_proc.report_outputs if o.output_type == 'ANALOG']
+        aes_outputs = [o for o in p1_proc.report_outputs if o.output_type == 'AES']
+        avb_outputs = [o for o in p1_proc.report_outputs if o.output_type == 'AVB']
     except:
         # If no P1Processor config exists, create empty lists
         analog_inputs = []
@@ -275,9 +276,9 @@ def _generate_galaxy_config(proc, section_style, header_style, cell_style):
     # Try to get the GalaxyProcessor config
     try:
         galaxy_proc = proc.galaxy_config
-        # Get inputs and outputs with proper ordering
-        inputs = list(galaxy_proc.inputs.all().order_by('channel_number'))
-        outputs = list(galaxy_proc.outputs.all().order_by('channel_number'))
+        # Inputs and outputs come prefetched in channel order
+        inputs = galaxy_proc.report_inputs
+        outputs = galaxy_proc.report_outputs
     except:
         inputs = []
         outputs = []
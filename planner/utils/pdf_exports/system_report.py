@@ -17,7 +17,10 @@ from django.http import HttpResponse
 from datetime import datetime
 import io
 
+from planner.project_revisions import revision_conditional
+
 from .pdf_styles import PDFStyles, LANDSCAPE_PAGE, MARGIN
+from .report_data import ReportData
 
 # Brand colors
 BRAND_BLUE = colors.HexColor('#4a9eff')
@@ -26,22 +29,19 @@ MEDIUM_GRAY = colors.HexColor('#666666')
 LIGHT_GRAY = colors.HexColor('#cccccc')
 BACKGROUND_GRAY = colors.HexColor('#f5f5f5')
 
+# What the report reads (project_revisions.MODULES)
+SYSTEM_REPORT_MODULES = (
+    'consoles', 'devices', 'processors', 'locations', 'pa_cables', 'comm', 'power',
+    'amplifier_profiles', 'predictions', 'mic',
+)
+
 
+@revision_conditional(*SYSTEM_REPORT_MODULES)
 def export_system_report(request):
     """
     Generate comprehensive system report PDF
     Combines all module exports into one document
     """
-    from planner.models import (
-        Location, Console, ConsoleInput, ConsoleAuxOutput, ConsoleMatrixOutput, ConsoleStereoOutput,
-        Device, DeviceInput, DeviceOutput,
-        Amp, AmpChannel, SystemProcessor,
-        PACableSchedule, PAFanOut,
-        CommBeltPack, CommChannel,
-        PowerDistributionPlan, AmplifierAssignment,
-        SoundvisionPrediction, SpeakerArray, SpeakerCabinet
-    )
-    
     # Get current project
     if not hasattr(request, 'current_project') or not request.current_project:
         return _empty_project_pdf()
@@ -50,8 +50,19 @@ def export_system_report(request):
     
     # Create response
     response = HttpResponse(content_type='application/pdf')
-    filename = f"{project.name.replace(' ', '_')}_Complete_System_Report.pdf"
-    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    response['Content-Disposition'] = f'inline; filename="{system_report_filename(project)}"'
+    response.write(build_system_report(project))
+    
+    return response
+
+
+def system_report_filename(project):
+    return f"{project.name.replace(' ', '_')}_Complete_System_Report.pdf"
+
+
+def build_system_report(project):
+    """The Complete System Report of `project`, as PDF bytes."""
+    report = ReportData(project)
     
     # Create PDF document - use landscape for wide tables
     buffer = io.BytesIO()
@@ -168,20 +179,16 @@ def export_system_report(request):
     story.append(Paragraph("1. Consoles", header_style))
     story.append(Spacer(1, 0.1*inch))
     
-    consoles = Console.objects.filter(project=project).order_by('name')
+    consoles = report.consoles
     
-    if consoles.exists():
+    if consoles:
         for console in consoles:
             story.append(Paragraph(f"Console: {console.name}", subheader_style))
             
     
-            # Console Inputs - sort numerically since dante_number is CharField
-            from django.db.models.functions import Cast
-            from django.db.models import IntegerField
-            inputs = console.consoleinput_set.annotate(
-                dante_num_int=Cast('dante_number', IntegerField())
-            ).order_by('dante_num_int')
-            if inputs.exists():
+            # Console Inputs - sorted numerically by the loader since dante_number is CharField
+            inputs = console.report_inputs
+            if inputs:
                 input_data = []
                 for inp in inputs:
                     if inp.dante_number or inp.input_ch or inp.source:
@@ -207,10 +214,10 @@ def export_system_report(request):
                         story.append(Spacer(1, 0.15*inch))
             
             # Console Aux Outputs
-            aux_outputs = console.consoleauxoutput_set.all()
-            if aux_outputs.exists():
+            aux_outputs = console.report_aux
+            if aux_outputs:
                 aux_data = []
-                for aux in sorted(aux_outputs, key=lambda x: int(x.aux_number) if x.aux_number and x.aux_number.isdigit() else 999):
+                for aux in aux_outputs:
                     if aux.aux_number or aux.name:
                         aux_data.append([
                             str(aux.dante_number) if aux.dante_number else '',
@@ -231,10 +238,10 @@ def export_system_report(request):
                         story.append(Spacer(1, 0.15*inch))
             
             # Console Matrix Outputs
-            matrix_outputs = console.consolematrixoutput_set.all()
-            if matrix_outputs.exists():
+            matrix_outputs = console.report_matrix
+            if matrix_outputs:
                 matrix_data = []
-                for mtx in sorted(matrix_outputs, key=lambda x: int(x.matrix_number) if x.matrix_number and x.matrix_number.isdigit() else 999):
+                for mtx in matrix_outputs:
                     if mtx.matrix_number or mtx.name:
                         matrix_data.append([
                             str(mtx.dante_number) if mtx.dante_number else '',
@@ -255,8 +262,8 @@ def export_system_report(request):
                         story.append(Spacer(1, 0.15*inch))
             
             # Console Stereo Outputs
-            stereo_outputs = console.consolestereooutput_set.all()
-            if stereo_outputs.exists():
+            stereo_outputs = console.report_stereo
+            if stereo_outputs:
                 stereo_data = []
                 for stereo in stereo_outputs:
                     stereo_data.append([
@@ -285,17 +292,17 @@ def export_system_report(request):
     story.append(Paragraph("2. I/O Devices", header_style))
     story.append(Spacer(1, 0.1*inch))
     
-    devices = Device.objects.filter(project=project).order_by('name')
+    devices = report.devices
     
-    if devices.exists():
+    if devices:
         for device in devices:
             story.append(Paragraph(f"Device: {device.name}", subheader_style))
             if device.location:
                 story.append(Paragraph(f"Location: {device.location.name}", info_style))
             
             # Device Inputs
-            inputs = device.inputs.filter(input_number__isnull=False).order_by('input_number')
-            if inputs.exists():
+            inputs = device.report_inputs
+            if inputs:
                 input_data = []
                 for inp in inputs:
                     # Prefer engineer-authored signal_name; fall back to the
@@ -326,8 +333,8 @@ def export_system_report(request):
                         story.append(Spacer(1, 0.15*inch))
             
             # Device Outputs
-            outputs = device.outputs.filter(output_number__isnull=False).order_by('output_number')
-            if outputs.exists():
+            outputs = device.report_outputs
+            if outputs:
                 output_data = []
                 for out in outputs:
                     output_label = out.signal_name or ''
@@ -355,9 +362,9 @@ def export_system_report(request):
     story.append(Paragraph("3. System Processors", header_style))
     story.append(Spacer(1, 0.1*inch))
     
-    processors = SystemProcessor.objects.filter(project=project).order_by('name')
+    processors = report.processors
     
-    if processors.exists():
+    if processors:
         processor_data = []
         for proc in processors:
             processor_data.append([
@@ -383,9 +390,9 @@ def export_system_report(request):
     story.append(Paragraph("4. PA Cable Schedule", header_style))
     story.append(Spacer(1, 0.1*inch))
     
-    pa_cables = PACableSchedule.objects.filter(project=project).order_by('label')
+    pa_cables = report.pa_cables
     
-    if pa_cables.exists():
+    if pa_cables:
         for cable in pa_cables:
             story.append(Paragraph(f"Cable Run: {cable.label}", subheader_style))
             
@@ -405,8 +412,8 @@ def export_system_report(request):
             story.append(info_table)
             
             # Fan outs
-            fanouts = cable.fan_outs.all()
-            if fanouts.exists():
+            fanouts = cable.report_fan_outs
+            if fanouts:
                 story.append(Spacer(1, 0.1*inch))
                 story.append(Paragraph("Fan Outs", ParagraphStyle('Small', fontSize=10, textColor=DARK_GRAY, spaceBefore=6)))
                 
@@ -436,12 +443,9 @@ def export_system_report(request):
     story.append(Spacer(1, 0.1*inch))
     
     for system_type, type_name in [('WIRELESS', 'Wireless System'), ('HARDWIRED', 'Hardwired System')]:
-        belt_packs = CommBeltPack.objects.filter(
-            project=project,
-            system_type=system_type
-        ).order_by('bp_number')
+        belt_packs = [pack for pack in report.belt_packs if pack.system_type == system_type]
         
-        if belt_packs.exists():
+        if belt_packs:
             story.append(Paragraph(type_name, subheader_style))
             
             comm_data = []
@@ -451,7 +455,7 @@ def export_system_report(request):
                 location_name = pack.unit_location.name if pack.unit_location else ''
                 
                 # Get channel assignments
-                channels = pack.channels.all().order_by('channel_number')
+                channels = pack.report_channels
                 channel_strs = []
                 for ch in channels[:4]:  # Show first 4 channels
                     if ch.channel:
@@ -484,7 +488,7 @@ def export_system_report(request):
                 story.append(table)
                 story.append(Spacer(1, 0.2*inch))
     
-    if not CommBeltPack.objects.filter(project=project).exists():
+    if not report.belt_packs:
         story.append(Paragraph("No COMM belt packs configured", info_style))
     
     story.append(PageBreak())
@@ -495,15 +499,15 @@ def export_system_report(request):
     story.append(Paragraph("6. Power Distribution", header_style))
     story.append(Spacer(1, 0.1*inch))
     
-    power_plans = PowerDistributionPlan.objects.filter(project=project)
+    power_plans = report.power_plans
     
-    if power_plans.exists():
+    if power_plans:
         for plan in power_plans:
             story.append(Paragraph(f"Venue: {plan.venue_name}", subheader_style))
             
             # Get amplifier assignments
-            assignments = plan.amplifier_assignments.all().order_by('phase_assignment', 'position')
-            if assignments.exists():
+            assignments = plan.report_assignments
+            if assignments:
                 assign_data = []
                 for assign in assignments:
                     amp_name = str(assign.amplifier) if assign.amplifier else ''
@@ -535,9 +539,9 @@ def export_system_report(request):
     story.append(Paragraph("7. Soundvision Predictions", header_style))
     story.append(Spacer(1, 0.1*inch))
     
-    predictions = SoundvisionPrediction.objects.filter(project=project)
+    predictions = report.predictions
     
-    if predictions.exists():
+    if predictions:
         for prediction in predictions:
             # Prediction title
             title_parts = []
@@ -557,12 +561,12 @@ def export_system_report(request):
                 story.append(Paragraph(" | ".join(info_parts), info_style))
             
             # Get arrays
-            arrays = prediction.speaker_arrays.all().order_by('source_name')
+            arrays = prediction.report_arrays
             
-            if arrays.exists():
+            if arrays:
                 # Summary
-                total_arrays = arrays.count()
-                total_cabinets = sum(array.cabinets.count() for array in arrays)
+                total_arrays = len(arrays)
+                total_cabinets = sum(len(array.report_cabinets) for array in arrays)
                 
                 summary_data = [
                     ['TOTAL ARRAYS', 'TOTAL CABINETS'],
@@ -636,8 +640,8 @@ def export_system_report(request):
                         story.append(Paragraph(f"<b>Bottom Trim Height:</b> {feet}' {inches}\"", array_info_style))
                     
                     # Cabinets table
-                    cabinets = array.cabinets.all().order_by('position_number')
-                    if cabinets.exists():
+                    cabinets = array.report_cabinets
+                    if cabinets:
                         cab_data = [['#', 'Model', 'Angle', 'Panflex']]
                         for idx, cab in enumerate(cabinets, 1):
                             angle_str = f"{cab.angle_to_next}°" if cab.angle_to_next is not None else ''
@@ -672,12 +676,10 @@ def export_system_report(request):
     # Build PDF
     doc.build(story, onFirstPage=styles.add_page_number, onLaterPages=styles.add_page_number)
     
-    # Return response
     pdf = buffer.getvalue()
     buffer.close()
-    response.write(pdf)
     
-    return response
+    return pdf
 
 
 def _empty_project_pdf():
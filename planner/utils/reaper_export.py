@@ -141,7 +141,9 @@ def _ordered_enabled_tracks(session):
                 Manual tracks sort last.
     'custom'  — by track_number ascending (engineer's drag order).
     """
-    tracks = list(session.tracks.filter(enabled=True))
+    from planner.models import MultitrackTrack  # models imports this module's palette
+
+    tracks = MultitrackTrack.resolve_sources(session.tracks.filter(enabled=True))
     mode = session.track_order_mode
 
     if mode == 'custom':
@@ -1,6 +1,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.forms import modelformset_factory
-from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, HttpResponseBadRequest
+from django.template.loader import render_to_string
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, HttpResponseBadRequest, FileResponse, Http404
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST, require_GET
@@ -24,7 +25,6 @@ from .models import SoundvisionPrediction, ShowDay
 from .soundvision_parser import import_soundvision_prediction
 from .models import SoundvisionPrediction, ShowDay, SpeakerArray
 import csv
-from django.db.models import Count, Q
 from planner.utils.pdf_exports.console_pdf import export_console_pdf
 from planner.models import Console
 from django.http import HttpResponse, HttpResponseRedirect
@@ -35,7 +35,6 @@ from django.shortcuts import redirect
 from .models import Project
 from .models import CommConfig, CommConfigPartyline, CommConfigRole, CommConfigKeyset, CommConfigRoleset, CommConfigSession, CommConfigPortAssignment, CommConfigDanteChannel, CommCrewName, AudioChecklistTemplate, AudioChecklistTemplateTask, CommConfigNetworkPort
 from .models import Amp, AmpDivider, Location, AmpLocation
-import hashlib
 import os
 from io import BytesIO
 from reportlab.lib.pagesizes import letter, landscape
@@ -47,6 +46,14 @@ from reportlab.lib.enums import TA_LEFT, TA_CENTER
 
 from .models import AudioChecklist, AudioChecklistTask, Project, ProjectMember
 from .models import ShowDay, MicSession, MicAssignment, MicShowInfo
+from .project_access import get_project_access
+from .mic_grid import build_mic_grid
+from .mic_changes import changed_day_ids, current_revision, mic_changes_since, record_queryset_changes
+from .signal_labels import label_index
+from .photo_store import MAX_PHOTO_BYTES, PhotoError, store_photo, thumbnail_name
+from .render_jobs import RenderError, job_json, request_render
+from .project_revisions import object_project, request_stamp, revision_conditional, touch
+from .project_stats import STATS_MODULES, project_stats
 import json as _json
 from django.http import JsonResponse
 
@@ -64,13 +71,14 @@ from .models import (
     P1Processor, P1Input, P1Output,
     CommBeltPack, CommBeltPackChannel, CommChannel, CommPosition, CommCrewName,
     Device, Device, DeviceInput, DeviceOutput,
-    SystemProcessor, Amp, AmpChannel, Location, AmpLocation, PACableSchedule, PAZone,
-    ShowDay, MicSession, MicAssignment, MicShowInfo, MicGroup, PresenterSlot, PowerDistributionPlan, AmplifierProfile,
+    SystemProcessor, Amp, AmpChannel, Location, AmpLocation, PACableSchedule,
+    ShowDay, MicSession, MicAssignment, MicShowInfo, MicGroup, PresenterSlot, StoredPhoto, PowerDistributionPlan, AmplifierProfile,
     AmplifierAssignment,
     MultitrackSession, MultitrackTrack,
     MultitrackTemplate, MultitrackTemplateSlot,
     SignalFlowDiagram,
     ConsoleAuxOutput, ConsoleMatrixOutput, ConsoleStereoOutput,
+    RenderJob,
 )
 from .forms import MultitrackSessionForm, ConsoleCsvUploadForm
 from .models import ConsoleImport
@@ -233,6 +241,7 @@ def p1_processor_export(request, p1_processor_id):
 
         return response
 
+@revision_conditional('consoles', 'locations', project=object_project(Console, 'console_id'))
 def console_pdf_export(request, console_id):
     """Export a console configuration as PDF"""
     console = get_object_or_404(Console, id=console_id)
@@ -604,55 +613,12 @@ def mic_tracker_view(request):
         request.session.modified = True
 
         
-    # Custom prefetch to order shared presenters by through table ID
-
-    from django.db.models import Prefetch
-    days = days.prefetch_related(
-        Prefetch(
-            'sessions__mic_assignments',
-            queryset=MicAssignment.objects.select_related('group').prefetch_related(
-                'presenter_slots__presenter',
-            ).distinct()
-        ),
-    ).order_by('date')
-
-
-    
-    # Organize sessions by columns for display
-    days_data = []
-    for day in days:
-        sessions = day.sessions.all()
-        
-        
-        days_data.append({
-            'day': day,
-            'sessions': sessions
-        })
+    # Days, sessions, assignments and slots in a fixed handful of queries
+    days_data = build_mic_grid(days.order_by('date'))
     
-    # CHECK PERMISSIONS - Add this section
-    from planner.models import Project, ProjectMember
-    
-    is_viewer = False
-    if not request.user.is_superuser:
-        # Check if user is viewer for any projects with ShowDays
-        # For simplicity, check if user has ANY viewer memberships
-        viewer_memberships = ProjectMember.objects.filter(
-            user=request.user,
-            role='viewer'
-        )
-        
-        # If user has viewer memberships but no editor/owner roles, they're read-only
-        if viewer_memberships.exists():
-            editor_owner_memberships = ProjectMember.objects.filter(
-                user=request.user,
-                role='editor'
-            ).exists()
-            
-            owns_projects = Project.objects.filter(owner=request.user).exists()
-            
-            # If ONLY viewer (no editor roles or owned projects), set read-only
-            if not editor_owner_memberships and not owns_projects:
-                is_viewer = True
+    # CHECK PERMISSIONS - read-only if the user is ONLY a viewer (no editor
+    # roles or owned projects)
+    is_viewer = get_project_access(request).is_viewer_only
     
     # This is inside the mic_tracker_view function
     context = {
@@ -677,29 +643,13 @@ def mic_tracker_overview_view(request):
     if not hasattr(request, 'current_project') or not request.current_project:
         return redirect('planner:mic_tracker')
 
-    from django.db.models import Prefetch
-    days = ShowDay.objects.filter(project=request.current_project).order_by('date').prefetch_related(
-        Prefetch(
-            'sessions__mic_assignments',
-            queryset=MicAssignment.objects.prefetch_related(
-                'presenter_slots__presenter',
-                'presenter_slots__groups',
-                'groups',
-            ),
-        ),
+    days_data = build_mic_grid(
+        ShowDay.objects.filter(project=request.current_project).order_by('date')
     )
-    days_data = [{'day': d, 'sessions': d.sessions.all()} for d in days]
     show_info = MicShowInfo.objects.filter(project=request.current_project).first()
 
     # Read-only gating for the Mic'd toggles — same rule as mic_tracker_view.
-    from planner.models import Project, ProjectMember
-    is_viewer = False
-    if not request.user.is_superuser:
-        if ProjectMember.objects.filter(user=request.user, role='viewer').exists():
-            has_editor = ProjectMember.objects.filter(user=request.user, role='editor').exists()
-            owns_projects = Project.objects.filter(owner=request.user).exists()
-            if not has_editor and not owns_projects:
-                is_viewer = True
+    is_viewer = get_project_access(request).is_viewer_only
 
     return render(request, 'planner/mic_tracker_overview.html', {
         'show_info': show_info,
@@ -739,6 +689,7 @@ def bulk_update_mics(request):
                 session.mic_assignments.update(is_d_mic=False)
             else:
                 return JsonResponse({'success': False, 'error': 'Invalid action'})
+            record_queryset_changes(session.day.project_id, 'assignment', session.mic_assignments.all())
         
         session_stats = session.get_mic_usage_stats()
         day_stats = session.day.get_all_mics_status()
@@ -842,6 +793,7 @@ def bulk_update_mics(request):
                 session.mic_assignments.update(is_d_mic=False)
             else:
                 return JsonResponse({'success': False, 'error': 'Invalid action'})
+            record_queryset_changes(session.day.project_id, 'assignment', session.mic_assignments.all())
         
         session_stats = session.get_mic_usage_stats()
         day_stats = session.day.get_all_mics_status()
@@ -882,7 +834,7 @@ def duplicate_session(request):
             # Append after existing sessions in the same day.
             order = source_session.day.sessions.count()
 
-            new_session = MicSession.objects.create(
+            new_session = MicSession(
                 day=source_session.day,
                 name=target_session_name,
                 session_type=source_session.session_type,
@@ -894,10 +846,8 @@ def duplicate_session(request):
                 column_position=source_session.column_position,
                 order=order,
             )
-
-            # MicSession.save() auto-created blank assignments; clear them so
-            # the copied assignments don't collide or double up.
-            new_session.mic_assignments.all().delete()
+            # No blank assignments: the copied ones take their place
+            new_session.save(create_assignments=False)
 
             source_session.duplicate_to_session(new_session)
 
@@ -945,6 +895,7 @@ def delete_session(request):
 
 @staff_member_required
 @staff_member_required
+@revision_conditional('mic')
 def export_mic_tracker(request):
     """Export mic tracker data as CSV — current project, all days/sessions."""
     project_id = request.session.get('current_project_id')
@@ -1022,11 +973,20 @@ def delete_session(request):
         return JsonResponse({'success': False, 'error': str(e)})
 
 @staff_member_required
+@revision_conditional('mic')
 def export_mic_tracker_pdf(request):
     """Export mic tracker A2 cards as PDF — current project, all days/sessions."""
+    response = HttpResponse(build_mic_tracker_pdf(request.current_project), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{mic_tracker_pdf_filename()}"'
+    return response
+
+
+def mic_tracker_pdf_filename():
+    return f'mic_tracker_{date.today()}.pdf'
 
-    project_id = request.session.get('current_project_id')
 
+def build_mic_tracker_pdf(project):
+    """The mic tracker A2 cards of `project` (all days/sessions), as PDF bytes."""
     buffer = BytesIO()
     doc = SimpleDocTemplate(
         buffer,
@@ -1083,8 +1043,8 @@ def export_mic_tracker_pdf(request):
     story = []
 
     # ── Title ────────────────────────────────────────────────────────────────
-    show_info = getattr(request.current_project, 'mic_show_info', None)
-    show_name = getattr(show_info, 'show_name', '') or str(request.current_project)
+    show_info = getattr(project, 'mic_show_info', None)
+    show_name = getattr(show_info, 'show_name', '') or str(project)
     story.append(Paragraph(f'🎤 Mic Tracker — {show_name}', style_title))
     meta = []
     if getattr(show_info, 'venue_name', ''):
@@ -1096,21 +1056,18 @@ def export_mic_tracker_pdf(request):
     story.append(Spacer(1, 0.15 * inch))
 
     # ── Data ─────────────────────────────────────────────────────────────────
-    days = ShowDay.objects.filter(
-        project_id=project_id
-    ).order_by('date').prefetch_related(
-        'sessions__mic_assignments__presenter_slots__presenter',
-    )
+    grid = build_mic_grid(ShowDay.objects.filter(project=project).order_by('date'))
 
     first_day = True
-    for day in days:
+    for day_data in grid:
+        day = day_data['day']
         if not first_day:
             story.append(PageBreak())
         first_day = False
         story.append(HRFlowable(width='100%', thickness=2, color=colors.HexColor('#0d3b6e')))
         story.append(Paragraph(str(day), style_day))
 
-        for session in day.sessions.order_by('order'):
+        for session in day_data['sessions']:
             sess_style = style_session
             if session.name_color:
                 # Highlight the session heading with its chosen color; use a
@@ -1129,8 +1086,8 @@ def export_mic_tracker_pdf(request):
                     sess_style = style_session
             story.append(Paragraph(f'Session: {session.name}', sess_style))
 
-            for assignment in session.mic_assignments.order_by('rf_number'):
-                slots = list(assignment.presenter_slots.order_by('order'))
+            for assignment in session.mic_assignments.all():
+                slots = list(assignment.presenter_slots.all())
                 if not slots:
                     continue
 
@@ -1208,11 +1165,7 @@ def export_mic_tracker_pdf(request):
             story.append(Spacer(1, 0.1 * inch))
 
     doc.build(story)
-    buffer.seek(0)
-
-    response = HttpResponse(buffer, content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="mic_tracker_{date.today()}.pdf"'
-    return response    
+    return buffer.getvalue()
 
 
 
@@ -1239,26 +1192,21 @@ def toggle_day_collapse(request):
         return JsonResponse({'success': False, 'error': str(e)})      
 
 
-def _presenter_photo_data_url(presenter):
-    """Return a data: URL string for a Presenter's headshot, or '' if none.
+def _presenter_stored_photo(presenter):
+    """Return the StoredPhoto of a Presenter's headshot, or None if none.
 
-    Used to auto-populate PresenterSlot.photo_data (an inline base64 data URL
-    that the A2 photo zone renders as <img src=...>) when a presenter is
-    assigned to a slot — Issue #10. Any read failure returns '' so the
-    assignment itself still succeeds; the photo just won't auto-populate.
+    Used to auto-populate PresenterSlot.stored_photo (the picture the A2
+    photo zone renders) when a presenter is assigned to a slot — Issue #10.
+    Any read failure returns None so the assignment itself still succeeds;
+    the photo just won't auto-populate.
     """
     if not presenter or not presenter.photo:
-        return ''
+        return None
     try:
-        import base64
-        import mimetypes
         with presenter.photo.open('rb') as f:
-            content = f.read()
-        mime_type = mimetypes.guess_type(presenter.photo.name)[0] or 'image/jpeg'
-        b64 = base64.b64encode(content).decode('utf-8')
-        return f'data:{mime_type};base64,{b64}'
+            return store_photo(f.read())
     except Exception:
-        return ''
+        return None
 
 
 @csrf_exempt
@@ -1317,9 +1265,9 @@ def update_mic_assignment(request):
 
             # Issue #10: when the presenter changes, sync the slot's headshot
             # to the Presenter's photo. Clearing the presenter also clears
-            # photo_data so a stale face doesn't hang on after re-assignment.
+            # the photo so a stale face doesn't hang on after re-assignment.
             if presenter_changed:
-                slot.photo_data = _presenter_photo_data_url(slot.presenter)
+                slot.stored_photo = _presenter_stored_photo(slot.presenter)
 
             slot.save()
         else:
@@ -1339,7 +1287,7 @@ def update_mic_assignment(request):
             'session_stats': session_stats,
             'presenter_display': presenter_display,
             'presenter_count': slot_count,
-            'slot_photo_data': active_slot.photo_data if active_slot else '',
+            'slot_photo_url': active_slot.photo_large_url if active_slot else '',
             'active_slot_id': active_slot.id if active_slot else None,
         })
         
@@ -1741,7 +1689,9 @@ def toggle_slot_micd(request):
         new_state = data.get('is_micd', False)
         slot = get_object_or_404(PresenterSlot, id=slot_id)
         # Turn off all sibling slots on this assignment
-        PresenterSlot.objects.filter(assignment=slot.assignment).update(is_micd=False)
+        siblings = PresenterSlot.objects.filter(assignment=slot.assignment)
+        siblings.update(is_micd=False)
+        record_queryset_changes(slot.assignment.session.day.project_id, 'slot', siblings)
         if new_state:
             slot.is_micd = True
             slot.save()
@@ -1824,16 +1774,16 @@ def upload_slot_photo(request):
         if not slot_id or not photo:
             return JsonResponse({'success': False, 'error': 'Missing slot_id or photo'})
         try:
-            import base64
             slot = PresenterSlot.objects.get(id=slot_id)
-            photo_bytes = photo.read()
-            mime_type = photo.content_type or 'image/jpeg'
-            b64 = base64.b64encode(photo_bytes).decode('utf-8')
-            slot.photo_data = f'data:{mime_type};base64,{b64}'
+            if photo.size > MAX_PHOTO_BYTES:
+                return JsonResponse({'success': False, 'error': 'Image exceeds 5 MB limit'})
+            slot.stored_photo = store_photo(photo.read())
             slot.save()
-            return JsonResponse({'success': True, 'photo_url': slot.photo_data})
+            return JsonResponse({'success': True, 'photo_url': slot.photo_large_url})
         except PresenterSlot.DoesNotExist:
             return JsonResponse({'success': False, 'error': 'Slot not found'})
+        except PhotoError as e:
+            return JsonResponse({'success': False, 'error': str(e)})
     return JsonResponse({'success': False})
 
 
@@ -1852,15 +1802,12 @@ def upload_slot_photo_from_url(request):
       private, loopback, link-local, reserved, multicast).
     - 10s connect/read timeout, 5 MB max response, image/* content-type.
     """
-    import base64
     import ipaddress
     import socket
     import urllib.parse
 
     import requests
 
-    MAX_BYTES = 5 * 1024 * 1024
-
     try:
         data = json.loads(request.body)
         slot_id = int(data['slot_id'])
@@ -1917,14 +1864,47 @@ def upload_slot_photo_from_url(request):
     buf = bytearray()
     for chunk in resp.iter_content(chunk_size=64 * 1024):
         buf.extend(chunk)
-        if len(buf) > MAX_BYTES:
+        if len(buf) > MAX_PHOTO_BYTES:
             resp.close()
             return JsonResponse({'success': False, 'error': 'Image exceeds 5 MB limit'}, status=400)
 
-    b64 = base64.b64encode(bytes(buf)).decode('utf-8')
-    slot.photo_data = f'data:{content_type};base64,{b64}'
-    slot.save(update_fields=['photo_data'])
-    return JsonResponse({'success': True, 'photo_url': slot.photo_data})
+    try:
+        slot.stored_photo = store_photo(bytes(buf))
+    except PhotoError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    slot.save(update_fields=['stored_photo'])
+    return JsonResponse({'success': True, 'photo_url': slot.photo_large_url})
+
+
+@login_required
+@require_GET
+def stored_photo(request, digest, size):
+    """GET: a StoredPhoto thumbnail. The URL names the file's content, so
+    browsers may keep it for good.
+
+    Photos carried over from the old inline column that Pillow couldn't
+    decode (SVG, HEIC, ...) have no thumbnails; their original is served
+    instead, sandboxed so an SVG can't run script on our origin."""
+    if size not in StoredPhoto.THUMBNAIL_SIZES:
+        raise Http404
+    try:
+        file = default_storage.open(thumbnail_name(digest, size), 'rb')
+        content_type = 'image/jpeg'
+    except FileNotFoundError:
+        photo = StoredPhoto.objects.filter(pk=digest).first()
+        if photo is None:
+            raise Http404
+        try:
+            file = default_storage.open(photo.original.name, 'rb')
+        except FileNotFoundError:
+            raise Http404
+        content_type = photo.content_type
+    response = FileResponse(file, content_type=content_type)
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    if content_type != 'image/jpeg':
+        response['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+        response['X-Content-Type-Options'] = 'nosniff'
+    return response
 
 
 @require_POST
@@ -1955,7 +1935,7 @@ def advance_presenter_slot(request):
             'notes': active.notes,
             'slot_index': next_index,
             'slot_count': len(slots),
-            'photo_url': active.photo_data or None,
+            'photo_url': active.photo_large_url or None,
             'a2_group_color': active.a2_group.color if active.a2_group else None,
             'a2_group_name': active.a2_group.name if active.a2_group else None,
         })
@@ -1990,7 +1970,7 @@ def previous_presenter_slot(request):
             'notes': active.notes,
             'slot_index': prev_index,
             'slot_count': len(slots),
-            'photo_url': active.photo_data or None,
+            'photo_url': active.photo_large_url or None,
             'a2_group_color': active.a2_group.color if active.a2_group else None,
             'a2_group_name': active.a2_group.name if active.a2_group else None,
         })
@@ -2012,6 +1992,9 @@ def add_presenter_slot(request):
         # Make the new (empty) slot the active one so it can be named
         # immediately — a freshly added presenter is the one you want to edit.
         assignment.presenter_slots.update(is_active=False)
+        record_queryset_changes(
+            assignment.session.day.project_id, 'slot', assignment.presenter_slots.all(),
+        )
         slot = PresenterSlot.objects.create(
             assignment=assignment,
             order=next_order,
@@ -2092,7 +2075,7 @@ def activate_presenter_slot(request):
             'notes': active.notes,
             'slot_index': target_index,
             'slot_count': len(slots),
-            'photo_url': active.photo_data or None,
+            'photo_url': active.photo_large_url or None,
             'a2_group_color': active.a2_group.color if active.a2_group else None,
             'a2_group_name': active.a2_group.name if active.a2_group else None,
         })
@@ -2906,127 +2889,28 @@ def export_prediction_summary(request, pk):
 
 @staff_member_required
 def dashboard(request):
-    """System Dashboard - Overview of all modules"""
-    
-    # Console Stats
-    
-  # Console Stats
-    console_stats = {
-        'total': Console.objects.count(),
-        'with_inputs': Console.objects.filter(consoleinput__isnull=False).distinct().count(),
-        'with_outputs': Console.objects.filter(
-            Q(consoleauxoutput__isnull=False) | Q(consolematrixoutput__isnull=False)
-        ).distinct().count(),
-}
-
-# Device Stats
-    device_stats = {
-        'total': Device.objects.count(),
-        'with_inputs': Device.objects.filter(inputs__isnull=False).distinct().count(),
-        'with_outputs': Device.objects.filter(outputs__isnull=False).distinct().count(),
-}
-    
-    # Processor Stats
-    processor_stats = {
-        'total': SystemProcessor.objects.count(),
-        'p1': SystemProcessor.objects.filter(device_type='P1').count(),
-        'galaxy': SystemProcessor.objects.filter(device_type='GALAXY').count(),
-    }
-
-    # Amp Stats
-    amp_stats = {
-        'total': Amp.objects.count(),
-        'locations': AmpLocation.objects.count(),
-        'channels': 0,
-    }
-  
-    # Power Distribution Stats
-    power_stats = {
-        'plans': PowerDistributionPlan.objects.count(),
-        'amps_in_plans': PowerDistributionPlan.objects.aggregate(
-            total=Count('amplifier_assignments')  # ← Must be 'amplifier_assignments' NOT 'amplifierinpowerplan'
-        )['total'] or 0,
-}
-
-    
-    # PA Cable Stats
-    pa_cable_stats = {
-        'cable_runs': PACableSchedule.objects.count(),
-        'zones': PAZone.objects.count(),
-        'total_cables': sum([
-            run.count for run in PACableSchedule.objects.all()
-        ]) if PACableSchedule.objects.exists() else 0,
-    }
-    
-    # Mic Tracker Stats
-
-
-# ... in your dashboard function ...
+    """System Dashboard - overview of the current project's modules.
+    Figures come from project_stats, cached against the project revision."""
+    project = getattr(request, 'current_project', None)
+    if project is None:
+        return render(request, 'planner/dashboard.html', {'no_project': True})
+    stats = project_stats.get(project.pk, request_stamp(request, STATS_MODULES))
 
-    mic_stats = {
-        'total': MicAssignment.objects.count(),
-        'micd': MicAssignment.objects.filter(is_micd=True).count(),
-        'd_mic': MicAssignment.objects.filter(is_d_mic=True).count(),
-        'available': MicAssignment.objects.filter(is_micd=False).count(),
-        'shared': MicAssignment.objects.annotate(
-            presenter_count=Count('shared_presenters')
-        ).filter(presenter_count__gt=0).count(),
-    }
-    
-    # Comm Stats
-    comm_stats = {
-        'total_packs': CommBeltPack.objects.count(),
-        'wireless': CommBeltPack.objects.filter(system_type='Wireless').count(),
-        'hardwired': CommBeltPack.objects.filter(system_type='Hardwired').count(),
-        'checked_out': CommBeltPack.objects.filter(checked_out=True).count(),
-    }
-    
-    # Power Distribution Stats
-    power_stats = {
-        'plans': PowerDistributionPlan.objects.count(),
-        'amps_in_plans': PowerDistributionPlan.objects.aggregate(
-            total=Count('amplifier_assignments')
-        )['total'] or 0,
-    }
-    
-   # Soundvision Stats
-    soundvision_stats = {
-        'predictions': SoundvisionPrediction.objects.count(),
-        'arrays': SoundvisionPrediction.objects.aggregate(
-            total=Count('speaker_arrays')  # ← CORRECT (with underscore)
-        )['total'] or 0,
-}
-    
-    # Recent Activity - Last 10 changes across key models
-    recent_show_days = ShowDay.objects.order_by('-id')[:3]
-    recent_sessions = MicSession.objects.select_related('show_day').order_by('-id')[:5]
-    recent_cables = PACableSchedule.objects.order_by('-id')[:5]
-    
-    # Quick Status Checks
-    status_checks = {
-        'has_consoles': Console.objects.exists(),
-        'has_devices': Device.objects.exists(),
-        'has_amps': Amp.objects.exists(),
-        'has_show_days': ShowDay.objects.exists(),
-        'has_comm': CommBeltPack.objects.exists(),
-    }
-    
     context = {
-        'console_stats': console_stats,
-        'device_stats': device_stats,
-        'processor_stats': processor_stats,
-        'amp_stats': amp_stats,
-        'pa_cable_stats': pa_cable_stats,
-        'mic_stats': mic_stats,
-        'comm_stats': comm_stats,
-        'power_stats': power_stats,
-        'soundvision_stats': soundvision_stats,
-        'recent_show_days': recent_show_days,
-        'recent_sessions': recent_sessions,
-        'recent_cables': recent_cables,
-        'status_checks': status_checks,
+        'project': project,
+        'console_stats': stats['console'],
+        'device_stats': stats['device'],
+        'processor_stats': stats['processor'],
+        'amp_stats': stats['amp'],
+        'pa_cable_stats': stats['pa_cable'],
+        'mic_stats': stats['mic'],
+        'comm_stats': stats['comm'],
+        'power_stats': stats['power'],
+        'soundvision_stats': stats['soundvision'],
+        'recent_show_days': stats['recent_show_days'],
+        'recent_cables': stats['recent_cables'],
+        'status_checks': stats['status'],
     }
-    
     return render(request, 'planner/dashboard.html', context)
 
 
@@ -3260,6 +3144,7 @@ def save_ip_address(request):
 # Device I/O PDF Export
 # Add/Update these functions in your planner/views.py file
 
+@revision_conditional('devices', 'consoles', 'locations')
 def all_devices_pdf_export(request):
     """Export all devices to PDF - filtered by current project"""
     
@@ -3274,6 +3159,7 @@ def all_devices_pdf_export(request):
     return export_all_devices_pdf(request.current_project)
 
 
+@revision_conditional('devices', 'consoles', 'locations')
 def device_pdf_export(request, device_id):
     """Export single device to PDF"""
     from planner.models import Device
@@ -3697,6 +3583,7 @@ def amp_inline_create(request):
     return JsonResponse({'success': True, 'amp_id': amp.id})
 
 
+@revision_conditional('amps', 'amp_models')
 def all_amps_pdf_export(request):
     """Export all amplifiers to PDF - filtered by current project"""
     
@@ -3714,6 +3601,7 @@ def all_amps_pdf_export(request):
 
 
 #-------PA Schedule PDF-------
+@revision_conditional('pa_cables')
 def all_pa_cables_pdf_export(request):
     """Export all PA cables to PDF."""
     from .models import PACableSchedule
@@ -4112,6 +4000,7 @@ def import_pa_cables_csv(request):
 
 # Update this function in planner/views.py
 
+@revision_conditional('processors', 'locations')
 def export_system_processor_pdf(request):
     """Export system processors as PDF - filtered by current project"""
     
@@ -4203,6 +4092,7 @@ def import_presenters_csv(request):
 
 
 @staff_member_required
+@revision_conditional('predictions', 'mic', project=object_project(SoundvisionPrediction, 'prediction_id'))
 def export_soundvision_pdf(request, prediction_id):
     """Export Soundvision Prediction as PDF"""
     from planner.utils.pdf_exports.soundvision_pdf import generate_soundvision_pdf
@@ -4220,6 +4110,7 @@ def export_soundvision_pdf(request, prediction_id):
 #------Ip Address Report PDF Export
 
 @staff_member_required
+@revision_conditional('consoles', 'devices', 'amps', 'amp_models', 'processors', 'locations', 'comm')
 def export_ip_address_report_pdf(request):
     """
     Export IP Address Report as PDF.
@@ -4237,9 +4128,54 @@ def export_ip_address_report_pdf(request):
     return response
 
 
+#-----Background PDF Renders-----
+
+@staff_member_required
+@require_POST
+def render_report(request, report_type):
+    """POST: start (or reuse) a background render of a PDF report for the
+    current project. Answers 202 while the job runs, 200 once it's done."""
+    project = getattr(request, 'current_project', None)
+    if project is None:
+        return JsonResponse({'success': False, 'error': 'No project selected'}, status=400)
+    try:
+        job = request_render(project, report_type, request.POST, request.user)
+    except RenderError as exc:
+        return JsonResponse({'success': False, 'error': str(exc)}, status=400)
+    return JsonResponse(job_json(job), status=200 if job.status == 'done' else 202)
+
+
+@staff_member_required
+@require_GET
+def render_job_status(request, job_id):
+    """GET: progress of a render job."""
+    job = get_object_or_404(RenderJob, pk=job_id, project=getattr(request, 'current_project', None))
+    return JsonResponse(job_json(job))
+
+
+@staff_member_required
+@require_GET
+def render_job_download(request, job_id):
+    """GET: the PDF of a finished render job. A job's PDF never changes, so
+    browsers may keep it for good."""
+    job = get_object_or_404(
+        RenderJob, pk=job_id, project=getattr(request, 'current_project', None), status='done',
+    )
+    try:
+        file = default_storage.open(job.artifact.name, 'rb')
+    except FileNotFoundError:
+        raise Http404
+    response = FileResponse(file, content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="{job.filename}"'
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+
+
 #-----Ip Address CSV Export-----
 
 @staff_member_required
+@revision_conditional('consoles', 'devices', 'amps', 'amp_models', 'processors', 'locations', 'comm')
 def export_ip_address_report_csv(request):
     """
     Export IP Address Report as CSV for spreadsheet import.
@@ -4463,33 +4399,77 @@ def _no_cache(response):
 
 @login_required
 @require_http_methods(["GET"])
-def mic_tracker_checksum(request):
-    """Return a checksum of mic tracker data to detect changes."""
+def mic_tracker_changes(request):
+    """Mic tracker change feed: what changed after revision ?since=N.
+
+    Without `since`, returns just the current revision. See mic_changes.py.
+    """
     project_id = request.session.get('current_project_id')
     if not project_id:
-        return _no_cache(JsonResponse({'checksum': None}))
+        return _no_cache(JsonResponse({'revision': None, 'changes': [], 'reset': False}))
+    try:
+        since = int(request.GET['since']) if request.GET.get('since') else None
+    except ValueError:
+        return _no_cache(JsonResponse({'error': 'since must be an integer'}, status=400))
+    return _no_cache(JsonResponse(mic_changes_since(project_id, since)))
+
+
+# Day partial per page that applies mic tracker changes
+MIC_TRACKER_DAY_TEMPLATES = {
+    'tracker': 'planner/_mic_tracker_day.html',
+    'overview': 'planner/_mic_tracker_overview_day.html',
+}
 
-    sessions = MicSession.objects.filter(
-        day__project_id=project_id
-    ).values('id', 'name', 'start_time', 'end_time').order_by('id')
 
-    assignments = MicAssignment.objects.filter(
-        session__day__project_id=project_id
-    ).values('id', 'rf_number', 'is_micd', 'is_d_mic').order_by('id')
+@login_required
+@require_http_methods(["GET"])
+def mic_tracker_days(request):
+    """Re-render the show days a batch of mic tracker changes touched.
+
+    The page passes the `changes` from mic_tracker_changes as ?day=, ?session=,
+    ?assignment=, ?slot= ids (plus the days it already shows them in, for
+    deleted objects) and ?page=tracker|overview. Returns the project's day
+    ids in page order and the HTML of each touched day that still exists;
+    the page swaps those in and drops days no longer listed.
+    """
+    project = getattr(request, 'current_project', None)
+    template = MIC_TRACKER_DAY_TEMPLATES.get(request.GET.get('page', 'tracker'))
+    if project is None or template is None:
+        return _no_cache(JsonResponse({'error': 'No project or unknown page'}, status=400))
+    try:
+        ids_by_kind = {
+            kind: [int(pk) for pk in request.GET.getlist(kind)]
+            for kind in ('day', 'session', 'assignment', 'slot')
+        }
+    except ValueError:
+        return _no_cache(JsonResponse({'error': 'ids must be integers'}, status=400))
+
+    days = ShowDay.objects.filter(project=project).order_by('date')
+    day_ids = changed_day_ids(project.pk, ids_by_kind)
+    is_viewer = get_project_access(request).is_viewer_only
+    rendered = {
+        day_data['day'].id: render_to_string(
+            template, {'day_data': day_data, 'is_viewer': is_viewer}, request=request,
+        )
+        for day_data in build_mic_grid(days.filter(pk__in=day_ids))
+    }
+    return _no_cache(JsonResponse({
+        'order': list(days.values_list('pk', flat=True)),
+        'days': rendered,
+    }))
 
-    # Include presenter slots so name/type/notes changes trigger refresh
-    slots = PresenterSlot.objects.filter(
-        assignment__session__day__project_id=project_id
-    ).values('id', 'assignment_id', 'presenter_id', 'mic_type', 'is_micd', 'is_active').order_by('id')
 
-    data_string = json.dumps({
-        'sessions': list(sessions),
-        'assignments': list(assignments),
-        'slots': list(slots),
-    }, default=str)
+@login_required
+@require_http_methods(["GET"])
+def mic_tracker_checksum(request):
+    """Return a checksum of mic tracker data to detect changes.
 
-    checksum = hashlib.md5(data_string.encode()).hexdigest()
-    return _no_cache(JsonResponse({'checksum': checksum}))
+    Kept for older pages; the checksum is now the project's mic tracker
+    revision (see mic_tracker_changes)."""
+    project_id = request.session.get('current_project_id')
+    if not project_id:
+        return _no_cache(JsonResponse({'checksum': None}))
+    return _no_cache(JsonResponse({'checksum': str(current_revision(project_id))}))
 
 
 
@@ -4571,13 +4551,11 @@ def create_session(request):
 
         # Each new assignment also needs a default PresenterSlot so the
         # A2 card and slot system works from the start.
-        for assignment in session.mic_assignments.all():
-            if not assignment.presenter_slots.exists():
-                PresenterSlot.objects.create(
-                    assignment=assignment,
-                    order=0,
-                    is_active=True,
-                )
+        slots = PresenterSlot.objects.bulk_create([
+            PresenterSlot(assignment=assignment, order=0, is_active=True)
+            for assignment in session.mic_assignments.filter(presenter_slots__isnull=True)
+        ])
+        session.record_bulk_changes(slot=slots)
 
         return JsonResponse({
             'success': True,
@@ -6215,51 +6193,38 @@ def comm_config_delete_crew_name(request):
 # Dashboard Stats JSON endpoint
 # ─────────────────────────────────────────────────────────────
 @require_GET
-@require_GET
-@require_GET
+@revision_conditional(*STATS_MODULES)
 def dashboard_stats(request):
-    """JSON stats for the system overview dashboard."""
-    from .models import ShowDay, MicAssignment
+    """JSON stats for the system overview dashboard (project_stats)."""
     cp = getattr(request, 'current_project', None)
-    p = {'project': cp} if cp else {}
+    if cp is None:
+        return JsonResponse({'project_name': 'No Project Selected', 'show_days': []})
+    stats = project_stats.get(cp.pk, request_stamp(request, STATS_MODULES))
 
-    try:
-        # Show days with mic counts
-        show_days = []
-        if cp:
-            for day in ShowDay.objects.filter(project=cp).order_by('date')[:5]:
-                mic_count = MicAssignment.objects.filter(session__day=day).count()
-                show_days.append({
-                    'date': str(day.date),
-                    'name': day.name,
-                    'mic_count': mic_count,
-                })
-
-        from .models import MultitrackSession
-        data = {
-            'project_name': cp.name if cp else 'No Project Selected',
-            'console_total': Console.objects.filter(**p).count(),
-            'device_total': Device.objects.filter(**p).count(),
-            'proc_p1': SystemProcessor.objects.filter(**{**p, 'device_type': 'P1'}).count(),
-            'proc_galaxy': SystemProcessor.objects.filter(**{**p, 'device_type': 'GALAXY'}).count(),
-            'amp_total': Amp.objects.filter(**p).count(),
-            'amp_locations': AmpLocation.objects.filter(**p).count(),
-            'pa_cables': PACableSchedule.objects.filter(**p).count(),
-            'pa_zones': PAZone.objects.filter(**p).count(),
-            'sv_total': SoundvisionPrediction.objects.filter(**p).count(),
-            'sv_arrays': 0,
-            'multitrack_total': MultitrackSession.objects.filter(**p).count(),
-            'comm_packs': CommBeltPack.objects.filter(**p).count(),
-            'comm_checked': CommBeltPack.objects.filter(**{**p, 'checked_out': True}).count(),
-            'mic_total': sum(d['mic_count'] for d in show_days),
-            'mic_micd': MicAssignment.objects.filter(session__day__project=cp, is_micd=True).count() if cp else 0,
-            'power_plans': PowerDistributionPlan.objects.filter(**p).count(),
-            'power_amps': 0,
-            'show_days': show_days,
-        }
-        return JsonResponse(data)
-    except Exception as e:
-        return JsonResponse({'error': str(e)}, status=500)
+    return JsonResponse({
+        'project_name': cp.name,
+        'console_total': stats['console']['total'],
+        'device_total': stats['device']['total'],
+        'proc_p1': stats['processor']['p1'],
+        'proc_galaxy': stats['processor']['galaxy'],
+        'amp_total': stats['amp']['total'],
+        'amp_locations': stats['amp']['locations'],
+        'pa_cables': stats['pa_cable']['cable_runs'],
+        'pa_zones': stats['pa_cable']['zones'],
+        'sv_total': stats['soundvision']['predictions'],
+        'sv_arrays': stats['soundvision']['arrays'],
+        'multitrack_total': stats['multitrack']['sessions'],
+        'comm_packs': stats['comm']['total_packs'],
+        'comm_checked': stats['comm']['checked_out'],
+        'mic_total': stats['mic']['assignments'],
+        'mic_micd': stats['mic']['micd'],
+        'power_plans': stats['power']['plans'],
+        'power_amps': stats['power']['amps_in_plans'],
+        'show_days': [
+            {'date': str(day['date']), 'name': day['name'], 'mic_count': day['mic_count']}
+            for day in stats['show_days']
+        ],
+    })
 
 
 @login_required
@@ -6866,9 +6831,10 @@ def _editor_context(session, tracks=None, current_project=None, **extras):
                     suffix without inline {% widthratio %} arithmetic.
     """
     if tracks is None:
-        tracks = list(session.tracks.all())
-    else:
-        tracks = list(tracks)
+        tracks = session.tracks.all()
+    # One query per source type for every resolved_label / resolved_source
+    # the sort and the track rows below read.
+    tracks = MultitrackTrack.resolve_sources(tracks)
 
     # Sort visible tracks according to session.track_order_mode so the editor
     # display matches what the .RPP export will produce. Reuse the exporter's
@@ -7089,6 +7055,7 @@ def multitrack_duplicate(request, session_id):
             for t in source.tracks.all().order_by('track_number')
         ]
         MultitrackTrack.objects.bulk_create(new_tracks)
+        touch(current_project.id, 'multitrack')
 
         return JsonResponse({
             'ok': True,
@@ -7305,6 +7272,7 @@ def multitrack_reorder(request, session_id):
             if session.track_order_mode != 'custom':
                 session.track_order_mode = 'custom'
                 session.save(update_fields=['track_order_mode'])
+            touch(session.project_id, 'multitrack')
 
         return JsonResponse({'ok': True, 'track_order_mode': session.track_order_mode})
     except Exception:
@@ -7323,8 +7291,8 @@ def _resolve_track_source_number(track):
     """Return the engineer-meaningful channel-number string for a MultitrackTrack
     so it can be stored as MultitrackTemplateSlot.source_number (D-02).
 
-    Looks up the linked channel row via _source_model_for(source_type) and reads
-    the corresponding CharField:
+    Reads the corresponding CharField of track.resolved_source (batch-load it
+    with MultitrackTrack.resolve_sources when converting many tracks):
       input  -> ConsoleInput.input_ch
       aux    -> ConsoleAuxOutput.aux_number
       matrix -> ConsoleMatrixOutput.matrix_number
@@ -7334,7 +7302,6 @@ def _resolve_track_source_number(track):
     Returns '' if the source row was deleted (D-04 post_delete converted track
     to manual) or unresolvable.
     """
-    from planner.models import _source_model_for
     if track.source_type == 'manual' or track.source_id is None:
         return ''
     number_field = {
@@ -7344,10 +7311,9 @@ def _resolve_track_source_number(track):
         'stereo': 'stereo_type',
     }
     field = number_field.get(track.source_type)
-    model = _source_model_for(track.source_type)
-    if not field or model is None:
+    if not field:
         return ''
-    row = model.objects.filter(id=track.source_id).only(field).first()
+    row = track.resolved_source
     if row is None:
         return ''
     return getattr(row, field, '') or ''
@@ -7420,7 +7386,9 @@ def multitrack_template_save(request):
 
         # Snapshot ENABLED tracks only (Open Question 1 resolution).
         slots = []
-        enabled_tracks = session.tracks.filter(enabled=True).order_by('track_number')
+        enabled_tracks = MultitrackTrack.resolve_sources(
+            session.tracks.filter(enabled=True).order_by('track_number')
+        )
         for position, track in enumerate(enabled_tracks, start=1):
             slots.append(MultitrackTemplateSlot(
                 template=template,
@@ -7831,7 +7799,9 @@ def multitrack_capacity_check(request, session_id):
 # ──────────────────────────────────────────────────────────────────
 
 from .utils.reaper_export import build_rpp, build_rtracktemplate
-from .utils.nuendo_live_export import build_nlpr, ExportTemplateError
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from .utils.nuendo_live_export import aiter_chunks, iter_nlpr, ExportTemplateError
 
 
 def _safe_filename(name):
@@ -7854,6 +7824,7 @@ def _has_enabled_tracks(session):
 
 
 @staff_member_required
+@revision_conditional('multitrack', 'consoles')
 def multitrack_export_rpp(request, session_id):
     """GET: download a Reaper .RPP file for this session (RPP-01..04).
 
@@ -7901,6 +7872,7 @@ def multitrack_export_rpp(request, session_id):
 
 
 @staff_member_required
+@revision_conditional('multitrack', 'consoles')
 def multitrack_export_rtracktemplate(request, session_id):
     """GET: download a Reaper .RTrackTemplate file for this session (RPP-05).
 
@@ -7953,20 +7925,23 @@ def multitrack_export_rtracktemplate(request, session_id):
 
 
 @staff_member_required
+@revision_conditional('multitrack', 'consoles')
 def multitrack_export_nlpr(request, session_id):
     """GET: download a Nuendo Live 3 .nlpr file for this session.
 
     Verifies NLP-01..06:
       - NLP-01: button-triggered download via the bundled empty-template
-        injection path (delegated to build_nlpr).
+        injection path (delegated to iter_nlpr, streamed).
       - NLP-02..05: name + Farb correctness (HUMAN-UAT — engineer opens
         the file in Nuendo Live 3 to confirm).
       - NLP-06: ID/RuntimeID uniqueness — covered by
         planner.tests.test_nuendo_live_export.
 
-    Response shape: HttpResponse, Content-Type
+    Response shape: StreamingHttpResponse, Content-Type
     application/xml; charset=utf-8, Content-Disposition attachment with
-    filename <_safe_filename(session.name)>.nlpr.
+    filename <_safe_filename(session.name)>.nlpr. Under ASGI the body is
+    an async iterator (aiter_chunks) so Django streams it rather than
+    buffering the whole file.
 
     Failure modes:
       - No current_project on the request → 302 to /.
@@ -7974,7 +7949,7 @@ def multitrack_export_nlpr(request, session_id):
         (IDOR-safe combined filter).
       - Session has no enabled tracks → render editor.html with
         export_error (D-03 reused from Phase 1 pattern at :6900-6912).
-      - Bundled fixture missing / malformed (build_nlpr raises
+      - Bundled fixture missing / malformed (iter_nlpr raises
         ExportTemplateError) → render editor.html with the D-03
         banner copy.
     """
@@ -8006,7 +7981,8 @@ def multitrack_export_nlpr(request, session_id):
         )
 
     try:
-        body = build_nlpr(session)
+        # Template + tracks load here; the body streams track by track
+        body = iter_nlpr(session)
     except ExportTemplateError:
         # CONTEXT.md D-03: missing or malformed bundled fixture →
         # render editor with an export_error banner instead of 500.
@@ -8027,7 +8003,9 @@ def multitrack_export_nlpr(request, session_id):
             ),
         )
 
-    response = HttpResponse(
+    if isinstance(request, ASGIRequest):
+        body = aiter_chunks(body)
+    response = StreamingHttpResponse(
         body, content_type='application/xml; charset=utf-8',
     )
     response['Content-Disposition'] = (
@@ -8617,6 +8595,8 @@ def signal_flow_autosave(request, diagram_id):
                 version=F('version') + 1,
                 updated_at=timezone.now(),
             )
+            if rowcount:
+                touch(diagram.project_id, 'signal_flow')
         if rowcount == 0:
             current = (
                 SignalFlowDiagram.objects.filter(id=diagram.id)
@@ -9127,67 +9107,17 @@ def signal_flow_label_autocomplete(request):
             if instance_results is not None:
                 return JsonResponse({'results': instance_results})
 
-        # (Model, label_field, project-scope kwarg, human source tag).
-        # SystemProcessor is intentionally NOT in this list (D-05).
+        # Project-wide list: served from the project's in-memory label index
+        # (planner/signal_labels.py, which holds the source list), so a
+        # keystroke does not touch the database.
         #
-        # DeviceInput appears TWICE under the same 'Device Input' tag —
-        # once for console_input__source, once for signal_name. The
-        # DeviceInputInlineForm (planner/forms.py:384-440) binds the
-        # engineer's pick to the console_input FK and never writes
-        # signal_name, so the production data path leaves signal_name=''
-        # and the visible label lives on the linked ConsoleInput.source.
-        # The signal_name entry stays for legacy / direct-edit rows. The
-        # (val, tag) dedupe below collapses any overlap.
-        SOURCES = [
-            (DeviceInput,      'console_input__source', 'device__project',
-             'Device Input'),
-            (DeviceInput,      'signal_name',  'device__project',
-             'Device Input'),
-            (DeviceOutput,     'signal_name',  'device__project',
-             'Device Output'),
-            (ConsoleInput,     'source',       'console__project',
-             'Console Input'),
-            (ConsoleAuxOutput, 'name',         'console__project',
-             'Console Aux Out'),
-            (AmpChannel,       'channel_name', 'amp__project',
-             'Amp Channel'),
-            (P1Input,          'label',        'p1_processor__system_processor__project',
-             'P1 Input'),
-            (P1Output,         'label',        'p1_processor__system_processor__project',
-             'P1 Output'),
-            (GalaxyInput,      'label',        'galaxy_processor__system_processor__project',
-             'Galaxy Input'),
-            (GalaxyOutput,     'label',        'galaxy_processor__system_processor__project',
-             'Galaxy Output'),
-        ]
-
-        # Phase 11 GAP-11.1: optionally narrow SOURCES to the requesting shape's catalog.
-        # Allowlist-only: unknown shape_class → fall through (no exception, no 500).
-        # shape_class was parsed and SHAPE_CLASS_BLOCK already short-circuited above.
-        if shape_class and shape_class in SHAPE_CLASS_SOURCES:
-            allowed_tags = SHAPE_CLASS_SOURCES[shape_class]
-            SOURCES = [row for row in SOURCES if row[3] in allowed_tags]
-
-        seen = set()
-        results = []
-        for Model, field, scope_kwarg, tag in SOURCES:
-            filter_kw = {scope_kwarg: current_project}
-            if q:
-                filter_kw[f'{field}__icontains'] = q
-            qs = (Model.objects
-                  .filter(**filter_kw)
-                  .exclude(**{field: ''})
-                  .exclude(**{f'{field}__isnull': True})
-                  .values_list(field, flat=True)
-                  .distinct()[:50])
-            for val in qs:
-                key = (val, tag)
-                if key not in seen:
-                    seen.add(key)
-                    results.append({'label': val, 'source': tag})
-
-        results.sort(key=lambda r: r['label'].lower())
-        return JsonResponse({'results': results[:8]})
+        # Phase 11 GAP-11.1: optionally narrow the sources to the requesting
+        # shape's catalog. Allowlist-only: unknown shape_class → fall through
+        # (no exception, no 500). shape_class was parsed and
+        # SHAPE_CLASS_BLOCK already short-circuited above.
+        allowed_tags = SHAPE_CLASS_SOURCES.get(shape_class) if shape_class else None
+        results = label_index.search(current_project.pk, q, tags=allowed_tags)
+        return JsonResponse({'results': results})
     except Exception:
         _signal_flow_logger.exception('signal_flow_label_autocomplete failed')
         return JsonResponse({'error': 'Server error.'}, status=500)
@@ -6,29 +6,48 @@
 #   - A local agent runs on the engineer's show laptop (run_monitor command)
 #   - The agent scans networks, pings devices, and POSTs results here
 #   - This file serves the dashboard (read-only) and receives agent data
-#   - SSE pushes live updates to the browser from the database
+#   - The browser polls a delta status endpoint; live events are pushed over
+#     SSE from the in-process hub in monitor_hub.py (production runs under
+#     ASGI for this — see Procfile)
 #
 # Auth:
 #   - Dashboard views: Django session auth (@login_required)
 #   - Agent API endpoints: Project agent_api_key (Bearer token)
 
+import gzip
+import hashlib
+import io
 import ipaddress
 import json
 import time
+from datetime import timedelta
 
 from django.shortcuts import render
-from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.contrib.auth.decorators import login_required
 from django.db import close_old_connections
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from .models import (
-    Project, MonitorSession, DiscoveredDevice, PollResult, DeviceEvent,
-    ProjectSNMPConfig, SwitchPortSnapshot,
+    MonitorSession, DiscoveredDevice, DeviceEvent,
+    ProjectSNMPConfig,
     Console, Device, Amp,
 )
+from .monitor_agent_cache import agent_cache
+from .monitor_hub import event_stream
+from .monitor_ingest import (
+    ingest_dante_results, ingest_poll_results, ingest_scan_results,
+    ingest_snmp_results, record_poll_history,
+)
+from .monitor_retention import retention_scheduler
+from .monitor_rollup import latency_series
+from .monitor_status import (
+    new_events, parse_cursor, status_etag, status_payload, status_signature,
+)
 
 
 # ──────────────────────────────────────────────
@@ -44,11 +63,31 @@ def _authenticate_agent(request):
         return None, JsonResponse({'error': 'Missing Authorization header'}, status=401)
 
     token = auth_header[7:].strip()
-    try:
-        project = Project.objects.get(agent_api_key=token)
-        return project, None
-    except Project.DoesNotExist:
+    project = agent_cache.project(token)
+    if project is None:
         return None, JsonResponse({'error': 'Invalid API key'}, status=403)
+    return project, None
+
+
+# Ceiling on a decompressed agent body (the compressed size is already capped
+# by DATA_UPLOAD_MAX_MEMORY_SIZE; this stops a tiny gzip bomb)
+AGENT_MAX_BODY_BYTES = 50 * 1024 * 1024
+
+
+def _agent_json(request):
+    """Parse an agent request body, gunzipping it first if the agent sent
+    Content-Encoding: gzip (see monitor_uplink.py). Raises ValueError on a
+    malformed or oversized body."""
+    body = request.body
+    if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+        try:
+            with gzip.GzipFile(fileobj=io.BytesIO(body)) as f:
+                body = f.read(AGENT_MAX_BODY_BYTES + 1)
+        except (OSError, EOFError) as e:
+            raise ValueError(f'Bad gzip body: {e}') from e
+        if len(body) > AGENT_MAX_BODY_BYTES:
+            raise ValueError('Body too large')
+    return json.loads(body)
 
 
 # ──────────────────────────────────────────────
@@ -132,72 +171,118 @@ def network_monitor_view(request):
 
 @login_required
 def monitor_status_view(request):
-    """Returns current device status + recent events as JSON.
+    """Returns device status + recent events as JSON, as a delta.
     The browser polls this every 2 seconds via fetch().
     Much more reliable than SSE with Django's threaded dev server.
+
+    GET ?last_event_id=N&cursor=C
+      - No cursor: full snapshot of active devices, switch ports and Dante data.
+      - cursor from the previous response: only rows changed since then, plus
+        `removed` (deactivated device ids) and `members` (active count + id sum)
+        so the client can detect hard deletes and drop its cursor.
+    Responses carry an ETag; a matching If-None-Match gets 304 when nothing
+    changed and there are no new events. See monitor_status.py.
     """
     current_project = getattr(request, 'current_project', None)
     if not current_project:
         return JsonResponse({'ok': False, 'error': 'No project'})
 
     # Get last_event_id from query param (browser tracks this)
-    last_event_id = int(request.GET.get('last_event_id', '0'))
+    try:
+        last_event_id = int(request.GET.get('last_event_id', '0'))
+    except ValueError:
+        last_event_id = 0
+    since = parse_cursor(request.GET.get('cursor'))
 
     # Active session?
     session = MonitorSession.objects.filter(
         project=current_project, ended_at__isnull=True
     ).first()
+    snmp_configured = ProjectSNMPConfig.objects.filter(project=current_project).exists()
 
-    # All active devices with current status
-    devices = list(
-        DiscoveredDevice.objects.filter(
-            project=current_project, is_active=True
-        )
-    )
+    signature = status_signature(current_project, session, timezone.now())
+    events = new_events(session, last_event_id)
+    delivered_event_id = events[-1]['id'] if events else last_event_id
 
-    # New events since last poll
-    new_events = []
-    if session:
-        events = DeviceEvent.objects.filter(
-            session=session, id__gt=last_event_id,
-        ).order_by('id').select_related('device')[:50]
-        new_events = [ev.as_sse_dict() for ev in events]
+    etag = status_etag(signature, session, snmp_configured, delivered_event_id)
+    if since is not None and request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
 
-    return JsonResponse({
+    payload = status_payload(current_project, session, signature, since)
+    response = JsonResponse({
         'ok': True,
         'monitor_running': session is not None,
-        'devices': [d.as_status_dict() for d in devices],
-        'events': new_events,
-        'last_event_id': new_events[-1]['id'] if new_events else last_event_id,
+        'events': events,
+        'last_event_id': delivered_event_id,
         'show_mode': session.show_mode if session else 'show',
-        'switch_ports': {
-            str(device.pk): [
-                {
-                    'port_index': snap.port_index,
-                    'port_description': snap.port_description,
-                    'oper_status': snap.oper_status,
-                    'speed_mbps': snap.speed_mbps,
-                    'bandwidth_pct': snap.bandwidth_pct,
-                    'error_count': snap.error_count,
-                }
-                for snap in device.port_snapshots.filter(session=session).order_by('port_index')
-            ]
-            for device in devices
-            if device.domain == 'switch'
-        } if session else {},
-        'dante_data': {
-            str(device.pk): {
-                'dante_device_name': device.dante_device_name,
-                'clock_role': device.clock_role,
-                'tx_channels': device.tx_channel_count,
-                'rx_channels': device.rx_channel_count,
-            }
-            for device in devices
-            if device.domain == 'dante'
-        },
-        'snmp_configured': ProjectSNMPConfig.objects.filter(
-            project=current_project
-        ).exists() if current_project else False,
+        'snmp_configured': snmp_configured,
+        **payload,
+    })
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@login_required
+def monitor_stream_view(request):
+    """Server-sent event stream of live monitor updates for the current project.
+    GET /audiopatch/network-monitor/stream/
+
+    Each agent cycle arrives as one `monitor` event: {"events": [...], "changed": bool}.
+    The dashboard shows alerts from `events` immediately and fetches a status
+    delta when `changed` is set. Fed from memory by monitor_hub — no queries
+    per connected client.
+
+    Needs ASGI, which is how production is served (Procfile). Under a WSGI
+    server such as `manage.py runserver` an open stream would pin a worker
+    for as long as the tab stays open, so there it answers 204, which tells
+    EventSource not to reconnect, and the dashboard keeps polling.
+    """
+    current_project = getattr(request, 'current_project', None)
+    if not current_project:
+        return JsonResponse({'ok': False, 'error': 'No project'})
+
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(
+        event_stream(current_project.pk), content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # don't let a proxy buffer the stream
+    return response
+
+
+@login_required
+def monitor_latency_view(request):
+    """Latency sparkline data from the rollup tiers (never scans raw PollResults).
+    GET /audiopatch/network-monitor/latency/?device=<id>&device=<id>&minutes=60&points=120
+    Without device params, returns every active device in the project.
+    """
+    current_project = getattr(request, 'current_project', None)
+    if not current_project:
+        return JsonResponse({'ok': False, 'error': 'No project'})
+
+    try:
+        minutes = max(1, min(int(request.GET.get('minutes', '60')), 60 * 24 * 400))
+        points = max(10, min(int(request.GET.get('points', '120')), 1000))
+        requested = [int(d) for d in request.GET.getlist('device')]
+    except ValueError:
+        return JsonResponse({'ok': False, 'error': 'Invalid parameters'}, status=400)
+
+    devices = DiscoveredDevice.objects.filter(project=current_project, is_active=True)
+    if requested:
+        devices = devices.filter(pk__in=requested)
+    device_ids = list(devices.values_list('pk', flat=True))
+
+    end = timezone.now()
+    data = latency_series(device_ids, end - timedelta(minutes=minutes), end, max_points=points)
+    return JsonResponse({
+        'ok': True,
+        'resolution': data['resolution'],
+        'series': {str(pk): columns for pk, columns in data['series'].items()},
     })
 
 
@@ -267,6 +352,7 @@ def dashboard_request_scan(request):
     # Store the scan request in the session notes field as a simple flag
     session.notes = 'SCAN_REQUESTED'
     session.save(update_fields=['notes'])
+    agent_cache.invalidate(current_project.pk)
 
     return JsonResponse({'ok': True, 'status': 'scan_requested'})
 
@@ -300,6 +386,8 @@ def agent_heartbeat(request):
             session=session, event_type='MONITOR_STARTED',
             details={'source': 'agent'},
         )
+    agent_cache.invalidate(project.pk)
+    retention_scheduler.ensure_started()
 
     return JsonResponse({
         'ok': True,
@@ -325,6 +413,7 @@ def agent_stop(request):
     if session:
         session.ended_at = timezone.now()
         session.save(update_fields=['ended_at'])
+    agent_cache.invalidate(project.pk)
 
     return JsonResponse({'ok': True, 'status': 'stopped'})
 
@@ -340,53 +429,11 @@ def agent_scan_results(request):
     if err:
         return err
 
-    data = json.loads(request.body)
+    data = _agent_json(request)
     devices_data = data.get('devices', [])
-    added = 0
-    updated = 0
-
-    for dev in devices_data:
-        ip = dev.get('ip', '').strip()
-        if not ip:
-            continue
-        obj, created = DiscoveredDevice.objects.get_or_create(
-            project=project,
-            ip_address=ip,
-            defaults={
-                'label': dev.get('label', ''),
-                'domain': dev.get('domain', 'unknown'),
-                'is_active': True,
-            }
-        )
-        if created:
-            added += 1
-        else:
-            # Update label/domain if provided and device exists
-            changed = False
-            if dev.get('label') and dev['label'] != obj.label:
-                obj.label = dev['label']
-                changed = True
-            if dev.get('domain') and dev['domain'] != obj.domain:
-                obj.domain = dev['domain']
-                changed = True
-            if not obj.is_active:
-                obj.is_active = True
-                obj.consecutive_failures = 0
-                obj.last_known_state = 'unknown'
-                changed = True
-            if changed:
-                obj.save()
-                updated += 1
-
-    # Log scan event
-    session = MonitorSession.objects.filter(
-        project=project, ended_at__isnull=True
-    ).first()
-    if session:
-        DeviceEvent.objects.create(
-            session=session, event_type='SCAN_STARTED',
-            details={'device_count': len(devices_data), 'added': added},
-        )
+
+    session = agent_cache.session(project)
+    added, updated = ingest_scan_results(project, session, devices_data)
 
     return JsonResponse({'ok': True, 'added': added, 'updated': updated})
 
@@ -404,67 +451,21 @@ def agent_poll_results(request):
     if err:
         return err
 
-    session = MonitorSession.objects.filter(
-        project=project, ended_at__isnull=True
-    ).first()
+    session = agent_cache.session(project)
     if not session:
         return JsonResponse({'error': 'No active session. Call /api/heartbeat/ first.'}, status=400)
 
-    data = json.loads(request.body)
-    results = data.get('results', [])
-
-    # Build IP → device map for this project
-    active_devices = {
-        d.ip_address: d
-        for d in DiscoveredDevice.objects.filter(project=project, is_active=True)
-    }
-
-    events_created = []
+    return JsonResponse(_poll_cycle(project, session, _agent_json(request)))
 
-    for r in results:
-        ip = r.get('ip', '').strip()
-        device = active_devices.get(ip)
-        if not device:
-            continue
 
-        is_up = r.get('is_alive', False)
-        latency = r.get('latency_ms')
-
-        # Write poll result
-        PollResult.objects.create(
-            device=device, session=session,
-            is_reachable=is_up, latency_ms=latency,
-        )
+def _poll_cycle(project, session, data):
+    """Apply one poll-results payload; returns the response body."""
+    results = data.get('results', [])
 
-        # N=3 state machine — runs on the cloud side
-        prev_state = device.last_known_state
-
-        if is_up:
-            if prev_state != 'online':
-                ev = DeviceEvent.objects.create(
-                    device=device, session=session,
-                    event_type='ONLINE',
-                    details={'latency_ms': latency},
-                )
-                events_created.append(ev.as_sse_dict())
-            device.consecutive_failures = 0
-            device.last_known_state = 'online'
-            device.last_seen = timezone.now()
-        else:
-            device.consecutive_failures = (device.consecutive_failures or 0) + 1
-            if device.consecutive_failures == 3:
-                device.last_known_state = 'offline'
-                # Only fire OFFLINE alert if device was previously online
-                # Never-seen devices (last_seen=None) stay "unreachable" — no alert
-                if device.last_seen is not None:
-                    ev = DeviceEvent.objects.create(
-                        device=device, session=session,
-                        event_type='OFFLINE',
-                        details={'consecutive_failures': device.consecutive_failures},
-                    )
-                    events_created.append(ev.as_sse_dict())
-
-        device.save(update_fields=['consecutive_failures', 'last_known_state', 'last_seen'])
+    # N=3 state machine runs in memory; the whole cycle is written in bulk.
+    # The same device rows give the agent its devices_version.
+    devices = list(DiscoveredDevice.objects.filter(project=project, is_active=True))
+    events_created = ingest_poll_results(project, session, results, devices)
 
     # Check if dashboard requested a re-scan
     scan_requested = False
@@ -472,13 +473,17 @@ def agent_poll_results(request):
         scan_requested = True
         session.notes = ''
         session.save(update_fields=['notes'])
+        agent_cache.invalidate(project.pk)
 
-    return JsonResponse({
+    return {
         'ok': True,
         'processed': len(results),
         'events': events_created,
         'scan_requested': scan_requested,
-    })
+        'devices_version': _device_list_of(
+            (d.ip_address, d.domain) for d in devices
+        )['version'],
+    }
 
 
 @csrf_exempt
@@ -492,7 +497,7 @@ def agent_remove_device(request):
     if err:
         return err
 
-    data = json.loads(request.body)
+    data = _agent_json(request)
     ip = data.get('ip', '').strip()
 
     device = DiscoveredDevice.objects.filter(
@@ -507,24 +512,44 @@ def agent_remove_device(request):
     return JsonResponse({'ok': True, 'ip': ip})
 
 
+# Domains the agent pings on its fast tier (sub-second detection): a switch
+# going down takes every device behind it with it
+CRITICAL_DOMAINS = ('switch',)
+
+
+def _device_list(project):
+    """Active device IPs, the critical subset, and a version string that
+    changes whenever either does (the agent refetches only on a new version)."""
+    return _device_list_of(
+        DiscoveredDevice.objects.filter(project=project, is_active=True)
+        .values_list('ip_address', 'domain')
+    )
+
+
+def _device_list_of(rows):
+    """_device_list() from already loaded (ip_address, domain) rows."""
+    rows = sorted(rows)
+    version = hashlib.md5(repr(rows).encode()).hexdigest()[:16]
+    return {
+        'devices': [ip for ip, _ in rows],
+        'critical': [ip for ip, domain in rows if domain in CRITICAL_DOMAINS],
+        'version': version,
+    }
+
+
 @csrf_exempt
 def agent_device_list(request):
     """Agent fetches the list of active devices to poll.
     GET /audiopatch/network-monitor/api/devices/
-    Returns: list of IPs the agent should ping each cycle.
+    Returns: {"devices": [IPs to ping], "critical": [IPs to ping on the fast
+    tier], "version": "..."}. Poll responses carry the current version as
+    devices_version, so the agent knows when to fetch again.
     """
     project, err = _authenticate_agent(request)
     if err:
         return err
 
-    devices = DiscoveredDevice.objects.filter(
-        project=project, is_active=True
-    ).values_list('ip_address', flat=True)
-
-    return JsonResponse({
-        'ok': True,
-        'devices': list(devices),
-    })
+    return JsonResponse({'ok': True, **_device_list(project)})
 
 
 # ──────────────────────────────────────────────
@@ -572,81 +597,18 @@ def agent_snmp_results(request):
     if err:
         return err
 
-    session = MonitorSession.objects.filter(project=project, ended_at__isnull=True).first()
+    session = agent_cache.session(project)
     if not session:
         return JsonResponse({'error': 'No active session.'}, status=400)
 
-    data = json.loads(request.body)
-    results = data.get('results', [])
-    suppress_non_critical = session.show_mode in ('setup', 'wrap')
-    events_created = []
-
-    for switch_data in results:
-        device_id = switch_data.get('device_id')
-        device = DiscoveredDevice.objects.filter(pk=device_id, project=project, is_active=True).first()
-        if not device:
-            continue
-
-        snmp_error = switch_data.get('error')
-        if snmp_error:
-            # SNMP unreachable — skip port snapshots
-            continue
-
-        ports = switch_data.get('ports', [])
-        for port_data in ports:
-            port_idx = port_data.get('port_index')
-            if port_idx is None:
-                continue
-
-            oper_status = port_data.get('oper_status', 'unknown')
-            speed = port_data.get('speed_mbps')
-            bw_pct = port_data.get('bandwidth_pct')
-            err_count = port_data.get('error_count', 0)
-            port_desc = port_data.get('port_description', '')
-
-            # Get previous snapshot for change detection
-            prev = SwitchPortSnapshot.objects.filter(
-                device=device, session=session, port_index=port_idx
-            ).first()
-            prev_status = prev.oper_status if prev else None
-
-            SwitchPortSnapshot.objects.update_or_create(
-                device=device, session=session, port_index=port_idx,
-                defaults={
-                    'port_description': port_desc,
-                    'oper_status': oper_status,
-                    'speed_mbps': speed,
-                    'bandwidth_pct': bw_pct,
-                    'error_count': err_count,
-                },
-            )
+    return JsonResponse(_snmp_cycle(project, session, _agent_json(request)))
+
 
-            # Non-critical events — suppressed in setup/wrap per D-08
-            if not suppress_non_critical:
-                if prev_status and prev_status != oper_status:
-                    event_type = 'PORT_UP' if oper_status == 'up' else 'PORT_DOWN'
-                    ev = DeviceEvent.objects.create(
-                        device=device, session=session,
-                        event_type=event_type,
-                        details={'port_index': port_idx, 'port_description': port_desc},
-                    )
-                    events_created.append(ev.as_sse_dict())
-                if bw_pct is not None and bw_pct > 90:
-                    ev = DeviceEvent.objects.create(
-                        device=device, session=session,
-                        event_type='BW_CRITICAL',
-                        details={'port_index': port_idx, 'bandwidth_pct': bw_pct},
-                    )
-                    events_created.append(ev.as_sse_dict())
-                elif bw_pct is not None and bw_pct > 70:
-                    ev = DeviceEvent.objects.create(
-                        device=device, session=session,
-                        event_type='BW_WARNING',
-                        details={'port_index': port_idx, 'bandwidth_pct': bw_pct},
-                    )
-                    events_created.append(ev.as_sse_dict())
-
-    return JsonResponse({'ok': True, 'events': events_created})
+def _snmp_cycle(project, session, data):
+    """Apply one snmp-results payload; returns the response body."""
+    # Previous snapshots are read once; the whole cycle is upserted in bulk
+    events_created = ingest_snmp_results(project, session, data.get('results', []))
+    return {'ok': True, 'events': events_created}
 
 
 # ──────────────────────────────────────────────
@@ -664,86 +626,92 @@ def agent_dante_results(request):
     if err:
         return err
 
-    session = MonitorSession.objects.filter(project=project, ended_at__isnull=True).first()
+    session = agent_cache.session(project)
     if not session:
         return JsonResponse({'error': 'No active session.'}, status=400)
 
     try:
-        data = json.loads(request.body)
-    except (json.JSONDecodeError, ValueError):
+        data = _agent_json(request)
+    except ValueError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
 
+    body, status = _dante_cycle(project, session, data)
+    return JsonResponse(body, status=status)
+
+
+def _dante_cycle(project, session, data):
+    """Apply one dante-results payload; returns (response body, status)."""
     results = data.get('results', [])
     if not isinstance(results, list):
-        return JsonResponse({'error': 'results must be a list'}, status=400)
-
-    events_created = []
-    seen_ips = set()
-
-    for entry in results:
-        ip = entry.get('ip')
-        name = entry.get('name', '')
-        if not ip:
-            continue
-
-        seen_ips.add(ip)
-
-        # Validate clock_role value
-        clock_role = entry.get('clock_role', 'unknown')
-        if clock_role not in ('master', 'locked', 'unlocked', 'unknown'):
-            clock_role = 'unknown'
-
-        device, created = DiscoveredDevice.objects.update_or_create(
-            project=project,
-            ip_address=ip,
-            defaults={
-                'domain': 'dante',
-                'label': name,
-                'dante_device_name': name,
-                'clock_role': clock_role,
-                'tx_channel_count': entry.get('tx_count'),
-                'rx_channel_count': entry.get('rx_count'),
-                'dante_model_id': entry.get('model_id', ''),
-                'dante_mac_address': entry.get('mac_address', ''),
-                'is_active': True,
-                'last_seen': timezone.now(),
-                'last_known_state': 'online',
-                'consecutive_failures': 0,
-            },
-        )
+        return {'error': 'results must be a list'}, 400
 
-        if created:
-            ev = DeviceEvent.objects.create(
-                device=device,
-                session=session,
-                event_type='DANTE_DISCOVERED',
-                details={'name': name, 'ip': ip, 'clock_role': clock_role},
-            )
-            events_created.append(ev.as_sse_dict())
-
-    # Clean up duplicate Dante records: same device name but different IP.
-    # Keeps the record matching the current discovery IP, removes stale duplicates.
-    seen_names = {}  # name -> current ip
-    for entry in results:
-        name = entry.get('name', '')
-        ip = entry.get('ip')
-        if name and ip:
-            seen_names[name] = ip
-    for name, current_ip in seen_names.items():
-        DiscoveredDevice.objects.filter(
-            project=project, domain='dante', dante_device_name=name,
-        ).exclude(ip_address=current_ip).delete()
+    events_created = ingest_dante_results(project, session, results)
+    return {'ok': True, 'events': events_created}, 200
+
+
+# ──────────────────────────────────────────────
+# Batched uplink (see monitor_uplink.py)
+# ──────────────────────────────────────────────
+
+def _batch_item(project, session, item):
+    """Apply one batch item; returns its response body."""
+    kind = item.get('kind')
+    data = item.get('body')
+    if not isinstance(data, dict):
+        return {'ok': False, 'error': 'body must be an object'}
+
+    if kind == 'poll-results':
+        if item.get('replay'):
+            observed_at = parse_datetime(item.get('observed_at') or '')
+            if observed_at is None or timezone.is_naive(observed_at):
+                return {'ok': False, 'error': 'replayed items need an aware observed_at'}
+            stored = record_poll_history(project, session, data.get('results', []), observed_at)
+            return {'ok': True, 'processed': stored, 'events': [], 'scan_requested': False}
+        return _poll_cycle(project, session, data)
+    if kind == 'snmp-results':
+        return _snmp_cycle(project, session, data)
+    if kind == 'dante-results':
+        body, _ = _dante_cycle(project, session, data)
+        return body
+    return {'ok': False, 'error': f'Unknown kind: {kind}'}
 
-    # Deactivate Dante devices NOT in this discovery cycle
-    stale_dante = DiscoveredDevice.objects.filter(
-        project=project, domain='dante', is_active=True,
-    ).exclude(ip_address__in=seen_ips)
 
-    for device in stale_dante:
-        device.is_active = False
-        device.save(update_fields=['is_active'])
+@csrf_exempt
+@require_POST
+def agent_batch(request):
+    """Agent pushes one tick's worth of results in a single (usually gzipped) request.
+    POST /audiopatch/network-monitor/api/batch/
+    Body: {"items": [{"kind": "poll-results"|"snmp-results"|"dante-results",
+                      "body": {...as for the single endpoint...},
+                      "observed_at": "ISO-8601", "replay": false}, ...]}
+
+    Items are applied in order. A replayed poll cycle (spooled by the agent
+    during an uplink outage) is stored as latency history at observed_at and
+    does not drive the state machine. Returns {"ok": true, "results": [...]},
+    one response body per item, in order.
+    """
+    project, err = _authenticate_agent(request)
+    if err:
+        return err
+
+    session = agent_cache.session(project)
+    if not session:
+        return JsonResponse({'error': 'No active session. Call /api/heartbeat/ first.'}, status=400)
+
+    try:
+        data = _agent_json(request)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    items = data.get('items', [])
+    if not isinstance(items, list):
+        return JsonResponse({'error': 'items must be a list'}, status=400)
 
-    return JsonResponse({'ok': True, 'events': events_created})
+    results = [
+        _batch_item(project, session, item) if isinstance(item, dict)
+        else {'ok': False, 'error': 'item must be an object'}
+        for item in items
+    ]
+    return JsonResponse({'ok': True, 'results': results})
 
 
 @login_required
@@ -872,4 +840,5 @@ def dashboard_set_show_mode(request):
 
     session.show_mode = mode
     session.save(update_fields=['show_mode'])
+    agent_cache.invalidate(current_project.pk)
     return JsonResponse({'ok': True, 'show_mode': mode})